@@ -1,6 +1,6 @@
 # ipsfa-inventario-backend/bienes_app/admin.py
 from django.contrib import admin
-from .models import Bien, MovimientoBien, DepreciacionMensual, Categoria
+from .models import Bien, MovimientoBien, DepreciacionMensual, DepreciacionAnual, Categoria, EstadoDepreciacionBien, EjecucionDepreciacion, UsoBien, ImportacionBienes, SubidaFragmentada, SolicitudReporte
 
 @admin.register(Bien) # Usa el decorador para registrar
 class BienAdmin(admin.ModelAdmin):
@@ -19,6 +19,13 @@ class MovimientoBienAdmin(admin.ModelAdmin):
     search_fields = ('bien__descripcion', 'bien__codigo_patrimonial')
     autocomplete_fields = ['bien', 'unidad_origen', 'unidad_destino', 'usuario_registra']
 
+@admin.register(UsoBien)
+class UsoBienAdmin(admin.ModelAdmin):
+    list_display = ('bien', 'anio', 'mes', 'unidades', 'fecha_registro')
+    list_filter = ('anio', 'mes')
+    search_fields = ('bien__descripcion', 'bien__codigo_patrimonial')
+    autocomplete_fields = ['bien']
+
 # NUEVO REGISTRO PARA LOS CÁLCULOS DE DEPRECIACIÓN
 @admin.register(DepreciacionMensual)
 class DepreciacionMensualAdmin(admin.ModelAdmin):
@@ -40,7 +47,119 @@ class DepreciacionMensualAdmin(admin.ModelAdmin):
     def has_delete_permission(self, request, obj=None):
         return False
     
+@admin.register(DepreciacionAnual)
+class DepreciacionAnualAdmin(admin.ModelAdmin):
+    list_display = (
+        'bien',
+        'anio',
+        'depreciacion_anio',
+        'depreciacion_acumulada',
+        'valor_neto_en_libros',
+        'fecha_actualizacion'
+    )
+    list_filter = ('anio',)
+    search_fields = ('bien__descripcion', 'bien__codigo_patrimonial')
+    def has_add_permission(self, request):
+        return False
+    def has_change_permission(self, request, obj=None):
+        return False
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 @admin.register(Categoria)
 class CategoriaAdmin(admin.ModelAdmin):
     list_display = ('nombre', 'descripcion')
-    search_fields = ('nombre',)
\ No newline at end of file
+    search_fields = ('nombre',)
+@admin.register(EstadoDepreciacionBien)
+class EstadoDepreciacionBienAdmin(admin.ModelAdmin):
+    list_display = (
+        'bien',
+        'ultimo_anio',
+        'ultimo_mes',
+        'depreciacion_acumulada',
+        'valor_neto_en_libros',
+        'fecha_actualizacion'
+    )
+    list_filter = ('ultimo_anio', 'ultimo_mes')
+    search_fields = ('bien__descripcion', 'bien__codigo_patrimonial')
+    def has_add_permission(self, request):
+        return False
+    def has_change_permission(self, request, obj=None):
+        return False
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(EjecucionDepreciacion)
+class EjecucionDepreciacionAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'anio',
+        'mes',
+        'estado',
+        'usuario',
+        'bienes_procesados',
+        'registros_creados',
+        'fecha_creacion',
+        'fecha_fin'
+    )
+    list_filter = ('estado', 'anio')
+    def has_add_permission(self, request):
+        return False
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(ImportacionBienes)
+class ImportacionBienesAdmin(admin.ModelAdmin):
+    list_display = (
+        'nombre_archivo',
+        'estado',
+        'modo',
+        'usuario',
+        'total_filas',
+        'filas_con_error',
+        'bienes_creados',
+        'bienes_actualizados',
+        'fecha_creacion',
+        'fecha_fin'
+    )
+    list_filter = ('estado', 'modo', 'fecha_creacion')
+    search_fields = ('nombre_archivo',)
+    def has_add_permission(self, request):
+        return False
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(SubidaFragmentada)
+class SubidaFragmentadaAdmin(admin.ModelAdmin):
+    list_display = (
+        'nombre_archivo',
+        'estado',
+        'usuario',
+        'tamano_total',
+        'importacion',
+        'fecha_creacion',
+        'fecha_actualizacion'
+    )
+    list_filter = ('estado', 'fecha_creacion')
+    def has_add_permission(self, request):
+        return False
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(SolicitudReporte)
+class SolicitudReporteAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'tipo',
+        'estado',
+        'usuario',
+        'nocturna',
+        'tamano_archivo',
+        'fecha_creacion',
+        'fecha_fin'
+    )
+    list_filter = ('estado', 'tipo', 'nocturna')
+    def has_add_permission(self, request):
+        return False
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BienesAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bienes_app'
+
+    def ready(self):
+        import bienes_app.signals
@@ -0,0 +1,122 @@
+# bienes_app/cache_reportes.py
+"""
+Caché en disco de los reportes PDF y Excel.
+
+Cada reporte generado se guarda en settings.REPORTES_CACHE_DIR con una clave
+que resume su tipo, sus parámetros y la versión de los datos
+(VersionDatosReportes). La versión aumenta con cada cambio en los bienes,
+movimientos, depreciaciones, categorías y unidades (ver signals.py; los
+procesos masivos, que no disparan señales, la aumentan por su cuenta), así que
+un reporte solo se vuelve a generar cuando cambian los datos. Al guardar un
+reporte se borran los de versiones anteriores, que ya no se van a pedir.
+
+La clave sirve también de ETag: el cliente que ya tiene el reporte recibe un
+304 sin que se lea ni se genere nada.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import VersionDatosReportes
+
+
+def version_datos():
+    """Versión actual de los datos de los reportes."""
+    version, _ = VersionDatosReportes.objects.get_or_create(pk=1)
+    return version.version
+
+
+def incrementar_version_datos():
+    """Aumenta la versión de los datos: los reportes guardados dejan de servir."""
+    actualizadas = VersionDatosReportes.objects.filter(pk=1).update(
+        version=F('version') + 1, fecha_actualizacion=timezone.now()
+    )
+    if not actualizadas:
+        VersionDatosReportes.objects.get_or_create(pk=1, defaults={'version': 1})
+
+
+# Marca, por hilo, de que hay un aumento de versión pendiente de confirmarse
+_aumento_pendiente = threading.local()
+
+
+def datos_modificados():
+    """
+    Aumenta la versión de los datos cuando se confirme la transacción en curso
+    (o en el momento, fuera de una). Si la transacción se revierte, los
+    reportes guardados siguen sirviendo.
+
+    Se llama por cada fila guardada o borrada, así que el aumento se hace una
+    sola vez por transacción: cada llamada programa un aviso (que no consulta
+    la base de datos) y solo el primero que se ejecuta al confirmar aumenta la
+    versión y quita la marca. Si la transacción se revierte la marca queda
+    puesta y la versión aumenta con la siguiente confirmación, lo que a lo
+    sumo regenera algún reporte de más.
+    """
+    _aumento_pendiente.activo = True
+    transaction.on_commit(_aumentar_si_pendiente)
+
+
+def _aumentar_si_pendiente():
+    if getattr(_aumento_pendiente, 'activo', False):
+        _aumento_pendiente.activo = False
+        incrementar_version_datos()
+
+
+def clave_reporte(tipo, parametros, version):
+    """Clave del reporte `tipo` con los `parametros` (normalizados) para la `version` de los datos."""
+    contenido = json.dumps([tipo, parametros], sort_keys=True, default=str)
+    return f'{version}-{hashlib.sha256(contenido.encode()).hexdigest()[:32]}'
+
+
+def ruta_reporte(clave, extension):
+    """Ruta en la caché del reporte con la `clave` (exista o no)."""
+    return os.path.join(settings.REPORTES_CACHE_DIR, f'{clave}.{extension}')
+
+
+def abrir_reporte(clave, extension, generar):
+    """
+    Abre para lectura el reporte de la caché con la `clave`. Si no está, lo
+    genera con `generar()` (que devuelve el archivo generado) y lo guarda: se
+    escribe en un temporal del mismo directorio y se renombra, para que nunca
+    se lea un reporte a medio escribir.
+    """
+    ruta = ruta_reporte(clave, extension)
+    try:
+        return open(ruta, 'rb')
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(settings.REPORTES_CACHE_DIR, exist_ok=True)
+    temporal = tempfile.NamedTemporaryFile(dir=settings.REPORTES_CACHE_DIR, suffix='.tmp', delete=False)
+    try:
+        with temporal:
+            shutil.copyfileobj(generar(), temporal)
+        # Se abre antes de renombrarlo por si otro proceso lo borra enseguida
+        archivo = open(temporal.name, 'rb')
+        os.replace(temporal.name, ruta)
+    except BaseException:
+        if os.path.exists(temporal.name):
+            os.remove(temporal.name)
+        raise
+    _borrar_versiones_anteriores(int(clave.split('-')[0]))
+    return archivo
+
+
+def _borrar_versiones_anteriores(version):
+    """Borra de la caché los reportes de versiones de los datos anteriores a `version`."""
+    for nombre in os.listdir(settings.REPORTES_CACHE_DIR):
+        prefijo = nombre.split('-')[0]
+        if prefijo.isdigit() and int(prefijo) < version:
+            try:
+                os.remove(os.path.join(settings.REPORTES_CACHE_DIR, nombre))
+            except FileNotFoundError:
+                pass # Lo borró otro proceso
@@ -0,0 +1,95 @@
+# bienes_app/datos_reportes.py
+"""
+Lectura de los datos de los reportes PDF y Excel.
+
+Las filas de cada reporte se leen una sola vez, como diccionarios de
+`values()` con los nombres de la categoría y de las unidades traídos en la
+misma consulta (JOIN), en lugar de instancias del modelo que hacen una
+consulta más por cada relación. Los totales y distribuciones del resumen
+salen de una sola consulta agrupada (GROUP BY). Así cada reporte hace siempre
+la misma cantidad de consultas, sin importar cuántas filas tenga.
+"""
+
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
+
+from .models import ESTADO_BIEN_CHOICES
+
+# Campos que leen los reportes de bienes, de movimientos y de depreciación
+CAMPOS_BIEN = [
+    'codigo_patrimonial', 'descripcion', 'marca', 'modelo', 'serial', 'estado_bien',
+    'fecha_adquisicion', 'valor_unitario_bs', 'categoria__nombre', 'unidad_administrativa_actual__nombre',
+]
+CAMPOS_MOVIMIENTO = [
+    'fecha_movimiento', 'motivo_desincorporacion', 'responsable_nuevo_nombre', 'numero_oficio_referencia',
+    'unidad_origen__nombre', 'unidad_destino__nombre',
+    'bien__codigo_patrimonial', 'bien__descripcion', 'bien__ubicacion_fisica_especifica', 'bien__marca',
+    'bien__modelo', 'bien__serial', 'bien__valor_unitario_bs', 'bien__categoria__nombre',
+]
+# Los querysets de los reportes de depreciación traen anotado el último estado de cada bien
+CAMPOS_DEPRECIACION = CAMPOS_BIEN + ['ultima_depreciacion_acumulada', 'ultimo_valor_neto']
+
+# Filas que se leen de la base de datos por vez
+TAMANO_LOTE_REPORTES = 2000
+
+NOMBRES_ESTADO_BIEN = dict(ESTADO_BIEN_CHOICES)
+
+# Valor neto de un bien en los reportes de depreciación: sin valor neto calculado (o en cero), el valor original
+VALOR_NETO_DEPRECIACION = Coalesce(
+    NullIf(F('ultimo_valor_neto'), Value(0, output_field=DecimalField())), F('valor_unitario_bs'),
+)
+
+
+def filas_reporte(queryset, campos):
+    """Filas del queryset como diccionarios con los `campos`, leídas en una sola consulta y de a lotes."""
+    return queryset.values(*campos).iterator(chunk_size=TAMANO_LOTE_REPORTES)
+
+
+def nombre_estado(estado):
+    """Nombre legible de un estado del bien (como get_estado_bien_display)."""
+    return NOMBRES_ESTADO_BIEN.get(estado, estado)
+
+
+class ResumenReporte:
+    """
+    Totales de un reporte: `cantidad` de filas, la suma de cada total pedido
+    (en `totales`) y, para cada campo agrupado, la cantidad de filas por valor
+    (en `distribuciones`, de mayor a menor cantidad).
+    """
+
+    def __init__(self, cantidad, totales, distribuciones):
+        self.cantidad = cantidad
+        self.totales = totales
+        self.distribuciones = distribuciones
+
+
+def resumen_reporte(queryset, agrupar_por, totales=None):
+    """
+    Resumen del queryset en una sola consulta agrupada por los campos de
+    `agrupar_por` (campo -> nombre para los valores nulos). `totales` indica
+    las sumas que se calculan (nombre -> campo o expresión).
+    """
+    totales = totales or {}
+    grupos = queryset.order_by().values(*agrupar_por).annotate(
+        resumen_cantidad=Count('pk'),
+        **{f'resumen_{nombre}': Sum(expresion) for nombre, expresion in totales.items()},
+    )
+
+    cantidad = 0
+    sumas = dict.fromkeys(totales, Decimal('0.00'))
+    conteos = {campo: {} for campo in agrupar_por}
+    for grupo in grupos:
+        cantidad += grupo['resumen_cantidad']
+        for nombre in totales:
+            sumas[nombre] += grupo[f'resumen_{nombre}'] or 0
+        for campo, nombre_nulo in agrupar_por.items():
+            valor = grupo[campo] or nombre_nulo
+            conteos[campo][valor] = conteos[campo].get(valor, 0) + grupo['resumen_cantidad']
+
+    distribuciones = {
+        campo: dict(sorted(conteo.items(), key=lambda item: (-item[1], item[0])))
+        for campo, conteo in conteos.items()
+    }
+    return ResumenReporte(cantidad, sumas, distribuciones)
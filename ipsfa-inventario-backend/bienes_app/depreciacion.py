@@ -0,0 +1,1220 @@
+# bienes_app/depreciacion.py
+"""
+Motor de cálculo de depreciación por lotes.
+
+En lugar de recorrer bien por bien y mes por mes consultando la base de datos,
+se cargan los bienes elegibles junto con su último cálculo en una sola consulta
+por lote, se calcula todo el calendario mensual con NumPy (en céntimos enteros)
+con el núcleo del método de cada bien (ver `registrar_metodo`) y se persiste
+con `bulk_create`. El último estado de cada bien queda además en
+EstadoDepreciacionBien, que es lo que leen el dashboard y los reportes, y el
+resumen por año en DepreciacionAnual, que es lo que leen los reportes anuales.
+
+Las solicitudes de la API se registran como EjecucionDepreciacion y las procesa
+el comando `procesar_depreciacion` (ver `ejecutar_depreciacion`), confirmando
+cada lote por separado.
+
+Cuando cambia la valoración de un bien (bienes_app/signals.py) su historial se
+marca como desactualizado y `recalcular_pendientes` reconstruye solo la cola
+afectada antes de cada cálculo.
+
+Todos los montos se manejan como enteros en céntimos y se redondean al céntimo
+con redondeo bancario (mitad al par), que es como Django cuantiza los
+DecimalField(decimal_places=2) al leerlos, de modo que los resultados coinciden
+con el cálculo anterior basado en Decimal.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal, ROUND_HALF_EVEN
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from auditoria_app.signals import log_action
+from .cache_reportes import datos_modificados
+from .models import Bien, UsoBien, DepreciacionMensual, DepreciacionAnual, EstadoDepreciacionBien, EjecucionDepreciacion
+
+# Solo se deprecian los bienes en uso (se excluyen obsoletos, malos y desincorporados)
+ESTADOS_DEPRECIABLES = ['NUEVO', 'BUENO', 'REGULAR', 'EN_REPARACION']
+
+# Cantidad de bienes que se cargan y calculan a la vez
+TAMANO_LOTE_BIENES = 2000
+# Cantidad de registros mensuales por sentencia INSERT
+TAMANO_LOTE_INSERCION = 1000
+
+
+# --- Utilidades de períodos y montos ---
+
+def periodo_a_indice(anio, mes):
+    """Convierte (año, mes) en un índice entero de meses consecutivos."""
+    return anio * 12 + (mes - 1)
+
+
+def indice_a_periodo(indice):
+    """Operación inversa de `periodo_a_indice`: devuelve (año, mes)."""
+    anio, mes0 = divmod(int(indice), 12)
+    return anio, mes0 + 1
+
+
+def a_centimos(valor):
+    """Convierte un Decimal (o None) en un entero de céntimos."""
+    if valor is None:
+        return 0
+    return int((Decimal(valor) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_EVEN))
+
+
+def desde_centimos(centimos):
+    """Convierte un entero de céntimos en un Decimal con dos decimales."""
+    return Decimal(int(centimos)).scaleb(-2)
+
+
+def dividir_redondeando(numerador, divisor):
+    """
+    División entera vectorizada con redondeo mitad al par.
+    Equivale a `round(numerador / divisor)` de Decimal, pero exacta en enteros.
+    """
+    cociente, resto = np.divmod(numerador, divisor)
+    doble_resto = 2 * resto
+    subir = (doble_resto > divisor) | ((doble_resto == divisor) & (cociente % 2 == 1))
+    return cociente + subir
+
+
+# --- Núcleos de cálculo ---
+#
+# Cada método de depreciación es un núcleo vectorizado: para un mes recibe
+# arreglos alineados por bien y devuelve la cuota del mes como una fracción
+# exacta (numerador, divisor) en céntimos. El motor se encarga del tope en el
+# valor residual y del redondeo. Los parámetros son:
+#   costo, residual, neto: montos en céntimos
+#   vida_meses: vida útil en meses
+#   edad: meses transcurridos desde el mes de adquisición (0 en ese mes)
+#   unidades: uso del bien en el mes (ver UsoBien)
+#   unidades_totales: uso estimado en toda la vida útil
+
+def cuota_linea_recta(costo, residual, vida_meses, neto, edad, unidades, unidades_totales):
+    """Cuota mensual fija: (costo - residual) / vida útil en meses."""
+    return costo - residual, vida_meses
+
+
+def cuota_saldo_decreciente(costo, residual, vida_meses, neto, edad, unidades, unidades_totales):
+    """
+    Saldo doblemente decreciente: tasa anual de 2 / vida útil aplicada
+    mensualmente sobre el valor neto en libros.
+    neto * (2 / vida_anios) / 12 == neto / (6 * vida_anios)
+    """
+    return neto, vida_meses // 2
+
+
+def cuota_suma_digitos(costo, residual, vida_meses, neto, edad, unidades, unidades_totales):
+    """
+    Suma de los dígitos de los años: en el año k (desde 0) de una vida útil de
+    n años se deprecia (costo - residual) * (n - k) / (n * (n + 1) / 2),
+    repartido en partes iguales entre sus doce meses.
+    (costo - residual) * (n - k) * 2 / (n * (n + 1)) / 12 == (costo - residual) * (n - k) / (6 * n * (n + 1))
+    Vencida la vida útil se deprecia de una vez lo que haya dejado el redondeo.
+    """
+    anios = np.maximum(vida_meses // 12, 1)
+    restantes = anios - edad // 12
+    divisor = 6 * anios * (anios + 1)
+    numerador = np.where(restantes > 0, (costo - residual) * restantes, (neto - residual) * divisor)
+    return numerador, divisor
+
+
+def cuota_unidades_produccion(costo, residual, vida_meses, neto, edad, unidades, unidades_totales):
+    """
+    Unidades de producción: (costo - residual) * unidades del mes / unidades
+    estimadas en toda la vida útil. Un mes sin uso registrado no se deprecia.
+    """
+    return (costo - residual) * unidades, np.maximum(unidades_totales, 1)
+
+
+class MetodoDepreciacion:
+    """
+    Método de depreciación registrado en el motor.
+
+    - `clave`: valor de Bien.metodo_depreciacion.
+    - `cuota`: núcleo mensual (ver arriba).
+    - `valores`: forma cerrada opcional para el valor a cualquier período (ver
+      `valores_en_periodo`); sin ella ese valor se simula mes a mes.
+    - `parametro`: campo de Bien que tiene que ser mayor que cero para que el
+      bien se deprecie con este método.
+    - `usa_unidades`: si la cuota depende del uso registrado en UsoBien.
+    """
+
+    def __init__(self, clave, cuota, valores=None, parametro='vida_util_estimada_anios', usa_unidades=False):
+        self.clave = clave
+        self.cuota = cuota
+        self.valores = valores
+        self.parametro = parametro
+        self.usa_unidades = usa_unidades
+
+    @property
+    def nombre(self):
+        return dict(Bien.METODO_DEPRECIACION_CHOICES).get(self.clave, self.clave)
+
+
+# Métodos disponibles, por clave (los incluidos se registran más abajo)
+METODOS_DEPRECIACION = {}
+
+
+def registrar_metodo(clave, cuota, valores=None, parametro='vida_util_estimada_anios', usa_unidades=False):
+    """
+    Registra (o reemplaza) un método de depreciación. El cálculo periódico, el
+    recálculo, el valor a un período, las proyecciones y los filtros de los
+    reportes usan todos los métodos registrados.
+    """
+    metodo = MetodoDepreciacion(clave, cuota, valores, parametro, usa_unidades)
+    METODOS_DEPRECIACION[clave] = metodo
+    return metodo
+
+
+def programa_depreciacion(cuota, costo, residual, vida_meses, acumulada, neto, meses,
+                          edad=None, unidades=None, unidades_totales=None):
+    """
+    Calendario mensual de depreciación para un conjunto de bienes.
+
+    Recibe arreglos (uno por bien) en céntimos con el estado del último mes
+    calculado y devuelve matrices (bienes x meses) con la depreciación del mes,
+    la depreciación acumulada, el valor neto en libros y una máscara de los
+    meses en los que el bien todavía se deprecia. `edad` es la edad en meses
+    de cada bien en el primer mes y `unidades` una matriz (bienes x meses) con
+    su uso; sin ellos se toman como cero.
+
+    Cada mes depende de los montos ya redondeados del mes anterior, igual que
+    cuando se leían de la base de datos, así que se itera por meses pero de
+    forma vectorizada sobre todos los bienes. La cuota es una fracción exacta
+    (numerador / divisor) y cada monto guardado se redondea por separado.
+    """
+    forma = (len(costo), meses)
+    depreciaciones = np.zeros(forma, dtype=np.int64)
+    acumuladas = np.zeros(forma, dtype=np.int64)
+    netos = np.zeros(forma, dtype=np.int64)
+    activos = np.zeros(forma, dtype=bool)
+    if edad is None:
+        edad = np.zeros(len(costo), dtype=np.int64)
+    if unidades_totales is None:
+        unidades_totales = np.zeros(len(costo), dtype=np.int64)
+
+    for mes in range(meses):
+        vigente = neto > residual
+        if not vigente.any():
+            # Ningún bien se sigue depreciando: los montos quedan fijos
+            acumuladas[:, mes:] = acumulada[:, None]
+            netos[:, mes:] = neto[:, None]
+            break
+        numerador, divisor = cuota(
+            costo, residual, vida_meses, neto, edad + mes,
+            unidades[:, mes] if unidades is not None else 0, unidades_totales,
+        )
+        # Nunca depreciar por debajo del valor residual
+        excede = neto * divisor - numerador < residual * divisor
+        numerador = np.where(excede, (neto - residual) * divisor, numerador)
+
+        depreciacion = dividir_redondeando(numerador, divisor)
+        nueva_acumulada = dividir_redondeando(acumulada * divisor + numerador, divisor)
+        nuevo_neto = dividir_redondeando((costo - acumulada) * divisor - numerador, divisor)
+
+        depreciaciones[:, mes] = np.where(vigente, depreciacion, 0)
+        acumulada = np.where(vigente, nueva_acumulada, acumulada)
+        neto = np.where(vigente, nuevo_neto, neto)
+        acumuladas[:, mes] = acumulada
+        netos[:, mes] = neto
+        activos[:, mes] = vigente
+
+    return depreciaciones, acumuladas, netos, activos
+
+
+def _matriz_uso(uso, seleccion, inicio, meses):
+    """
+    Matriz (bienes de `seleccion` x `meses` desde el `inicio` de cada uno) con
+    las unidades de `uso`, que viene como arreglos planos (posición del bien
+    en el lote, período, unidades).
+    """
+    matriz = np.zeros((len(seleccion), meses), dtype=np.int64)
+    if uso is None:
+        return matriz
+    filas, periodos, unidades = uso
+    posicion = np.full(len(inicio), -1, dtype=np.int64)
+    posicion[seleccion] = np.arange(len(seleccion))
+    columna = periodos - inicio[filas]
+    validos = (posicion[filas] >= 0) & (columna >= 0) & (columna < meses)
+    matriz[posicion[filas][validos], columna[validos]] = unidades[validos]
+    return matriz
+
+
+def calcular_programa(metodos, costo, residual, vida_meses, acumulada, neto, inicio, fin,
+                      adquisicion=None, unidades_totales=None, uso=None):
+    """
+    Calcula el calendario de depreciación de un lote de bienes, repartiéndolo
+    entre los núcleos de los métodos registrados.
+
+    Todos los parámetros son arreglos de NumPy alineados por bien (montos en
+    céntimos, `inicio` y `adquisicion` como índices de período) salvo `fin`,
+    que es el índice del último período a calcular, y `uso`, el uso mensual
+    del lote (ver `cargar_uso`). Devuelve arreglos planos con una entrada
+    por registro mensual: posición del bien en el lote, período, depreciación
+    del mes, depreciación acumulada y valor neto en libros.
+    """
+    meses_por_bien = np.maximum(fin - inicio + 1, 0)
+    edad = inicio - adquisicion if adquisicion is not None else np.zeros(len(costo), dtype=np.int64)
+    if unidades_totales is None:
+        unidades_totales = np.zeros(len(costo), dtype=np.int64)
+    resultados = []
+
+    for metodo in METODOS_DEPRECIACION.values():
+        seleccion = np.nonzero((metodos == metodo.clave) & (meses_por_bien > 0))[0]
+        if not len(seleccion):
+            continue
+        meses = int(meses_por_bien[seleccion].max())
+        depreciaciones, acumuladas, netos, activos = programa_depreciacion(
+            metodo.cuota, costo[seleccion], residual[seleccion], vida_meses[seleccion],
+            acumulada[seleccion], neto[seleccion], meses, edad[seleccion],
+            _matriz_uso(uso, seleccion, inicio, meses) if metodo.usa_unidades else None,
+            unidades_totales[seleccion],
+        )
+        # Un bien solo genera registros hasta el período solicitado
+        activos &= np.arange(meses)[None, :] < meses_por_bien[seleccion][:, None]
+
+        fila, columna = np.nonzero(activos)
+        resultados.append((
+            seleccion[fila],
+            inicio[seleccion][fila] + columna,
+            depreciaciones[fila, columna],
+            acumuladas[fila, columna],
+            netos[fila, columna],
+        ))
+
+    if not resultados:
+        return tuple(np.zeros(0, dtype=np.int64) for _ in range(5))
+    return tuple(np.concatenate(partes) for partes in zip(*resultados))
+
+
+def calcular_programa_en_paralelo(ejecutor, fragmentos, metodos, costo, residual, vida_meses, acumulada, neto, inicio, fin,
+                                  adquisicion=None, unidades_totales=None, uso=None):
+    """
+    Igual que `calcular_programa`, pero reparte el lote en `fragmentos` rangos
+    contiguos (el lote viene ordenado por id, así que cada fragmento es un rango
+    de ids) y calcula cada uno en un proceso del `ejecutor`.
+
+    Los procesos solo reciben y devuelven arreglos de NumPy; no tocan la base
+    de datos. Las filas devueltas se desplazan para que sigan refiriéndose a
+    posiciones del lote completo.
+    """
+    if adquisicion is None:
+        adquisicion = inicio
+    if unidades_totales is None:
+        unidades_totales = np.zeros(len(costo), dtype=np.int64)
+    limites = np.linspace(0, len(costo), fragmentos + 1, dtype=np.int64)
+    futuros = []
+    for desde, hasta in zip(limites[:-1].tolist(), limites[1:].tolist()):
+        if desde == hasta:
+            continue
+        uso_fragmento = None
+        if uso is not None:
+            dentro = (uso[0] >= desde) & (uso[0] < hasta)
+            uso_fragmento = (uso[0][dentro] - desde, uso[1][dentro], uso[2][dentro])
+        futuros.append((desde, ejecutor.submit(
+            calcular_programa,
+            metodos[desde:hasta], costo[desde:hasta], residual[desde:hasta], vida_meses[desde:hasta],
+            acumulada[desde:hasta], neto[desde:hasta], inicio[desde:hasta], fin,
+            adquisicion[desde:hasta], unidades_totales[desde:hasta], uso_fragmento,
+        )))
+
+    resultados = []
+    for desde, futuro in futuros:
+        filas, periodos, depreciaciones, acumuladas, netos = futuro.result()
+        resultados.append((filas + desde, periodos, depreciaciones, acumuladas, netos))
+    if not resultados:
+        return tuple(np.zeros(0, dtype=np.int64) for _ in range(5))
+    return tuple(np.concatenate(partes) for partes in zip(*resultados))
+
+
+@contextmanager
+def ejecutor_depreciacion(trabajadores):
+    """
+    Pool de procesos para el cálculo en paralelo, o None si `trabajadores` <= 1.
+    Si no hay una transacción abierta se cierra la conexión a la base de datos
+    antes de crear los procesos para que no la hereden (de todos modos los
+    procesos nunca la usan).
+    """
+    if trabajadores <= 1:
+        yield None
+        return
+    if not connection.in_atomic_block:
+        connection.close()
+    with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+        yield ejecutor
+
+
+def trabajadores_por_defecto():
+    """Cantidad de procesos configurada en settings.DEPRECIACION_TRABAJADORES."""
+    return max(1, getattr(settings, 'DEPRECIACION_TRABAJADORES', 1))
+
+
+# --- Valor a cualquier período (forma cerrada) ---
+
+# Meses que se recalculan con el núcleo exacto alrededor del tope del valor residual
+MESES_CIERRE_LINEA_RECTA = 3
+
+
+def _tomar_mes(matriz, indice):
+    """Valor de cada fila de `matriz` en la columna `indice` (uno por bien)."""
+    return matriz[np.arange(len(matriz)), indice]
+
+
+def valores_linea_recta(costo, residual, vida_meses, acumulada, neto, meses):
+    """
+    Depreciación del mes, acumulada y valor neto en libros `meses` meses
+    (>= 1, uno por bien) después del estado (acumulada, neto), en O(1) por bien.
+
+    Reproduce exactamente el redondeo mes a mes del cálculo periódico: los dos
+    primeros meses se calculan con el núcleo exacto; a partir de ahí la cuota
+    redondeada es constante, así que los montos avanzan linealmente hasta el
+    mes en que se llega al valor residual, y ese cierre se vuelve a calcular
+    con el núcleo exacto.
+    """
+    deps, acums, netos, _ = programa_depreciacion(
+        cuota_linea_recta, costo, residual, vida_meses, acumulada, neto, 2
+    )
+    numerador = costo - residual
+    paso = dividir_redondeando(numerador, vida_meses)
+
+    # Meses normales (sin tope) después del segundo: mientras neto - cuota >= residual
+    holgura = (netos[:, 1] - residual) * vida_meses - numerador
+    normales = np.where(
+        paso > 0,
+        np.where(holgura >= 0, holgura // np.maximum(paso * vida_meses, 1) + 1, 0),
+        np.iinfo(np.int64).max // 2,  # Cuota de menos de medio céntimo: nunca llega al residual
+    )
+    normales = np.where(netos[:, 1] > residual, normales, 0)
+    lineales = np.clip(meses - 2, 0, normales)
+
+    # Estado al final del tramo lineal y cierre con el núcleo exacto
+    ultimo = 2 + normales
+    acumulada_lineal = acums[:, 1] + normales * paso
+    neto_lineal = netos[:, 1] - normales * paso
+    deps_cierre, acums_cierre, netos_cierre, _ = programa_depreciacion(
+        cuota_linea_recta, costo, residual, vida_meses, acumulada_lineal, neto_lineal, MESES_CIERRE_LINEA_RECTA
+    )
+
+    en_inicio = meses <= 2
+    en_cierre = meses > ultimo
+    cierre = np.clip(meses - ultimo - 1, 0, MESES_CIERRE_LINEA_RECTA - 1)
+    inicio = np.clip(meses - 1, 0, 1)
+    pasado_cierre = meses - ultimo > MESES_CIERRE_LINEA_RECTA
+
+    depreciacion = np.where(en_inicio, _tomar_mes(deps, inicio), np.where(
+        en_cierre, np.where(pasado_cierre, 0, _tomar_mes(deps_cierre, cierre)), paso))
+    acumulada = np.where(en_inicio, _tomar_mes(acums, inicio), np.where(
+        en_cierre, _tomar_mes(acums_cierre, cierre), acums[:, 1] + lineales * paso))
+    neto = np.where(en_inicio, _tomar_mes(netos, inicio), np.where(
+        en_cierre, _tomar_mes(netos_cierre, cierre), netos[:, 1] - lineales * paso))
+    return depreciacion, acumulada, neto
+
+
+def valores_saldo_decreciente(costo, residual, vida_meses, acumulada, neto, meses):
+    """
+    Igual que `valores_linea_recta` para el saldo doblemente decreciente: el
+    valor neto es una serie geométrica neto * (1 - 1 / (6 * vida_anios)) ** meses
+    con tope en el valor residual.
+
+    A diferencia de línea recta, el cálculo periódico redondea el neto cada mes,
+    así que fuera del historial guardado el resultado puede diferir en algunos
+    céntimos del que se guardará al calcular esos meses.
+    """
+    factor = 1 - 2 / vida_meses
+    sin_tope = np.rint(neto * np.power(factor, meses - 1)).astype(np.int64)
+    sin_tope_mes = np.rint(neto * np.power(factor, meses)).astype(np.int64)
+    vigente = neto > residual
+    neto_anterior = np.where(vigente, np.maximum(sin_tope, residual), neto)
+    nuevo_neto = np.where(vigente, np.maximum(sin_tope_mes, residual), neto)
+    return neto_anterior - nuevo_neto, acumulada + (neto - nuevo_neto), nuevo_neto
+
+
+def valores_en_periodo(metodos, costo, residual, vida_meses, acumulada, neto, meses,
+                       inicio=None, adquisicion=None, unidades_totales=None, uso=None):
+    """
+    Aplica la forma cerrada de cada método registrado. `meses` es la cantidad
+    de meses transcurridos desde el estado (acumulada, neto); con `meses` <= 0
+    o un método desconocido (o None) se devuelve el mismo estado, sin
+    depreciación del mes.
+
+    Los métodos sin forma cerrada se simulan mes a mes desde el mes `inicio`
+    de cada bien, con su fecha de `adquisicion` y su `uso` (como en
+    `calcular_programa`).
+    """
+    depreciacion = np.zeros(len(costo), dtype=np.int64)
+    acumulada_final = acumulada.copy()
+    neto_final = neto.copy()
+    for metodo in METODOS_DEPRECIACION.values():
+        seleccion = np.nonzero((metodos == metodo.clave) & (meses > 0))[0]
+        if not len(seleccion):
+            continue
+        if metodo.valores is not None:
+            resultado = metodo.valores(
+                costo[seleccion], residual[seleccion], vida_meses[seleccion],
+                acumulada[seleccion], neto[seleccion], meses[seleccion],
+            )
+        else:
+            total = int(meses[seleccion].max())
+            edad = inicio[seleccion] - adquisicion[seleccion]
+            deps, acums, netos, _ = programa_depreciacion(
+                metodo.cuota, costo[seleccion], residual[seleccion], vida_meses[seleccion],
+                acumulada[seleccion], neto[seleccion], total, edad,
+                _matriz_uso(uso, seleccion, inicio, total) if metodo.usa_unidades else None,
+                unidades_totales[seleccion] if unidades_totales is not None else None,
+            )
+            columna = meses[seleccion] - 1
+            resultado = _tomar_mes(deps, columna), _tomar_mes(acums, columna), _tomar_mes(netos, columna)
+        depreciacion[seleccion], acumulada_final[seleccion], neto_final[seleccion] = resultado
+    return depreciacion, acumulada_final, neto_final
+
+
+# --- Registro de métodos incluidos ---
+
+registrar_metodo('LINEA_RECTA', cuota_linea_recta, valores_linea_recta)
+registrar_metodo('SALDO_DECRECIENTE', cuota_saldo_decreciente, valores_saldo_decreciente)
+registrar_metodo('SUMA_DIGITOS', cuota_suma_digitos)
+registrar_metodo(
+    'UNIDADES_PRODUCCION', cuota_unidades_produccion,
+    parametro='unidades_produccion_estimadas', usa_unidades=True,
+)
+
+
+def valores_al_periodo(bienes, anio, mes):
+    """
+    Depreciación del mes, depreciación acumulada y valor neto en libros de
+    cada bien del queryset `bienes` al período (anio, mes), sin necesidad de
+    que exista el historial mensual.
+
+    Si el período ya está guardado en DepreciacionMensual se devuelven esos
+    montos tal cual (origen 'HISTORICO'). Si no, se parte del último estado
+    guardado (o de la adquisición) y se aplica la forma cerrada del método,
+    vectorizada sobre todos los bienes (origen 'CALCULADO'). Los bienes que no
+    se deprecian conservan su último estado.
+
+    Devuelve una lista de diccionarios ordenada por id de bien.
+    """
+    objetivo = periodo_a_indice(anio, mes)
+    filas = list(
+        bienes.order_by('id').values_list(
+            'id', 'codigo_patrimonial', 'descripcion', 'fecha_adquisicion',
+            'valor_unitario_bs', 'valor_residual', 'vida_util_estimada_anios',
+            'metodo_depreciacion', 'estado_bien',
+            'estado_depreciacion__ultimo_anio', 'estado_depreciacion__ultimo_mes',
+            'estado_depreciacion__depreciacion_acumulada', 'estado_depreciacion__valor_neto_en_libros',
+            'unidades_produccion_estimadas',
+        )
+    )
+    if not filas:
+        return []
+
+    historico = {
+        bien_id: (depreciacion, acumulada, neto)
+        for bien_id, depreciacion, acumulada, neto in DepreciacionMensual.objects.filter(
+            bien__in=bienes.values('id'), anio=anio, mes=mes
+        ).values_list('bien_id', 'valor_depreciado_mes', 'depreciacion_acumulada', 'valor_neto_en_libros')
+    }
+
+    costo = np.array([a_centimos(fila[4]) for fila in filas], dtype=np.int64)
+    residual = np.array([a_centimos(fila[5]) for fila in filas], dtype=np.int64)
+    vida_meses = np.array([(fila[6] or 0) * 12 for fila in filas], dtype=np.int64)
+    unidades_totales = np.array([fila[13] or 0 for fila in filas], dtype=np.int64)
+    metodos = _metodos_elegibles(np.array([fila[7] for fila in filas], dtype=object), vida_meses, unidades_totales)
+    depreciable = np.array([fila[8] in ESTADOS_DEPRECIABLES for fila in filas]) & metodos.astype(bool)
+    periodo_estado = np.array([
+        periodo_a_indice(fila[9], fila[10]) if fila[9] is not None else -1 for fila in filas
+    ], dtype=np.int64)
+    adquisicion = np.array([periodo_a_indice(fila[3].year, fila[3].month) for fila in filas], dtype=np.int64)
+
+    # Se parte del último estado guardado si es anterior al período pedido; si no, de la adquisición
+    desde_estado = (periodo_estado >= 0) & (periodo_estado < objetivo)
+    acumulada = np.array([
+        a_centimos(fila[11]) if usar else 0 for fila, usar in zip(filas, desde_estado.tolist())
+    ], dtype=np.int64)
+    neto = np.array([
+        a_centimos(fila[12]) if usar else a_centimos(fila[4]) for fila, usar in zip(filas, desde_estado.tolist())
+    ], dtype=np.int64)
+    meses = np.where(desde_estado, objetivo - periodo_estado, objetivo - adquisicion + 1)
+    # Sin depreciar (no elegible) el bien se queda en su último estado
+    meses = np.where(depreciable, meses, 0)
+    inicio = objetivo - meses + 1
+    ids = np.array([fila[0] for fila in filas], dtype=np.int64)
+
+    depreciaciones, acumuladas, netos = valores_en_periodo(
+        metodos, costo, residual, vida_meses, acumulada, neto, meses,
+        inicio, adquisicion, unidades_totales, cargar_uso(ids, metodos, inicio),
+    )
+
+    resultados = []
+    for i, fila in enumerate(filas):
+        guardado = historico.get(fila[0])
+        if guardado:
+            depreciacion, acumulada_bien, neto_bien = guardado
+            origen = 'HISTORICO'
+        else:
+            depreciacion = desde_centimos(depreciaciones[i])
+            acumulada_bien = desde_centimos(acumuladas[i])
+            neto_bien = desde_centimos(netos[i])
+            origen = 'CALCULADO'
+        resultados.append({
+            'bien_id': fila[0],
+            'codigo_patrimonial': fila[1],
+            'descripcion': fila[2],
+            'anio': anio,
+            'mes': mes,
+            'valor_depreciado_mes': depreciacion,
+            'depreciacion_acumulada': acumulada_bien,
+            'valor_neto_en_libros': neto_bien,
+            'origen': origen,
+        })
+    return resultados
+
+
+# --- Acceso a datos ---
+
+def condicion_depreciable(metodo=None, vida_util_anios=None):
+    """
+    Condición (Q) de los bienes que tienen un método registrado y el dato que
+    ese método necesita (vida útil, unidades estimadas...). Si se simula un
+    `metodo` para todos, solo se exige el dato de ese método, y si se simula
+    una vida útil, no hace falta que el bien la tenga.
+    """
+    condicion = Q()
+    metodos = [METODOS_DEPRECIACION[metodo]] if metodo else METODOS_DEPRECIACION.values()
+    for registrado in metodos:
+        requisito = Q(**{f'{registrado.parametro}__gt': 0})
+        if vida_util_anios is not None and registrado.parametro == 'vida_util_estimada_anios':
+            requisito = Q()
+        if not metodo:
+            requisito &= Q(metodo_depreciacion=registrado.clave)
+        condicion |= requisito
+    return condicion
+
+
+def _metodos_elegibles(metodos, vida_meses, unidades_totales):
+    """
+    Igual que `condicion_depreciable` sobre los arreglos de un lote: copia de
+    `metodos` con None en los bienes a los que les falta el dato que requiere su método.
+    """
+    parametros = {'vida_util_estimada_anios': vida_meses, 'unidades_produccion_estimadas': unidades_totales}
+    elegibles = np.full(len(metodos), None, dtype=object)
+    for registrado in METODOS_DEPRECIACION.values():
+        seleccion = (metodos == registrado.clave) & (parametros[registrado.parametro] > 0)
+        elegibles[seleccion] = registrado.clave
+    return elegibles
+
+
+def bienes_depreciables():
+    """Bienes que participan en el cálculo de depreciación."""
+    return Bien.objects.filter(condicion_depreciable(), estado_bien__in=ESTADOS_DEPRECIABLES)
+
+
+def cargar_lote(ultimo_id, tamano, bienes=None):
+    """
+    Carga el siguiente lote de bienes elegibles (por id ascendente) junto con
+    su último estado de depreciación, en una sola consulta.
+    """
+    if bienes is None:
+        bienes = bienes_depreciables()
+    return list(
+        bienes
+        .filter(id__gt=ultimo_id)
+        .order_by('id')
+        .values_list(
+            'id', 'fecha_adquisicion', 'valor_unitario_bs', 'valor_residual',
+            'vida_util_estimada_anios', 'metodo_depreciacion',
+            'estado_depreciacion__ultimo_anio', 'estado_depreciacion__ultimo_mes',
+            'estado_depreciacion__depreciacion_acumulada', 'estado_depreciacion__valor_neto_en_libros',
+            'unidades_produccion_estimadas',
+        )[:tamano]
+    )
+
+
+def cargar_uso(ids, metodos, inicio):
+    """
+    Uso registrado en UsoBien desde el mes `inicio` de los bienes del lote que
+    se deprecian por unidades, como arreglos planos (posición del bien en el
+    lote, período, unidades). None si ningún bien del lote lo necesita.
+    """
+    claves = [metodo.clave for metodo in METODOS_DEPRECIACION.values() if metodo.usa_unidades]
+    seleccion = np.nonzero(np.isin(metodos, claves))[0]
+    if not len(seleccion):
+        return None
+    posiciones = dict(zip(ids[seleccion].tolist(), seleccion.tolist()))
+    anio, mes = indice_a_periodo(int(inicio[seleccion].min()))
+    filas, periodos, unidades = [], [], []
+    bienes = list(posiciones)
+    for i in range(0, len(bienes), TAMANO_LOTE_INSERCION):
+        for bien_id, anio_uso, mes_uso, unidades_mes in UsoBien.objects.filter(
+            Q(anio__gt=anio) | Q(anio=anio, mes__gte=mes), bien_id__in=bienes[i:i + TAMANO_LOTE_INSERCION]
+        ).values_list('bien_id', 'anio', 'mes', 'unidades'):
+            filas.append(posiciones[bien_id])
+            periodos.append(periodo_a_indice(anio_uso, mes_uso))
+            unidades.append(unidades_mes)
+    return (
+        np.array(filas, dtype=np.int64), np.array(periodos, dtype=np.int64), np.array(unidades, dtype=np.int64)
+    )
+
+
+def preparar_arreglos(lote):
+    """Convierte las filas del lote en arreglos de NumPy alineados por bien."""
+    ids = np.array([fila[0] for fila in lote], dtype=np.int64)
+    inicio = np.array([
+        periodo_a_indice(fila[6], fila[7]) + 1 if fila[6] is not None
+        else periodo_a_indice(fila[1].year, fila[1].month)
+        for fila in lote
+    ], dtype=np.int64)
+    costo = np.array([a_centimos(fila[2]) for fila in lote], dtype=np.int64)
+    residual = np.array([a_centimos(fila[3]) for fila in lote], dtype=np.int64)
+    vida_meses = np.array([(fila[4] or 0) * 12 for fila in lote], dtype=np.int64)
+    metodos = np.array([fila[5] for fila in lote], dtype=object)
+    acumulada = np.array([a_centimos(fila[8]) for fila in lote], dtype=np.int64)
+    # Sin cálculos previos el valor neto en libros es el costo del bien
+    neto = np.array([a_centimos(fila[9]) if fila[6] is not None else a_centimos(fila[2]) for fila in lote], dtype=np.int64)
+    adquisicion = np.array([periodo_a_indice(fila[1].year, fila[1].month) for fila in lote], dtype=np.int64)
+    unidades_totales = np.array([fila[10] or 0 for fila in lote], dtype=np.int64)
+    return ids, metodos, costo, residual, vida_meses, acumulada, neto, inicio, adquisicion, unidades_totales
+
+
+def _guardar_registros(ids, filas, periodos, depreciaciones, acumuladas, netos):
+    """Persiste los registros mensuales calculados con `bulk_create`."""
+    registros = []
+    for bien_id, periodo, depreciacion, acumulada, neto in zip(
+        ids[filas].tolist(), periodos.tolist(), depreciaciones.tolist(), acumuladas.tolist(), netos.tolist()
+    ):
+        anio, mes = indice_a_periodo(periodo)
+        registros.append(DepreciacionMensual(
+            bien_id=bien_id, mes=mes, anio=anio,
+            valor_depreciado_mes=desde_centimos(depreciacion),
+            depreciacion_acumulada=desde_centimos(acumulada),
+            valor_neto_en_libros=desde_centimos(neto),
+        ))
+    DepreciacionMensual.objects.bulk_create(registros, batch_size=TAMANO_LOTE_INSERCION)
+    return len(registros)
+
+
+def _guardar_estados(ids, filas, periodos, acumuladas, netos):
+    """
+    Actualiza (o crea) el EstadoDepreciacionBien de cada bien con su último
+    registro mensual calculado.
+    """
+    # Dentro de cada bien los registros van en orden de período, así que la
+    # última aparición de cada fila es su último mes calculado
+    _, desde_el_final = np.unique(filas[::-1], return_index=True)
+    ultimos = len(filas) - 1 - desde_el_final
+
+    estados = []
+    for bien_id, periodo, acumulada, neto in zip(
+        ids[filas[ultimos]].tolist(), periodos[ultimos].tolist(), acumuladas[ultimos].tolist(), netos[ultimos].tolist()
+    ):
+        anio, mes = indice_a_periodo(periodo)
+        estados.append(EstadoDepreciacionBien(
+            bien_id=bien_id, ultimo_mes=mes, ultimo_anio=anio,
+            depreciacion_acumulada=desde_centimos(acumulada),
+            valor_neto_en_libros=desde_centimos(neto),
+        ))
+    EstadoDepreciacionBien.objects.bulk_create(
+        estados,
+        batch_size=TAMANO_LOTE_INSERCION,
+        update_conflicts=True,
+        unique_fields=['bien'],
+        update_fields=['ultimo_mes', 'ultimo_anio', 'depreciacion_acumulada', 'valor_neto_en_libros', 'fecha_actualizacion'],
+    )
+
+
+def _guardar_anuales(ids, filas, periodos, depreciaciones, acumuladas, netos, sumar_existentes=True):
+    """
+    Actualiza (o crea) el resumen anual (DepreciacionAnual) de cada bien y año
+    presente en los registros calculados: suma de la depreciación de los meses
+    y montos del último mes del año.
+
+    Con `sumar_existentes`, al primer año de cada bien se le suma lo que ya
+    estaba guardado para ese año (meses calculados en una ejecución anterior).
+    """
+    if not len(filas):
+        return
+    # Una clave por (bien, año); dentro de cada bien los registros van en orden de período
+    claves = filas * 10000 + periodos // 12
+    unicas, grupo = np.unique(claves, return_inverse=True)
+    depreciacion_anio = np.zeros(len(unicas), dtype=np.int64)
+    np.add.at(depreciacion_anio, grupo, depreciaciones)
+    ultimo = np.zeros(len(unicas), dtype=np.int64)
+    np.maximum.at(ultimo, grupo, np.arange(len(filas)))
+
+    bien_ids = ids[unicas // 10000].tolist()
+    anios = (unicas % 10000).tolist()
+    if sumar_existentes:
+        _, primeros = np.unique(unicas // 10000, return_index=True)
+        primeros = {(bien_ids[i], anios[i]): i for i in primeros.tolist()}
+        for bien_id, anio, depreciacion in DepreciacionAnual.objects.filter(
+            bien_id__in={bien_id for bien_id, _ in primeros}, anio__in={anio for _, anio in primeros}
+        ).values_list('bien_id', 'anio', 'depreciacion_anio'):
+            if (bien_id, anio) in primeros:
+                depreciacion_anio[primeros[(bien_id, anio)]] += a_centimos(depreciacion)
+
+    anuales = [
+        DepreciacionAnual(
+            bien_id=bien_id, anio=anio,
+            depreciacion_anio=desde_centimos(depreciacion),
+            depreciacion_acumulada=desde_centimos(acumulada),
+            valor_neto_en_libros=desde_centimos(neto),
+        )
+        for bien_id, anio, depreciacion, acumulada, neto in zip(
+            bien_ids, anios, depreciacion_anio.tolist(), acumuladas[ultimo].tolist(), netos[ultimo].tolist()
+        )
+    ]
+    DepreciacionAnual.objects.bulk_create(
+        anuales,
+        batch_size=TAMANO_LOTE_INSERCION,
+        update_conflicts=True,
+        unique_fields=['bien', 'anio'],
+        update_fields=['depreciacion_anio', 'depreciacion_acumulada', 'valor_neto_en_libros', 'fecha_actualizacion'],
+    )
+
+
+def procesar_lote(fin, ultimo_id, tamano_lote=TAMANO_LOTE_BIENES, ejecutor=None, trabajadores=1):
+    """
+    Calcula y guarda la depreciación del siguiente lote de bienes elegibles
+    (con id mayor a `ultimo_id`) hasta el índice de período `fin`.
+    Si se pasa un `ejecutor` (ver `ejecutor_depreciacion`), el cálculo del lote
+    se reparte entre `trabajadores` procesos; la inserción la hace siempre el
+    proceso principal.
+
+    Devuelve None si ya no quedan bienes, o un resumen del lote con el id del
+    último bien recorrido, que sirve como punto de control para el siguiente.
+    """
+    lote = cargar_lote(ultimo_id, tamano_lote)
+    if not lote:
+        return None
+    # Las inserciones masivas no disparan las señales que invalidan los reportes
+    datos_modificados()
+
+    ids, metodos, costo, residual, vida_meses, acumulada, neto, inicio, adquisicion, unidades_totales = preparar_arreglos(lote)
+    uso = cargar_uso(ids, metodos, inicio)
+    if ejecutor is not None:
+        filas, periodos, depreciaciones, acumuladas, netos = calcular_programa_en_paralelo(
+            ejecutor, trabajadores, metodos, costo, residual, vida_meses, acumulada, neto, inicio, fin,
+            adquisicion, unidades_totales, uso,
+        )
+    else:
+        filas, periodos, depreciaciones, acumuladas, netos = calcular_programa(
+            metodos, costo, residual, vida_meses, acumulada, neto, inicio, fin,
+            adquisicion, unidades_totales, uso,
+        )
+    registros_creados = _guardar_registros(ids, filas, periodos, depreciaciones, acumuladas, netos)
+    _guardar_estados(ids, filas, periodos, acumuladas, netos)
+    _guardar_anuales(ids, filas, periodos, depreciaciones, acumuladas, netos)
+
+    bienes_con_registros = len(np.unique(filas))
+    return {
+        'ultimo_bien_id': lote[-1][0],
+        'bienes_procesados': bienes_con_registros,
+        'bienes_omitidos': len(lote) - bienes_con_registros,
+        'registros_creados': registros_creados,
+    }
+
+
+def calcular_depreciacion(anio, mes, tamano_lote=TAMANO_LOTE_BIENES, trabajadores=None):
+    """
+    Calcula y guarda la depreciación de todos los bienes elegibles hasta el
+    período (anio, mes) inclusive, retomando desde el último mes calculado de
+    cada bien ("catch-up"). Con `trabajadores` > 1 el cálculo de cada lote se
+    reparte en un pool de procesos (por defecto, settings.DEPRECIACION_TRABAJADORES).
+
+    Devuelve un resumen con la cantidad de bienes procesados, omitidos y
+    registros mensuales creados.
+    """
+    fin = periodo_a_indice(anio, mes)
+    resumen = {'bienes_procesados': 0, 'bienes_omitidos': 0, 'registros_creados': 0}
+
+    trabajadores = trabajadores or trabajadores_por_defecto()
+    # Primero se corrige el historial de los bienes cuya valoración cambió
+    recalcular_pendientes()
+    ultimo_id = 0
+    with ejecutor_depreciacion(trabajadores) as ejecutor:
+        while True:
+            resultado = procesar_lote(fin, ultimo_id, tamano_lote, ejecutor, trabajadores)
+            if resultado is None:
+                break
+            ultimo_id = resultado['ultimo_bien_id']
+            for clave in resumen:
+                resumen[clave] += resultado[clave]
+
+    return resumen
+
+
+# --- Recálculo incremental tras cambios de valoración ---
+
+# Bienes marcados que se recalculan por transacción
+TAMANO_LOTE_RECALCULO = 500
+
+
+def marcar_para_recalculo(bien_id, desde):
+    """
+    Marca el historial de un bien como desactualizado desde el índice de
+    período `desde` (se conserva la marca más antigua). Si el bien todavía no
+    tiene cálculos de depreciación no hay nada que marcar.
+    """
+    estado = EstadoDepreciacionBien.objects.filter(bien_id=bien_id).values_list(
+        'recalcular_desde_anio', 'recalcular_desde_mes'
+    ).first()
+    if estado is None:
+        return False
+    if estado[0] is not None and periodo_a_indice(*estado) <= desde:
+        return True
+    anio, mes = indice_a_periodo(desde)
+    EstadoDepreciacionBien.objects.filter(bien_id=bien_id).update(
+        recalcular_desde_anio=anio, recalcular_desde_mes=mes
+    )
+    return True
+
+
+def marcar_varios_para_recalculo(marcas):
+    """
+    Como `marcar_para_recalculo` para muchos bienes a la vez ({bien_id:
+    desde}), p. ej. tras un `bulk_update` que no dispara las señales: una
+    consulta para leer las marcas actuales y un UPDATE por período distinto.
+    """
+    por_periodo = {}
+    estados = EstadoDepreciacionBien.objects.filter(bien_id__in=list(marcas)).values_list(
+        'bien_id', 'recalcular_desde_anio', 'recalcular_desde_mes'
+    )
+    for bien_id, anio, mes in estados:
+        desde = marcas[bien_id]
+        if anio is None or desde < periodo_a_indice(anio, mes):
+            por_periodo.setdefault(desde, []).append(bien_id)
+    for desde, ids in por_periodo.items():
+        anio, mes = indice_a_periodo(desde)
+        EstadoDepreciacionBien.objects.filter(bien_id__in=ids).update(
+            recalcular_desde_anio=anio, recalcular_desde_mes=mes
+        )
+    return sum(len(ids) for ids in por_periodo.values())
+
+
+def _periodo_ultima_ejecucion():
+    """Índice del período más alto de las ejecuciones completadas (o -1 si no hay)."""
+    ultimo = EjecucionDepreciacion.objects.filter(estado='COMPLETADA').order_by('-anio', '-mes').values_list('anio', 'mes').first()
+    return periodo_a_indice(*ultimo) if ultimo else -1
+
+
+def _recalcular_lote(lote, periodo_ejecutado):
+    """
+    Reconstruye el historial de un lote de bienes marcados hasta el período al
+    que llegaba (o hasta el de la última ejecución completada, si es posterior,
+    por si con la nueva valoración el bien se deprecia por más meses). Se
+    recalcula el calendario completo en memoria, se compara con lo guardado y
+    solo se reemplaza la cola a partir del primer mes que difiere: un DELETE y
+    un bulk_create por lote.
+    """
+    # Los borrados e inserciones masivas de abajo cambian los datos de los reportes
+    datos_modificados()
+    ids = np.array([fila[0] for fila in lote], dtype=np.int64)
+    desde = np.array([periodo_a_indice(fila[1], fila[2]) for fila in lote], dtype=np.int64)
+    horizonte = np.maximum(
+        np.array([periodo_a_indice(fila[3], fila[4]) for fila in lote], dtype=np.int64), periodo_ejecutado
+    )
+    inicio = np.array([periodo_a_indice(fila[5].year, fila[5].month) for fila in lote], dtype=np.int64)
+    costo = np.array([a_centimos(fila[6]) for fila in lote], dtype=np.int64)
+    residual = np.array([a_centimos(fila[7]) for fila in lote], dtype=np.int64)
+    vida_meses = np.array([(fila[8] or 0) * 12 for fila in lote], dtype=np.int64)
+    unidades_totales = np.array([fila[10] or 0 for fila in lote], dtype=np.int64)
+    # Sin método o sin el dato que requiere (vida útil, unidades) el bien ya no se deprecia: su historial se elimina
+    metodos = _metodos_elegibles(np.array([fila[9] for fila in lote], dtype=object), vida_meses, unidades_totales)
+
+    filas, periodos, depreciaciones, acumuladas, netos = calcular_programa(
+        metodos, costo, residual, np.maximum(vida_meses, 1), np.zeros(len(ids), dtype=np.int64),
+        costo, inicio, horizonte, inicio, unidades_totales, cargar_uso(ids, metodos, inicio),
+    )
+    nuevos = {
+        (int(ids[fila]), periodo): (depreciacion, acumulada, neto)
+        for fila, periodo, depreciacion, acumulada, neto in zip(
+            filas.tolist(), periodos.tolist(), depreciaciones.tolist(), acumuladas.tolist(), netos.tolist()
+        )
+    }
+    guardados = {
+        (bien_id, periodo_a_indice(anio, mes)): (a_centimos(depreciacion), a_centimos(acumulada), a_centimos(neto))
+        for bien_id, anio, mes, depreciacion, acumulada, neto in DepreciacionMensual.objects.filter(
+            bien_id__in=ids.tolist()
+        ).values_list('bien_id', 'anio', 'mes', 'valor_depreciado_mes', 'depreciacion_acumulada', 'valor_neto_en_libros')
+    }
+
+    # Primer período que difiere (o que sobra / falta) de cada bien, a partir de su marca
+    primer_cambio = {}
+    desde_por_bien = dict(zip(ids.tolist(), desde.tolist()))
+    distintos = (nuevos.keys() ^ guardados.keys()) | {
+        clave for clave in nuevos.keys() & guardados.keys() if nuevos[clave] != guardados[clave]
+    }
+    for clave in distintos:
+        bien_id, periodo = clave
+        if periodo >= desde_por_bien[bien_id]:
+            primer_cambio[bien_id] = min(periodo, primer_cambio.get(bien_id, periodo))
+
+    eliminados = 0
+    bienes_cambiados = list(primer_cambio.items())
+    for i in range(0, len(bienes_cambiados), 100):
+        condicion = Q()
+        condicion_anual = Q()
+        for bien_id, periodo in bienes_cambiados[i:i + 100]:
+            anio, mes = indice_a_periodo(periodo)
+            condicion |= Q(bien_id=bien_id) & (Q(anio__gt=anio) | Q(anio=anio, mes__gte=mes))
+            condicion_anual |= Q(bien_id=bien_id, anio__gte=anio)
+        eliminados += DepreciacionMensual.objects.filter(condicion).delete()[0]
+        DepreciacionAnual.objects.filter(condicion_anual).delete()
+
+    cambio = np.array([primer_cambio.get(bien_id, horizonte[fila] + 1) for fila, bien_id in enumerate(ids.tolist())], dtype=np.int64)
+    cola = periodos >= cambio[filas]
+    creados = _guardar_registros(ids, filas[cola], periodos[cola], depreciaciones[cola], acumuladas[cola], netos[cola])
+    # El resumen anual se rehace con los años completos desde el primer cambio
+    anios_afectados = (periodos // 12 >= cambio[filas] // 12) & (cambio[filas] <= horizonte[filas])
+    _guardar_anuales(
+        ids, filas[anios_afectados], periodos[anios_afectados], depreciaciones[anios_afectados],
+        acumuladas[anios_afectados], netos[anios_afectados], sumar_existentes=False,
+    )
+
+    # Estado: último registro del calendario nuevo; sin registros, el bien queda sin estado
+    if len(filas):
+        _guardar_estados(ids, filas, periodos, acumuladas, netos)
+    con_registros = ids[np.unique(filas)].tolist()
+    EstadoDepreciacionBien.objects.filter(bien_id__in=ids.tolist()).exclude(bien_id__in=con_registros).delete()
+    EstadoDepreciacionBien.objects.filter(bien_id__in=con_registros).update(
+        recalcular_desde_anio=None, recalcular_desde_mes=None
+    )
+    return {
+        'bienes_recalculados': len(primer_cambio),
+        'registros_eliminados': eliminados,
+        'registros_creados': creados,
+    }
+
+
+def recalcular_pendientes(tamano_lote=TAMANO_LOTE_RECALCULO):
+    """
+    Reconstruye el historial de todos los bienes marcados con
+    `marcar_para_recalculo`, lote por lote (una transacción por lote).
+    Devuelve la cantidad de bienes cuyo historial cambió y de registros
+    eliminados y creados.
+    """
+    resumen = {'bienes_recalculados': 0, 'registros_eliminados': 0, 'registros_creados': 0}
+    periodo_ejecutado = _periodo_ultima_ejecucion()
+    while True:
+        with transaction.atomic():
+            lote = list(
+                EstadoDepreciacionBien.objects.filter(recalcular_desde_anio__isnull=False)
+                .order_by('bien_id')
+                .values_list(
+                    'bien_id', 'recalcular_desde_anio', 'recalcular_desde_mes', 'ultimo_anio', 'ultimo_mes',
+                    'bien__fecha_adquisicion', 'bien__valor_unitario_bs', 'bien__valor_residual',
+                    'bien__vida_util_estimada_anios', 'bien__metodo_depreciacion',
+                    'bien__unidades_produccion_estimadas',
+                )[:tamano_lote]
+            )
+            if not lote:
+                break
+            resultado = _recalcular_lote(lote, periodo_ejecutado)
+        for clave in resumen:
+            resumen[clave] += resultado[clave]
+    return resumen
+
+
+# --- Proyecciones (simulación sin escritura) ---
+
+def bienes_proyectables(vida_util_anios=None, metodo=None):
+    """
+    Bienes que participan en una proyección. Si se simula otra vida útil u
+    otro método, también entran los bienes en uso que no tienen ese dato.
+    """
+    return Bien.objects.filter(
+        condicion_depreciable(metodo, vida_util_anios), estado_bien__in=ESTADOS_DEPRECIABLES
+    )
+
+
+def proyectar_lotes(bienes, fin, vida_util_anios=None, metodo=None, tamano_lote=TAMANO_LOTE_BIENES):
+    """
+    Calcula por lotes el calendario de depreciación de `bienes` desde su
+    último estado guardado hasta el índice de período `fin`, opcionalmente
+    con otra vida útil (en años) u otro método para todos. No guarda nada.
+
+    Genera, por lote, los ids de los bienes, los arreglos planos de
+    `calcular_programa` y la depreciación acumulada y el valor neto iniciales
+    de cada bien (todo en céntimos).
+    """
+    ultimo_id = 0
+    while True:
+        lote = cargar_lote(ultimo_id, tamano_lote, bienes)
+        if not lote:
+            break
+        ultimo_id = lote[-1][0]
+
+        ids, metodos, costo, residual, vida_meses, acumulada, neto, inicio, adquisicion, unidades_totales = preparar_arreglos(lote)
+        if vida_util_anios is not None:
+            vida_meses = np.full(len(ids), vida_util_anios * 12, dtype=np.int64)
+        if metodo is not None:
+            metodos = np.full(len(ids), metodo, dtype=object)
+        metodos = _metodos_elegibles(metodos, vida_meses, unidades_totales)
+        filas, periodos, depreciaciones, acumuladas, netos = calcular_programa(
+            metodos, costo, residual, vida_meses, acumulada, neto, inicio, fin,
+            adquisicion, unidades_totales, cargar_uso(ids, metodos, inicio),
+        )
+        yield ids, filas, periodos, depreciaciones, acumuladas, netos, acumulada, neto
+
+
+def proyeccion_mensual(bienes, desde, hasta, vida_util_anios=None, metodo=None):
+    """
+    Filas (bien_id, código patrimonial, año, mes, depreciación del mes,
+    acumulada, valor neto) de la proyección entre los índices de período
+    `desde` y `hasta`, generadas lote a lote para poder enviarlas en streaming.
+    """
+    for ids, filas, periodos, depreciaciones, acumuladas, netos, _, _ in proyectar_lotes(
+        bienes, hasta, vida_util_anios, metodo
+    ):
+        codigos = dict(Bien.objects.filter(id__in=ids.tolist()).values_list('id', 'codigo_patrimonial'))
+        # Orden por bien y período dentro del lote
+        orden = np.lexsort((periodos, filas))
+        orden = orden[periodos[orden] >= desde]
+        for fila, periodo, depreciacion, acumulada, neto in zip(
+            filas[orden].tolist(), periodos[orden].tolist(), depreciaciones[orden].tolist(),
+            acumuladas[orden].tolist(), netos[orden].tolist(),
+        ):
+            bien_id = int(ids[fila])
+            anio, mes = indice_a_periodo(periodo)
+            yield (
+                bien_id, codigos.get(bien_id), anio, mes,
+                desde_centimos(depreciacion), desde_centimos(acumulada), desde_centimos(neto),
+            )
+
+
+def proyeccion_anual(bienes, desde, hasta, vida_util_anios=None, metodo=None):
+    """
+    Totales por año de la proyección entre los índices de período `desde` y
+    `hasta`: depreciación del año (solo meses dentro del rango) y depreciación
+    acumulada y valor neto en libros del conjunto al cierre de cada año.
+    """
+    anio_desde = indice_a_periodo(desde)[0]
+    anio_hasta = indice_a_periodo(hasta)[0]
+    # Casilla 0: todo lo anterior a `desde`; casillas 1..n: cada año del rango
+    casillas = anio_hasta - anio_desde + 2
+    depreciacion = np.zeros(casillas, dtype=np.int64)
+    cambio_acumulada = np.zeros(casillas, dtype=np.int64)
+    cambio_neto = np.zeros(casillas, dtype=np.int64)
+    acumulada_inicial = 0
+    neto_inicial = 0
+    cantidad = 0
+
+    for ids, filas, periodos, depreciaciones, acumuladas, netos, acumulada, neto in proyectar_lotes(
+        bienes, hasta, vida_util_anios, metodo
+    ):
+        cantidad += len(ids)
+        acumulada_inicial += int(acumulada.sum())
+        neto_inicial += int(neto.sum())
+        if not len(filas):
+            continue
+        orden = np.lexsort((periodos, filas))
+        filas, periodos = filas[orden], periodos[orden]
+        depreciaciones, acumuladas, netos = depreciaciones[orden], acumuladas[orden], netos[orden]
+
+        # Variación de cada registro respecto al anterior del mismo bien (o a su estado inicial)
+        primero = np.ones(len(filas), dtype=bool)
+        primero[1:] = filas[1:] != filas[:-1]
+        acumulada_previa = np.where(primero, acumulada[filas], np.roll(acumuladas, 1))
+        neto_previo = np.where(primero, neto[filas], np.roll(netos, 1))
+
+        casilla = np.where(periodos >= desde, periodos // 12 - anio_desde + 1, 0)
+        # np.add.at en enteros (bincount suma en float y perdería céntimos en montos grandes)
+        np.add.at(depreciacion, casilla, np.where(periodos >= desde, depreciaciones, 0))
+        np.add.at(cambio_acumulada, casilla, acumuladas - acumulada_previa)
+        np.add.at(cambio_neto, casilla, netos - neto_previo)
+
+    acumulada_cierre = acumulada_inicial + np.cumsum(cambio_acumulada)
+    neto_cierre = neto_inicial + np.cumsum(cambio_neto)
+    return cantidad, [
+        {
+            'anio': anio_desde + casilla - 1,
+            'depreciacion': desde_centimos(depreciacion[casilla]),
+            'depreciacion_acumulada': desde_centimos(acumulada_cierre[casilla]),
+            'valor_neto_en_libros': desde_centimos(neto_cierre[casilla]),
+        }
+        for casilla in range(1, casillas)
+    ]
+
+
+# --- Ejecuciones en segundo plano ---
+
+def tomar_ejecucion(ejecucion):
+    """
+    Marca una ejecución PENDIENTE como EN_PROCESO (bloqueo a nivel de ejecución).
+    Devuelve False si otra ejecución ya está en proceso.
+    Una ejecución que ya estaba EN_PROCESO (p. ej. tras una caída) se retoma tal cual.
+    """
+    if ejecucion.estado == 'EN_PROCESO':
+        return True
+    try:
+        with transaction.atomic():
+            tomada = EjecucionDepreciacion.objects.filter(pk=ejecucion.pk, estado='PENDIENTE').update(
+                estado='EN_PROCESO',
+                fecha_inicio=timezone.now(),
+                total_bienes=bienes_depreciables().count(),
+            )
+    except IntegrityError:
+        # La restricción única sobre estado='EN_PROCESO' impide dos ejecuciones simultáneas
+        return False
+    if tomada:
+        ejecucion.refresh_from_db()
+    return bool(tomada)
+
+
+def ejecutar_depreciacion(ejecucion, tamano_lote=TAMANO_LOTE_BIENES, trabajadores=None):
+    """
+    Procesa una ejecución de depreciación lote por lote.
+
+    Cada lote se confirma en su propia transacción junto con el avance y el
+    punto de control (`ultimo_bien_id`) de la ejecución, de modo que si el
+    proceso se interrumpe se retoma desde el último lote confirmado.
+    Devuelve False si no se pudo tomar el bloqueo.
+    """
+    if not tomar_ejecucion(ejecucion):
+        return False
+
+    fin = periodo_a_indice(ejecucion.anio, ejecucion.mes)
+    trabajadores = trabajadores or trabajadores_por_defecto()
+    try:
+        # Primero se corrige el historial de los bienes cuya valoración cambió
+        recalcular_pendientes()
+        with ejecutor_depreciacion(trabajadores) as ejecutor:
+            while True:
+                with transaction.atomic():
+                    resultado = procesar_lote(fin, ejecucion.ultimo_bien_id, tamano_lote, ejecutor, trabajadores)
+                    if resultado is None:
+                        break
+                    ejecucion.ultimo_bien_id = resultado['ultimo_bien_id']
+                    ejecucion.bienes_procesados += resultado['bienes_procesados']
+                    ejecucion.bienes_omitidos += resultado['bienes_omitidos']
+                    ejecucion.registros_creados += resultado['registros_creados']
+                    ejecucion.save(update_fields=[
+                        'ultimo_bien_id', 'bienes_procesados', 'bienes_omitidos',
+                        'registros_creados', 'fecha_actualizacion',
+                    ])
+    except Exception as e:
+        ejecucion.estado = 'FALLIDA'
+        ejecucion.mensaje_error = str(e)
+        ejecucion.fecha_fin = timezone.now()
+        ejecucion.save(update_fields=['estado', 'mensaje_error', 'fecha_fin', 'fecha_actualizacion'])
+        raise
+
+    ejecucion.estado = 'COMPLETADA'
+    ejecucion.fecha_fin = timezone.now()
+    ejecucion.save(update_fields=['estado', 'fecha_fin', 'fecha_actualizacion'])
+
+    # bulk_create no dispara post_save, así que se deja un único registro de auditoría por ejecución
+    log_action(
+        usuario=ejecucion.usuario,
+        ip_address=None,
+        accion='CALCULAR_DEPRECIACION',
+        entidad='Cálculo de Depreciación',
+        entidad_id=ejecucion.pk,
+        detalles=f"Cálculo de depreciación hasta {ejecucion.mes}/{ejecucion.anio}: "
+                 f"{ejecucion.registros_creados} registros mensuales para {ejecucion.bienes_procesados} bienes."
+    )
+    return True
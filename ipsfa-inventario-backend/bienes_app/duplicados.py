@@ -0,0 +1,280 @@
+# bienes_app/duplicados.py
+"""
+Detección de bienes duplicados, en la carga masiva (`marcar_duplicados`) y
+sobre los bienes ya registrados (`buscar_grupos_duplicados`).
+
+Dos bienes se consideran posibles duplicados si:
+
+1. Tienen el mismo serial normalizado (`models.normalizar_serial`): 'SN-1234 a'
+   y 'sn1234A' son el mismo serial escrito distinto.
+2. Son del mismo bloque de marca y modelo (`models.clave_bloque`) y sus
+   descripciones son parecidas: similitud de Dice entre los pares de
+   caracteres de las descripciones normalizadas, de 0 a 1. Las
+   descripciones solo se comparan si a alguno de los dos le falta el serial:
+   si ambos lo tienen decide el serial (varias unidades del mismo modelo
+   tienen la misma descripción). Sin marca o modelo no hay bloque.
+
+Cada descripción se representa con sus pares de caracteres como un entero
+de bits (un bit por par distinto, ver `pares_de_caracteres`): la intersección
+es un AND y su tamaño un conteo de bits, y ocupa mucho menos que un conjunto.
+
+Las claves se guardan en Bien (`serial_normalizado` y `bloque_duplicados`, con
+índice), así que los candidatos de las filas de un archivo se buscan con una
+consulta por lote y las descripciones solo se comparan dentro de cada bloque.
+Dentro de un bloque, además, solo se comparan las descripciones cuya cantidad
+de pares de caracteres es compatible con el umbral (ver `BloqueDescripciones`),
+en lugar de comparar todos contra todos.
+"""
+
+import bisect
+import math
+import re
+import threading
+
+import pandas as pd
+from django.db.models import Count
+from .models import Bien, clave_bloque, normalizar_nombre, normalizar_serial
+
+UMBRAL_SIMILITUD = 0.9
+# Bienes registrados de los bloques ya consultados que se conservan entre lotes de una carga
+MAXIMO_REGISTRADOS_EN_MEMORIA = 500000
+TAMANO_LOTE_CONSULTA = 1000
+# Datos de cada bien en los grupos de `buscar_grupos_duplicados`
+CAMPOS_GRUPO = ('id', 'codigo_patrimonial', 'descripcion', 'marca', 'modelo', 'serial')
+
+
+# Bit de cada par de caracteres visto, como potencia de 2 (los pares distintos son pocos: letras, dígitos y espacio).
+# Lo comparten los hilos del servidor: los pares nuevos se agregan con `_BLOQUEO_PARES`
+_BITS_PARES = {}
+_BLOQUEO_PARES = threading.Lock()
+_PALABRAS = re.compile(r'\w+')
+
+
+def pares_de_caracteres(descripcion):
+    """
+    Pares de caracteres consecutivos de la descripción normalizada (sin
+    acentos, signos ni mayúsculas), como un entero con un bit por par.
+    """
+    texto = ' '.join(_PALABRAS.findall(normalizar_nombre(descripcion or '')))
+    pares = set(map(str.__add__, texto, texto[1:]))
+    nuevos = [par for par in pares if par not in _BITS_PARES]
+    if nuevos:
+        with _BLOQUEO_PARES:
+            for par in nuevos:
+                # Otro hilo pudo agregarlo mientras se esperaba el bloqueo
+                if par not in _BITS_PARES:
+                    _BITS_PARES[par] = 1 << len(_BITS_PARES)
+    return sum(map(_BITS_PARES.__getitem__, pares))
+
+
+def similitud(pares, otros_pares):
+    """Coeficiente de Dice entre dos `pares_de_caracteres`."""
+    if not pares or not otros_pares:
+        return 0.0
+    return 2 * (pares & otros_pares).bit_count() / (pares.bit_count() + otros_pares.bit_count())
+
+
+class _Descripciones:
+    """Descripciones distintas ordenadas por cantidad de pares, con el primer dato de cada una."""
+
+    def __init__(self):
+        self.tamanos = []
+        self.pares = []
+        self.datos = {}
+
+    def agregar(self, pares, dato):
+        if pares in self.datos:
+            return
+        self.datos[pares] = dato
+        tamano = pares.bit_count()
+        posicion = bisect.bisect_right(self.tamanos, tamano)
+        self.tamanos.insert(posicion, tamano)
+        self.pares.insert(posicion, pares)
+
+    def entre(self, minimo, maximo):
+        return self.pares[bisect.bisect_left(self.tamanos, minimo):bisect.bisect_right(self.tamanos, maximo)]
+
+
+class BloqueDescripciones:
+    """
+    Descripciones de un bloque (mismo marca y modelo), separadas según el bien
+    tenga serial o no (si ambos lo tienen no se comparan) y ordenadas por
+    cantidad de pares de caracteres. Con similitud >= u, la otra descripción
+    debe tener entre n·u/(2-u) y n·(2-u)/u pares, así que solo se comparan
+    las de ese rango. Las descripciones idénticas se guardan una vez, con el
+    dato del primer bien que la tuvo.
+    """
+
+    def __init__(self, umbral=UMBRAL_SIMILITUD):
+        self.umbral = umbral
+        self.con_serial = _Descripciones()
+        self.sin_serial = _Descripciones()
+
+    def agregar(self, pares, serial, dato):
+        if pares:
+            (self.con_serial if serial else self.sin_serial).agregar(pares, dato)
+
+    def parecidas(self, pares, serial):
+        """[(similitud, dato)] de las descripciones del bloque con similitud >= umbral."""
+        if not pares:
+            return []
+        tamano = pares.bit_count()
+        minimo = math.ceil(tamano * self.umbral / (2 - self.umbral))
+        maximo = math.floor(tamano * (2 - self.umbral) / self.umbral)
+        resultado = []
+        for descripciones in ((self.sin_serial,) if serial else (self.sin_serial, self.con_serial)):
+            for otros_pares in descripciones.entre(minimo, maximo):
+                valor = similitud(pares, otros_pares)
+                if valor >= self.umbral:
+                    resultado.append((valor, descripciones.datos[otros_pares]))
+        return resultado
+
+
+def _columna(datos, campo):
+    """Columna de `datos` con None en los valores vacíos (o toda None si no está)."""
+    if campo not in datos.columns:
+        return pd.Series([None] * len(datos), index=datos.index, dtype=object)
+    return datos[campo].astype(object).where(datos[campo].notna(), None)
+
+
+def marcar_duplicados(datos, errores, estado, umbral=UMBRAL_SIMILITUD):
+    """
+    Marca las filas de `datos` (ya validadas por `validar_bienes`) que
+    crearían un bien y parecen duplicar uno registrado o una fila anterior
+    del archivo. Las filas que actualizan un bien existente (columna `id`) no
+    se revisan. `estado` ({}) acumula los lotes anteriores del mismo archivo.
+    El serial idéntico ya lo marcan `marcar_existentes` y `marcar_repetidos`;
+    aquí se marca el mismo serial escrito distinto y la descripción parecida.
+    """
+    nuevas = datos['id'].isna() if 'id' in datos.columns else pd.Series(True, index=datos.index)
+    filas = datos.index[nuevas]
+    if not len(filas):
+        return
+    seriales = _columna(datos, 'serial')[nuevas]
+    normalizados = seriales.map(normalizar_serial)
+    bloques = [clave_bloque(marca, modelo) for marca, modelo in
+               zip(_columna(datos, 'marca')[nuevas], _columna(datos, 'modelo')[nuevas])]
+    descripciones = _columna(datos, 'descripcion')[nuevas]
+
+    # Seriales registrados con la misma forma normalizada
+    registrados = {}
+    valores = list(set(normalizados.dropna()))
+    for inicio in range(0, len(valores), TAMANO_LOTE_CONSULTA):
+        consulta = Bien.objects.filter(serial_normalizado__in=valores[inicio:inicio + TAMANO_LOTE_CONSULTA])
+        for normalizado, codigo, serial in consulta.values_list('serial_normalizado', 'codigo_patrimonial', 'serial'):
+            registrados.setdefault(normalizado, (codigo, serial))
+
+    # Bienes registrados de los bloques de este lote
+    cache = estado.setdefault('registrados', {})
+    faltantes = list({bloque for bloque in bloques if bloque and bloque not in cache})
+    if estado.get('total_registrados', 0) > MAXIMO_REGISTRADOS_EN_MEMORIA:
+        cache.clear()
+        estado['total_registrados'] = 0
+        faltantes = list({bloque for bloque in bloques if bloque})
+    for bloque in faltantes:
+        cache[bloque] = BloqueDescripciones(umbral)
+    for inicio in range(0, len(faltantes), TAMANO_LOTE_CONSULTA):
+        consulta = Bien.objects.filter(bloque_duplicados__in=faltantes[inicio:inicio + TAMANO_LOTE_CONSULTA])
+        for bloque, descripcion, serial, codigo in consulta.values_list(
+            'bloque_duplicados', 'descripcion', 'serial_normalizado', 'codigo_patrimonial'
+        ):
+            cache[bloque].agregar(pares_de_caracteres(descripcion), serial, f'del bien {codigo}')
+            estado['total_registrados'] = estado.get('total_registrados', 0) + 1
+
+    del_archivo = estado.setdefault('archivo', {})
+    seriales_archivo = estado.setdefault('seriales', {})
+    for fila, serial, normalizado, bloque, descripcion in zip(filas, seriales, normalizados, bloques, descripciones):
+        mensajes = []
+        if normalizado:
+            registrado = registrados.get(normalizado)
+            anterior = seriales_archivo.get(normalizado)
+            if registrado and registrado[1] != serial:
+                mensajes.append(f'Posible duplicado del bien {registrado[0]}: su serial "{registrado[1]}" '
+                                'es el mismo escrito de otra forma.')
+            elif anterior and anterior[1] != serial:
+                mensajes.append(f'Posible duplicado de la fila {anterior[0]}: su serial "{anterior[1]}" '
+                                'es el mismo escrito de otra forma.')
+            seriales_archivo.setdefault(normalizado, (fila, serial))
+        if bloque and descripcion:
+            pares = pares_de_caracteres(descripcion)
+            archivo = del_archivo.setdefault(bloque, BloqueDescripciones(umbral))
+            parecidas = cache[bloque].parecidas(pares, normalizado) + archivo.parecidas(pares, normalizado)
+            if parecidas and not mensajes:
+                valor, origen = max(parecidas)
+                mensajes.append(f'Posible duplicado {origen}: misma marca y modelo y descripción '
+                                f'parecida ({valor:.0%}).')
+            archivo.agregar(pares, normalizado, f'de la fila {fila}')
+        for mensaje in mensajes:
+            errores.setdefault(fila, {}).setdefault('duplicado', []).append(mensaje)
+
+
+def buscar_grupos_duplicados(umbral=UMBRAL_SIMILITUD, bienes=None):
+    """
+    Recorre los bienes registrados (o el queryset `bienes`) y devuelve los
+    grupos de posibles duplicados: [{'motivo': 'SERIAL' o 'DESCRIPCION',
+    'clave', 'similitud', 'bienes': [...]}]. Los de serial salen de una
+    consulta agrupada por `serial_normalizado`; los de descripción, de
+    recorrer los bienes ordenados por bloque comparando cada uno solo con
+    los anteriores de su bloque (ver `BloqueDescripciones`). Los bienes
+    unidos por parecidos encadenados forman un solo grupo, y su similitud es
+    la menor de esos parecidos.
+    """
+    bienes = Bien.objects.all() if bienes is None else bienes
+    grupos = []
+
+    repetidos = list(
+        bienes.filter(serial_normalizado__isnull=False).values('serial_normalizado')
+        .annotate(total=Count('id')).filter(total__gt=1).values_list('serial_normalizado', flat=True)
+    )
+    por_serial = {}
+    for inicio in range(0, len(repetidos), TAMANO_LOTE_CONSULTA):
+        consulta = bienes.filter(serial_normalizado__in=repetidos[inicio:inicio + TAMANO_LOTE_CONSULTA])
+        for normalizado, *fila in consulta.order_by('id').values_list('serial_normalizado', *CAMPOS_GRUPO):
+            por_serial.setdefault(normalizado, []).append(dict(zip(CAMPOS_GRUPO, fila)))
+    for normalizado in sorted(por_serial):
+        grupos.append({'motivo': 'SERIAL', 'clave': normalizado, 'similitud': None, 'bienes': por_serial[normalizado]})
+
+    def cerrar_bloque(bloque, miembros, uniones):
+        if not uniones:
+            return
+        # Componentes conexas de los pares parecidos (unión y búsqueda)
+        padre = {}
+
+        def raiz(x):
+            while padre.setdefault(x, x) != x:
+                padre[x] = padre[padre[x]]
+                x = padre[x]
+            return x
+
+        for _, a, b in uniones:
+            padre[raiz(a)] = raiz(b)
+        minima = {}
+        for valor, a, _ in uniones:
+            minima[raiz(a)] = min(valor, minima.get(raiz(a), 1))
+        componentes = {}
+        for indice in padre:
+            componentes.setdefault(raiz(indice), []).append(indice)
+        for principal, indices in componentes.items():
+            grupos.append({
+                'motivo': 'DESCRIPCION', 'clave': bloque, 'similitud': round(minima[principal], 3),
+                'bienes': [miembros[indice] for indice in sorted(indices)],
+            })
+
+    consulta = bienes.filter(bloque_duplicados__isnull=False).order_by('bloque_duplicados', 'id').values_list(
+        'bloque_duplicados', 'serial_normalizado', *CAMPOS_GRUPO
+    )
+    bloque_actual = None
+    miembros, uniones, descripciones = [], [], None
+    for bloque, normalizado, *fila in consulta.iterator(chunk_size=5000):
+        if bloque != bloque_actual:
+            cerrar_bloque(bloque_actual, miembros, uniones)
+            bloque_actual = bloque
+            miembros, uniones, descripciones = [], [], BloqueDescripciones(umbral)
+        indice = len(miembros)
+        miembros.append(dict(zip(CAMPOS_GRUPO, fila)))
+        pares = pares_de_caracteres(fila[2])
+        for valor, otro in descripciones.parecidas(pares, normalizado):
+            uniones.append((valor, otro, indice))
+        descripciones.agregar(pares, normalizado, indice)
+    cerrar_bloque(bloque_actual, miembros, uniones)
+    return grupos
@@ -11,23 +11,25 @@ from openpyxl import load_workbook
 from openpyxl.drawing.image import Image
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 
+from .datos_reportes import CAMPOS_BIEN, CAMPOS_DEPRECIACION, CAMPOS_MOVIMIENTO, filas_reporte, nombre_estado
+
 # El nombre de la función ahora acepta un título para hacerlo dinámico
 def generar_reporte_inventario_excel(bienes_queryset, titulo_reporte):
-    # 1. Preparar los datos y crear el DataFrame de pandas
+    # 1. Preparar los datos (una sola consulta, ver datos_reportes) y crear el DataFrame de pandas
     datos_para_df = []
-    for i, bien in enumerate(bienes_queryset):
+    for i, bien in enumerate(filas_reporte(bienes_queryset, CAMPOS_BIEN)):
         datos_para_df.append({
             'N°': i + 1,
-            'CÓDIGO PATRIMONIAL': bien.codigo_patrimonial,
-            'DESCRIPCIÓN': bien.descripcion,
-            'CATEGORÍA': bien.categoria.nombre if bien.categoria else 'N/A',
-            'MARCA': bien.marca or '',
-            'MODELO': bien.modelo or '',
-            'SERIAL': bien.serial or '',
-            'UNIDAD ASIGNADA': bien.unidad_administrativa_actual.nombre if bien.unidad_administrativa_actual else 'N/A',
-            'ESTADO': bien.get_estado_bien_display(),
-            'FECHA DE ADQUISICIÓN': bien.fecha_adquisicion,
-            'VALOR (Bs.)': bien.valor_unitario_bs
+            'CÓDIGO PATRIMONIAL': bien['codigo_patrimonial'],
+            'DESCRIPCIÓN': bien['descripcion'],
+            'CATEGORÍA': bien['categoria__nombre'] or 'N/A',
+            'MARCA': bien['marca'] or '',
+            'MODELO': bien['modelo'] or '',
+            'SERIAL': bien['serial'] or '',
+            'UNIDAD ASIGNADA': bien['unidad_administrativa_actual__nombre'] or 'N/A',
+            'ESTADO': nombre_estado(bien['estado_bien']),
+            'FECHA DE ADQUISICIÓN': bien['fecha_adquisicion'],
+            'VALOR (Bs.)': bien['valor_unitario_bs']
         })
     df = pd.DataFrame(datos_para_df)
 
@@ -84,7 +86,7 @@ def generar_reporte_inventario_excel(bienes_queryset, titulo_reporte):
     info_row = 12
     sheet.merge_cells(f'A{info_row}:K{info_row}')
     cell = sheet[f'A{info_row}']
-    cell.value = f"Total de Bienes: {bienes_queryset.count()} | Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}"
+    cell.value = f"Total de Bienes: {len(df)} | Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}"
     cell.alignment = Alignment(horizontal='center', vertical='center')
     cell.font = Font(bold=True, size=11)
     
@@ -137,15 +139,15 @@ def generar_reporte_inventario_excel(bienes_queryset, titulo_reporte):
 
 def generar_reporte_desincorporados_excel(movimientos_queryset, titulo_reporte, fecha_desde=None, fecha_hasta=None):
     datos_para_df = []
-    for i, movimiento in enumerate(movimientos_queryset):
+    for i, movimiento in enumerate(filas_reporte(movimientos_queryset, CAMPOS_MOVIMIENTO)):
         datos_para_df.append({
             'N°': i + 1,
-            'CÓDIGO PATRIMONIAL': movimiento.bien.codigo_patrimonial,
-            'DESCRIPCIÓN': movimiento.bien.descripcion,
-            'UBICACIÓN DEL BIEN': movimiento.bien.ubicacion_fisica_especifica or '',
-            'MARCA': movimiento.bien.marca or '',
-            'MODELO': movimiento.bien.modelo or '',
-            'N° SERIAL': movimiento.bien.serial or '',
+            'CÓDIGO PATRIMONIAL': movimiento['bien__codigo_patrimonial'],
+            'DESCRIPCIÓN': movimiento['bien__descripcion'],
+            'UBICACIÓN DEL BIEN': movimiento['bien__ubicacion_fisica_especifica'] or '',
+            'MARCA': movimiento['bien__marca'] or '',
+            'MODELO': movimiento['bien__modelo'] or '',
+            'N° SERIAL': movimiento['bien__serial'] or '',
         })
     df = pd.DataFrame(datos_para_df)
     buffer = BytesIO()
@@ -186,7 +188,7 @@ def generar_reporte_desincorporados_excel(movimientos_queryset, titulo_reporte,
     cell.alignment = Alignment(horizontal='center', vertical='center')
     cell.font = Font(bold=True, size=14)
     # --- Información del reporte ---
-    info_text = f"Total de Bienes: {movimientos_queryset.count()} | Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}"
+    info_text = f"Total de Bienes: {len(df)} | Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}"
     if fecha_desde and fecha_hasta:
         info_text += f" | Período: Desde {fecha_desde} Hasta {fecha_hasta}"
     elif fecha_desde:
@@ -241,15 +243,15 @@ def generar_reporte_desincorporados_excel(movimientos_queryset, titulo_reporte,
 
 def generar_reporte_traslados_excel(movimientos_queryset, titulo_reporte, fecha_desde=None, fecha_hasta=None):
     datos_para_df = []
-    for i, movimiento in enumerate(movimientos_queryset):
+    for i, movimiento in enumerate(filas_reporte(movimientos_queryset, CAMPOS_MOVIMIENTO)):
         datos_para_df.append({
             'N°': i + 1,
-            'FECHA DE TRASLADO': movimiento.fecha_movimiento.strftime('%d/%m/%Y'),
-            'CODIGO PATRIMONIAL': movimiento.bien.codigo_patrimonial,
-            'DESCRIPCION': movimiento.bien.descripcion,
-            'UNIDAD ORIGEN': movimiento.unidad_origen.nombre if movimiento.unidad_origen else 'N/A',
-            'UNIDAD DESTINO': movimiento.unidad_destino.nombre if movimiento.unidad_destino else 'N/A',
-            'NUEVO RESPONSABLE': movimiento.responsable_nuevo_nombre or '',
+            'FECHA DE TRASLADO': movimiento['fecha_movimiento'].strftime('%d/%m/%Y'),
+            'CODIGO PATRIMONIAL': movimiento['bien__codigo_patrimonial'],
+            'DESCRIPCION': movimiento['bien__descripcion'],
+            'UNIDAD ORIGEN': movimiento['unidad_origen__nombre'] or 'N/A',
+            'UNIDAD DESTINO': movimiento['unidad_destino__nombre'] or 'N/A',
+            'NUEVO RESPONSABLE': movimiento['responsable_nuevo_nombre'] or '',
         })
 
     df = pd.DataFrame(datos_para_df)
@@ -295,7 +297,7 @@ def generar_reporte_traslados_excel(movimientos_queryset, titulo_reporte, fecha_
     cell.font = Font(bold=True, size=14)
 
     # --- Información del reporte ---
-    info_text = f"Total de Bienes: {movimientos_queryset.count()} | Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}"
+    info_text = f"Total de Bienes: {len(df)} | Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}"
     if fecha_desde and fecha_hasta:
         info_text += f" | Período: Desde {fecha_desde} Hasta {fecha_hasta}"
     elif fecha_desde:
@@ -356,18 +358,18 @@ def generar_reporte_traslados_excel(movimientos_queryset, titulo_reporte, fecha_
 # --- NUEVA FUNCIÓN PARA REPORTE DE DEPRECIACIÓN ---
 def generar_reporte_depreciacion_excel(bienes_con_depreciacion, titulo_reporte):
     datos_para_df = []
-    for i, bien in enumerate(bienes_con_depreciacion):
-        depreciacion_acumulada = bien.ultima_depreciacion_acumulada or 0
-        valor_neto = bien.ultimo_valor_neto or bien.valor_unitario_bs
-        porcentaje_depreciacion = (depreciacion_acumulada / bien.valor_unitario_bs * 100) if bien.valor_unitario_bs > 0 else 0
-        categoria_nombre = bien.categoria.nombre if bien.categoria else 'N/A'
+    for i, bien in enumerate(filas_reporte(bienes_con_depreciacion, CAMPOS_DEPRECIACION)):
+        depreciacion_acumulada = bien['ultima_depreciacion_acumulada'] or 0
+        valor_neto = bien['ultimo_valor_neto'] or bien['valor_unitario_bs']
+        porcentaje_depreciacion = (depreciacion_acumulada / bien['valor_unitario_bs'] * 100) if bien['valor_unitario_bs'] > 0 else 0
+        categoria_nombre = bien['categoria__nombre'] or 'N/A'
         
         datos_para_df.append({
             'N°': i + 1,
-            'CÓDIGO PATRIMONIAL': bien.codigo_patrimonial,
-            'DESCRIPCIÓN': bien.descripcion,
+            'CÓDIGO PATRIMONIAL': bien['codigo_patrimonial'],
+            'DESCRIPCIÓN': bien['descripcion'],
             'CATEGORÍA': categoria_nombre,
-            'VALOR ORIGINAL (Bs.)': bien.valor_unitario_bs,
+            'VALOR ORIGINAL (Bs.)': bien['valor_unitario_bs'],
             'DEPRECIACIÓN ACUMULADA (Bs.)': depreciacion_acumulada,
             'VALOR NETO EN LIBROS (Bs.)': valor_neto,
             '% DEPRECIACIÓN': f"{porcentaje_depreciacion:.1f}%"
@@ -422,7 +424,7 @@ def generar_reporte_depreciacion_excel(bienes_con_depreciacion, titulo_reporte):
     info_row = 12
     sheet.merge_cells(f'A{info_row}:H{info_row}')
     cell = sheet[f'A{info_row}']
-    cell.value = f"Total de Bienes: {bienes_con_depreciacion.count()} | Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}"
+    cell.value = f"Total de Bienes: {len(df)} | Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}"
     cell.alignment = Alignment(horizontal='center', vertical='center')
     cell.font = Font(bold=True, size=11)
     
@@ -0,0 +1,1093 @@
+# bienes_app/importacion.py
+"""
+Carga masiva de bienes desde archivos CSV, Excel o Parquet.
+
+En lugar de pasar cada fila por BienSerializer (un INSERT, un UPDATE para el
+código patrimonial y un registro de auditoría por bien), las validaciones se
+aplican por columnas sobre el DataFrame completo, las claves foráneas y los
+campos únicos se verifican con una consulta por lote de valores, los
+proveedores, unidades y categorías indicados por nombre se buscan en un
+diccionario cargado con una consulta por tabla (ver `normalizar_nombre`), los códigos
+patrimoniales se asignan antes de insertar y los bienes se guardan con
+`bulk_create` por lotes.
+
+La carga es todo o nada: si alguna fila tiene errores no se guarda ningún
+bien y se devuelven los errores de cada fila (con el número de fila del
+archivo, contando el encabezado), en el mismo formato que los del serializer.
+`simular_importacion` hace la misma validación sin guardar nada.
+
+En modo actualización (para las reimportaciones periódicas del inventario)
+cada fila se busca entre los bienes existentes por serial, código anterior o
+código patrimonial, con una consulta por lote. Las filas encontradas
+actualizan su bien con `bulk_update` (solo los campos que cambian; las celdas
+vacías no borran lo guardado) y el resto se crean.
+
+Las cargas desde la API se registran como ImportacionBienes y las procesa el
+comando `procesar_importaciones` (ver `ejecutar_importacion`). Ahí el archivo
+no se carga completo en memoria: se lee de a lotes de filas (`leer_por_lotes`,
+con openpyxl en modo de solo lectura o `read_csv` por partes), cada lote se
+valida a medida que se lee (`validar_lotes`) y los lotes ya validados se
+guardan en un archivo temporal hasta la fase de guardado.
+"""
+
+import os
+import pickle
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from auditoria_app.signals import log_action
+from proveedores_app.models import Proveedor
+from unidades_administrativas_app.models import UnidadAdministrativa
+from .cache_reportes import datos_modificados
+from .depreciacion import marcar_varios_para_recalculo, periodo_a_indice
+from .duplicados import marcar_duplicados
+from .models import Bien, Categoria, ImportacionBienes, ESTADO_BIEN_CHOICES, MOTIVO_ADQUISICION_CHOICES, normalizar_nombre
+from .parquet import contar_filas_parquet, leer_parquet_por_lotes
+from .signals import CAMPOS_VALORACION
+
+# Bienes por sentencia INSERT y valores por consulta de verificación
+TAMANO_LOTE_IMPORTACION = 1000
+# Filas por lote al solo validar (sin inserciones, lotes más grandes significan menos consultas)
+TAMANO_LOTE_SIMULACION = 5000
+
+# Formatos de archivo que se pueden cargar
+EXTENSIONES_ARCHIVO = ('.csv', '.xls', '.xlsx', '.parquet')
+
+# Mapeo de columnas del archivo Excel/CSV a los campos del modelo Django
+COLUMNAS_ARCHIVO = {
+    'FECHA DE ADQUISICIÓN': 'fecha_adquisicion',
+    'DESCRIPCIÓN': 'descripcion',
+    'CANTIDAD': 'cantidad',
+    'MARCA': 'marca',
+    'MODELO': 'modelo',
+    'SERIAL': 'serial',
+    'CÓDIGO': 'codigo_anterior',
+    'N° ORDEN DE COMPRA O N° DE FACTURA': 'n_orden_compra_factura',
+    'PROVEEDOR': 'nombre_proveedor',
+    'UNIDAD ADMINISTRATIVA': 'nombre_unidad',
+    'CATEGORÍA': 'nombre_categoria',
+    'VALOR UNITARIO Bs.': 'valor_unitario_bs',
+    'VALOR UNITARIO $': 'valor_unitario_usd',
+    'RESPONSABLE DEL ÁREA': 'responsable_asignado_nombre',
+    'CARGO DEL RESPONSABLE': 'responsable_asignado_cargo',
+    'UBICACIÓN FÍSICA': 'ubicacion_fisica_especifica',
+    'ESTADO DEL BIEN': 'estado_bien',
+    'OBSERVACIONES': 'observaciones'
+}
+
+# Campos de texto de Bien que se pueden cargar (también con su nombre interno como encabezado)
+CAMPOS_TEXTO = [
+    'codigo_patrimonial', 'codigo_anterior', 'descripcion', 'marca', 'modelo', 'serial',
+    'n_orden_compra_factura', 'ubicacion_fisica_especifica', 'responsable_asignado_nombre',
+    'responsable_asignado_cargo', 'observaciones',
+]
+CAMPOS_OBLIGATORIOS = ['descripcion', 'ubicacion_fisica_especifica', 'valor_unitario_bs']
+CAMPOS_DECIMALES = ['valor_unitario_bs', 'valor_unitario_usd', 'valor_residual']
+CAMPOS_ENTEROS = ['cantidad', 'vida_util_estimada_anios', 'unidades_produccion_estimadas']
+CAMPOS_OPCIONES = {
+    'estado_bien': ESTADO_BIEN_CHOICES,
+    'motivo_adquisicion': MOTIVO_ADQUISICION_CHOICES,
+    'metodo_depreciacion': Bien.METODO_DEPRECIACION_CHOICES,
+}
+# Claves foráneas que se pueden indicar por id
+CLAVES_FORANEAS = {
+    'categoria': Categoria,
+    'unidad_administrativa_actual': UnidadAdministrativa,
+    'proveedor': Proveedor,
+}
+# Columnas con el nombre (o código) de un registro relacionado: clave foránea
+# que completan, modelo, campos por los que se busca (por prioridad) y textos
+# para los mensajes de error. Si la fila trae además el id, manda el id.
+CATALOGOS = {
+    'nombre_proveedor': {
+        'campo': 'proveedor', 'modelo': Proveedor, 'claves': ('nombre_proveedor', 'rif'),
+        'registro': 'un proveedor', 'busqueda': 'con el nombre o RIF',
+    },
+    'nombre_unidad': {
+        'campo': 'unidad_administrativa_actual', 'modelo': UnidadAdministrativa, 'claves': ('codigo', 'nombre'),
+        'registro': 'una unidad administrativa', 'busqueda': 'con el código o nombre',
+    },
+    'nombre_categoria': {
+        'campo': 'categoria', 'modelo': Categoria, 'claves': ('nombre',),
+        'registro': 'una categoría', 'busqueda': 'con el nombre',
+    },
+}
+# Id inexistente con el que se marca en el diccionario un nombre que corresponde a varios registros
+_AMBIGUO = 0
+
+
+def leer_archivo(archivo):
+    """
+    Lee el archivo subido en un DataFrame. Las celdas se leen tal cual (sin
+    inferir tipos por columna) para no perder, p. ej., los ceros a la
+    izquierda de los seriales. Lanza ValueError si el formato no es soportado.
+    """
+    if archivo.name.endswith('.csv'):
+        return pd.read_csv(archivo, sep=';', encoding='utf-8', dtype=str)
+    if archivo.name.endswith(('.xls', '.xlsx')):
+        return pd.read_excel(archivo, dtype=object)
+    if archivo.name.endswith('.parquet'):
+        return pd.concat(list(leer_parquet_por_lotes(archivo, TAMANO_LOTE_IMPORTACION)))
+    raise ValueError('Formato de archivo no soportado.')
+
+
+def leer_por_lotes(archivo, tamano_lote=TAMANO_LOTE_IMPORTACION):
+    """
+    Lee el archivo de a `tamano_lote` filas, como `leer_archivo` pero sin
+    cargarlo completo: devuelve un iterador de DataFrames con las mismas
+    columnas e índice que tendrían esas filas en el de `leer_archivo`. Los
+    .xls (formato binario antiguo, sin lectura por partes) sí se leen completos.
+    Lanza ValueError si el formato no es soportado.
+    """
+    if archivo.name.endswith('.csv'):
+        return pd.read_csv(archivo, sep=';', encoding='utf-8', dtype=str, chunksize=tamano_lote)
+    if archivo.name.endswith('.xlsx'):
+        return _leer_xlsx_por_lotes(archivo, tamano_lote)
+    if archivo.name.endswith('.xls'):
+        df = pd.read_excel(archivo, dtype=object)
+        return (df.iloc[inicio:inicio + tamano_lote] for inicio in range(0, len(df), tamano_lote))
+    if archivo.name.endswith('.parquet'):
+        return leer_parquet_por_lotes(archivo, tamano_lote)
+    raise ValueError('Formato de archivo no soportado.')
+
+
+def _leer_xlsx_por_lotes(archivo, tamano_lote):
+    """Primera hoja del libro, leída fila a fila con openpyxl en modo de solo lectura."""
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            return
+        columnas = [f'Unnamed: {i}' if nombre is None else nombre for i, nombre in enumerate(encabezado)]
+        ancho = len(columnas)
+        lote = []
+        inicio = 0
+        for fila in filas:
+            # Las filas pueden venir más cortas que el encabezado (celdas vacías al final)
+            lote.append(fila[:ancho] + (None,) * (ancho - len(fila)))
+            if len(lote) == tamano_lote:
+                yield pd.DataFrame(lote, columns=columnas, index=range(inicio, inicio + len(lote)), dtype=object)
+                inicio += len(lote)
+                lote = []
+        if lote:
+            yield pd.DataFrame(lote, columns=columnas, index=range(inicio, inicio + len(lote)), dtype=object)
+    finally:
+        libro.close()
+
+
+def estimar_filas(archivo):
+    """
+    Cantidad aproximada de filas de datos del archivo, sin leerlas: la
+    dimensión guardada en la hoja de un .xlsx o los saltos de línea de un CSV
+    (incluye las filas vacías; en un Parquet es exacta). Sirve para informar
+    el avance mientras se lee.
+    """
+    if archivo.name.endswith('.parquet'):
+        return contar_filas_parquet(archivo)
+    if archivo.name.endswith('.xlsx'):
+        libro = load_workbook(archivo, read_only=True)
+        try:
+            filas = libro.worksheets[0].max_row or 1
+        finally:
+            libro.close()
+        archivo.seek(0)
+        return max(0, filas - 1)
+    if not archivo.name.endswith('.csv'):
+        return 0
+    lineas = 0
+    for parte in iter(lambda: archivo.read(1024 * 1024), b''):
+        lineas += parte.count(b'\n')
+    archivo.seek(0)
+    return max(0, lineas - 1)
+
+
+def _marcar(errores, mascara, campo, mensaje):
+    """Agrega `mensaje` (texto o serie alineada con las filas) al `campo` de cada fila marcada."""
+    for indice in mascara[mascara].index:
+        texto = mensaje if isinstance(mensaje, str) else mensaje[indice]
+        errores.setdefault(indice, {}).setdefault(campo, []).append(texto)
+
+
+def _como_texto(serie):
+    """Columna como texto sin espacios sobrantes; las celdas vacías quedan como None."""
+    if pd.api.types.infer_dtype(serie, skipna=True) in ('string', 'empty'):
+        # Caso habitual (CSV leído como texto): se resuelve con operaciones vectorizadas
+        texto = serie.str.strip()
+        return texto.where(texto.notna() & (texto != ''), None).astype(object)
+
+    def convertir(valor):
+        if valor is None or pd.isna(valor):
+            return None
+        if isinstance(valor, float) and valor.is_integer():
+            valor = int(valor)  # Números leídos de Excel (p. ej. seriales o códigos)
+        texto = str(valor).strip()
+        return texto or None
+    return serie.map(convertir).astype(object)
+
+
+def _numeros(serie, errores, campo):
+    """Columna como números (NaN si está vacía); marca las celdas que no son números."""
+    numeros = pd.to_numeric(serie, errors='coerce')
+    _marcar(errores, serie.notna() & numeros.isna(), campo, 'Se requiere un número válido.')
+    return numeros
+
+
+def _fechas(serie, errores, campo):
+    """
+    Columna como fechas (NaT si está vacía). Los textos deben ser AAAA-MM-DD o
+    DD/MM/AAAA exactamente; las celdas de fecha de Excel (o Parquet) se toman
+    tal cual. Se marca todo lo demás, incluidas las fechas imposibles.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    # datetime y pd.Timestamp son subclases de date
+    es_fecha = serie.map(lambda valor: isinstance(valor, date))
+    texto = _como_texto(serie.where(~es_fecha, None))
+    fechas = pd.to_datetime(texto, errors='coerce', format='%Y-%m-%d')
+    fechas = fechas.fillna(pd.to_datetime(texto, errors='coerce', format='%d/%m/%Y'))
+    if es_fecha.any():
+        fechas = fechas.mask(es_fecha, pd.to_datetime(serie.where(es_fecha, None), errors='coerce'))
+    _marcar(errores, serie.notna() & fechas.isna(), campo, 'Fecha con formato erróneo. Use AAAA-MM-DD o DD/MM/AAAA.')
+    return fechas
+
+
+def _enteros(numeros):
+    """Números como int de Python; None en las celdas vacías o con decimales."""
+    return pd.Series(
+        [None if pd.isna(valor) or valor % 1 else int(valor) for valor in numeros], index=numeros.index, dtype=object
+    )
+
+
+def _en_lotes(valores, tamano=TAMANO_LOTE_IMPORTACION):
+    valores = list(valores)
+    for i in range(0, len(valores), tamano):
+        yield valores[i:i + tamano]
+
+
+def indice_por_nombre(modelo, claves):
+    """
+    Diccionario {nombre normalizado: id} de todos los registros de `modelo`,
+    leídos con una sola consulta, por cada uno de los campos `claves`. Si un
+    texto coincide con campos distintos manda el primero de `claves`; si
+    corresponde a varios registros por el mismo campo queda como _AMBIGUO.
+    """
+    por_clave = [{} for _ in claves]
+    for registro_id, *valores in modelo.objects.values_list('id', *claves):
+        for indice, valor in zip(por_clave, valores):
+            if valor:
+                texto = normalizar_nombre(valor)
+                indice[texto] = registro_id if indice.get(texto, registro_id) == registro_id else _AMBIGUO
+    resultado = {}
+    for indice in por_clave:
+        for texto, registro_id in indice.items():
+            resultado.setdefault(texto, registro_id)
+    return resultado
+
+
+def cargar_catalogos(columnas):
+    """Diccionarios de `indice_por_nombre` para las columnas de CATALOGOS presentes en el archivo."""
+    return {
+        columna: indice_por_nombre(catalogo['modelo'], catalogo['claves'])
+        for columna, catalogo in CATALOGOS.items() if columna in columnas
+    }
+
+
+def _campos_bien(datos):
+    """Columnas de `datos` que son campos de Bien (sin el id del bien existente ni los nombres de catálogos)."""
+    return [campo for campo in datos.columns if campo != 'id' and campo not in CATALOGOS]
+
+
+def preparar_datos(df):
+    """
+    Renombra las columnas del archivo a los campos del modelo (las claves
+    foráneas también se aceptan como `<campo>_id`, como en las exportaciones
+    a Parquet) y descarta las filas vacías.
+    """
+    df = df.rename(columns=COLUMNAS_ARCHIVO)
+    df = df.rename(columns={f'{campo}_id': campo for campo in CLAVES_FORANEAS if campo not in df.columns})
+    df = df.dropna(how='all')
+    # Índice = fila del archivo (la 1 es el encabezado)
+    df.index = df.index + 2
+    return df
+
+
+def validar_bienes(df, catalogos=None, crear_proveedores=False):
+    """
+    Valida y convierte las columnas del DataFrame ya preparado. `catalogos`
+    son los diccionarios de `cargar_catalogos` (se cargan si no se indican);
+    con `crear_proveedores`, los proveedores que no existen no son un error
+    (los crea `ejecutar_importacion` al guardar).
+
+    Devuelve (datos, errores): `datos` es un DataFrame con una columna por
+    campo del modelo ya convertida a su tipo (None en las celdas vacías, que
+    al crear el bien toman el valor por defecto del modelo) y `errores` un
+    diccionario {fila: {campo: [mensajes]}}.
+    """
+    errores = {}
+    datos = pd.DataFrame(index=df.index)
+
+    for campo in CAMPOS_TEXTO + list(CATALOGOS):
+        if campo in df.columns:
+            datos[campo] = _como_texto(df[campo])
+    for campo in CAMPOS_TEXTO:
+        if campo not in datos.columns:
+            continue
+        maximo = Bien._meta.get_field(campo).max_length
+        if maximo:
+            _marcar(errores, datos[campo].str.len() > maximo, campo,
+                    f'Asegúrese de que este campo no tenga más de {maximo} caracteres.')
+
+    for campo in CAMPOS_OBLIGATORIOS:
+        if campo not in df.columns:
+            _marcar(errores, pd.Series(True, index=df.index), campo, 'Este campo es requerido.')
+        elif campo in datos.columns:
+            _marcar(errores, datos[campo].isna(), campo, 'Este campo es requerido.')
+
+    for campo in CAMPOS_DECIMALES:
+        if campo not in df.columns:
+            continue
+        numeros = _numeros(df[campo], errores, campo)
+        centimos = numeros * 100
+        _marcar(errores, numeros.notna() & ((centimos - centimos.round()).abs() > 1e-6), campo,
+                'Asegúrese de que no haya más de 2 decimales.')
+        _marcar(errores, numeros.abs() >= 10 ** 17, campo, 'Asegúrese de que no haya más de 19 dígitos en total.')
+        datos[campo] = numeros.map(lambda valor: None if pd.isna(valor) else Decimal(f'{valor:.2f}')).astype(object)
+        if campo in CAMPOS_OBLIGATORIOS:
+            _marcar(errores, df[campo].isna(), campo, 'Este campo es requerido.')
+
+    for campo in CAMPOS_ENTEROS:
+        if campo not in df.columns:
+            continue
+        numeros = _numeros(df[campo], errores, campo)
+        _marcar(errores, numeros.notna() & (numeros % 1 != 0), campo, 'Se requiere un número entero válido.')
+        _marcar(errores, numeros < 0, campo, 'Asegúrese de que este valor sea mayor o igual a 0.')
+        datos[campo] = _enteros(numeros)
+
+    if 'fecha_adquisicion' in df.columns:
+        fechas = _fechas(df['fecha_adquisicion'], errores, 'fecha_adquisicion')
+        datos['fecha_adquisicion'] = fechas.dt.date.where(fechas.notna(), None).astype(object)
+
+    for campo, opciones in CAMPOS_OPCIONES.items():
+        if campo not in df.columns:
+            continue
+        # Se acepta tanto el valor interno ('EN_REPARACION') como el nombre ('En Reparación')
+        equivalencias = {clave: clave for clave, _ in opciones}
+        equivalencias.update({nombre: clave for clave, nombre in opciones})
+        texto = _como_texto(df[campo])
+        valores = texto.map(equivalencias)
+        if campo == 'estado_bien':
+            # Estados no reconocidos se cargan como 'NUEVO' (comportamiento histórico de la carga)
+            valores = valores.mask(texto.notna() & valores.isna(), 'NUEVO')
+            datos[campo] = valores.where(valores.notna(), None).astype(object)
+            continue
+        _marcar(errores, texto.notna() & valores.isna(), campo, '"' + texto.astype(str) + '" no es una elección válida.')
+        datos[campo] = valores.where(valores.notna(), None).astype(object)
+
+    for campo, modelo in CLAVES_FORANEAS.items():
+        if campo not in df.columns:
+            continue
+        numeros = _numeros(df[campo], errores, campo)
+        ids = _enteros(numeros)
+        existentes = set()
+        for lote in _en_lotes(set(ids.dropna())):
+            existentes.update(modelo.objects.filter(pk__in=lote).values_list('pk', flat=True))
+        _marcar(errores, ids.notna() & ~ids.isin(existentes), campo,
+                'Clave primaria "' + ids.astype(str) + '" inválida - objeto no existe.')
+        datos[f'{campo}_id'] = ids
+
+    if catalogos is None:
+        catalogos = cargar_catalogos(datos.columns)
+    resolver_nombres(datos, errores, catalogos, crear_proveedores)
+    return datos, errores
+
+
+def resolver_nombres(datos, errores, catalogos, crear_proveedores=False):
+    """
+    Completa la clave foránea de cada columna de CATALOGOS (p. ej.
+    `proveedor_id` a partir de `nombre_proveedor`) buscando el nombre
+    normalizado en su diccionario, sin consultas adicionales.
+    """
+    for columna, indice in catalogos.items():
+        if columna not in datos.columns:
+            continue
+        catalogo = CATALOGOS[columna]
+        campo = catalogo['campo']
+        textos = datos[columna]
+        # Cada nombre distinto se normaliza una sola vez
+        ids_por_texto = {texto: indice.get(normalizar_nombre(texto)) for texto in set(textos.dropna())}
+        ids = pd.Series([ids_por_texto.get(texto) for texto in textos], index=datos.index, dtype=object)
+        _marcar(errores, ids == _AMBIGUO, campo,
+                '"' + textos.astype(str) + f'" corresponde a más de {catalogo["registro"]}.')
+        faltantes = textos.notna() & ids.isna()
+        if columna == 'nombre_proveedor' and crear_proveedores:
+            maximo = Proveedor._meta.get_field('nombre_proveedor').max_length
+            _marcar(errores, faltantes & (textos.str.len() > maximo), campo,
+                    f'El nombre del proveedor a crear no puede tener más de {maximo} caracteres.')
+        else:
+            _marcar(errores, faltantes, campo,
+                    f'No existe {catalogo["registro"]} {catalogo["busqueda"]} "' + textos.astype(str) + '".')
+        ids = ids.where(ids != _AMBIGUO, None)
+        if f'{campo}_id' in datos.columns:
+            # Si viene el id, tiene prioridad sobre el nombre
+            ids = datos[f'{campo}_id'].where(datos[f'{campo}_id'].notna(), ids)
+        datos[f'{campo}_id'] = ids
+
+
+def proveedores_faltantes(datos):
+    """
+    Proveedores nombrados en el archivo que no existen, uno por nombre
+    normalizado: {nombre normalizado: nombre como aparece la primera vez}.
+    """
+    if 'nombre_proveedor' not in datos.columns:
+        return {}
+    nombres = {}
+    for texto in datos.loc[datos['nombre_proveedor'].notna() & datos['proveedor_id'].isna(), 'nombre_proveedor']:
+        nombres.setdefault(normalizar_nombre(texto), texto)
+    return nombres
+
+
+def crear_proveedores(nombres):
+    """
+    Crea con un `bulk_create` los proveedores de `nombres` (como los devuelve
+    `proveedores_faltantes`). Devuelve {nombre normalizado: id}.
+    """
+    Proveedor.objects.bulk_create([Proveedor(nombre_proveedor=nombre) for nombre in nombres.values()])
+    creados = {}
+    for lote in _en_lotes(nombres.values()):
+        creados.update(Proveedor.objects.filter(nombre_proveedor__in=lote).values_list('nombre_proveedor', 'id'))
+    return {normalizado: creados[nombre] for normalizado, nombre in nombres.items()}
+
+
+def completar_proveedores(datos, ids):
+    """Completa `proveedor_id` en las filas cuyo proveedor se creó (`ids` de `crear_proveedores`)."""
+    if 'nombre_proveedor' not in datos.columns:
+        return
+    faltantes = datos['nombre_proveedor'].notna() & datos['proveedor_id'].isna()
+    if faltantes.any():
+        datos.loc[faltantes, 'proveedor_id'] = [
+            ids[normalizar_nombre(texto)] for texto in datos.loc[faltantes, 'nombre_proveedor']
+        ]
+
+
+# Campos únicos de Bien que se pueden cargar
+CAMPOS_UNICOS = (('serial', 'serial'), ('codigo_patrimonial', 'código patrimonial'))
+
+
+# Campos por los que se busca el bien existente de cada fila en modo actualización, por prioridad
+CLAVES_COINCIDENCIA = (
+    ('serial', 'serial'), ('codigo_anterior', 'código anterior'), ('codigo_patrimonial', 'código patrimonial'),
+)
+
+
+def marcar_repetidos(datos, errores, vistos=None):
+    """
+    Marca los seriales y códigos patrimoniales repetidos en el archivo (a
+    partir de la segunda aparición) y, en modo actualización, las filas que
+    corresponden al mismo bien que una anterior. Para buscarlos lote por
+    lote, `vistos` ({campo: set}) acumula los valores de los lotes anteriores.
+    """
+    if vistos is None:
+        vistos = {}
+
+    def repetidos(campo):
+        valores = datos[campo]
+        anteriores = vistos.setdefault(campo, set())
+        en_anteriores = pd.Series([valor in anteriores for valor in valores], index=datos.index, dtype=bool)
+        anteriores.update(valores.dropna())
+        return valores.notna() & (valores.duplicated(keep='first') | en_anteriores)
+
+    for campo, nombre in CAMPOS_UNICOS:
+        if campo in datos.columns:
+            _marcar(errores, repetidos(campo), campo, f'Este {nombre} está repetido en el archivo.')
+    if 'id' in datos.columns:
+        _marcar(errores, repetidos('id'), 'bien', 'Otra fila del archivo corresponde al mismo bien.')
+
+
+def buscar_coincidencias(datos, errores):
+    """
+    Modo actualización: id del bien existente que corresponde a cada fila
+    (None si es un bien nuevo), buscándolo por la primera de las
+    CLAVES_COINCIDENCIA que lo encuentre, con una sola consulta para todo el
+    lote. Un código anterior compartido por varios bienes es un error.
+    """
+    ids = pd.Series(None, index=datos.index, dtype=object)
+    claves = [(campo, nombre) for campo, nombre in CLAVES_COINCIDENCIA if campo in datos.columns]
+    condicion = Q()
+    for campo, _ in claves:
+        valores = list(set(datos[campo].dropna()))
+        if valores:
+            condicion |= Q(**{f'{campo}__in': valores})
+    if not condicion:
+        return ids
+
+    encontrados = {campo: {} for campo, _ in claves}
+    for bien_id, *valores in Bien.objects.filter(condicion).values_list('id', *encontrados):
+        for campo, valor in zip(encontrados, valores):
+            if valor is not None:
+                encontrados[campo].setdefault(valor, []).append(bien_id)
+
+    pendientes = pd.Series(True, index=datos.index)
+    for campo, nombre in claves:
+        valores = datos[campo]
+        unicos = {valor: bienes[0] for valor, bienes in encontrados[campo].items() if len(bienes) == 1}
+        varios = {valor: str(len(bienes)) for valor, bienes in encontrados[campo].items() if len(bienes) > 1}
+        con_uno = pendientes & valores.isin(unicos)
+        con_varios = pendientes & valores.isin(varios)
+        _marcar(errores, con_varios, campo,
+                'Hay ' + valores.map(varios).astype(str) + f' bienes con este {nombre}; indique su serial o código patrimonial.')
+        ids[con_uno] = valores[con_uno].map(unicos)
+        pendientes &= ~(con_uno | con_varios)
+    return ids
+
+
+def marcar_existentes(datos, errores):
+    """
+    Marca los seriales y códigos patrimoniales ya registrados en otros bienes
+    (en modo actualización, en uno distinto del que corresponde a la fila).
+    """
+    propios = datos['id'] if 'id' in datos.columns else pd.Series(None, index=datos.index, dtype=object)
+    for campo, nombre in CAMPOS_UNICOS:
+        if campo not in datos.columns:
+            continue
+        valores = datos[campo]
+        existentes = {}
+        for lote in _en_lotes(set(valores.dropna())):
+            existentes.update(Bien.objects.filter(**{f'{campo}__in': lote}).values_list(campo, 'id'))
+        duenos = valores.map(existentes).astype(object)
+        _marcar(errores, duenos.notna() & (duenos != propios), campo, f'Ya existe un bien con este {nombre}.')
+
+
+def validar_por_lotes(df, tamano_lote=TAMANO_LOTE_IMPORTACION, al_avanzar=None, actualizar=False,
+                      crear_proveedores=False, permitir_duplicados=False):
+    """
+    Valida el DataFrame ya preparado de a `tamano_lote` filas (cada lote hace
+    sus propias consultas de verificación) y al final busca los repetidos en
+    todo el archivo. Después de cada lote llama a `al_avanzar(filas validadas,
+    filas con error)`, si se indica. Con `actualizar`, `datos` tiene además
+    una columna `id` con el bien existente de cada fila (ver `buscar_coincidencias`).
+    Los diccionarios de nombres de catálogos se cargan una sola vez. Salvo
+    con `permitir_duplicados`, los posibles duplicados de bienes registrados
+    o de otras filas son errores (ver duplicados.py).
+
+    Devuelve (datos, errores) como `validar_bienes`.
+    """
+    partes = []
+    errores = {}
+    catalogos = cargar_catalogos(df.columns)
+    duplicados = None if permitir_duplicados else {}
+    for inicio in range(0, len(df), tamano_lote):
+        datos_lote, errores_lote = _validar_lote(df.iloc[inicio:inicio + tamano_lote], catalogos, actualizar,
+                                                 crear_proveedores, duplicados)
+        partes.append(datos_lote)
+        errores.update(errores_lote)
+        if al_avanzar:
+            al_avanzar(inicio + len(datos_lote), len(errores))
+    datos = pd.concat(partes) if partes else pd.DataFrame(index=df.index)
+    marcar_repetidos(datos, errores)
+    return datos, errores
+
+
+def _validar_lote(df, catalogos, actualizar, crear_proveedores, duplicados):
+    datos, errores = validar_bienes(df, catalogos, crear_proveedores)
+    if actualizar:
+        datos['id'] = buscar_coincidencias(datos, errores)
+    marcar_existentes(datos, errores)
+    if duplicados is not None:
+        marcar_duplicados(datos, errores, duplicados)
+    return datos, errores
+
+
+def validar_lotes(lotes, al_avanzar=None, actualizar=False, crear_proveedores=False, permitir_duplicados=False):
+    """
+    Versión de `validar_por_lotes` para un archivo leído por partes: recibe
+    los lotes de `leer_por_lotes` (sin preparar) y devuelve, a medida que los
+    valida, (datos, errores) de cada uno. Los repetidos se buscan también
+    contra los lotes anteriores, así que los errores de cada fila quedan
+    completos apenas se valida su lote. `al_avanzar` recibe los totales
+    acumulados de filas validadas (sin contar las vacías) y con error.
+    """
+    catalogos = None
+    vistos = {}
+    duplicados = None if permitir_duplicados else {}
+    filas = con_error = 0
+    for lote in lotes:
+        df = preparar_datos(lote)
+        if catalogos is None:
+            catalogos = cargar_catalogos(df.columns)
+        datos, errores = _validar_lote(df, catalogos, actualizar, crear_proveedores, duplicados)
+        marcar_repetidos(datos, errores, vistos)
+        filas += len(df)
+        con_error += len(errores)
+        if al_avanzar:
+            al_avanzar(filas, con_error)
+        yield datos, errores
+
+
+def lista_de_errores(errores):
+    """Errores por fila en el formato de la respuesta de la API, ordenados por fila."""
+    return [{'fila': int(fila), 'errores': errores[fila]} for fila in sorted(errores)]
+
+
+def hoja_de_errores(lotes, errores):
+    """
+    Hoja de Excel (bytes) con las filas del archivo tal como se leyeron (los
+    lotes de `leer_por_lotes`, o un solo DataFrame de `leer_archivo`, antes de
+    `preparar_datos`) y una columna ERRORES con los errores de cada una, para
+    corregirla y volver a cargarla (la columna ERRORES se ignora al importar).
+    Se escribe fila a fila, sin armar el libro completo en memoria.
+    """
+    if isinstance(lotes, pd.DataFrame):
+        lotes = [lotes]
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet('Bienes')
+    encabezado = False
+    for lote in lotes:
+        if not encabezado:
+            hoja.append([str(columna) for columna in lote.columns] + ['ERRORES'])
+            encabezado = True
+        for indice, fila in zip(lote.index, lote.itertuples(index=False)):
+            mensajes = errores.get(indice + 2)  # Mismo número de fila que en los errores
+            hoja.append([None if pd.isna(valor) else valor for valor in fila] + [
+                '; '.join(f"{campo}: {' '.join(textos)}" for campo, textos in mensajes.items()) if mensajes else ''
+            ])
+    buffer = BytesIO()
+    libro.save(buffer)
+    return buffer.getvalue()
+
+
+def _cantidad_nuevos(datos):
+    """Bienes que crea el lote validado `datos` (las filas sin `id`)."""
+    if 'id' not in datos.columns:
+        return len(datos)
+    return int(datos['id'].isna().sum())
+
+
+def _reservar_ids(cantidad):
+    """
+    Reserva `cantidad` ids consecutivos para los bienes nuevos de una carga y
+    devuelve el primero. En la misma transacción en que se lee el mayor id se
+    avanza el contador de la base de datos hasta el final del bloque, de modo
+    que los bienes creados mientras tanto (p. ej. por la API, entre dos lotes
+    de una importación en segundo plano) reciben ids posteriores.
+    """
+    tabla = Bien._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            # Con AUTOINCREMENT, SQLite asigna el siguiente al mayor entre max(id) y sqlite_sequence.
+            # El UPDATE toma el bloqueo de escritura antes de leer, para que nadie inserte en medio.
+            cursor.execute("UPDATE sqlite_sequence SET seq = seq WHERE name = %s", [tabla])
+            cursor.execute(
+                f"SELECT MAX(id), (SELECT seq FROM sqlite_sequence WHERE name = %s) FROM {connection.ops.quote_name(tabla)}",
+                [tabla],
+            )
+            maximo, secuencia = cursor.fetchone()
+            primer_id = max(maximo or 0, secuencia or 0) + 1
+            if secuencia is None:
+                cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)", [tabla, primer_id + cantidad - 1])
+            else:
+                cursor.execute("UPDATE sqlite_sequence SET seq = %s WHERE name = %s", [primer_id + cantidad - 1, tabla])
+        elif connection.vendor == 'postgresql':
+            # El bloqueo impide inserciones (y por lo tanto nextval) hasta confirmar la reserva
+            cursor.execute(f"LOCK TABLE {connection.ops.quote_name(tabla)} IN SHARE ROW EXCLUSIVE MODE")
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [tabla])
+            secuencia = cursor.fetchone()[0]
+            cursor.execute(
+                f"SELECT GREATEST((SELECT COALESCE(MAX(id), 0) FROM {connection.ops.quote_name(tabla)}), "
+                f"(SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM {secuencia}))"
+            )
+            primer_id = cursor.fetchone()[0] + 1
+            if cantidad:
+                cursor.execute("SELECT setval(%s, %s)", [secuencia, primer_id + cantidad - 1])
+        else:
+            primer_id = (Bien.objects.aggregate(maximo=Max('id'))['maximo'] or 0) + 1
+    return primer_id
+
+
+def _crear_lote(datos, primer_id):
+    """
+    Inserta con `bulk_create` los bienes de `datos` con ids consecutivos desde
+    `primer_id`, con el código patrimonial por defecto (IPSFA-BM-<año>-<id>,
+    igual que Bien.save()) ya asignado para no necesitar un UPDATE por bien.
+    """
+    campos = _campos_bien(datos)
+    anio = timezone.now().year
+    bienes = []
+    for desplazamiento, fila in enumerate(datos[campos].itertuples(index=False)):
+        valores = {campo: valor for campo, valor in zip(campos, fila) if valor is not None}
+        bien = Bien(id=primer_id + desplazamiento, **valores)
+        if not bien.codigo_patrimonial:
+            bien.codigo_patrimonial = f"IPSFA-BM-{anio}-{bien.id:05d}"
+        bien.asignar_claves_duplicados()  # bulk_create no pasa por Bien.save()
+        bienes.append(bien)
+    Bien.objects.bulk_create(bienes)
+    return len(bienes)
+
+
+def cambios_en_bienes(datos):
+    """
+    Compara las filas de bienes existentes (columna `id`) con lo guardado,
+    leyendo sus bienes con una consulta. Devuelve [(bien, {campo: valor
+    nuevo})] de los que cambian; las celdas vacías no cuentan como cambio.
+    """
+    campos = _campos_bien(datos)
+    bienes = Bien.objects.in_bulk(list(datos['id']))
+    resultado = []
+    for bien_id, fila in zip(datos['id'], datos[campos].itertuples(index=False)):
+        bien = bienes[bien_id]
+        cambios = {campo: valor for campo, valor in zip(campos, fila)
+                   if valor is not None and getattr(bien, campo) != valor}
+        if cambios:
+            resultado.append((bien, cambios))
+    return resultado
+
+
+def _actualizar_lote(datos, anteriores=None):
+    """
+    Aplica a los bienes existentes (columna `id`) los valores de sus filas
+    con un solo `bulk_update`. Solo se escriben los campos que cambian y las
+    celdas vacías no borran el valor guardado. Si se indica la lista
+    `anteriores`, se le agregan los valores que tenían los campos cambiados,
+    como (id del bien, {campo: valor anterior}).
+
+    Devuelve (bienes actualizados, bienes sin cambios).
+    """
+    cambios = cambios_en_bienes(datos)
+    if anteriores is not None:
+        anteriores.extend((bien.id, {campo: getattr(bien, campo) for campo in valores}) for bien, valores in cambios)
+    _aplicar_cambios(cambios)
+    return len(cambios), len(datos) - len(cambios)
+
+
+def _aplicar_cambios(cambios):
+    """
+    Guarda los cambios [(bien, {campo: valor})] con un solo `bulk_update`.
+    Como `bulk_update` no dispara las señales de Bien, los bienes con cambios
+    de valoración se marcan aquí para recalcular su depreciación.
+    """
+    actualizados = []
+    campos_actualizados = set()
+    recalcular = {}
+    for bien, valores in cambios:
+        if set(valores) & set(CAMPOS_VALORACION):
+            adquisicion = min(bien.fecha_adquisicion, valores.get('fecha_adquisicion', bien.fecha_adquisicion))
+            recalcular[bien.id] = periodo_a_indice(adquisicion.year, adquisicion.month)
+        for campo, valor in valores.items():
+            setattr(bien, campo, valor)
+        if set(valores) & set(Bien.CAMPOS_CLAVES_DUPLICADOS):
+            bien.asignar_claves_duplicados()
+            campos_actualizados.update(('serial_normalizado', 'bloque_duplicados'))
+        actualizados.append(bien)
+        campos_actualizados.update(valores)
+    if actualizados:
+        Bien.objects.bulk_update(actualizados, sorted(campos_actualizados) + ['fecha_actualizacion'])
+    if recalcular:
+        marcar_varios_para_recalculo(recalcular)
+
+
+def _guardar_lote(datos, primer_id, anteriores=None):
+    """
+    Crea los bienes nuevos del lote (ids consecutivos desde `primer_id`) y
+    actualiza los existentes (anotando en `anteriores` lo que tenían, ver
+    `_actualizar_lote`). Devuelve (creados, actualizados, sin cambios).
+    """
+    # bulk_create y bulk_update no disparan las señales que invalidan los reportes
+    datos_modificados()
+    if 'id' not in datos.columns:
+        return _crear_lote(datos, primer_id), 0, 0
+    existentes = datos['id'].notna()
+    creados = _crear_lote(datos[~existentes], primer_id)
+    actualizados, sin_cambios = _actualizar_lote(datos[existentes], anteriores) if existentes.any() else (0, 0)
+    return creados, actualizados, sin_cambios
+
+
+def _auditar_carga(usuario, ip_address, creados, actualizados=0, sin_cambios=0):
+    # bulk_create no dispara post_save, así que se deja un único registro de auditoría por carga
+    detalles = f"Carga masiva de {creados} bienes."
+    if actualizados or sin_cambios:
+        detalles = f"Carga masiva: {creados} bienes creados, {actualizados} actualizados y {sin_cambios} sin cambios."
+    log_action(
+        usuario=usuario,
+        ip_address=ip_address,
+        accion='CARGA_MASIVA_BIENES',
+        entidad='Bien',
+        entidad_id=None,
+        detalles=detalles,
+    )
+
+
+def advertir_codigos_anteriores(datos, advertencias):
+    """
+    El código anterior no es único en el modelo, pero repetido suele indicar
+    un error en el archivo: se advierte si se repite en el archivo o si ya lo
+    tiene otro bien (en las filas que crean un bien nuevo).
+    """
+    if 'codigo_anterior' not in datos.columns:
+        return
+    codigos = datos['codigo_anterior']
+    _marcar(advertencias, codigos.notna() & codigos.duplicated(keep=False), 'codigo_anterior',
+            'Este código anterior está repetido en el archivo.')
+    nuevos = datos['id'].isna() if 'id' in datos.columns else pd.Series(True, index=datos.index)
+    registrados = set()
+    for lote in _en_lotes(set(codigos[nuevos].dropna())):
+        registrados.update(Bien.objects.filter(codigo_anterior__in=lote).values_list('codigo_anterior', flat=True))
+    _marcar(advertencias, nuevos & codigos.isin(registrados), 'codigo_anterior',
+            'Ya existe un bien con este código anterior.')
+
+
+def simular_importacion(df, actualizar=False, crear_proveedores=False, permitir_duplicados=False,
+                        tamano_lote=TAMANO_LOTE_SIMULACION):
+    """
+    Valida la carga completa como `ejecutar_importacion` (incluidos los seriales y
+    códigos repetidos en el archivo o ya registrados) y resume lo que haría,
+    sin guardar nada ni abrir una transacción de escritura. Como no hay
+    inserciones se valida en lotes más grandes, para responder en la misma
+    petición aun con archivos de decenas de miles de filas.
+
+    Devuelve el total de filas, las válidas y con errores, los bienes que se
+    crearían, actualizarían o quedarían sin cambios (solo de las filas
+    válidas), los proveedores que se crearían y los errores y advertencias
+    por fila (en el formato de `lista_de_errores`).
+    """
+    df = preparar_datos(df)
+    datos, errores = validar_por_lotes(df, tamano_lote, actualizar=actualizar, crear_proveedores=crear_proveedores,
+                                       permitir_duplicados=permitir_duplicados)
+    advertencias = {}
+    advertir_codigos_anteriores(datos, advertencias)
+
+    validas = datos.drop(index=list(errores))
+    existentes = validas[validas['id'].notna()] if 'id' in validas.columns else validas.iloc[:0]
+    actualizados = sum(
+        len(cambios_en_bienes(existentes.iloc[inicio:inicio + tamano_lote]))
+        for inicio in range(0, len(existentes), tamano_lote)
+    )
+    return {
+        'total_filas': len(df),
+        'filas_validas': len(validas),
+        'filas_con_error': len(errores),
+        'bienes_a_crear': len(validas) - len(existentes),
+        'bienes_a_actualizar': actualizados,
+        'bienes_sin_cambios': len(existentes) - actualizados,
+        'proveedores_a_crear': len(proveedores_faltantes(validas)) if crear_proveedores else 0,
+        'errores': lista_de_errores(errores),
+        'advertencias': lista_de_errores(advertencias),
+    }
+
+
+# --- Importaciones en segundo plano ---
+
+def tomar_importacion(importacion):
+    """
+    Marca una importación PENDIENTE como EN_PROCESO. Devuelve False si otra
+    importación ya está en proceso. Una importación que ya estaba EN_PROCESO
+    (p. ej. tras una caída) se deshace y se vuelve a procesar desde el principio.
+    """
+    if importacion.estado == 'EN_PROCESO':
+        _deshacer_importacion(importacion)
+        return True
+    try:
+        with transaction.atomic():
+            tomada = ImportacionBienes.objects.filter(pk=importacion.pk, estado='PENDIENTE').update(
+                estado='EN_PROCESO', fecha_inicio=timezone.now(),
+            )
+    except IntegrityError:
+        # La restricción única sobre estado='EN_PROCESO' impide dos importaciones simultáneas
+        return False
+    if tomada:
+        importacion.refresh_from_db()
+    return bool(tomada)
+
+
+def _deshacer_importacion(importacion):
+    """
+    Elimina los bienes ya creados por una importación interrumpida o fallida,
+    devuelve a los actualizados los valores que tenían y reinicia su avance.
+    """
+    _restaurar_valores_anteriores(importacion)
+    if importacion.primer_bien_id is not None and importacion.bienes_creados:
+        datos_modificados()
+        Bien.objects.filter(
+            id__gte=importacion.primer_bien_id,
+            id__lt=importacion.primer_bien_id + importacion.bienes_creados,
+        ).delete()
+    importacion.filas_procesadas = 0
+    importacion.filas_con_error = 0
+    importacion.bienes_creados = 0
+    importacion.bienes_actualizados = 0
+    importacion.bienes_sin_cambios = 0
+    importacion.primer_bien_id = None
+    importacion.fecha_inicio = timezone.now()
+    importacion.save(update_fields=[
+        'filas_procesadas', 'filas_con_error', 'bienes_creados', 'bienes_actualizados',
+        'bienes_sin_cambios', 'primer_bien_id', 'fecha_inicio', 'fecha_actualizacion',
+    ])
+
+
+def _ruta_valores_anteriores(importacion):
+    """
+    Archivo con los valores que tenían los bienes actualizados por la
+    importación, lote a lote. Está en disco y no en un temporal para poder
+    restaurarlos también cuando se retoma una importación tras una caída.
+    """
+    return os.path.join(settings.IMPORTACION_FRAGMENTOS_DIR, 'importaciones', f'{importacion.pk}_anteriores.pickle')
+
+
+def _restaurar_valores_anteriores(importacion):
+    """Devuelve a los bienes actualizados por la importación los valores de `_ruta_valores_anteriores`."""
+    ruta = _ruta_valores_anteriores(importacion)
+    try:
+        with open(ruta, 'rb') as archivo:
+            lotes = list(_lotes_volcados(archivo))
+    except FileNotFoundError:
+        return
+    with transaction.atomic():
+        datos_modificados()
+        # Del último cambio al primero, para que un bien actualizado dos veces quede con su valor original
+        for anteriores in reversed(lotes):
+            valores_por_bien = {}
+            for bien_id, valores in reversed(anteriores):
+                valores_por_bien.setdefault(bien_id, {}).update(valores)
+            bienes = Bien.objects.in_bulk(list(valores_por_bien))
+            _aplicar_cambios([
+                (bienes[bien_id], valores) for bien_id, valores in valores_por_bien.items() if bien_id in bienes
+            ])
+    os.remove(ruta)
+
+
+def _volcar_lote(destino, datos):
+    pickle.dump(datos, destino, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _lotes_volcados(origen):
+    """Lotes guardados con `_volcar_lote` en el archivo `origen`, en el mismo orden."""
+    origen.seek(0)
+    while True:
+        try:
+            yield pickle.load(origen)
+        except EOFError:
+            return
+
+
+def ejecutar_importacion(importacion, tamano_lote=TAMANO_LOTE_IMPORTACION):
+    """
+    Procesa una importación en dos fases, guardando el avance después de cada
+    lote para que la API pueda informarlo:
+
+    1. Lee y valida el archivo de a `tamano_lote` filas (ver `leer_por_lotes`
+       y `validar_lotes`); los lotes validados se guardan en un archivo
+       temporal, de modo que la memoria usada no depende del tamaño del
+       archivo. Si alguna fila tiene errores, la importación queda RECHAZADA
+       con la hoja de errores y no se crea ningún bien.
+    2. Crea (o, en modo ACTUALIZAR, actualiza) los bienes de cada lote
+       validado, cada uno en su propia transacción. Los valores que tenían
+       los bienes actualizados se guardan en disco junto con cada lote (ver
+       `_ruta_valores_anteriores`). Si algo falla a mitad de camino, o el
+       proceso cae y la importación se retoma, se eliminan los bienes ya
+       creados y los actualizados recuperan sus valores, de modo que la carga
+       sigue siendo todo o nada.
+
+    Devuelve False si no se pudo tomar el bloqueo.
+    """
+    if not tomar_importacion(importacion):
+        return False
+
+    def guardar_avance(*campos):
+        importacion.save(update_fields=list(campos) + ['fecha_actualizacion'])
+
+    try:
+        with importacion.archivo.open('rb') as archivo:
+            # Aproximado hasta terminar la validación (incluye filas vacías)
+            importacion.total_filas = estimar_filas(archivo)
+        guardar_avance('total_filas')
+
+        def al_validar(procesadas, con_error):
+            importacion.filas_procesadas = procesadas
+            importacion.filas_con_error = con_error
+            guardar_avance('filas_procesadas', 'filas_con_error')
+
+        errores = {}
+        proveedores = {}
+        nuevos = 0
+        with tempfile.TemporaryFile() as validados:
+            with importacion.archivo.open('rb') as archivo:
+                lotes = validar_lotes(
+                    leer_por_lotes(archivo, tamano_lote), al_validar,
+                    actualizar=importacion.modo == 'ACTUALIZAR', crear_proveedores=importacion.crear_proveedores,
+                    permitir_duplicados=importacion.permitir_duplicados,
+                )
+                for datos, errores_lote in lotes:
+                    errores.update(errores_lote)
+                    if errores:
+                        continue  # La carga ya no se va a guardar: solo se siguen buscando errores
+                    _volcar_lote(validados, datos)
+                    nuevos += _cantidad_nuevos(datos)
+                    if importacion.crear_proveedores:
+                        for nombre, texto in proveedores_faltantes(datos).items():
+                            proveedores.setdefault(nombre, texto)
+            importacion.total_filas = importacion.filas_procesadas
+            importacion.filas_con_error = len(errores)
+            if errores:
+                with importacion.archivo.open('rb') as archivo:
+                    hoja = hoja_de_errores(leer_por_lotes(archivo, tamano_lote), errores)
+                importacion.archivo_errores.save(f'errores_{importacion.pk}.xlsx', ContentFile(hoja), save=False)
+                importacion.estado = 'RECHAZADA'
+                importacion.fecha_fin = timezone.now()
+                guardar_avance('total_filas', 'filas_con_error', 'archivo_errores', 'estado', 'fecha_fin')
+                return True
+            guardar_avance('total_filas')
+
+            ids_proveedores = {}
+            if proveedores:
+                # Los proveedores creados se conservan aunque la carga falle después
+                with transaction.atomic():
+                    ids_proveedores = crear_proveedores(proveedores)
+                    importacion.proveedores_creados = len(ids_proveedores)
+                    guardar_avance('proveedores_creados')
+            # El bloque de ids se reserva completo antes del primer lote
+            importacion.primer_bien_id = _reservar_ids(nuevos)
+            guardar_avance('primer_bien_id')
+            ruta_anteriores = _ruta_valores_anteriores(importacion)
+            os.makedirs(os.path.dirname(ruta_anteriores), exist_ok=True)
+            with open(ruta_anteriores, 'wb') as valores_anteriores:
+                for datos in _lotes_volcados(validados):
+                    if ids_proveedores:
+                        completar_proveedores(datos, ids_proveedores)
+                    anteriores = []
+                    with transaction.atomic():
+                        creados, actualizados, sin_cambios = _guardar_lote(
+                            datos, importacion.primer_bien_id + importacion.bienes_creados, anteriores
+                        )
+                        if anteriores:
+                            # Se escriben antes de confirmar el lote, por si el proceso cae justo después
+                            _volcar_lote(valores_anteriores, anteriores)
+                            valores_anteriores.flush()
+                        importacion.bienes_creados += creados
+                        importacion.bienes_actualizados += actualizados
+                        importacion.bienes_sin_cambios += sin_cambios
+                        guardar_avance('bienes_creados', 'bienes_actualizados', 'bienes_sin_cambios')
+    except Exception as e:
+        _deshacer_importacion(importacion)
+        importacion.estado = 'FALLIDA'
+        importacion.mensaje_error = str(e)
+        importacion.fecha_fin = timezone.now()
+        guardar_avance('estado', 'mensaje_error', 'fecha_fin')
+        raise
+
+    importacion.estado = 'COMPLETADA'
+    importacion.fecha_fin = timezone.now()
+    guardar_avance('estado', 'fecha_fin')
+    os.remove(ruta_anteriores)
+    _auditar_carga(
+        importacion.usuario, importacion.ip_address,
+        importacion.bienes_creados, importacion.bienes_actualizados, importacion.bienes_sin_cambios,
+    )
+    return True
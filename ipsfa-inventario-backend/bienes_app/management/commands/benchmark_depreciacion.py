@@ -0,0 +1,118 @@
+# bienes_app/management/commands/benchmark_depreciacion.py
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from bienes_app.depreciacion import (
+    cargar_lote, cargar_uso, preparar_arreglos, calcular_programa, calcular_programa_en_paralelo,
+    calcular_depreciacion, periodo_a_indice, TAMANO_LOTE_BIENES,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide cómo escala el cálculo de depreciación con 1..N procesos. "
+        "Por defecto solo mide el cálculo de los calendarios completos, desde la adquisición de "
+        "cada bien e ignorando lo ya calculado (sin escribir en la base de datos); "
+        "con --con-escritura mide también el cálculo completo con inserción, dentro de una "
+        "transacción que se revierte al final de cada corrida."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-trabajadores', type=int, default=os.cpu_count() or 1,
+                            help='Cantidad máxima de procesos a probar (por defecto, los núcleos disponibles).')
+        parser.add_argument('--hasta', default=None,
+                            help='Período final AAAA-MM (por defecto, el mes actual).')
+        parser.add_argument('--repeticiones', type=int, default=3,
+                            help='Repeticiones por cantidad de procesos; se reporta la mejor (por defecto 3).')
+        parser.add_argument('--con-escritura', action='store_true',
+                            help='Mide también calcular_depreciacion completo (con bulk_create), revirtiendo los cambios.')
+
+    def handle(self, *args, **options):
+        if options['hasta']:
+            try:
+                anio, mes = (int(parte) for parte in options['hasta'].split('-'))
+            except ValueError:
+                raise CommandError('El período debe tener el formato AAAA-MM.')
+        else:
+            hoy = timezone.now().date()
+            anio, mes = hoy.year, hoy.month
+        fin = periodo_a_indice(anio, mes)
+
+        arreglos = self.cargar_arreglos()
+        if not len(arreglos[0]):
+            raise CommandError('No hay bienes depreciables para medir.')
+        self.stdout.write(f"{len(arreglos[0])} bienes depreciables, cálculo hasta {mes}/{anio}.")
+
+        self.stdout.write("\nCálculo de calendarios (sin escritura):")
+        self.stdout.write(f"{'procesos':>9} {'registros':>11} {'segundos':>10} {'aceleración':>12}")
+        base = None
+        for trabajadores in range(1, options['max_trabajadores'] + 1):
+            segundos, registros = self.medir_calculo(arreglos, fin, trabajadores, options['repeticiones'])
+            base = base or segundos
+            self.stdout.write(f"{trabajadores:>9} {registros:>11} {segundos:>10.3f} {base / segundos:>11.2f}x")
+
+        if options['con_escritura']:
+            self.stdout.write("\nCálculo completo con inserción (cambios revertidos):")
+            self.stdout.write(f"{'procesos':>9} {'registros':>11} {'segundos':>10} {'aceleración':>12}")
+            base = None
+            for trabajadores in range(1, options['max_trabajadores'] + 1):
+                segundos, registros = self.medir_completo(anio, mes, trabajadores)
+                base = base or segundos
+                self.stdout.write(f"{trabajadores:>9} {registros:>11} {segundos:>10.3f} {base / segundos:>11.2f}x")
+
+    def cargar_arreglos(self):
+        """
+        Carga todos los bienes depreciables (por lotes) en arreglos alineados,
+        descartando su estado de depreciación para calcular el calendario completo.
+        """
+        partes = []
+        ultimo_id = 0
+        while True:
+            lote = cargar_lote(ultimo_id, TAMANO_LOTE_BIENES)
+            if not lote:
+                break
+            ultimo_id = lote[-1][0]
+            partes.append(preparar_arreglos([fila[:6] + (None,) * 4 + fila[10:] for fila in lote]))
+        if not partes:
+            return tuple(np.zeros(0, dtype=np.int64) for _ in range(10)) + (None,)
+        arreglos = tuple(np.concatenate(arreglo) for arreglo in zip(*partes))
+        ids, metodos, inicio = arreglos[0], arreglos[1], arreglos[7]
+        return arreglos + (cargar_uso(ids, metodos, inicio),)
+
+    def medir_calculo(self, arreglos, fin, trabajadores, repeticiones):
+        _, metodos, costo, residual, vida_meses, acumulada, neto, inicio, adquisicion, unidades_totales, uso = arreglos
+        tiempos = []
+        if trabajadores == 1:
+            for _ in range(repeticiones):
+                t0 = time.perf_counter()
+                resultado = calcular_programa(
+                    metodos, costo, residual, vida_meses, acumulada, neto, inicio, fin,
+                    adquisicion, unidades_totales, uso,
+                )
+                tiempos.append(time.perf_counter() - t0)
+        else:
+            with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+                # Arranca los procesos antes de medir
+                list(ejecutor.map(abs, range(trabajadores)))
+                for _ in range(repeticiones):
+                    t0 = time.perf_counter()
+                    resultado = calcular_programa_en_paralelo(
+                        ejecutor, trabajadores, metodos, costo, residual, vida_meses, acumulada, neto, inicio, fin,
+                        adquisicion, unidades_totales, uso,
+                    )
+                    tiempos.append(time.perf_counter() - t0)
+        return min(tiempos), len(resultado[0])
+
+    def medir_completo(self, anio, mes, trabajadores):
+        with transaction.atomic():
+            t0 = time.perf_counter()
+            resumen = calcular_depreciacion(anio, mes, trabajadores=trabajadores)
+            segundos = time.perf_counter() - t0
+            transaction.set_rollback(True)
+        return segundos, resumen['registros_creados']
@@ -0,0 +1,38 @@
+# bienes_app/management/commands/exportar_parquet.py
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bienes_app.parquet import exportar_tablas, COMPRESION_PARQUET, TABLAS_PARQUET, TAMANO_LOTE_PARQUET
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta el inventario a archivos Apache Parquet (uno por tabla: "
+        f"{', '.join(TABLAS_PARQUET)}) para su análisis, leyendo cada tabla por lotes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('tablas', nargs='*', metavar='tabla',
+                            help=f"Tablas a exportar ({', '.join(TABLAS_PARQUET)}); por defecto todas.")
+        parser.add_argument('--directorio', default='.',
+                            help='Directorio donde se escriben los archivos <tabla>.parquet (por defecto el actual).')
+        parser.add_argument('--tamano-lote', type=int, default=TAMANO_LOTE_PARQUET,
+                            help=f'Filas por lote de lectura y por grupo de filas (por defecto {TAMANO_LOTE_PARQUET}).')
+        parser.add_argument('--compresion', default=COMPRESION_PARQUET,
+                            help=f'Códec de compresión de Parquet (por defecto {COMPRESION_PARQUET}).')
+
+    def handle(self, *args, **options):
+        invalidas = [tabla for tabla in options['tablas'] if tabla not in TABLAS_PARQUET]
+        if invalidas:
+            raise CommandError(f"Tablas no válidas: {', '.join(invalidas)}. Opciones: {', '.join(TABLAS_PARQUET)}.")
+        os.makedirs(options['directorio'], exist_ok=True)
+        try:
+            resultado = exportar_tablas(
+                options['directorio'], options['tablas'], options['tamano_lote'], options['compresion'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        for tabla, ruta, filas, segundos in resultado:
+            tamano = os.path.getsize(ruta) / (1024 * 1024)
+            self.stdout.write(f"{tabla}: {filas} filas en {ruta} ({tamano:.1f} MB, {segundos:.1f} s).")
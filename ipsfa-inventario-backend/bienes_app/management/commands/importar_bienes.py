@@ -0,0 +1,72 @@
+# bienes_app/management/commands/importar_bienes.py
+import os
+
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from bienes_app.importacion import ejecutar_importacion, EXTENSIONES_ARCHIVO, TAMANO_LOTE_IMPORTACION
+from bienes_app.models import ImportacionBienes
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga masiva de bienes desde un archivo del servidor (Parquet, CSV o Excel; p. ej. un "
+        "bienes.parquet de exportar_parquet). Se registra como una ImportacionBienes y se procesa "
+        "igual que las cargas de la API: todo o nada, con hoja de errores si alguna fila es inválida."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo a cargar.')
+        parser.add_argument('--actualizar', action='store_true',
+                            help='Actualiza los bienes ya registrados (por serial, código anterior o código patrimonial).')
+        parser.add_argument('--crear-proveedores', action='store_true',
+                            help='Crea los proveedores del archivo que no existan.')
+        parser.add_argument('--permitir-duplicados', action='store_true',
+                            help='Acepta las filas que parecen duplicar un bien registrado u otra fila.')
+        parser.add_argument('--usuario', help='Usuario al que se atribuye la carga (por defecto ninguno).')
+        parser.add_argument('--tamano-lote', type=int, default=TAMANO_LOTE_IMPORTACION,
+                            help=f'Filas por lote de validación/creación (por defecto {TAMANO_LOTE_IMPORTACION}).')
+
+    def handle(self, *args, **options):
+        ruta = options['archivo']
+        if not ruta.endswith(EXTENSIONES_ARCHIVO):
+            raise CommandError('Formato de archivo no soportado.')
+        if not os.path.isfile(ruta):
+            raise CommandError(f"No existe el archivo '{ruta}'.")
+        usuario = None
+        if options['usuario']:
+            usuario = User.objects.filter(username=options['usuario']).first()
+            if usuario is None:
+                raise CommandError(f"No existe el usuario '{options['usuario']}'.")
+
+        nombre = os.path.basename(ruta)
+        with open(ruta, 'rb') as archivo:
+            importacion = ImportacionBienes.objects.create(
+                archivo=File(archivo, name=nombre),
+                nombre_archivo=nombre,
+                modo='ACTUALIZAR' if options['actualizar'] else 'CREAR',
+                crear_proveedores=options['crear_proveedores'],
+                permitir_duplicados=options['permitir_duplicados'],
+                usuario=usuario,
+            )
+        self.stdout.write(f"Procesando importación {importacion.pk} ('{nombre}')...")
+        try:
+            ejecutada = ejecutar_importacion(importacion, tamano_lote=options['tamano_lote'])
+        except Exception as e:
+            raise CommandError(f"La importación {importacion.pk} falló: {e}")
+        if not ejecutada:
+            self.stdout.write(
+                f"Hay otra importación en proceso; la importación {importacion.pk} quedó en cola para procesar_importaciones."
+            )
+            return
+        if importacion.estado == 'RECHAZADA':
+            raise CommandError(
+                f"Importación {importacion.pk} rechazada: {importacion.filas_con_error} filas con errores "
+                f"(ver {importacion.archivo_errores.path})."
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Importación {importacion.pk} completada: {importacion.bienes_creados} bienes creados, "
+            f"{importacion.bienes_actualizados} actualizados y {importacion.bienes_sin_cambios} sin cambios "
+            f"({importacion.proveedores_creados} proveedores creados)."
+        ))
@@ -0,0 +1,72 @@
+# bienes_app/management/commands/procesar_depreciacion.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from bienes_app.depreciacion import ejecutar_depreciacion, recalcular_pendientes, TAMANO_LOTE_BIENES
+from bienes_app.models import EjecucionDepreciacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Procesa en segundo plano las ejecuciones de depreciación solicitadas desde la API. "
+        "Primero retoma la ejecución que haya quedado EN_PROCESO (p. ej. tras una caída) "
+        "desde su último punto de control y luego atiende las PENDIENTES en orden de llegada. "
+        "Mientras no hay ejecuciones, recalcula el historial de los bienes cuya valoración cambió. "
+        "Se asume un único proceso trabajador."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Procesa las ejecuciones en cola y termina, sin quedarse esperando nuevas.')
+        parser.add_argument('--intervalo', type=float, default=5,
+                            help='Segundos de espera entre consultas a la cola (por defecto 5).')
+        parser.add_argument('--tamano-lote', type=int, default=TAMANO_LOTE_BIENES,
+                            help=f'Bienes por lote/transacción (por defecto {TAMANO_LOTE_BIENES}).')
+        parser.add_argument('--trabajadores', type=int, default=None,
+                            help='Procesos para calcular cada lote en paralelo '
+                                 '(por defecto settings.DEPRECIACION_TRABAJADORES).')
+
+    def handle(self, *args, **options):
+        while True:
+            ejecucion = self.siguiente_ejecucion()
+            if ejecucion is None:
+                # Sin ejecuciones en cola se aprovecha para corregir historiales desactualizados
+                recalculo = recalcular_pendientes()
+                if recalculo['bienes_recalculados']:
+                    self.stdout.write(
+                        f"Historial recalculado de {recalculo['bienes_recalculados']} bienes: "
+                        f"{recalculo['registros_eliminados']} registros eliminados, {recalculo['registros_creados']} creados."
+                    )
+                if options['una_vez']:
+                    break
+                time.sleep(options['intervalo'])
+                continue
+
+            self.stdout.write(f"Procesando {ejecucion} (desde el bien {ejecucion.ultimo_bien_id})...")
+            try:
+                ejecutada = ejecutar_depreciacion(
+                    ejecucion,
+                    tamano_lote=options['tamano_lote'],
+                    trabajadores=options['trabajadores'],
+                )
+            except Exception as e:
+                self.stderr.write(self.style.ERROR(f"La ejecución {ejecucion.pk} falló: {e}"))
+                continue
+
+            if not ejecutada:
+                # Otra ejecución tiene el bloqueo; se reintenta en la siguiente vuelta
+                if options['una_vez']:
+                    break
+                time.sleep(options['intervalo'])
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f"Ejecución {ejecucion.pk} completada: {ejecucion.registros_creados} registros "
+                f"para {ejecucion.bienes_procesados} bienes."
+            ))
+
+    def siguiente_ejecucion(self):
+        en_proceso = EjecucionDepreciacion.objects.filter(estado='EN_PROCESO').first()
+        if en_proceso:
+            return en_proceso
+        return EjecucionDepreciacion.objects.filter(estado='PENDIENTE').order_by('fecha_creacion').first()
@@ -0,0 +1,67 @@
+# bienes_app/management/commands/procesar_importaciones.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from bienes_app.importacion import ejecutar_importacion, TAMANO_LOTE_IMPORTACION
+from bienes_app.models import ImportacionBienes
+from bienes_app.subida_fragmentada import descartar_subidas_vencidas, DIAS_VIGENCIA_SUBIDA
+
+
+class Command(BaseCommand):
+    help = (
+        "Procesa en segundo plano las cargas masivas de bienes recibidas por la API. "
+        "Primero retoma la importación que haya quedado EN_PROCESO (p. ej. tras una caída), "
+        "deshaciendo lo que alcanzó a crear, y luego atiende las PENDIENTES en orden de llegada. "
+        f"Mientras no hay importaciones, descarta las subidas fragmentadas sin actividad en {DIAS_VIGENCIA_SUBIDA} días. "
+        "Se asume un único proceso trabajador."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Procesa las importaciones en cola y termina, sin quedarse esperando nuevas.')
+        parser.add_argument('--intervalo', type=float, default=5,
+                            help='Segundos de espera entre consultas a la cola (por defecto 5).')
+        parser.add_argument('--tamano-lote', type=int, default=TAMANO_LOTE_IMPORTACION,
+                            help=f'Filas por lote de validación/creación (por defecto {TAMANO_LOTE_IMPORTACION}).')
+
+    def handle(self, *args, **options):
+        while True:
+            importacion = self.siguiente_importacion()
+            if importacion is None:
+                descartadas = descartar_subidas_vencidas()
+                if descartadas:
+                    self.stdout.write(f"{descartadas} subidas fragmentadas vencidas descartadas.")
+                if options['una_vez']:
+                    break
+                time.sleep(options['intervalo'])
+                continue
+
+            self.stdout.write(f"Procesando importación {importacion.pk} ('{importacion.nombre_archivo}')...")
+            try:
+                ejecutada = ejecutar_importacion(importacion, tamano_lote=options['tamano_lote'])
+            except Exception as e:
+                self.stderr.write(self.style.ERROR(f"La importación {importacion.pk} falló: {e}"))
+                continue
+
+            if not ejecutada:
+                # Otra importación tiene el bloqueo; se reintenta en la siguiente vuelta
+                if options['una_vez']:
+                    break
+                time.sleep(options['intervalo'])
+                continue
+            if importacion.estado == 'RECHAZADA':
+                self.stdout.write(self.style.WARNING(
+                    f"Importación {importacion.pk} rechazada: {importacion.filas_con_error} filas con errores."
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Importación {importacion.pk} completada: {importacion.bienes_creados} bienes creados, "
+                    f"{importacion.bienes_actualizados} actualizados y {importacion.bienes_sin_cambios} sin cambios."
+                ))
+
+    def siguiente_importacion(self):
+        en_proceso = ImportacionBienes.objects.filter(estado='EN_PROCESO').first()
+        if en_proceso:
+            return en_proceso
+        return ImportacionBienes.objects.filter(estado='PENDIENTE').order_by('fecha_creacion').first()
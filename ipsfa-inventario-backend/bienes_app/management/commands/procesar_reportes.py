@@ -0,0 +1,95 @@
+# bienes_app/management/commands/procesar_reportes.py
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from bienes_app.models import SolicitudReporte
+from bienes_app.solicitudes_reportes import (
+    descartar_solicitudes_vencidas, ejecutar_solicitud, marcar_fallida, programar_reportes_nocturnos,
+    reiniciar_interrumpidas, tomar_solicitud, trabajadores_por_defecto, DIAS_VIGENCIA_SOLICITUD,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera en segundo plano los reportes solicitados por la API, varios a la vez "
+        "(cada uno en su propio proceso) hasta el límite de --concurrencia. "
+        "Primero devuelve a la cola las solicitudes que hayan quedado EN_PROCESO (p. ej. tras una caída) "
+        "y luego atiende las PENDIENTES en orden de llegada. Con --nocturna, encola cada día a esa hora "
+        "los reportes estándar para que queden generados. "
+        f"Mientras no hay solicitudes, elimina las terminadas hace más de {DIAS_VIGENCIA_SOLICITUD} días. "
+        "Se asume un único proceso trabajador."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Procesa las solicitudes en cola y termina, sin quedarse esperando nuevas.')
+        parser.add_argument('--intervalo', type=float, default=5,
+                            help='Segundos de espera entre consultas a la cola (por defecto 5).')
+        parser.add_argument('--concurrencia', type=int, default=None,
+                            help='Reportes que se generan a la vez (por defecto settings.REPORTES_TRABAJADORES).')
+        parser.add_argument('--nocturna', default=None, metavar='HH:MM',
+                            help='Hora a partir de la cual se encolan cada día los reportes estándar (p. ej. 02:00).')
+
+    def handle(self, *args, **options):
+        concurrencia = max(1, options['concurrencia'] or trabajadores_por_defecto())
+        hora_nocturna = None
+        if options['nocturna']:
+            try:
+                hora_nocturna = datetime.strptime(options['nocturna'], '%H:%M').time()
+            except ValueError:
+                raise CommandError('--nocturna debe tener el formato HH:MM.')
+
+        reiniciadas = reiniciar_interrumpidas()
+        if reiniciadas:
+            self.stdout.write(f"{reiniciadas} solicitudes interrumpidas vuelven a la cola.")
+
+        en_curso = {}
+        with ProcessPoolExecutor(max_workers=concurrencia) as ejecutor:
+            while True:
+                self.recoger_terminadas(en_curso)
+
+                if hora_nocturna is not None and timezone.localtime().time() >= hora_nocturna:
+                    programadas = programar_reportes_nocturnos()
+                    if programadas:
+                        self.stdout.write(f"{programadas} reportes nocturnos en cola.")
+
+                libres = concurrencia - len(en_curso)
+                for solicitud in SolicitudReporte.objects.filter(estado='PENDIENTE').order_by('fecha_creacion')[:libres]:
+                    if not tomar_solicitud(solicitud):
+                        continue
+                    self.stdout.write(f"Generando solicitud {solicitud.pk} ('{solicitud.tipo}')...")
+                    # Los procesos del pool se crean a medida que se necesitan: no deben heredar la conexión
+                    connection.close()
+                    en_curso[ejecutor.submit(ejecutar_solicitud, solicitud.pk)] = solicitud.pk
+
+                if en_curso:
+                    wait(en_curso, timeout=options['intervalo'], return_when=FIRST_COMPLETED)
+                    continue
+                descartadas = descartar_solicitudes_vencidas()
+                if descartadas:
+                    self.stdout.write(f"{descartadas} solicitudes vencidas eliminadas.")
+                if options['una_vez']:
+                    break
+                time.sleep(options['intervalo'])
+
+    def recoger_terminadas(self, en_curso):
+        for futuro in [futuro for futuro in en_curso if futuro.done()]:
+            solicitud_id = en_curso.pop(futuro)
+            try:
+                solicitud = futuro.result()
+            except Exception as e:
+                # El proceso que la generaba terminó de forma inesperada
+                marcar_fallida(solicitud_id, str(e))
+                self.stderr.write(self.style.ERROR(f"La solicitud {solicitud_id} falló: {e}"))
+                continue
+            if solicitud.estado == 'COMPLETADA':
+                self.stdout.write(self.style.SUCCESS(
+                    f"Solicitud {solicitud.pk} completada: '{solicitud.nombre_archivo}' ({solicitud.tamano_archivo} bytes)."
+                ))
+            else:
+                self.stderr.write(self.style.ERROR(f"La solicitud {solicitud.pk} falló: {solicitud.mensaje_error}"))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def poblar_estados(apps, schema_editor):
+    """Crea el estado de cada bien a partir de su último cálculo mensual existente."""
+    DepreciacionMensual = apps.get_model('bienes_app', 'DepreciacionMensual')
+    EstadoDepreciacionBien = apps.get_model('bienes_app', 'EstadoDepreciacionBien')
+
+    estados = {}
+    for calculo in DepreciacionMensual.objects.order_by('bien_id', 'anio', 'mes').iterator():
+        estados[calculo.bien_id] = EstadoDepreciacionBien(
+            bien_id=calculo.bien_id,
+            ultimo_mes=calculo.mes,
+            ultimo_anio=calculo.anio,
+            depreciacion_acumulada=calculo.depreciacion_acumulada,
+            valor_neto_en_libros=calculo.valor_neto_en_libros,
+        )
+    EstadoDepreciacionBien.objects.bulk_create(estados.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bienes_app', '0008_bien_motivo_adquisicion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadoDepreciacionBien',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ultimo_mes', models.PositiveIntegerField(verbose_name='Último Mes Calculado')),
+                ('ultimo_anio', models.PositiveIntegerField(verbose_name='Último Año Calculado')),
+                ('depreciacion_acumulada', models.DecimalField(decimal_places=2, max_digits=19, verbose_name='Depreciación Acumulada')),
+                ('valor_neto_en_libros', models.DecimalField(decimal_places=2, max_digits=19, verbose_name='Valor Neto en Libros')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('bien', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='estado_depreciacion', to='bienes_app.bien', verbose_name='Bien')),
+            ],
+            options={
+                'verbose_name': 'Estado de Depreciación',
+                'verbose_name_plural': 'Estados de Depreciación',
+            },
+        ),
+        migrations.RunPython(poblar_estados, migrations.RunPython.noop),
+    ]
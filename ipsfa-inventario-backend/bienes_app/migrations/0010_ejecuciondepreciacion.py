@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bienes_app', '0009_estadodepreciacionbien'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EjecucionDepreciacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.PositiveIntegerField(verbose_name='Mes del Cálculo')),
+                ('anio', models.PositiveIntegerField(verbose_name='Año del Cálculo')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En Proceso'), ('COMPLETADA', 'Completada'), ('FALLIDA', 'Fallida')], default='PENDIENTE', max_length=20, verbose_name='Estado')),
+                ('total_bienes', models.PositiveIntegerField(default=0, verbose_name='Total de Bienes a Procesar')),
+                ('bienes_procesados', models.PositiveIntegerField(default=0, verbose_name='Bienes Procesados')),
+                ('bienes_omitidos', models.PositiveIntegerField(default=0, verbose_name='Bienes Omitidos')),
+                ('registros_creados', models.PositiveIntegerField(default=0, verbose_name='Registros Mensuales Creados')),
+                ('ultimo_bien_id', models.PositiveIntegerField(default=0, verbose_name='Último Bien Procesado (Punto de Control)')),
+                ('mensaje_error', models.TextField(blank=True, null=True, verbose_name='Mensaje de Error')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Solicitud')),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Inicio')),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Finalización')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ejecuciones_depreciacion', to=settings.AUTH_USER_MODEL, verbose_name='Usuario que Solicita')),
+            ],
+            options={
+                'verbose_name': 'Ejecución de Depreciación',
+                'verbose_name_plural': 'Ejecuciones de Depreciación',
+                'ordering': ['-fecha_creacion'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('estado', 'EN_PROCESO')), fields=('estado',), name='unica_ejecucion_depreciacion_en_proceso')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bienes_app', '0010_ejecuciondepreciacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='estadodepreciacionbien',
+            name='recalcular_desde_anio',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Recalcular desde el Año'),
+        ),
+        migrations.AddField(
+            model_name='estadodepreciacionbien',
+            name='recalcular_desde_mes',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Recalcular desde el Mes'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def poblar_resumen_anual(apps, schema_editor):
+    """Crea el resumen anual de cada bien a partir de los cálculos mensuales existentes."""
+    DepreciacionMensual = apps.get_model('bienes_app', 'DepreciacionMensual')
+    DepreciacionAnual = apps.get_model('bienes_app', 'DepreciacionAnual')
+
+    anuales = {}
+    for calculo in DepreciacionMensual.objects.order_by('bien_id', 'anio', 'mes').iterator():
+        clave = (calculo.bien_id, calculo.anio)
+        anterior = anuales.get(clave)
+        anuales[clave] = DepreciacionAnual(
+            bien_id=calculo.bien_id,
+            anio=calculo.anio,
+            depreciacion_anio=calculo.valor_depreciado_mes + (anterior.depreciacion_anio if anterior else 0),
+            depreciacion_acumulada=calculo.depreciacion_acumulada,
+            valor_neto_en_libros=calculo.valor_neto_en_libros,
+        )
+    DepreciacionAnual.objects.bulk_create(anuales.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bienes_app', '0011_estadodepreciacionbien_recalcular'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepreciacionAnual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.PositiveIntegerField(verbose_name='Año')),
+                ('depreciacion_anio', models.DecimalField(decimal_places=2, max_digits=19, verbose_name='Depreciación del Año')),
+                ('depreciacion_acumulada', models.DecimalField(decimal_places=2, max_digits=19, verbose_name='Depreciación Acumulada al Cierre')),
+                ('valor_neto_en_libros', models.DecimalField(decimal_places=2, max_digits=19, verbose_name='Valor Neto en Libros al Cierre')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('bien', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='depreciaciones_anuales', to='bienes_app.bien', verbose_name='Bien Depreciado')),
+            ],
+            options={
+                'verbose_name': 'Depreciación Anual',
+                'verbose_name_plural': 'Depreciaciones Anuales',
+                'ordering': ['-anio'],
+                'unique_together': {('bien', 'anio')},
+            },
+        ),
+        migrations.RunPython(poblar_resumen_anual, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bienes_app', '0012_depreciacionanual'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bien',
+            name='unidades_produccion_estimadas',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Unidades de Producción Estimadas'),
+        ),
+        migrations.AlterField(
+            model_name='bien',
+            name='metodo_depreciacion',
+            field=models.CharField(blank=True, choices=[('LINEA_RECTA', 'Línea Recta'), ('SALDO_DECRECIENTE', 'Saldo Decreciente'), ('SUMA_DIGITOS', 'Suma de los Dígitos de los Años'), ('UNIDADES_PRODUCCION', 'Unidades de Producción')], max_length=50, null=True, verbose_name='Método de Depreciación'),
+        ),
+        migrations.CreateModel(
+            name='UsoBien',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.PositiveIntegerField(verbose_name='Mes')),
+                ('anio', models.PositiveIntegerField(verbose_name='Año')),
+                ('unidades', models.PositiveIntegerField(verbose_name='Unidades del Mes')),
+                ('fecha_registro', models.DateTimeField(auto_now=True, verbose_name='Fecha de Registro')),
+                ('bien', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usos', to='bienes_app.bien', verbose_name='Bien')),
+            ],
+            options={
+                'verbose_name': 'Uso del Bien',
+                'verbose_name_plural': 'Usos de Bienes',
+                'ordering': ['-anio', '-mes'],
+                'unique_together': {('bien', 'mes', 'anio')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bienes_app', '0013_metodos_suma_digitos_unidades'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportacionBienes',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archivo', models.FileField(upload_to='importaciones/', verbose_name='Archivo Cargado')),
+                ('nombre_archivo', models.CharField(max_length=255, verbose_name='Nombre del Archivo')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En Proceso'), ('COMPLETADA', 'Completada'), ('RECHAZADA', 'Rechazada por Errores'), ('FALLIDA', 'Fallida')], default='PENDIENTE', max_length=20, verbose_name='Estado')),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True, verbose_name='Dirección IP')),
+                ('total_filas', models.PositiveIntegerField(default=0, verbose_name='Total de Filas')),
+                ('filas_procesadas', models.PositiveIntegerField(default=0, verbose_name='Filas Validadas')),
+                ('filas_con_error', models.PositiveIntegerField(default=0, verbose_name='Filas con Errores')),
+                ('bienes_creados', models.PositiveIntegerField(default=0, verbose_name='Bienes Creados')),
+                ('primer_bien_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='Primer Bien Creado')),
+                ('archivo_errores', models.FileField(blank=True, null=True, upload_to='importaciones/errores/', verbose_name='Hoja de Errores')),
+                ('mensaje_error', models.TextField(blank=True, null=True, verbose_name='Mensaje de Error')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Carga')),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Inicio')),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Finalización')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='importaciones_bienes', to=settings.AUTH_USER_MODEL, verbose_name='Usuario que Carga')),
+            ],
+            options={
+                'verbose_name': 'Importación de Bienes',
+                'verbose_name_plural': 'Importaciones de Bienes',
+                'ordering': ['-fecha_creacion'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('estado', 'EN_PROCESO')), fields=('estado',), name='unica_importacion_bienes_en_proceso')],
+            },
+        ),
+    ]
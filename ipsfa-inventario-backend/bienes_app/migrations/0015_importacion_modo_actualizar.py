@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bienes_app', '0014_importacionbienes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importacionbienes',
+            name='bienes_actualizados',
+            field=models.PositiveIntegerField(default=0, verbose_name='Bienes Actualizados'),
+        ),
+        migrations.AddField(
+            model_name='importacionbienes',
+            name='bienes_sin_cambios',
+            field=models.PositiveIntegerField(default=0, verbose_name='Bienes sin Cambios'),
+        ),
+        migrations.AddField(
+            model_name='importacionbienes',
+            name='modo',
+            field=models.CharField(choices=[('CREAR', 'Solo Crear'), ('ACTUALIZAR', 'Crear o Actualizar')], default='CREAR', max_length=20, verbose_name='Modo de Carga'),
+        ),
+    ]
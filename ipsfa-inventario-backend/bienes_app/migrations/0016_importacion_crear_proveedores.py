@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bienes_app', '0015_importacion_modo_actualizar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importacionbienes',
+            name='crear_proveedores',
+            field=models.BooleanField(default=False, verbose_name='Crear Proveedores Faltantes'),
+        ),
+        migrations.AddField(
+            model_name='importacionbienes',
+            name='proveedores_creados',
+            field=models.PositiveIntegerField(default=0, verbose_name='Proveedores Creados'),
+        ),
+    ]
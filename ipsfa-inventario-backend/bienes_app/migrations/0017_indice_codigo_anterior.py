@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bienes_app', '0016_importacion_crear_proveedores'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bien',
+            name='codigo_anterior',
+            field=models.CharField(blank=True, db_index=True, max_length=50, null=True, verbose_name='Código de Inventario Anterior'),
+        ),
+    ]
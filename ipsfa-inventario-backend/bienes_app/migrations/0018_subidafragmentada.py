@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bienes_app', '0017_indice_codigo_anterior'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubidaFragmentada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre_archivo', models.CharField(max_length=255, verbose_name='Nombre del Archivo')),
+                ('tamano_total', models.PositiveBigIntegerField(verbose_name='Tamaño Total (bytes)')),
+                ('tamano_fragmento', models.PositiveIntegerField(verbose_name='Tamaño de cada Fragmento (bytes)')),
+                ('modo', models.CharField(choices=[('CREAR', 'Solo Crear'), ('ACTUALIZAR', 'Crear o Actualizar')], default='CREAR', max_length=20, verbose_name='Modo de Carga')),
+                ('crear_proveedores', models.BooleanField(default=False, verbose_name='Crear Proveedores Faltantes')),
+                ('estado', models.CharField(choices=[('EN_CURSO', 'En Curso'), ('COMPLETADA', 'Completada')], default='EN_CURSO', max_length=20, verbose_name='Estado')),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True, verbose_name='Dirección IP')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Inicio')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('importacion', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='subida_fragmentada', to='bienes_app.importacionbienes', verbose_name='Importación Generada')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subidas_fragmentadas', to=settings.AUTH_USER_MODEL, verbose_name='Usuario que Sube')),
+            ],
+            options={
+                'verbose_name': 'Subida Fragmentada',
+                'verbose_name_plural': 'Subidas Fragmentadas',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:48
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Copias de las funciones de bienes_app.models al crear esta migración, para
+# que las claves calculadas no cambien si esas funciones cambian después.
+
+def normalizar_nombre(texto):
+    if not texto.isascii():
+        texto = ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+    return ' '.join(texto.casefold().split())
+
+
+def normalizar_serial(serial):
+    if not serial:
+        return None
+    return re.sub(r'[\W_]+', '', normalizar_nombre(serial)).upper() or None
+
+
+def clave_bloque(marca, modelo):
+    marca = normalizar_nombre(marca) if marca else ''
+    modelo = normalizar_serial(modelo)
+    if not marca or not modelo:
+        return None
+    return f'{marca}|{modelo}'[:255]
+
+
+def poblar_claves(apps, schema_editor):
+    """Calcula las claves de duplicados de los bienes existentes, de a lotes."""
+    Bien = apps.get_model('bienes_app', 'Bien')
+    lote = []
+    for bien in Bien.objects.only('id', 'serial', 'marca', 'modelo').iterator(chunk_size=2000):
+        bien.serial_normalizado = normalizar_serial(bien.serial)
+        bien.bloque_duplicados = clave_bloque(bien.marca, bien.modelo)
+        lote.append(bien)
+        if len(lote) >= 2000:
+            Bien.objects.bulk_update(lote, ['serial_normalizado', 'bloque_duplicados'])
+            lote = []
+    if lote:
+        Bien.objects.bulk_update(lote, ['serial_normalizado', 'bloque_duplicados'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bienes_app', '0018_subidafragmentada'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bien',
+            name='bloque_duplicados',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255, null=True, verbose_name='Marca y Modelo Normalizados'),
+        ),
+        migrations.AddField(
+            model_name='bien',
+            name='serial_normalizado',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=100, null=True, verbose_name='Serial Normalizado'),
+        ),
+        migrations.AddField(
+            model_name='importacionbienes',
+            name='permitir_duplicados',
+            field=models.BooleanField(default=False, verbose_name='Permitir Posibles Duplicados'),
+        ),
+        migrations.AddField(
+            model_name='subidafragmentada',
+            name='permitir_duplicados',
+            field=models.BooleanField(default=False, verbose_name='Permitir Posibles Duplicados'),
+        ),
+        migrations.RunPython(poblar_claves, migrations.RunPython.noop),
+    ]
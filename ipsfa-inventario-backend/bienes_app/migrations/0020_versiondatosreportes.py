@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:39
+
+from django.db import migrations, models
+
+
+def crear_version(apps, schema_editor):
+    VersionDatosReportes = apps.get_model('bienes_app', 'VersionDatosReportes')
+    VersionDatosReportes.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bienes_app', '0019_claves_duplicados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionDatosReportes',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Versión')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+            ],
+            options={
+                'verbose_name': 'Versión de los Datos de Reportes',
+                'verbose_name_plural': 'Versión de los Datos de Reportes',
+            },
+        ),
+        migrations.RunPython(crear_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bienes_app', '0020_versiondatosreportes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolicitudReporte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=50, verbose_name='Tipo de Reporte')),
+                ('parametros', models.JSONField(blank=True, default=dict, verbose_name='Parámetros')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En Proceso'), ('COMPLETADA', 'Completada'), ('FALLIDA', 'Fallida')], default='PENDIENTE', max_length=20, verbose_name='Estado')),
+                ('nocturna', models.BooleanField(default=False, verbose_name='Pregenerada en la Noche')),
+                ('nombre_archivo', models.CharField(blank=True, max_length=255, verbose_name='Nombre del Archivo')),
+                ('tamano_archivo', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Tamaño del Archivo (bytes)')),
+                ('mensaje_error', models.TextField(blank=True, null=True, verbose_name='Mensaje de Error')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Solicitud')),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Inicio')),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Finalización')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='solicitudes_reporte', to=settings.AUTH_USER_MODEL, verbose_name='Usuario que Solicita')),
+            ],
+            options={
+                'verbose_name': 'Solicitud de Reporte',
+                'verbose_name_plural': 'Solicitudes de Reportes',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+    ]
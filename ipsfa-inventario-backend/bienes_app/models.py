@@ -1,4 +1,7 @@
 # ipsfa-inventario-backend/bienes_app/models.py
+import re
+import unicodedata
+
 from django.db import models
 from django.utils import timezone # Para la fecha de adquisición por defecto
 from django.contrib.auth.models import User # Para el usuario que realiza la acción
@@ -29,6 +32,34 @@ MOTIVO_ADQUISICION_CHOICES = [
     ('OTRO', 'Otro'),
 ]
 
+
+def normalizar_nombre(texto):
+    """Nombre para comparar sin distinguir mayúsculas, acentos ni espacios ('  Dirección  de TI' == 'direccion de ti')."""
+    if not texto.isascii():
+        texto = ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+    return ' '.join(texto.casefold().split())
+
+
+def normalizar_serial(serial):
+    """Serial o modelo solo con letras y dígitos, en mayúsculas ('sn 12-34/a' == 'SN1234A'); None si queda vacío."""
+    if not serial:
+        return None
+    return re.sub(r'[\W_]+', '', normalizar_nombre(serial)).upper() or None
+
+
+def clave_bloque(marca, modelo):
+    """
+    Marca y modelo normalizados ('hp|LASERJETP1102'): solo se buscan
+    descripciones parecidas entre bienes del mismo bloque (ver duplicados.py).
+    None si falta alguno de los dos.
+    """
+    marca = normalizar_nombre(marca) if marca else ''
+    modelo = normalizar_serial(modelo)
+    if not marca or not modelo:
+        return None
+    return f'{marca}|{modelo}'[:255]
+
+
 class Categoria(models.Model):
     nombre = models.CharField(max_length=100, unique=True, verbose_name="Nombre de la Categoría")
     descripcion = models.TextField(blank=True, null=True, verbose_name="Descripción")
@@ -54,6 +85,7 @@ class Bien(models.Model):
         max_length=50, 
         blank=True, 
         null=True, 
+        db_index=True, # Se usa para identificar bienes en las reimportaciones (ver importacion.py)
         verbose_name="Código de Inventario Anterior"
     )
     descripcion = models.TextField(verbose_name="Descripción del Bien")
@@ -124,12 +156,20 @@ class Bien(models.Model):
     METODO_DEPRECIACION_CHOICES = [
         ('LINEA_RECTA', 'Línea Recta'),
         ('SALDO_DECRECIENTE', 'Saldo Decreciente'),
+        ('SUMA_DIGITOS', 'Suma de los Dígitos de los Años'),
+        ('UNIDADES_PRODUCCION', 'Unidades de Producción'),
     ]
     vida_util_estimada_anios = models.PositiveIntegerField(
         null=True,
         blank=True,
         verbose_name="Vida Útil Estimada (Años)"
     )
+    # Solo para el método de unidades de producción (horas, kilómetros, piezas...)
+    unidades_produccion_estimadas = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Unidades de Producción Estimadas"
+    )
     valor_residual = models.DecimalField(
         max_digits=19,
         decimal_places=2,
@@ -155,12 +195,30 @@ class Bien(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
     fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
 
+    # Claves para la detección de duplicados (ver duplicados.py), derivadas del serial, la marca y el modelo
+    serial_normalizado = models.CharField(
+        max_length=100, blank=True, null=True, db_index=True, editable=False, verbose_name="Serial Normalizado"
+    )
+    bloque_duplicados = models.CharField(
+        max_length=255, blank=True, null=True, db_index=True, editable=False, verbose_name="Marca y Modelo Normalizados"
+    )
+
+    # Campos de los que se derivan las claves de duplicados
+    CAMPOS_CLAVES_DUPLICADOS = ('serial', 'marca', 'modelo')
 
     def __str__(self):
         return f"{self.codigo_patrimonial} - {self.descripcion}"
 
+    def asignar_claves_duplicados(self):
+        self.serial_normalizado = normalizar_serial(self.serial)
+        self.bloque_duplicados = clave_bloque(self.marca, self.modelo)
+
     def save(self, *args, **kwargs):
         is_new = self.pk is None
+        self.asignar_claves_duplicados()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(self.CAMPOS_CLAVES_DUPLICADOS):
+            kwargs['update_fields'] = set(update_fields) | {'serial_normalizado', 'bloque_duplicados'}
         super().save(*args, **kwargs)  # Guarda primero para obtener el ID
         if is_new and not self.codigo_patrimonial:
             year = self.fecha_creacion.year if self.fecha_creacion else timezone.now().year
@@ -251,4 +309,361 @@ class DepreciacionMensual(models.Model):
         ordering = ['-anio', '-mes']
 
     def __str__(self):
-        return f"Depreciación de '{self.bien.descripcion}' para {self.mes}/{self.anio}"
\ No newline at end of file
+        return f"Depreciación de '{self.bien.descripcion}' para {self.mes}/{self.anio}"
+
+class UsoBien(models.Model):
+    """
+    Unidades producidas o consumidas por un bien en un mes (horas de uso,
+    kilómetros recorridos, piezas...). Es la base de la cuota mensual de los
+    bienes que se deprecian por unidades de producción.
+    """
+    bien = models.ForeignKey(Bien, on_delete=models.CASCADE, related_name='usos', verbose_name="Bien")
+    mes = models.PositiveIntegerField(verbose_name="Mes")
+    anio = models.PositiveIntegerField(verbose_name="Año")
+    unidades = models.PositiveIntegerField(verbose_name="Unidades del Mes")
+    fecha_registro = models.DateTimeField(auto_now=True, verbose_name="Fecha de Registro")
+
+    class Meta:
+        unique_together = ('bien', 'mes', 'anio')
+        verbose_name = "Uso del Bien"
+        verbose_name_plural = "Usos de Bienes"
+        ordering = ['-anio', '-mes']
+
+    def __str__(self):
+        return f"Uso de '{self.bien.descripcion}' en {self.mes}/{self.anio}: {self.unidades}"
+
+class EstadoDepreciacionBien(models.Model):
+    """
+    Último estado de depreciación de cada bien (desnormalizado).
+    Lo mantiene el motor de depreciación cada vez que guarda registros mensuales,
+    para que el dashboard y los reportes no tengan que buscar el último
+    DepreciacionMensual de cada bien.
+    Si cambia la valoración del bien, `recalcular_desde_*` marca desde qué
+    período hay que reconstruir su historial (ver bienes_app/signals.py).
+    """
+    bien = models.OneToOneField(Bien, on_delete=models.CASCADE, related_name='estado_depreciacion', verbose_name="Bien")
+    ultimo_mes = models.PositiveIntegerField(verbose_name="Último Mes Calculado")
+    ultimo_anio = models.PositiveIntegerField(verbose_name="Último Año Calculado")
+
+    depreciacion_acumulada = models.DecimalField(max_digits=19, decimal_places=2, verbose_name="Depreciación Acumulada")
+    valor_neto_en_libros = models.DecimalField(max_digits=19, decimal_places=2, verbose_name="Valor Neto en Libros")
+
+    # Primer período con registros posiblemente desactualizados (el bien cambió de valoración)
+    recalcular_desde_mes = models.PositiveIntegerField(null=True, blank=True, verbose_name="Recalcular desde el Mes")
+    recalcular_desde_anio = models.PositiveIntegerField(null=True, blank=True, verbose_name="Recalcular desde el Año")
+
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
+
+    class Meta:
+        verbose_name = "Estado de Depreciación"
+        verbose_name_plural = "Estados de Depreciación"
+
+    def __str__(self):
+        return f"Estado de depreciación de '{self.bien.descripcion}' al {self.ultimo_mes}/{self.ultimo_anio}"
+
+class DepreciacionAnual(models.Model):
+    """
+    Resumen anual de la depreciación de cada bien (desnormalizado).
+    Lo mantiene el motor de depreciación al guardar los registros mensuales,
+    para que los reportes anuales no tengan que agregar DepreciacionMensual.
+    """
+    bien = models.ForeignKey(Bien, on_delete=models.CASCADE, related_name='depreciaciones_anuales', verbose_name="Bien Depreciado")
+    anio = models.PositiveIntegerField(verbose_name="Año")
+
+    depreciacion_anio = models.DecimalField(max_digits=19, decimal_places=2, verbose_name="Depreciación del Año")
+    depreciacion_acumulada = models.DecimalField(max_digits=19, decimal_places=2, verbose_name="Depreciación Acumulada al Cierre")
+    valor_neto_en_libros = models.DecimalField(max_digits=19, decimal_places=2, verbose_name="Valor Neto en Libros al Cierre")
+
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
+
+    class Meta:
+        unique_together = ('bien', 'anio')
+        verbose_name = "Depreciación Anual"
+        verbose_name_plural = "Depreciaciones Anuales"
+        ordering = ['-anio']
+
+    def __str__(self):
+        return f"Depreciación anual de '{self.bien.descripcion}' para {self.anio}"
+
+class EjecucionDepreciacion(models.Model):
+    """
+    Ejecución del cálculo de depreciación hasta un período (mes/año).
+    La API solo la registra como PENDIENTE; la procesa en segundo plano el
+    comando `procesar_depreciacion`, que va guardando el avance y un punto de
+    control (último bien procesado) después de cada lote para poder retomarla
+    si el proceso se interrumpe.
+    """
+    ESTADO_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_PROCESO', 'En Proceso'),
+        ('COMPLETADA', 'Completada'),
+        ('FALLIDA', 'Fallida'),
+    ]
+
+    mes = models.PositiveIntegerField(verbose_name="Mes del Cálculo")
+    anio = models.PositiveIntegerField(verbose_name="Año del Cálculo")
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='PENDIENTE', verbose_name="Estado")
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ejecuciones_depreciacion',
+        verbose_name="Usuario que Solicita"
+    )
+
+    # Avance y punto de control
+    total_bienes = models.PositiveIntegerField(default=0, verbose_name="Total de Bienes a Procesar")
+    bienes_procesados = models.PositiveIntegerField(default=0, verbose_name="Bienes Procesados")
+    bienes_omitidos = models.PositiveIntegerField(default=0, verbose_name="Bienes Omitidos")
+    registros_creados = models.PositiveIntegerField(default=0, verbose_name="Registros Mensuales Creados")
+    ultimo_bien_id = models.PositiveIntegerField(default=0, verbose_name="Último Bien Procesado (Punto de Control)")
+    mensaje_error = models.TextField(blank=True, null=True, verbose_name="Mensaje de Error")
+
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Solicitud")
+    fecha_inicio = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Inicio")
+    fecha_fin = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Finalización")
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
+
+    @property
+    def progreso(self):
+        """Porcentaje de bienes recorridos (procesados u omitidos)."""
+        if self.estado == 'COMPLETADA':
+            return 100
+        if not self.total_bienes:
+            return 0
+        return min(100, round((self.bienes_procesados + self.bienes_omitidos) * 100 / self.total_bienes))
+
+    class Meta:
+        verbose_name = "Ejecución de Depreciación"
+        verbose_name_plural = "Ejecuciones de Depreciación"
+        ordering = ['-fecha_creacion']
+        constraints = [
+            # Bloqueo a nivel de ejecución: solo una puede estar en proceso a la vez
+            models.UniqueConstraint(
+                fields=['estado'],
+                condition=models.Q(estado='EN_PROCESO'),
+                name='unica_ejecucion_depreciacion_en_proceso',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Depreciación hasta {self.mes}/{self.anio} ({self.get_estado_display()})"
+
+class ImportacionBienes(models.Model):
+    """
+    Carga masiva de bienes desde un archivo. La API guarda el archivo y la
+    registra como PENDIENTE; la procesa en segundo plano el comando
+    `procesar_importaciones` (ver importacion.py), que valida el archivo por
+    lotes y después crea los bienes, guardando el avance después de cada lote.
+    En modo ACTUALIZAR las filas de bienes ya registrados (por serial, código
+    anterior o código patrimonial) los actualizan en lugar de crearlos.
+    Si alguna fila tiene errores la importación queda RECHAZADA sin guardar
+    nada, y se genera una hoja con las filas originales y sus errores.
+    """
+    ESTADO_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_PROCESO', 'En Proceso'),
+        ('COMPLETADA', 'Completada'),
+        ('RECHAZADA', 'Rechazada por Errores'),
+        ('FALLIDA', 'Fallida'),
+    ]
+    MODO_CHOICES = [
+        ('CREAR', 'Solo Crear'),
+        ('ACTUALIZAR', 'Crear o Actualizar'),
+    ]
+
+    archivo = models.FileField(upload_to='importaciones/', verbose_name="Archivo Cargado")
+    nombre_archivo = models.CharField(max_length=255, verbose_name="Nombre del Archivo")
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='PENDIENTE', verbose_name="Estado")
+    modo = models.CharField(max_length=20, choices=MODO_CHOICES, default='CREAR', verbose_name="Modo de Carga")
+    crear_proveedores = models.BooleanField(default=False, verbose_name="Crear Proveedores Faltantes")
+    permitir_duplicados = models.BooleanField(default=False, verbose_name="Permitir Posibles Duplicados")
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='importaciones_bienes',
+        verbose_name="Usuario que Carga"
+    )
+    ip_address = models.GenericIPAddressField(null=True, blank=True, verbose_name="Dirección IP")
+
+    # Avance
+    total_filas = models.PositiveIntegerField(default=0, verbose_name="Total de Filas")
+    filas_procesadas = models.PositiveIntegerField(default=0, verbose_name="Filas Validadas")
+    filas_con_error = models.PositiveIntegerField(default=0, verbose_name="Filas con Errores")
+    bienes_creados = models.PositiveIntegerField(default=0, verbose_name="Bienes Creados")
+    bienes_actualizados = models.PositiveIntegerField(default=0, verbose_name="Bienes Actualizados")
+    bienes_sin_cambios = models.PositiveIntegerField(default=0, verbose_name="Bienes sin Cambios")
+    proveedores_creados = models.PositiveIntegerField(default=0, verbose_name="Proveedores Creados")
+    # Primer id reservado para los bienes de la importación (para deshacerla si se interrumpe)
+    primer_bien_id = models.PositiveIntegerField(null=True, blank=True, verbose_name="Primer Bien Creado")
+    archivo_errores = models.FileField(
+        upload_to='importaciones/errores/', null=True, blank=True, verbose_name="Hoja de Errores"
+    )
+    mensaje_error = models.TextField(blank=True, null=True, verbose_name="Mensaje de Error")
+
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Carga")
+    fecha_inicio = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Inicio")
+    fecha_fin = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Finalización")
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
+
+    @property
+    def progreso(self):
+        """
+        Porcentaje de avance: la validación de todas las filas es la primera
+        mitad y el guardado de los bienes la segunda.
+        """
+        if self.estado in ('COMPLETADA', 'RECHAZADA'):
+            return 100
+        if not self.total_filas:
+            return 0
+        guardadas = self.bienes_creados + self.bienes_actualizados + self.bienes_sin_cambios
+        return min(100, round((self.filas_procesadas + guardadas) * 50 / self.total_filas))
+
+    @property
+    def segundos_restantes(self):
+        """Tiempo restante estimado según el ritmo desde el inicio (None si no se puede estimar)."""
+        if self.estado != 'EN_PROCESO' or not self.fecha_inicio or not 0 < self.progreso < 100:
+            return None
+        transcurridos = (timezone.now() - self.fecha_inicio).total_seconds()
+        return round(transcurridos * (100 - self.progreso) / self.progreso)
+
+    class Meta:
+        verbose_name = "Importación de Bienes"
+        verbose_name_plural = "Importaciones de Bienes"
+        ordering = ['-fecha_creacion']
+        constraints = [
+            # Los ids de los bienes se reservan por importación: solo una puede estar en proceso a la vez
+            models.UniqueConstraint(
+                fields=['estado'],
+                condition=models.Q(estado='EN_PROCESO'),
+                name='unica_importacion_bienes_en_proceso',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Importación de '{self.nombre_archivo}' ({self.get_estado_display()})"
+
+
+class SubidaFragmentada(models.Model):
+    """
+    Subida en fragmentos de un archivo de carga masiva, para archivos grandes
+    enviados por conexiones inestables. Los fragmentos se guardan en disco a
+    medida que llegan (ver subida_fragmentada.py), de modo que si la conexión
+    se corta solo se reenvían los que faltan; al completarla se unen en el
+    archivo de una ImportacionBienes, que sigue el camino normal.
+    """
+    ESTADO_CHOICES = [
+        ('EN_CURSO', 'En Curso'),
+        ('COMPLETADA', 'Completada'),
+    ]
+
+    nombre_archivo = models.CharField(max_length=255, verbose_name="Nombre del Archivo")
+    tamano_total = models.PositiveBigIntegerField(verbose_name="Tamaño Total (bytes)")
+    tamano_fragmento = models.PositiveIntegerField(verbose_name="Tamaño de cada Fragmento (bytes)")
+    # Opciones de la importación que se creará al completar la subida
+    modo = models.CharField(max_length=20, choices=ImportacionBienes.MODO_CHOICES, default='CREAR', verbose_name="Modo de Carga")
+    crear_proveedores = models.BooleanField(default=False, verbose_name="Crear Proveedores Faltantes")
+    permitir_duplicados = models.BooleanField(default=False, verbose_name="Permitir Posibles Duplicados")
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='EN_CURSO', verbose_name="Estado")
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='subidas_fragmentadas',
+        verbose_name="Usuario que Sube"
+    )
+    ip_address = models.GenericIPAddressField(null=True, blank=True, verbose_name="Dirección IP")
+    importacion = models.OneToOneField(
+        ImportacionBienes,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='subida_fragmentada',
+        verbose_name="Importación Generada"
+    )
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Inicio")
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
+
+    @property
+    def total_fragmentos(self):
+        return max(1, -(-self.tamano_total // self.tamano_fragmento))
+
+    def tamano_esperado(self, numero):
+        """Tamaño en bytes del fragmento `numero` (desde 0): todos iguales salvo el último."""
+        if numero < self.total_fragmentos - 1:
+            return self.tamano_fragmento
+        return self.tamano_total - self.tamano_fragmento * (self.total_fragmentos - 1)
+
+    class Meta:
+        verbose_name = "Subida Fragmentada"
+        verbose_name_plural = "Subidas Fragmentadas"
+        ordering = ['-fecha_creacion']
+
+    def __str__(self):
+        return f"Subida de '{self.nombre_archivo}' ({self.get_estado_display()})"
+
+
+class VersionDatosReportes(models.Model):
+    """
+    Versión de los datos de los que salen los reportes (fila única, pk=1).
+    Aumenta con cada cambio en los bienes, movimientos, depreciaciones,
+    categorías y unidades (ver signals.py) y forma parte de la clave de los
+    reportes guardados en la caché (ver cache_reportes.py).
+    """
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Versión")
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
+
+    class Meta:
+        verbose_name = "Versión de los Datos de Reportes"
+        verbose_name_plural = "Versión de los Datos de Reportes"
+
+    def __str__(self):
+        return f"Datos de reportes, versión {self.version}"
+
+
+class SolicitudReporte(models.Model):
+    """
+    Generación en segundo plano de un reporte PDF o Excel (ver reportes.py),
+    para los reportes pesados que no conviene generar dentro de la petición.
+    La API solo la registra como PENDIENTE; la procesa el comando
+    `procesar_reportes`, que genera varias a la vez hasta un límite, y el
+    archivo terminado queda en disco para descargarlo (ver solicitudes_reportes.py).
+    """
+    ESTADO_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_PROCESO', 'En Proceso'),
+        ('COMPLETADA', 'Completada'),
+        ('FALLIDA', 'Fallida'),
+    ]
+
+    tipo = models.CharField(max_length=50, verbose_name="Tipo de Reporte")
+    # Parámetros ya validados y normalizados (ver TipoReporte.leer_parametros)
+    parametros = models.JSONField(default=dict, blank=True, verbose_name="Parámetros")
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='PENDIENTE', verbose_name="Estado")
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='solicitudes_reporte',
+        verbose_name="Usuario que Solicita"
+    )
+    nocturna = models.BooleanField(default=False, verbose_name="Pregenerada en la Noche")
+    nombre_archivo = models.CharField(max_length=255, blank=True, verbose_name="Nombre del Archivo")
+    tamano_archivo = models.PositiveBigIntegerField(null=True, blank=True, verbose_name="Tamaño del Archivo (bytes)")
+    mensaje_error = models.TextField(blank=True, null=True, verbose_name="Mensaje de Error")
+
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Solicitud")
+    fecha_inicio = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Inicio")
+    fecha_fin = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Finalización")
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
+
+    class Meta:
+        verbose_name = "Solicitud de Reporte"
+        verbose_name_plural = "Solicitudes de Reportes"
+        ordering = ['-fecha_creacion']
+
+    def __str__(self):
+        return f"Reporte '{self.tipo}' ({self.get_estado_display()})"
@@ -0,0 +1,148 @@
+# bienes_app/parquet.py
+"""
+Exportación e importación del inventario en Apache Parquet (formato columnar
+comprimido), para que el equipo de análisis no tenga que recorrer la API
+paginada.
+
+Las tablas se leen de a lotes con `values_list` ordenado por id (cada lote
+continúa desde el último id leído, sin OFFSET) y cada lote se escribe como un
+grupo de filas del archivo, así que la memoria usada no depende del tamaño de
+la tabla. Los tipos de cada columna salen del modelo (decimales exactos,
+fechas, enteros); las claves foráneas se exportan con su id (`bien_id`,
+`categoria_id`...).
+
+Un Parquet de bienes (el exportado u otro con las mismas columnas) se puede
+volver a cargar por la carga masiva normal: `leer_parquet_por_lotes` lo lee
+de a lotes para `importacion.leer_por_lotes`.
+
+Requiere pyarrow.
+"""
+
+import os
+import time
+
+from django.conf import settings
+from django.db import models
+from .models import Bien, DepreciacionMensual, MovimientoBien
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Solo lo necesitan la exportación e importación en Parquet
+    pa = pq = None
+
+# Tablas exportables: nombre del archivo (sin extensión) -> modelo
+TABLAS_PARQUET = {
+    'bienes': Bien,
+    'movimientos': MovimientoBien,
+    'depreciaciones': DepreciacionMensual,
+}
+# Filas por lote de lectura y por grupo de filas del archivo
+TAMANO_LOTE_PARQUET = 50000
+COMPRESION_PARQUET = 'zstd'
+
+
+def _requerir_pyarrow():
+    if pa is None:
+        raise ValueError('Para leer o escribir archivos Parquet debe instalar pyarrow.')
+
+
+def _tipo_arrow(campo):
+    """Tipo de Arrow de la columna de un campo del modelo."""
+    if isinstance(campo, models.ForeignKey):
+        return pa.int64()
+    if isinstance(campo, models.DecimalField):
+        return pa.decimal128(campo.max_digits, campo.decimal_places)
+    if isinstance(campo, models.DateTimeField):
+        return pa.timestamp('us', tz=settings.TIME_ZONE if settings.USE_TZ else None)
+    if isinstance(campo, models.DateField):
+        return pa.date32()
+    if isinstance(campo, models.BooleanField):
+        return pa.bool_()
+    if isinstance(campo, (models.IntegerField, models.AutoField)):
+        return pa.int64()
+    return pa.string()
+
+
+def esquema_parquet(modelo):
+    """(columnas, esquema de Arrow) con todos los campos concretos del modelo; las claves foráneas, por su id."""
+    _requerir_pyarrow()
+    campos = modelo._meta.concrete_fields
+    columnas = [campo.attname for campo in campos]
+    esquema = pa.schema([
+        pa.field(campo.attname, _tipo_arrow(campo), nullable=campo.null)
+        for campo in campos
+    ])
+    return columnas, esquema
+
+
+def exportar_parquet(modelo, destino, tamano_lote=TAMANO_LOTE_PARQUET, compresion=COMPRESION_PARQUET):
+    """
+    Escribe la tabla de `modelo` completa en `destino` (ruta o archivo
+    abierto en modo binario), de a `tamano_lote` filas. Devuelve la cantidad
+    de filas escritas.
+    """
+    columnas, esquema = esquema_parquet(modelo)
+    filas = 0
+    ultimo_id = None
+    with pq.ParquetWriter(destino, esquema, compression=compresion) as escritor:
+        while True:
+            consulta = modelo.objects.order_by('pk')
+            if ultimo_id is not None:
+                consulta = consulta.filter(pk__gt=ultimo_id)
+            lote = list(consulta.values_list(*columnas)[:tamano_lote])
+            if not lote:
+                break
+            valores = list(zip(*lote))
+            escritor.write_table(pa.Table.from_arrays(
+                [pa.array(columna, type=tipo) for columna, tipo in zip(valores, esquema.types)], schema=esquema,
+            ))
+            filas += len(lote)
+            ultimo_id = lote[-1][0]
+            if len(lote) < tamano_lote:
+                break
+    return filas
+
+
+def exportar_tablas(directorio, tablas=None, tamano_lote=TAMANO_LOTE_PARQUET, compresion=COMPRESION_PARQUET):
+    """
+    Exporta las `tablas` indicadas (por defecto todas las de TABLAS_PARQUET)
+    a `<directorio>/<tabla>.parquet`. Devuelve [(tabla, ruta, filas, segundos)].
+    """
+    resultado = []
+    for tabla in tablas or TABLAS_PARQUET:
+        ruta = os.path.join(directorio, f'{tabla}.parquet')
+        inicio = time.monotonic()
+        filas = exportar_parquet(TABLAS_PARQUET[tabla], ruta, tamano_lote, compresion)
+        resultado.append((tabla, ruta, filas, time.monotonic() - inicio))
+    return resultado
+
+
+def contar_filas_parquet(archivo):
+    """Filas del archivo según sus metadatos (sin leer los datos)."""
+    _requerir_pyarrow()
+    filas = pq.ParquetFile(archivo).metadata.num_rows
+    archivo.seek(0)
+    return filas
+
+
+def leer_parquet_por_lotes(archivo, tamano_lote):
+    """
+    Lee el archivo Parquet de a `tamano_lote` filas como DataFrames, con el
+    mismo índice que en `importacion.leer_por_lotes`. Las fechas con hora se
+    pasan a la hora local sin zona (como se leen de un Excel).
+    """
+    _requerir_pyarrow()
+    return _lotes_parquet(pq.ParquetFile(archivo), tamano_lote)
+
+
+def _lotes_parquet(archivo_parquet, tamano_lote):
+    inicio = 0
+    for lote in archivo_parquet.iter_batches(batch_size=tamano_lote):
+        df = lote.to_pandas()
+        for columna in df.columns:
+            if getattr(df[columna].dtype, 'tz', None) is not None:
+                df[columna] = df[columna].dt.tz_convert(settings.TIME_ZONE).dt.tz_localize(None)
+        df.index = range(inicio, inicio + len(df))
+        inicio += len(df)
+        yield df
@@ -1,952 +1,702 @@
 # en bienes_app/pdf_generator.py
-
+"""
+Reportes PDF del inventario.
+
+Todos los reportes tienen el mismo formato: membrete, logo y marca de agua en
+la primera página, título, líneas de información, una tabla, un resumen y la
+firma. Ese formato lo arma `generar_reporte_pdf`; cada reporte solo indica sus
+columnas (título, ancho y cómo obtener el valor de cada fila), el color del
+encabezado de la tabla y su resumen. Las filas y el resumen se leen con
+`datos_reportes`.
+
+Los estilos, el membrete, la firma, los encabezados y estilos de las tablas y
+las imágenes se preparan una sola vez por proceso (ver `recursos_reporte`) en
+lugar de en cada reporte.
+
+Con `en_streaming=True` el reporte se arma sin tener todas las filas en
+memoria: la tabla (ver `TablaPorPaginas`) lee las filas a medida que arma cada
+página, el contenido de cada página se comprime al terminarla y el PDF se
+escribe en un archivo temporal (en memoria mientras es chico, en disco si
+crece). La memoria usada no crece con la cantidad de filas más que por el
+tamaño del PDF comprimido.
+
+Con `rapido=True` las celdas cuyo texto entra en una línea van como texto
+simple, que la tabla dibuja todo junto (ver `TablaRapida`), y solo las que hay
+que partir en varias líneas (por ejemplo descripciones largas) van en un
+Paragraph; la tabla también se arma por páginas. El resultado se ve igual: el
+texto simple queda en el mismo lugar que el Paragraph de una línea.
+
+El logo y la marca de agua se incrustan reducidos a la resolución con que se
+dibujan y ya comprimidos (ver `_preparar_imagen`): cada PDF solo copia esos
+bytes. Cada imagen se dibuja desde un formulario (XObject) reutilizable, así
+que se guarda una sola vez por documento, y el contenido de las páginas va
+comprimido.
+"""
+
+import copy
+import os
+import tempfile
+import zlib
+from collections import deque
+from functools import lru_cache
 from io import BytesIO
-from django.http import HttpResponse
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.lib import colors
-from reportlab.lib.units import inch
+
 from django.conf import settings
-import os
 from django.utils import timezone
-
-def draw_watermark(canvas, doc):
-    """Función para dibujar la marca de agua con el logo de IPSFANB"""
+from PIL import Image
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfdoc import PDFArray, PDFImageXObject, PDFName, PDFStream, PDFZCompress
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer, Flowable
+
+from .datos_reportes import (
+    CAMPOS_BIEN, CAMPOS_DEPRECIACION, CAMPOS_MOVIMIENTO, VALOR_NETO_DEPRECIACION,
+    filas_reporte, nombre_estado, resumen_reporte,
+)
+
+MEMBRETE = (
+    'REPÚBLICA BOLIVARIANA DE VENEZUELA<br/>'
+    'MINISTERIO DEL PODER POPULAR PARA LA DEFENSA<br/>'
+    'VICEMINISTERIO DE SERVICIOS, PERSONAL Y LOGÍSTICA<br/>'
+    'DIRECCIÓN GENERAL DE EMPRESAS Y SERVICIOS<br/>'
+    'INSTITUTO DE PREVISIÓN SOCIAL DE LA FUERZA ARMADA NACIONAL BOLIVARIANA<br/>'
+    'GERENCIA DE FINANZAS<br/>'
+    'UNIDAD DE BIENES PÚBLICOS'
+)
+LINEA_FIRMA = "____________________________________"
+NOMBRE_FIRMANTE = "MY. ANDELSON JOSE PINTO HERRERA"
+CARGO_FIRMANTE = "JEFE DEL DEPARTAMENTO DE BIENES PÚBLICOS"
+
+# Valor de columna que indica el número de fila (N°)
+NUMERO = None
+
+# Colores del encabezado de la tabla de cada reporte
+COLOR_INVENTARIO = '#003366'
+COLOR_CATEGORIA = '#2E8B57'
+COLOR_UNIDAD = '#8B4513'
+COLOR_DESINCORPORADOS = '#DC143C'
+COLOR_TRASLADOS = '#FF8C00'
+COLOR_DEPRECIACION = '#4169E1'
+
+
+# Tamaño con que se dibuja cada imagen (pulgadas, es cuadrada) y resolución de la
+# variante que se incrusta en el PDF (puntos por pulgada). La marca de agua se
+# dibuja con 8% de opacidad: a más resolución o calidad no se nota la diferencia.
+LADO_LOGO = 0.8
+PPP_LOGO = 200
+LADO_MARCA_DE_AGUA = 4
+PPP_MARCA_DE_AGUA = 100
+CALIDAD_JPEG_MARCA_DE_AGUA = 60
+
+# Relleno de las celdas de las tablas (el horizontal es el de ReportLab por omisión)
+RELLENO_ENCABEZADO = 8
+RELLENO_FILAS = 4
+RELLENO_HORIZONTAL = 6
+
+# Modo en streaming: tamaño del PDF desde el que el archivo temporal pasa a disco
+TAMANO_MAXIMO_PDF_EN_MEMORIA = 5 * 1024 * 1024
+
+
+def _xobjeto_imagen(nombre, imagen, datos, filtro):
+    """XObject de imagen con los `datos` ya comprimidos con `filtro` (FlateDecode o DCTDecode)."""
+    xobjeto = PDFImageXObject(nombre)
+    xobjeto.width, xobjeto.height = imagen.size
+    xobjeto.bitsPerComponent = 8
+    xobjeto.colorSpace = 'DeviceGray' if imagen.mode == 'L' else 'DeviceRGB'
+    xobjeto.streamContent = datos
+    xobjeto._filters = (filtro,)
+    xobjeto.mask = None
+    return xobjeto
+
+
+def _preparar_imagen(nombre, lado, ppp, calidad_jpeg=None):
+    """
+    XObject de static/images/<nombre> reducida a `lado` pulgadas a `ppp`
+    puntos por pulgada y ya comprimida: en JPEG con `calidad_jpeg`, si se
+    indica, o sin pérdida y con su canal alfa (como máscara) si no. Devuelve
+    None si la imagen no existe o no se puede leer.
+    """
+    ruta = os.path.join(settings.BASE_DIR, 'static/images', nombre)
+    if not os.path.exists(ruta):
+        return None
     try:
-        # Ruta del logo de IPSFANB (el logo circular que viste)
-        logo_path = os.path.join(settings.BASE_DIR, 'static/images/watermark.png')
-        
-        if os.path.exists(logo_path):
-            # Obtener dimensiones del documento
-            page_width = doc.pagesize[0]
-            page_height = doc.pagesize[1]
-            
-            # Calcular posición centrada para la marca de agua
-            watermark_width = 4 * inch  # Aumentado de 2.5 a 4 pulgadas
-            watermark_height = 4 * inch  # Aumentado de 2.5 a 4 pulgadas
-            x = (page_width - watermark_width) / 2
-            y = (page_height - watermark_height) / 2
-            
-            # Dibujar la marca de agua con transparencia
+        with Image.open(ruta) as original:
+            imagen = original.convert('RGBA' if original.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        pixeles = round(lado * ppp)
+        imagen.thumbnail((pixeles, pixeles), Image.LANCZOS)
+
+        if calidad_jpeg:
+            salida = BytesIO()
+            imagen.convert('RGB').save(salida, 'JPEG', quality=calidad_jpeg, optimize=True)
+            return _xobjeto_imagen(nombre, imagen, salida.getvalue(), 'DCTDecode')
+
+        alfa = imagen.getchannel('A') if imagen.mode == 'RGBA' else None
+        imagen = imagen.convert('RGB')
+        xobjeto = _xobjeto_imagen(nombre, imagen, zlib.compress(imagen.tobytes(), 9), 'FlateDecode')
+        if alfa is not None and alfa.getextrema() != (255, 255):
+            xobjeto.mascara = _xobjeto_imagen(f'{nombre}.alfa', alfa, zlib.compress(alfa.tobytes(), 9), 'FlateDecode')
+        return xobjeto
+    except Exception as e:
+        print(f"Error al cargar la imagen {nombre}: {e}")
+        return None
+
+
+def _dibujar_imagen(canvas, imagen, x, y, ancho, alto):
+    """
+    Dibuja una imagen de `_preparar_imagen` en el rectángulo indicado.
+
+    La primera vez que se dibuja en un documento se agrega al documento una
+    copia del XObject (el documento la modifica al registrarla, pero los bytes
+    ya comprimidos se comparten) y un formulario de 1x1 que la dibuja; luego
+    cada vez solo se usa el formulario, escalado al rectángulo.
+    """
+    formulario = f'formulario.{imagen.name}'
+    if not canvas.hasForm(formulario):
+        documento = canvas._doc
+        xobjeto = copy.copy(imagen)
+        mascara = getattr(imagen, 'mascara', None)
+        if mascara is not None:
+            del xobjeto.mascara
+            xobjeto.smask = documento.Reference(copy.copy(mascara), documento.getXObjectName(mascara.name))
+        documento.Reference(xobjeto, documento.getXObjectName(imagen.name))
+        canvas.beginForm(formulario, 0, 0, 1, 1)
+        canvas.doForm(imagen.name)
+        canvas.endForm()
+    canvas.saveState()
+    canvas.translate(x, y)
+    canvas.scale(ancho, alto)
+    canvas.doForm(formulario)
+    canvas.restoreState()
+
+
+class RecursosReporte:
+    """Estilos, párrafos fijos e imágenes comunes a todos los reportes."""
+
+    def __init__(self):
+        estilos = getSampleStyleSheet()
+        # Todo el texto de los reportes va centrado
+        self.texto = ParagraphStyle('texto_reporte', parent=estilos['Normal'], alignment=TA_CENTER)
+        self.titulo = ParagraphStyle('titulo_reporte', parent=estilos['h2'], alignment=TA_CENTER)
+        self.celda = ParagraphStyle('celda_reporte', parent=self.texto, fontSize=7, leading=8, wordWrap='LTR')
+        self.logo = _preparar_imagen('logo_ipsfa.png', LADO_LOGO, PPP_LOGO)
+        self.marca_de_agua = _preparar_imagen(
+            'watermark.png', LADO_MARCA_DE_AGUA, PPP_MARCA_DE_AGUA, CALIDAD_JPEG_MARCA_DE_AGUA
+        )
+        self._membrete = [Paragraph(MEMBRETE, self.texto), Spacer(1, 0.2*inch)]
+        self._firma = [
+            Spacer(1, 1.5*inch),
+            Paragraph(LINEA_FIRMA, self.texto),
+            Paragraph(NOMBRE_FIRMANTE, self.texto),
+            Paragraph(CARGO_FIRMANTE, self.texto),
+        ]
+
+    # Los flowables se copian para cada reporte: al construir el PDF guardan su tamaño
+    # y no se pueden compartir entre dos reportes que se generen a la vez
+    def membrete(self):
+        return [copy.copy(elemento) for elemento in self._membrete]
+
+    def firma(self):
+        return [copy.copy(elemento) for elemento in self._firma]
+
+    def encabezado_tabla(self, columnas):
+        return [copy.copy(celda) for celda in _celdas_encabezado(tuple(titulo for titulo, _, _ in columnas))]
+
+    def dibujar_primera_pagina(self, canvas, doc):
+        """Logo del membrete y marca de agua."""
+        if self.logo:
+            lado = LADO_LOGO * inch
+            _dibujar_imagen(canvas, self.logo, doc.leftMargin, doc.height + doc.topMargin - lado, lado, lado)
+        if self.marca_de_agua:
+            # Centrada y con transparencia del 8% para que sea sutil
+            lado = LADO_MARCA_DE_AGUA * inch
             canvas.saveState()
-            canvas.setFillAlpha(0.08)  # Transparencia del 8% para que sea sutil
-            canvas.drawImage(logo_path, x, y, width=watermark_width, height=watermark_height, mask='auto')
+            canvas.setFillAlpha(0.08)
+            _dibujar_imagen(canvas, self.marca_de_agua, (doc.pagesize[0] - lado) / 2, (doc.pagesize[1] - lado) / 2,
+                            lado, lado)
             canvas.restoreState()
-    except Exception as e:
-        # Si hay error al cargar la marca de agua, continuar sin ella
-        print(f"Error al cargar marca de agua: {e}")
-
-def generar_reporte_inventario_pdf(bienes_queryset, fecha_desde, fecha_hasta, titulo_reporte="INVENTARIO GENERAL DE BIENES PÚBLICOS"):
-    # 1. Preparar el buffer de respuesta HTTP para el PDF
-    buffer = BytesIO()
-
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                             rightMargin=30, leftMargin=30, topMargin=40, bottomMargin=40)
-
-    elementos = []
-    styles = getSampleStyleSheet()
-
-    # 3. Lógica del Encabezado (Membrete y Logo)
-    logo_path = os.path.join(settings.BASE_DIR, 'static/images/logo_ipsfa.png')
-    logo = None
-    if os.path.exists(logo_path):
-        logo = logo_path
-
-    membrete_text = (
-        'REPÚBLICA BOLIVARIANA DE VENEZUELA<br/>'
-        'MINISTERIO DEL PODER POPULAR PARA LA DEFENSA<br/>'
-        'VICEMINISTERIO DE SERVICIOS, PERSONAL Y LOGÍSTICA<br/>'
-        'DIRECCIÓN GENERAL DE EMPRESAS Y SERVICIOS<br/>'
-        'INSTITUTO DE PREVISIÓN SOCIAL DE LA FUERZA ARMADA NACIONAL BOLIVARIANA<br/>'
-        'GERENCIA DE FINANZAS<br/>'
-        'UNIDAD DE BIENES PÚBLICOS'
-    )
-    membrete_paragraph = Paragraph(membrete_text, styles['Normal'])
-    elementos.append(membrete_paragraph)
-    elementos.append(Spacer(1, 0.2*inch))
-
-    def draw_logo(canvas, doc):
-        if logo:
-            canvas.drawImage(logo, doc.leftMargin, doc.height + doc.topMargin - 0.8*inch, width=0.8*inch, height=0.8*inch, mask='auto')
-        # Agregar marca de agua
-        draw_watermark(canvas, doc)
-
-    # 4. Título del Reporte
-    titulo = Paragraph(titulo_reporte, styles['h2'])
-    titulo.style.alignment = 1
-    elementos.append(titulo)
-
-    # Información adicional del reporte
-    info_reporte = []
-    if fecha_desde != 'N/A' and fecha_hasta != 'N/A':
-        info_reporte.append(f"Período: Desde {fecha_desde} Hasta {fecha_hasta}")
-    info_reporte.append(f"Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}")
-    
-    for info in info_reporte:
-        info_paragraph = Paragraph(info, styles['Normal'])
-        info_paragraph.style.alignment = 1
-        elementos.append(info_paragraph)
-    
-    elementos.append(Spacer(1, 0.3*inch))
 
-    # 5. Lógica de la Tabla de Datos - Columnas específicas para inventario
-    columnas = ['N°', 'CÓDIGO PATRIMONIAL', 'DESCRIPCIÓN', 'MARCA', 'MODELO', 'SERIAL', 'UNIDAD ASIGNADA', 'ESTADO', 'VALOR (Bs.)']
-    
-    # Estilo para celdas de la tabla
-    cell_style = styles['Normal'].clone('cell_style')
-    cell_style.fontSize = 7
-    cell_style.leading = 8
-    cell_style.wordWrap = 'LTR'
-    
-    # Estilo para encabezados de la tabla
-    header_style = styles['Normal'].clone('header_style')
-    header_style.fontSize = 7
-    header_style.leading = 8
-    header_style.wordWrap = 'LTR'
-    header_style.alignment = 1
-    
-    # Convertir los títulos de columna en Paragraph con color blanco y negrita
-    columnas_paragraph = [
-        Paragraph(f'<font color="white"><b>{col}</b></font>', header_style) for col in columnas
-    ]
-    datos_tabla = [columnas_paragraph]
-    
-    for i, bien in enumerate(bienes_queryset):
-        unidad_nombre = bien.unidad_administrativa_actual.nombre if bien.unidad_administrativa_actual else 'N/A'
-        datos_tabla.append([
-            Paragraph(str(i + 1), cell_style),
-            Paragraph(str(bien.codigo_patrimonial), cell_style),
-            Paragraph(str(bien.descripcion), cell_style),
-            Paragraph(str(bien.marca or ''), cell_style),
-            Paragraph(str(bien.modelo or ''), cell_style),
-            Paragraph(str(bien.serial or ''), cell_style),
-            Paragraph(str(unidad_nombre), cell_style),
-            Paragraph(str(bien.get_estado_bien_display()), cell_style),
-            Paragraph(f"{bien.valor_unitario_bs:,.2f}", cell_style),
-        ])
-
-    # Ajustar los anchos de columna para inventario general
-    tabla_bienes = Table(
-        datos_tabla,
-        colWidths=[0.4*inch, 1.0*inch, 1.5*inch, 0.7*inch, 0.7*inch, 0.8*inch, 1.0*inch, 0.6*inch, 0.8*inch]
-    )
-    tabla_bienes.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#003366')),  # Azul para encabezado
+
+@lru_cache(maxsize=None)
+def recursos_reporte():
+    return RecursosReporte()
+
+
+@lru_cache(maxsize=None)
+def _celdas_encabezado(titulos):
+    celda = recursos_reporte().celda
+    return tuple(ParrafoCelda(f'<font color="white"><b>{titulo}</b></font>', celda) for titulo in titulos)
+
+
+@lru_cache(maxsize=None)
+def estilo_tabla(color):
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(color)),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
         ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
         ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
         ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
         ('FONTSIZE', (0, 0), (-1, 0), 7),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('TOPPADDING', (0, 0), (-1, 0), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), RELLENO_ENCABEZADO),
+        ('TOPPADDING', (0, 0), (-1, 0), RELLENO_ENCABEZADO),
         ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
         ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
         ('FONTSIZE', (0, 1), (-1, -1), 7),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-        ('TOPPADDING', (0, 1), (-1, -1), 4),
+        ('LEADING', (0, 1), (-1, -1), recursos_reporte().celda.leading),  # El de los Paragraph, para el texto simple
+        ('BOTTOMPADDING', (0, 1), (-1, -1), RELLENO_FILAS),
+        ('TOPPADDING', (0, 1), (-1, -1), RELLENO_FILAS),
         # Sin ROWBACKGROUNDS para que las filas sean transparentes
-    ]))
-    elementos.append(tabla_bienes)
-    elementos.append(Spacer(1, 0.3*inch))
+    ])
+
+
+def celdas_fila(columnas, fila, numero, anchos_texto=None):
+    """
+    Celdas de la fila número `numero` de la tabla de un reporte. Con
+    `anchos_texto` (el ancho disponible para el texto en cada columna) el
+    texto que entra en una línea queda como texto simple y solo el resto va
+    en un Paragraph.
+    """
+    celda = recursos_reporte().celda
+    textos = [str(numero if valor is NUMERO else valor(fila)) for _, _, valor in columnas]
+    if anchos_texto is None:
+        return [Paragraph(texto, celda) for texto in textos]
+    return [
+        texto if '\n' not in texto and _ancho_texto(texto) <= ancho else ParrafoCelda(texto, celda)
+        for texto, ancho in zip(textos, anchos_texto)
+    ]
 
-    # 6. Resumen estadístico
-    if bienes_queryset.count() > 0:
-        total_valor = sum(bien.valor_unitario_bs for bien in bienes_queryset)
-        estados_count = {}
-        for bien in bienes_queryset:
-            estado = bien.get_estado_bien_display()
-            estados_count[estado] = estados_count.get(estado, 0) + 1
-        
-        resumen_text = f"""
-        <b>RESUMEN ESTADÍSTICO:</b><br/>
-        • Total de Bienes: {bienes_queryset.count()}<br/>
-        • Valor Total: Bs. {total_valor:,.2f}<br/>
-        • Distribución por Estado: {', '.join([f'{estado}: {count}' for estado, count in estados_count.items()])}
-        """
-        resumen_paragraph = Paragraph(resumen_text, styles['Normal'])
-        elementos.append(resumen_paragraph)
-        elementos.append(Spacer(1, 0.3*inch))
 
-    # 7. Lógica del Pie de Página (Firma)
-    elementos.append(Spacer(1, 1.5*inch))
+class ParrafoCelda(Paragraph):
+    """
+    Paragraph de una celda que no vuelve a partir sus líneas si se le pide
+    el mismo ancho: la tabla lo mide y luego, al dibujarlo, lo vuelve a medir.
+    """
+
+    _ancho_partido = None
+
+    def wrap(self, availWidth, availHeight):
+        if availWidth != self._ancho_partido:
+            self._tamano = super().wrap(availWidth, availHeight)
+            self._ancho_partido = availWidth
+        return self._tamano
+
+
+# Cada texto se mide al armar la fila y otra vez al dibujarlo, en la misma página
+@lru_cache(maxsize=4096)
+def _ancho_texto(texto):
+    celda = recursos_reporte().celda
+    return stringWidth(texto, celda.fontName, celda.fontSize)
+
+
+class TablaRapida(LongTable):
+    """
+    LongTable que dibuja todas sus celdas de texto simple en un solo objeto
+    de texto del PDF, en lugar de uno por celda, en la misma posición en que
+    las dibuja LongTable (centradas horizontal y verticalmente).
+    """
+
+    def draw(self):
+        self._textos = None
+        super().draw()
+        if self._textos is not None:
+            self.canv.drawText(self._textos)
+
+    def _drawCell(self, cellval, cellstyle, pos, size):
+        if not isinstance(cellval, str):
+            return super()._drawCell(cellval, cellstyle, pos, size)
+        if self._textos is None:
+            # Todas las celdas de texto simple de los reportes tienen el mismo estilo
+            self._textos = self.canv.beginText()
+            self._textos.setFont(cellstyle.fontname, cellstyle.fontsize, cellstyle.leading)
+            self._textos.setFillColor(cellstyle.color)
+        colpos, rowpos = pos
+        colwidth, rowheight = size
+        x = colpos + (colwidth + cellstyle.leftPadding - cellstyle.rightPadding - _ancho_texto(cellval))/2
+        y = rowpos + (cellstyle.bottomPadding + rowheight - cellstyle.topPadding + cellstyle.leading)/2 - cellstyle.fontsize
+        self._textos.setTextOrigin(x, y)
+        self._textos._textOut(cellval)
+
+
+def tabla_reporte(columnas, filas, color):
+    """Tabla de `filas` con las `columnas` de un reporte (ver `generar_reporte_pdf`)."""
+    datos_tabla = [recursos_reporte().encabezado_tabla(columnas)]
+    for i, fila in enumerate(filas):
+        datos_tabla.append(celdas_fila(columnas, fila, i + 1))
+    tabla = Table(datos_tabla, colWidths=[ancho*inch for _, ancho, _ in columnas])
+    tabla.setStyle(estilo_tabla(color))
+    return tabla
+
+
+class TablaPorPaginas(Flowable):
+    """
+    Tabla de un reporte que va leyendo sus filas mientras se arma el PDF.
+
+    Cada fila se lee y se mide (su alto) una sola vez. Solo se tienen en
+    memoria las filas de la página que se está armando: en cada página se
+    dibuja una LongTable con el encabezado y las filas que entran, y el resto
+    de la tabla sigue en la página siguiente. Con `rapido` las celdas que
+    entran en una línea van como texto simple (ver `celdas_fila`).
+    """
+
+    def __init__(self, columnas, filas, color, rapido=False):
+        super().__init__()
+        self.columnas = columnas
+        self.filas = filas
+        self.color = color
+        self.rapido = rapido
+        self.anchos = [ancho*inch for _, ancho, _ in columnas]
+        self.anchos_texto = [ancho - 2*RELLENO_HORIZONTAL for ancho in self.anchos] if rapido else None
+        self.encabezado = recursos_reporte().encabezado_tabla(columnas)
+        self.alto_encabezado = self._alto_fila(self.encabezado, RELLENO_ENCABEZADO)
+        self.pendientes = deque()  # (celdas, alto) de las filas leídas y aún no dibujadas
+        self.numero = 0  # Filas leídas hasta ahora
+
+    def _alto_fila(self, celdas, relleno):
+        # El mismo cálculo que hace Table con celdas de texto simple (una línea) o de un solo Paragraph
+        interlineado = recursos_reporte().celda.leading
+        return max(
+            interlineado if isinstance(celda, str) else celda.wrap(ancho - 2*RELLENO_HORIZONTAL, 72000)[1]
+            for celda, ancho in zip(celdas, self.anchos)
+        ) + 2*relleno
+
+    def _leer_fila(self):
+        fila = next(self.filas, None)
+        if fila is None:
+            return False
+        self.numero += 1
+        celdas = celdas_fila(self.columnas, fila, self.numero, self.anchos_texto)
+        self.pendientes.append((celdas, self._alto_fila(celdas, RELLENO_FILAS)))
+        return True
+
+    def _tabla(self, filas):
+        tabla = (TablaRapida if self.rapido else LongTable)(
+            [self.encabezado, *(celdas for celdas, _ in filas)], colWidths=self.anchos,
+            rowHeights=[self.alto_encabezado, *(alto for _, alto in filas)], repeatRows=1,
+        )
+        tabla.setStyle(estilo_tabla(self.color))
+        return tabla
+
+    def wrap(self, ancho_disponible, alto_disponible):
+        # Se leen filas hasta pasar el alto disponible o terminarlas
+        alto = self.alto_encabezado + sum(alto_fila for _, alto_fila in self.pendientes)
+        while alto <= alto_disponible and self._leer_fila():
+            alto += self.pendientes[-1][1]
+        self.width, self.height = sum(self.anchos), alto
+        return self.width, self.height
+
+    def split(self, ancho_disponible, alto_disponible):
+        alto = self.alto_encabezado
+        entran = 0
+        for _, alto_fila in self.pendientes:
+            if alto + alto_fila > alto_disponible:
+                break
+            alto += alto_fila
+            entran += 1
+        if not entran:
+            return []
+        pagina = [self.pendientes.popleft() for _ in range(entran)]
+        resto = TablaPorPaginas(self.columnas, self.filas, self.color, self.rapido)
+        resto.pendientes, resto.numero = self.pendientes, self.numero
+        return [self._tabla(pagina), resto]
+
+    def draw(self):
+        tabla = self._tabla(self.pendientes)
+        tabla.wrapOn(self.canv, self.width, self.height)
+        tabla.drawOn(self.canv, 0, 0)
+
+
+class CanvasPaginasComprimidas(Canvas):
+    """
+    Canvas que comprime el contenido de cada página al terminarla, en lugar de
+    guardarlo como texto hasta escribir el PDF.
+    """
+
+    def showPage(self):
+        super().showPage()
+        pagina = self._doc.Pages.pages[-1]
+        contenido = PDFStream(content=PDFZCompress.encode(pagina.stream))
+        contenido.dictionary['Filter'] = PDFArray([PDFName(PDFZCompress.pdfname)])
+        pagina.Contents = contenido
+        pagina.stream = None
+
+
+def generar_reporte_pdf(titulo_reporte, info_reporte, columnas, filas, color, resumen=None, en_streaming=False,
+                        rapido=False):
+    """
+    Arma un reporte con el formato común y devuelve el archivo con el PDF
+    (un BytesIO o, con `en_streaming`, un archivo temporal), al inicio.
+
+    `info_reporte` son las líneas bajo el título (se agrega la fecha de
+    generación). `columnas` es una lista de (título, ancho en pulgadas,
+    valor), donde `valor(fila)` da el texto de la celda (o es NUMERO para el
+    número de fila), y `filas` las filas de la tabla. `resumen` es el texto
+    bajo la tabla (con las marcas de Paragraph), si lo hay.
+    """
+    recursos = recursos_reporte()
+    if en_streaming:
+        buffer = tempfile.SpooledTemporaryFile(max_size=TAMANO_MAXIMO_PDF_EN_MEMORIA)
+    else:
+        buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=40, bottomMargin=40, pageCompression=1
+    )
 
-    linea_firma = "____________________________________"
-    nombre_firmante = "MY. ANDELSON JOSE PINTO HERRERA"
-    cargo_firmante = "JEFE DEL DEPARTAMENTO BIENES PÚBLICOS"
+    elementos = recursos.membrete()
+    elementos.append(Paragraph(titulo_reporte, recursos.titulo))
+    for info in [*info_reporte, f"Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}"]:
+        elementos.append(Paragraph(info, recursos.texto))
+    elementos.append(Spacer(1, 0.3*inch))
 
-    p_linea = Paragraph(linea_firma, styles['Normal'])
-    p_linea.style.alignment = 1
-    p_nombre = Paragraph(nombre_firmante, styles['Normal'])
-    p_nombre.style.alignment = 1
-    p_cargo = Paragraph(cargo_firmante, styles['Normal'])
-    p_cargo.style.alignment = 1
+    if en_streaming or rapido:
+        elementos.append(TablaPorPaginas(columnas, iter(filas), color, rapido))
+    else:
+        elementos.append(tabla_reporte(columnas, filas, color))
+    elementos.append(Spacer(1, 0.3*inch))
 
-    elementos.append(p_linea)
-    elementos.append(p_nombre)
-    elementos.append(p_cargo)
+    if resumen:
+        elementos.append(Paragraph(resumen, recursos.texto))
+        elementos.append(Spacer(1, 0.3*inch))
 
-    # Construir el PDF
-    doc.build(elementos, onFirstPage=draw_logo)
+    elementos.extend(recursos.firma())
 
-    # 8. Devolver el buffer con el PDF generado
+    doc.build(
+        elementos, onFirstPage=recursos.dibujar_primera_pagina,
+        canvasmaker=CanvasPaginasComprimidas if en_streaming else Canvas,
+    )
     buffer.seek(0)
     return buffer
 
-def generar_reporte_desincorporados_pdf(movimientos_queryset, fecha_desde, fecha_hasta, titulo_reporte):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=40, bottomMargin=40)
-    elementos = []
-    styles = getSampleStyleSheet()
-
-    # Encabezado (Membrete y Logo)
-    logo_path = os.path.join(settings.BASE_DIR, 'static/images/logo_ipsfa.png')
-    logo = None
-    if os.path.exists(logo_path):
-        logo = logo_path
-    membrete_text = (
-        'REPÚBLICA BOLIVARIANA DE VENEZUELA<br/>'
-        'MINISTERIO DEL PODER POPULAR PARA LA DEFENSA<br/>'
-        'VICEMINISTERIO DE SERVICIOS, PERSONAL Y LOGÍSTICA<br/>'
-        'DIRECCIÓN GENERAL DE EMPRESAS Y SERVICIOS<br/>'
-        'INSTITUTO DE PREVISIÓN SOCIAL DE LA FUERZA ARMADA NACIONAL BOLIVARIANA<br/>'
-        'GERENCIA DE FINANZAS<br/>'
-        'UNIDAD DE BIENES PÚBLICOS'
-    )
-    membrete_paragraph = Paragraph(membrete_text, styles['Normal'])
-    elementos.append(membrete_paragraph)
-    elementos.append(Spacer(1, 0.2*inch))
-
-    def draw_logo(canvas, doc):
-        if logo:
-            canvas.drawImage(logo, doc.leftMargin, doc.height + doc.topMargin - 0.8*inch, width=0.8*inch, height=0.8*inch, mask='auto')
-        # Agregar marca de agua
-        draw_watermark(canvas, doc)
-
-    # Título del Reporte
-    titulo = Paragraph(titulo_reporte, styles['h2'])
-    titulo.style.alignment = 1
-    elementos.append(titulo)
-
-    # Información específica de desincorporaciones
-    info_reporte = []
-    info_reporte.append(f"Período: Desde {fecha_desde} Hasta {fecha_hasta}")
-    info_reporte.append(f"Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}")
-    
-    for info in info_reporte:
-        info_paragraph = Paragraph(info, styles['Normal'])
-        info_paragraph.style.alignment = 1
-        elementos.append(info_paragraph)
-    
-    elementos.append(Spacer(1, 0.3*inch))
 
-    # Tabla de Datos - Columnas específicas para desincorporaciones
-    columnas = ['N°', 'FECHA DESINC.', 'CÓDIGO PATRIMONIAL', 'DESCRIPCIÓN', 'CATEGORÍA', 'VALOR ORIGINAL (Bs.)', 'MOTIVO DESINCORPORACIÓN']
-    
-    cell_style = styles['Normal'].clone('cell_style')
-    cell_style.fontSize = 7
-    cell_style.leading = 8
-    cell_style.wordWrap = 'LTR'
-    
-    header_style = styles['Normal'].clone('header_style')
-    header_style.fontSize = 7
-    header_style.leading = 8
-    header_style.wordWrap = 'LTR'
-    header_style.alignment = 1
-    
-    columnas_paragraph = [
-        Paragraph(f'<font color="white"><b>{col}</b></font>', header_style) for col in columnas
-    ]
-    datos_tabla = [columnas_paragraph]
-    
-    for i, movimiento in enumerate(movimientos_queryset):
-        categoria_nombre = movimiento.bien.categoria.nombre if movimiento.bien.categoria else 'N/A'
-        datos_tabla.append([
-            Paragraph(str(i + 1), cell_style),
-            Paragraph(movimiento.fecha_movimiento.strftime('%d/%m/%Y'), cell_style),
-            Paragraph(str(movimiento.bien.codigo_patrimonial), cell_style),
-            Paragraph(str(movimiento.bien.descripcion), cell_style),
-            Paragraph(str(categoria_nombre), cell_style),
-            Paragraph(f"{movimiento.bien.valor_unitario_bs:,.2f}", cell_style),
-            Paragraph(str(movimiento.motivo_desincorporacion or 'No especificado'), cell_style),
-        ])
-
-    tabla_reporte = Table(
-        datos_tabla,
-        colWidths=[0.4*inch, 0.8*inch, 1.0*inch, 1.8*inch, 0.8*inch, 1.0*inch, 1.2*inch]
-    )
-    tabla_reporte.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#DC143C')),  # Rojo para desincorporaciones
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 7),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('TOPPADDING', (0, 0), (-1, 0), 8),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 7),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-        ('TOPPADDING', (0, 1), (-1, -1), 4),
-        # Sin ROWBACKGROUNDS para que las filas sean transparentes
-    ]))
-    elementos.append(tabla_reporte)
-    elementos.append(Spacer(1, 0.3*inch))
-
-    # Resumen específico de desincorporaciones
-    if movimientos_queryset.count() > 0:
-        total_valor = sum(movimiento.bien.valor_unitario_bs for movimiento in movimientos_queryset)
-        categorias_count = {}
-        motivos_count = {}
-        
-        for movimiento in movimientos_queryset:
-            categoria = movimiento.bien.categoria.nombre if movimiento.bien.categoria else 'Sin Categoría'
-            categorias_count[categoria] = categorias_count.get(categoria, 0) + 1
-            
-            motivo = movimiento.motivo_desincorporacion or 'No especificado'
-            motivos_count[motivo] = motivos_count.get(motivo, 0) + 1
-        
-        resumen_text = f"""
-        <b>RESUMEN DE DESINCORPORACIONES:</b><br/>
-        • Total de Bienes Desincorporados: {movimientos_queryset.count()}<br/>
-        • Valor Total Desincorporado: Bs. {total_valor:,.2f}<br/>
-        • Distribución por Categoría: {', '.join([f'{categoria}: {count}' for categoria, count in list(categorias_count.items())[:3]])}<br/>
-        • Principales Motivos: {', '.join([f'{motivo}: {count}' for motivo, count in list(motivos_count.items())[:3]])}
+def _periodo(fecha_desde, fecha_hasta):
+    if fecha_desde != 'N/A' and fecha_hasta != 'N/A':
+        return [f"Período: Desde {fecha_desde} Hasta {fecha_hasta}"]
+    return []
+
+
+# Las columnas reciben las filas de `datos_reportes.filas_reporte`
+
+def _depreciacion_acumulada(bien):
+    return bien['ultima_depreciacion_acumulada'] or 0
+
+
+def _valor_neto(bien):
+    return bien['ultimo_valor_neto'] or bien['valor_unitario_bs']
+
+
+def _porcentaje_depreciacion(bien):
+    return (_depreciacion_acumulada(bien) / bien['valor_unitario_bs'] * 100) if bien['valor_unitario_bs'] > 0 else 0
+
+
+def _fecha_movimiento(movimiento):
+    return movimiento['fecha_movimiento'].strftime('%d/%m/%Y')
+
+
+COLUMNAS_INVENTARIO = [
+    ('N°', 0.4, NUMERO),
+    ('CÓDIGO PATRIMONIAL', 1.0, lambda bien: bien['codigo_patrimonial']),
+    ('DESCRIPCIÓN', 1.5, lambda bien: bien['descripcion']),
+    ('MARCA', 0.7, lambda bien: bien['marca'] or ''),
+    ('MODELO', 0.7, lambda bien: bien['modelo'] or ''),
+    ('SERIAL', 0.8, lambda bien: bien['serial'] or ''),
+    ('UNIDAD ASIGNADA', 1.0, lambda bien: bien['unidad_administrativa_actual__nombre'] or 'N/A'),
+    ('ESTADO', 0.6, lambda bien: nombre_estado(bien['estado_bien'])),
+    ('VALOR (Bs.)', 0.8, lambda bien: f"{bien['valor_unitario_bs']:,.2f}"),
+]
+
+COLUMNAS_UNIDAD = [
+    ('N°', 0.4, NUMERO),
+    ('CÓDIGO PATRIMONIAL', 1.0, lambda bien: bien['codigo_patrimonial']),
+    ('DESCRIPCIÓN', 1.3, lambda bien: bien['descripcion']),
+    ('CATEGORÍA', 0.8, lambda bien: bien['categoria__nombre'] or 'N/A'),
+    ('MARCA', 0.6, lambda bien: bien['marca'] or ''),
+    ('MODELO', 0.6, lambda bien: bien['modelo'] or ''),
+    ('SERIAL', 0.8, lambda bien: bien['serial'] or ''),
+    ('ESTADO', 0.6, lambda bien: nombre_estado(bien['estado_bien'])),
+    ('VALOR (Bs.)', 0.8, lambda bien: f"{bien['valor_unitario_bs']:,.2f}"),
+]
+
+COLUMNAS_DESINCORPORADOS = [
+    ('N°', 0.4, NUMERO),
+    ('FECHA DESINC.', 0.8, _fecha_movimiento),
+    ('CÓDIGO PATRIMONIAL', 1.0, lambda movimiento: movimiento['bien__codigo_patrimonial']),
+    ('DESCRIPCIÓN', 1.8, lambda movimiento: movimiento['bien__descripcion']),
+    ('CATEGORÍA', 0.8, lambda movimiento: movimiento['bien__categoria__nombre'] or 'N/A'),
+    ('VALOR ORIGINAL (Bs.)', 1.0, lambda movimiento: f"{movimiento['bien__valor_unitario_bs']:,.2f}"),
+    ('MOTIVO DESINCORPORACIÓN', 1.2, lambda movimiento: movimiento['motivo_desincorporacion'] or 'No especificado'),
+]
+
+COLUMNAS_TRASLADOS = [
+    ('N°', 0.4, NUMERO),
+    ('FECHA TRASLADO', 0.8, _fecha_movimiento),
+    ('CÓDIGO PATRIMONIAL', 1.0, lambda movimiento: movimiento['bien__codigo_patrimonial']),
+    ('DESCRIPCIÓN', 1.5, lambda movimiento: movimiento['bien__descripcion']),
+    ('UNIDAD ORIGEN', 1.0, lambda movimiento: movimiento['unidad_origen__nombre'] or 'N/A'),
+    ('UNIDAD DESTINO', 1.0, lambda movimiento: movimiento['unidad_destino__nombre'] or 'N/A'),
+    ('RESPONSABLE', 1.0, lambda movimiento: movimiento['responsable_nuevo_nombre'] or 'No especificado'),
+    ('N° OFICIO', 0.8, lambda movimiento: movimiento['numero_oficio_referencia'] or 'N/A'),
+]
+
+COLUMNAS_DEPRECIACION = [
+    ('N°', 0.3, NUMERO),
+    ('CÓDIGO PATRIMONIAL', 0.8, lambda bien: bien['codigo_patrimonial']),
+    ('DESCRIPCIÓN', 1.2, lambda bien: bien['descripcion']),
+    ('CATEGORÍA', 0.8, lambda bien: bien['categoria__nombre'] or 'N/A'),
+    ('VALOR ORIGINAL (Bs.)', 1.0, lambda bien: f"{bien['valor_unitario_bs']:,.2f}"),
+    ('DEPRECIACIÓN ACUMULADA (Bs.)', 1.0, lambda bien: f"{_depreciacion_acumulada(bien):,.2f}"),
+    ('VALOR NETO EN LIBROS (Bs.)', 1.0, lambda bien: f"{_valor_neto(bien):,.2f}"),
+    ('% DEPRECIACIÓN', 0.6, lambda bien: f"{_porcentaje_depreciacion(bien):.1f}%"),
+]
+
+
+def _distribucion(conteos, maximo=None):
+    return ', '.join([f'{nombre}: {count}' for nombre, count in list(conteos.items())[:maximo]])
+
+
+def _distribucion_estados(conteos):
+    return _distribucion({nombre_estado(estado): cantidad for estado, cantidad in conteos.items()})
+
+
+def generar_reporte_inventario_pdf(bienes_queryset, fecha_desde, fecha_hasta, titulo_reporte="INVENTARIO GENERAL DE BIENES PÚBLICOS", en_streaming=False, rapido=False):
+    estadisticas = resumen_reporte(bienes_queryset, {'estado_bien': ''}, {'valor': 'valor_unitario_bs'})
+    resumen = None
+    if estadisticas.cantidad > 0:
+        resumen = f"""
+        <b>RESUMEN ESTADÍSTICO:</b><br/>
+        • Total de Bienes: {estadisticas.cantidad}<br/>
+        • Valor Total: Bs. {estadisticas.totales['valor']:,.2f}<br/>
+        • Distribución por Estado: {_distribucion_estados(estadisticas.distribuciones['estado_bien'])}
         """
-        resumen_paragraph = Paragraph(resumen_text, styles['Normal'])
-        elementos.append(resumen_paragraph)
-        elementos.append(Spacer(1, 0.3*inch))
 
-    # Pie de página (Firma)
-    elementos.append(Spacer(1, 1.5*inch))
-    linea_firma = "____________________________________"
-    nombre_firmante = "MY. ANDELSON JOSE PINTO HERRERA"
-    cargo_firmante = "JEFE DEL DEPARTAMENTO DE BIENES PÚBLICOS"
-    
-    p_linea = Paragraph(linea_firma, styles['Normal'])
-    p_linea.style.alignment = 1
-    p_nombre = Paragraph(nombre_firmante, styles['Normal'])
-    p_nombre.style.alignment = 1
-    p_cargo = Paragraph(cargo_firmante, styles['Normal'])
-    p_cargo.style.alignment = 1
-    
-    elementos.append(p_linea)
-    elementos.append(p_nombre)
-    elementos.append(p_cargo)
-
-    doc.build(elementos, onFirstPage=draw_logo)
-    buffer.seek(0)
-    return buffer
+    return generar_reporte_pdf(
+        titulo_reporte, _periodo(fecha_desde, fecha_hasta), COLUMNAS_INVENTARIO,
+        filas_reporte(bienes_queryset, CAMPOS_BIEN), COLOR_INVENTARIO, resumen, en_streaming, rapido
+    )
 
-def generar_reporte_traslados_pdf(movimientos_queryset, fecha_desde, fecha_hasta, titulo_reporte):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=40, bottomMargin=40)
-    elementos = []
-    styles = getSampleStyleSheet()
-
-    # Encabezado (Membrete y Logo)
-    logo_path = os.path.join(settings.BASE_DIR, 'static/images/logo_ipsfa.png')
-    logo = None
-    if os.path.exists(logo_path):
-        logo = logo_path
-    membrete_text = (
-        'REPÚBLICA BOLIVARIANA DE VENEZUELA<br/>'
-        'MINISTERIO DEL PODER POPULAR PARA LA DEFENSA<br/>'
-        'VICEMINISTERIO DE SERVICIOS, PERSONAL Y LOGÍSTICA<br/>'
-        'DIRECCIÓN GENERAL DE EMPRESAS Y SERVICIOS<br/>'
-        'INSTITUTO DE PREVISIÓN SOCIAL DE LA FUERZA ARMADA NACIONAL BOLIVARIANA<br/>'
-        'GERENCIA DE FINANZAS<br/>'
-        'UNIDAD DE BIENES PÚBLICOS'
+def generar_reporte_desincorporados_pdf(movimientos_queryset, fecha_desde, fecha_hasta, titulo_reporte, en_streaming=False, rapido=False):
+    estadisticas = resumen_reporte(
+        movimientos_queryset,
+        {'bien__categoria__nombre': 'Sin Categoría', 'motivo_desincorporacion': 'No especificado'},
+        {'valor': 'bien__valor_unitario_bs'},
     )
-    membrete_paragraph = Paragraph(membrete_text, styles['Normal'])
-    elementos.append(membrete_paragraph)
-    elementos.append(Spacer(1, 0.2*inch))
-
-    def draw_logo(canvas, doc):
-        if logo:
-            canvas.drawImage(logo, doc.leftMargin, doc.height + doc.topMargin - 0.8*inch, width=0.8*inch, height=0.8*inch, mask='auto')
-        # Agregar marca de agua
-        draw_watermark(canvas, doc)
-
-    # Título del Reporte
-    titulo = Paragraph(titulo_reporte, styles['h2'])
-    titulo.style.alignment = 1
-    elementos.append(titulo)
-
-    # Información específica de traslados
-    info_reporte = []
-    info_reporte.append(f"Período: Desde {fecha_desde} Hasta {fecha_hasta}")
-    info_reporte.append(f"Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}")
-    
-    for info in info_reporte:
-        info_paragraph = Paragraph(info, styles['Normal'])
-        info_paragraph.style.alignment = 1
-        elementos.append(info_paragraph)
-    
-    elementos.append(Spacer(1, 0.3*inch))
+    resumen = None
+    if estadisticas.cantidad > 0:
+        resumen = f"""
+        <b>RESUMEN DE DESINCORPORACIONES:</b><br/>
+        • Total de Bienes Desincorporados: {estadisticas.cantidad}<br/>
+        • Valor Total Desincorporado: Bs. {estadisticas.totales['valor']:,.2f}<br/>
+        • Distribución por Categoría: {_distribucion(estadisticas.distribuciones['bien__categoria__nombre'], 3)}<br/>
+        • Principales Motivos: {_distribucion(estadisticas.distribuciones['motivo_desincorporacion'], 3)}
+        """
 
-    # Tabla de Datos - Columnas específicas para traslados
-    columnas = ['N°', 'FECHA TRASLADO', 'CÓDIGO PATRIMONIAL', 'DESCRIPCIÓN', 'UNIDAD ORIGEN', 'UNIDAD DESTINO', 'RESPONSABLE', 'N° OFICIO']
-    
-    cell_style = styles['Normal'].clone('cell_style')
-    cell_style.fontSize = 7
-    cell_style.leading = 8
-    cell_style.wordWrap = 'LTR'
-    
-    header_style = styles['Normal'].clone('header_style')
-    header_style.fontSize = 7
-    header_style.leading = 8
-    header_style.wordWrap = 'LTR'
-    header_style.alignment = 1
-    
-    columnas_paragraph = [
-        Paragraph(f'<font color="white"><b>{col}</b></font>', header_style) for col in columnas
-    ]
-    datos_tabla = [columnas_paragraph]
-    
-    for i, movimiento in enumerate(movimientos_queryset):
-        datos_tabla.append([
-            Paragraph(str(i + 1), cell_style),
-            Paragraph(movimiento.fecha_movimiento.strftime('%d/%m/%Y'), cell_style),
-            Paragraph(str(movimiento.bien.codigo_patrimonial), cell_style),
-            Paragraph(str(movimiento.bien.descripcion), cell_style),
-            Paragraph(str(movimiento.unidad_origen.nombre if movimiento.unidad_origen else 'N/A'), cell_style),
-            Paragraph(str(movimiento.unidad_destino.nombre if movimiento.unidad_destino else 'N/A'), cell_style),
-            Paragraph(str(movimiento.responsable_nuevo_nombre or 'No especificado'), cell_style),
-            Paragraph(str(movimiento.numero_oficio_referencia or 'N/A'), cell_style)
-        ])
-
-    tabla_reporte = Table(
-        datos_tabla,
-        colWidths=[0.4*inch, 0.8*inch, 1.0*inch, 1.5*inch, 1.0*inch, 1.0*inch, 1.0*inch, 0.8*inch]
+    info_reporte = [f"Período: Desde {fecha_desde} Hasta {fecha_hasta}"]
+    return generar_reporte_pdf(
+        titulo_reporte, info_reporte, COLUMNAS_DESINCORPORADOS,
+        filas_reporte(movimientos_queryset, CAMPOS_MOVIMIENTO), COLOR_DESINCORPORADOS, resumen, en_streaming, rapido
     )
-    tabla_reporte.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#FF8C00')),  # Naranja para traslados
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 7),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('TOPPADDING', (0, 0), (-1, 0), 8),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 7),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-        ('TOPPADDING', (0, 1), (-1, -1), 4),
-        # Sin ROWBACKGROUNDS para que las filas sean transparentes
-    ]))
-    elementos.append(tabla_reporte)
-    elementos.append(Spacer(1, 0.3*inch))
 
-    # Resumen específico de traslados
-    if movimientos_queryset.count() > 0:
-        unidades_origen_count = {}
-        unidades_destino_count = {}
-        responsables_count = {}
-        
-        for movimiento in movimientos_queryset:
-            origen = movimiento.unidad_origen.nombre if movimiento.unidad_origen else 'Sin Origen'
-            unidades_origen_count[origen] = unidades_origen_count.get(origen, 0) + 1
-            
-            destino = movimiento.unidad_destino.nombre if movimiento.unidad_destino else 'Sin Destino'
-            unidades_destino_count[destino] = unidades_destino_count.get(destino, 0) + 1
-            
-            responsable = movimiento.responsable_nuevo_nombre or 'No especificado'
-            responsables_count[responsable] = responsables_count.get(responsable, 0) + 1
-        
-        resumen_text = f"""
+def generar_reporte_traslados_pdf(movimientos_queryset, fecha_desde, fecha_hasta, titulo_reporte, en_streaming=False, rapido=False):
+    estadisticas = resumen_reporte(movimientos_queryset, {
+        'unidad_origen__nombre': 'Sin Origen',
+        'unidad_destino__nombre': 'Sin Destino',
+        'responsable_nuevo_nombre': 'No especificado',
+    })
+    resumen = None
+    if estadisticas.cantidad > 0:
+        resumen = f"""
         <b>RESUMEN DE TRASLADOS:</b><br/>
-        • Total de Traslados: {movimientos_queryset.count()}<br/>
-        • Principales Unidades Origen: {', '.join([f'{origen}: {count}' for origen, count in list(unidades_origen_count.items())[:3]])}<br/>
-        • Principales Unidades Destino: {', '.join([f'{destino}: {count}' for destino, count in list(unidades_destino_count.items())[:3]])}<br/>
-        • Principales Responsables: {', '.join([f'{responsable}: {count}' for responsable, count in list(responsables_count.items())[:3]])}
+        • Total de Traslados: {estadisticas.cantidad}<br/>
+        • Principales Unidades Origen: {_distribucion(estadisticas.distribuciones['unidad_origen__nombre'], 3)}<br/>
+        • Principales Unidades Destino: {_distribucion(estadisticas.distribuciones['unidad_destino__nombre'], 3)}<br/>
+        • Principales Responsables: {_distribucion(estadisticas.distribuciones['responsable_nuevo_nombre'], 3)}
         """
-        resumen_paragraph = Paragraph(resumen_text, styles['Normal'])
-        elementos.append(resumen_paragraph)
-        elementos.append(Spacer(1, 0.3*inch))
 
-    # Pie de página (Firma)
-    elementos.append(Spacer(1, 1.5*inch))
-    linea_firma = "____________________________________"
-    nombre_firmante = "MY. ANDELSON JOSE PINTO HERRERA"
-    cargo_firmante = "JEFE DEL DEPARTAMENTO DE BIENES PÚBLICOS"
-    
-    p_linea = Paragraph(linea_firma, styles['Normal'])
-    p_linea.style.alignment = 1
-    p_nombre = Paragraph(nombre_firmante, styles['Normal'])
-    p_nombre.style.alignment = 1
-    p_cargo = Paragraph(cargo_firmante, styles['Normal'])
-    p_cargo.style.alignment = 1
-    
-    elementos.append(p_linea)
-    elementos.append(p_nombre)
-    elementos.append(p_cargo)
-
-    doc.build(elementos, onFirstPage=draw_logo)
-    buffer.seek(0)
-    return buffer
-
-# --- NUEVA FUNCIÓN PARA REPORTE DE DEPRECIACIÓN ---
-def generar_reporte_depreciacion_pdf(bienes_con_depreciacion, fecha_hasta, titulo_reporte):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=40, bottomMargin=40)
-    elementos = []
-    styles = getSampleStyleSheet()
-
-    # Encabezado (logo y membrete)
-    logo_path = os.path.join(settings.BASE_DIR, 'static/images/logo_ipsfa.png')
-    logo = None
-    if os.path.exists(logo_path):
-        logo = logo_path
-    membrete_text = (
-        'REPÚBLICA BOLIVARIANA DE VENEZUELA<br/>'
-        'MINISTERIO DEL PODER POPULAR PARA LA DEFENSA<br/>'
-        'VICEMINISTERIO DE SERVICIOS, PERSONAL Y LOGÍSTICA<br/>'
-        'DIRECCIÓN GENERAL DE EMPRESAS Y SERVICIOS<br/>'
-        'INSTITUTO DE PREVISIÓN SOCIAL DE LA FUERZA ARMADA NACIONAL BOLIVARIANA<br/>'
-        'GERENCIA DE FINANZAS<br/>'
-        'UNIDAD DE BIENES PÚBLICOS'
+    info_reporte = [f"Período: Desde {fecha_desde} Hasta {fecha_hasta}"]
+    return generar_reporte_pdf(
+        titulo_reporte, info_reporte, COLUMNAS_TRASLADOS,
+        filas_reporte(movimientos_queryset, CAMPOS_MOVIMIENTO), COLOR_TRASLADOS, resumen, en_streaming, rapido
     )
-    membrete_paragraph = Paragraph(membrete_text, styles['Normal'])
-    elementos.append(membrete_paragraph)
-    elementos.append(Spacer(1, 0.2*inch))
-    
-    def draw_logo(canvas, doc):
-        if logo:
-            canvas.drawImage(logo, doc.leftMargin, doc.height + doc.topMargin - 0.8*inch, width=0.8*inch, height=0.8*inch, mask='auto')
-        # Agregar marca de agua
-        draw_watermark(canvas, doc)
-    
-    # Título y Fecha
-    titulo = Paragraph(titulo_reporte, styles['h2'])
-    titulo.style.alignment = 1
-    elementos.append(titulo)
-    
-    # Información específica de depreciación
-    info_reporte = []
-    info_reporte.append(f"Cálculos hasta la fecha: {fecha_hasta}")
-    info_reporte.append(f"Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}")
-    
-    for info in info_reporte:
-        info_paragraph = Paragraph(info, styles['Normal'])
-        info_paragraph.style.alignment = 1
-        elementos.append(info_paragraph)
-    
-    elementos.append(Spacer(1, 0.3*inch))
-    
-    # Tabla de Datos - Columnas específicas para depreciación
-    columnas = ['N°', 'CÓDIGO PATRIMONIAL', 'DESCRIPCIÓN', 'CATEGORÍA', 'VALOR ORIGINAL (Bs.)', 'DEPRECIACIÓN ACUMULADA (Bs.)', 'VALOR NETO EN LIBROS (Bs.)', '% DEPRECIACIÓN']
-    
-    cell_style = styles['Normal'].clone('cell_style')
-    cell_style.fontSize = 7
-    cell_style.leading = 8
-    cell_style.wordWrap = 'LTR'
-    
-    header_style = styles['Normal'].clone('header_style')
-    header_style.fontSize = 7
-    header_style.leading = 8
-    header_style.wordWrap = 'LTR'
-    header_style.alignment = 1
-    
-    columnas_paragraph = [
-        Paragraph(f'<font color="white"><b>{col}</b></font>', header_style) for col in columnas
-    ]
-    datos_tabla = [columnas_paragraph]
-    
-    for i, bien in enumerate(bienes_con_depreciacion):
-        depreciacion_acumulada = bien.ultima_depreciacion_acumulada or 0
-        valor_neto = bien.ultimo_valor_neto or bien.valor_unitario_bs
-        porcentaje_depreciacion = (depreciacion_acumulada / bien.valor_unitario_bs * 100) if bien.valor_unitario_bs > 0 else 0
-        categoria_nombre = bien.categoria.nombre if bien.categoria else 'N/A'
-        
-        datos_tabla.append([
-            Paragraph(str(i + 1), cell_style),
-            Paragraph(str(bien.codigo_patrimonial), cell_style),
-            Paragraph(str(bien.descripcion), cell_style),
-            Paragraph(str(categoria_nombre), cell_style),
-            Paragraph(f"{bien.valor_unitario_bs:,.2f}", cell_style),
-            Paragraph(f"{depreciacion_acumulada:,.2f}", cell_style),
-            Paragraph(f"{valor_neto:,.2f}", cell_style),
-            Paragraph(f"{porcentaje_depreciacion:.1f}%", cell_style)
-        ])
-
-    tabla_reporte = Table(
-        datos_tabla,
-        colWidths=[0.3*inch, 0.8*inch, 1.2*inch, 0.8*inch, 1.0*inch, 1.0*inch, 1.0*inch, 0.6*inch]
-    )
-    tabla_reporte.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4169E1')),  # Azul para depreciación
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 7),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('TOPPADDING', (0, 0), (-1, 0), 8),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 7),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-        ('TOPPADDING', (0, 1), (-1, -1), 4),
-        # Sin ROWBACKGROUNDS para que las filas sean transparentes
-    ]))
-    elementos.append(tabla_reporte)
-    elementos.append(Spacer(1, 0.3*inch))
 
-    # Resumen específico de depreciación
-    if bienes_con_depreciacion.count() > 0:
-        total_valor_original = sum(bien.valor_unitario_bs for bien in bienes_con_depreciacion)
-        total_depreciacion_acumulada = sum(bien.ultima_depreciacion_acumulada or 0 for bien in bienes_con_depreciacion)
-        total_valor_neto = sum(bien.ultimo_valor_neto or bien.valor_unitario_bs for bien in bienes_con_depreciacion)
+# --- NUEVA FUNCIÓN PARA REPORTE DE DEPRECIACIÓN ---
+def generar_reporte_depreciacion_pdf(bienes_con_depreciacion, fecha_hasta, titulo_reporte, en_streaming=False, rapido=False):
+    estadisticas = resumen_reporte(bienes_con_depreciacion, {'categoria__nombre': 'Sin Categoría'}, {
+        'valor_original': 'valor_unitario_bs',
+        'depreciacion_acumulada': 'ultima_depreciacion_acumulada',
+        'valor_neto': VALOR_NETO_DEPRECIACION,
+    })
+    resumen = None
+    if estadisticas.cantidad > 0:
+        total_valor_original = estadisticas.totales['valor_original']
+        total_depreciacion_acumulada = estadisticas.totales['depreciacion_acumulada']
         porcentaje_total_depreciacion = (total_depreciacion_acumulada / total_valor_original * 100) if total_valor_original > 0 else 0
-        
-        categorias_count = {}
-        for bien in bienes_con_depreciacion:
-            categoria = bien.categoria.nombre if bien.categoria else 'Sin Categoría'
-            categorias_count[categoria] = categorias_count.get(categoria, 0) + 1
-        
-        resumen_text = f"""
+
+        resumen = f"""
         <b>RESUMEN DE DEPRECIACIÓN ACUMULADA:</b><br/>
-        • Total de Bienes: {bienes_con_depreciacion.count()}<br/>
+        • Total de Bienes: {estadisticas.cantidad}<br/>
         • Valor Original Total: Bs. {total_valor_original:,.2f}<br/>
         • Depreciación Acumulada Total: Bs. {total_depreciacion_acumulada:,.2f}<br/>
-        • Valor Neto Total: Bs. {total_valor_neto:,.2f}<br/>
+        • Valor Neto Total: Bs. {estadisticas.totales['valor_neto']:,.2f}<br/>
         • Porcentaje Promedio de Depreciación: {porcentaje_total_depreciacion:.1f}%<br/>
-        • Distribución por Categoría: {', '.join([f'{categoria}: {count}' for categoria, count in list(categorias_count.items())[:3]])}
+        • Distribución por Categoría: {_distribucion(estadisticas.distribuciones['categoria__nombre'], 3)}
         """
-        resumen_paragraph = Paragraph(resumen_text, styles['Normal'])
-        elementos.append(resumen_paragraph)
-        elementos.append(Spacer(1, 0.3*inch))
 
-    # Pie de página (Firma)
-    elementos.append(Spacer(1, 1.5*inch))
-    linea_firma = "____________________________________"
-    nombre_firmante = "MY. ANDELSON JOSE PINTO HERRERA"
-    cargo_firmante = "JEFE DEL DEPARTAMENTO DE BIENES PÚBLICOS"
-    
-    p_linea = Paragraph(linea_firma, styles['Normal'])
-    p_linea.style.alignment = 1
-    p_nombre = Paragraph(nombre_firmante, styles['Normal'])
-    p_nombre.style.alignment = 1
-    p_cargo = Paragraph(cargo_firmante, styles['Normal'])
-    p_cargo.style.alignment = 1
-    
-    elementos.append(p_linea)
-    elementos.append(p_nombre)
-    elementos.append(p_cargo)
-    
-    doc.build(elementos, onFirstPage=draw_logo)
-    buffer.seek(0)
-    return buffer
+    info_reporte = [f"Cálculos hasta la fecha: {fecha_hasta}"]
+    return generar_reporte_pdf(
+        titulo_reporte, info_reporte, COLUMNAS_DEPRECIACION,
+        filas_reporte(bienes_con_depreciacion, CAMPOS_DEPRECIACION), COLOR_DEPRECIACION, resumen, en_streaming, rapido
+    )
 
-def generar_reporte_por_categoria_pdf(bienes_queryset, categoria_nombre, fecha_desde, fecha_hasta, titulo_reporte=None):
+def generar_reporte_por_categoria_pdf(bienes_queryset, categoria_nombre, fecha_desde, fecha_hasta, titulo_reporte=None, en_streaming=False, rapido=False):
     """Función específica para reporte por categoría con formato optimizado"""
     if titulo_reporte is None:
         titulo_reporte = f"INVENTARIO DE BIENES - CATEGORÍA: {categoria_nombre.upper()}"
-    
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                             rightMargin=30, leftMargin=30, topMargin=40, bottomMargin=40)
-    elementos = []
-    styles = getSampleStyleSheet()
-
-    # Encabezado (Membrete y Logo)
-    logo_path = os.path.join(settings.BASE_DIR, 'static/images/logo_ipsfa.png')
-    logo = None
-    if os.path.exists(logo_path):
-        logo = logo_path
-
-    membrete_text = (
-        'REPÚBLICA BOLIVARIANA DE VENEZUELA<br/>'
-        'MINISTERIO DEL PODER POPULAR PARA LA DEFENSA<br/>'
-        'VICEMINISTERIO DE SERVICIOS, PERSONAL Y LOGÍSTICA<br/>'
-        'DIRECCIÓN GENERAL DE EMPRESAS Y SERVICIOS<br/>'
-        'INSTITUTO DE PREVISIÓN SOCIAL DE LA FUERZA ARMADA NACIONAL BOLIVARIANA<br/>'
-        'GERENCIA DE FINANZAS<br/>'
-        'UNIDAD DE BIENES PÚBLICOS'
-    )
-    membrete_paragraph = Paragraph(membrete_text, styles['Normal'])
-    elementos.append(membrete_paragraph)
-    elementos.append(Spacer(1, 0.2*inch))
-
-    def draw_logo(canvas, doc):
-        if logo:
-            canvas.drawImage(logo, doc.leftMargin, doc.height + doc.topMargin - 0.8*inch, width=0.8*inch, height=0.8*inch, mask='auto')
-        # Agregar marca de agua
-        draw_watermark(canvas, doc)
-
-    # Título del Reporte
-    titulo = Paragraph(titulo_reporte, styles['h2'])
-    titulo.style.alignment = 1
-    elementos.append(titulo)
-
-    # Información específica de la categoría
-    info_reporte = []
-    info_reporte.append(f"Categoría: {categoria_nombre}")
-    if fecha_desde != 'N/A' and fecha_hasta != 'N/A':
-        info_reporte.append(f"Período: Desde {fecha_desde} Hasta {fecha_hasta}")
-    info_reporte.append(f"Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}")
-    
-    for info in info_reporte:
-        info_paragraph = Paragraph(info, styles['Normal'])
-        info_paragraph.style.alignment = 1
-        elementos.append(info_paragraph)
-    
-    elementos.append(Spacer(1, 0.3*inch))
 
-    # Tabla de Datos - Columnas específicas para categoría
-    columnas = ['N°', 'CÓDIGO PATRIMONIAL', 'DESCRIPCIÓN', 'MARCA', 'MODELO', 'SERIAL', 'UNIDAD ASIGNADA', 'ESTADO', 'VALOR (Bs.)']
-    
-    cell_style = styles['Normal'].clone('cell_style')
-    cell_style.fontSize = 7
-    cell_style.leading = 8
-    cell_style.wordWrap = 'LTR'
-    
-    header_style = styles['Normal'].clone('header_style')
-    header_style.fontSize = 7
-    header_style.leading = 8
-    header_style.wordWrap = 'LTR'
-    header_style.alignment = 1
-    
-    columnas_paragraph = [
-        Paragraph(f'<font color="white"><b>{col}</b></font>', header_style) for col in columnas
-    ]
-    datos_tabla = [columnas_paragraph]
-    
-    for i, bien in enumerate(bienes_queryset):
-        unidad_nombre = bien.unidad_administrativa_actual.nombre if bien.unidad_administrativa_actual else 'N/A'
-        datos_tabla.append([
-            Paragraph(str(i + 1), cell_style),
-            Paragraph(str(bien.codigo_patrimonial), cell_style),
-            Paragraph(str(bien.descripcion), cell_style),
-            Paragraph(str(bien.marca or ''), cell_style),
-            Paragraph(str(bien.modelo or ''), cell_style),
-            Paragraph(str(bien.serial or ''), cell_style),
-            Paragraph(str(unidad_nombre), cell_style),
-            Paragraph(str(bien.get_estado_bien_display()), cell_style),
-            Paragraph(f"{bien.valor_unitario_bs:,.2f}", cell_style),
-        ])
-
-    tabla_bienes = Table(
-        datos_tabla,
-        colWidths=[0.4*inch, 1.0*inch, 1.5*inch, 0.7*inch, 0.7*inch, 0.8*inch, 1.0*inch, 0.6*inch, 0.8*inch]
+    estadisticas = resumen_reporte(
+        bienes_queryset,
+        {'estado_bien': '', 'unidad_administrativa_actual__nombre': 'Sin Asignar'},
+        {'valor': 'valor_unitario_bs'},
     )
-    tabla_bienes.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E8B57')),  # Verde para categorías
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 7),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('TOPPADDING', (0, 0), (-1, 0), 8),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 7),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-        ('TOPPADDING', (0, 1), (-1, -1), 4),
-        # Sin ROWBACKGROUNDS para que las filas sean transparentes
-    ]))
-    elementos.append(tabla_bienes)
-    elementos.append(Spacer(1, 0.3*inch))
-
-    # Resumen específico de la categoría
-    if bienes_queryset.count() > 0:
-        total_valor = sum(bien.valor_unitario_bs for bien in bienes_queryset)
-        estados_count = {}
-        unidades_count = {}
-        for bien in bienes_queryset:
-            estado = bien.get_estado_bien_display()
-            estados_count[estado] = estados_count.get(estado, 0) + 1
-            
-            unidad = bien.unidad_administrativa_actual.nombre if bien.unidad_administrativa_actual else 'Sin Asignar'
-            unidades_count[unidad] = unidades_count.get(unidad, 0) + 1
-        
-        resumen_text = f"""
+    resumen = None
+    if estadisticas.cantidad > 0:
+        resumen = f"""
         <b>RESUMEN DE LA CATEGORÍA "{categoria_nombre.upper()}":</b><br/>
-        • Total de Bienes: {bienes_queryset.count()}<br/>
-        • Valor Total: Bs. {total_valor:,.2f}<br/>
-        • Distribución por Estado: {', '.join([f'{estado}: {count}' for estado, count in estados_count.items()])}<br/>
-        • Distribución por Unidad: {', '.join([f'{unidad}: {count}' for unidad, count in list(unidades_count.items())[:3]])}
+        • Total de Bienes: {estadisticas.cantidad}<br/>
+        • Valor Total: Bs. {estadisticas.totales['valor']:,.2f}<br/>
+        • Distribución por Estado: {_distribucion_estados(estadisticas.distribuciones['estado_bien'])}<br/>
+        • Distribución por Unidad: {_distribucion(estadisticas.distribuciones['unidad_administrativa_actual__nombre'], 3)}
         """
-        resumen_paragraph = Paragraph(resumen_text, styles['Normal'])
-        elementos.append(resumen_paragraph)
-        elementos.append(Spacer(1, 0.3*inch))
-
-    # Pie de página (Firma)
-    elementos.append(Spacer(1, 1.5*inch))
-    linea_firma = "____________________________________"
-    nombre_firmante = "MY. ANDELSON JOSE PINTO HERRERA"
-    cargo_firmante = "JEFE DEL DEPARTAMENTO BIENES PÚBLICOS"
-
-    p_linea = Paragraph(linea_firma, styles['Normal'])
-    p_linea.style.alignment = 1
-    p_nombre = Paragraph(nombre_firmante, styles['Normal'])
-    p_nombre.style.alignment = 1
-    p_cargo = Paragraph(cargo_firmante, styles['Normal'])
-    p_cargo.style.alignment = 1
-
-    elementos.append(p_linea)
-    elementos.append(p_nombre)
-    elementos.append(p_cargo)
 
-    doc.build(elementos, onFirstPage=draw_logo)
-    buffer.seek(0)
-    return buffer
+    info_reporte = [f"Categoría: {categoria_nombre}", *_periodo(fecha_desde, fecha_hasta)]
+    return generar_reporte_pdf(
+        titulo_reporte, info_reporte, COLUMNAS_INVENTARIO,
+        filas_reporte(bienes_queryset, CAMPOS_BIEN), COLOR_CATEGORIA, resumen, en_streaming, rapido
+    )
 
-def generar_reporte_por_unidad_pdf(bienes_queryset, unidad_nombre, fecha_desde, fecha_hasta, titulo_reporte=None):
+def generar_reporte_por_unidad_pdf(bienes_queryset, unidad_nombre, fecha_desde, fecha_hasta, titulo_reporte=None, en_streaming=False, rapido=False):
     """Función específica para reporte por unidad administrativa con formato optimizado"""
     if titulo_reporte is None:
         titulo_reporte = f"INVENTARIO DE BIENES - UNIDAD: {unidad_nombre.upper()}"
-    
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                             rightMargin=30, leftMargin=30, topMargin=40, bottomMargin=40)
-    elementos = []
-    styles = getSampleStyleSheet()
-
-    # Encabezado (Membrete y Logo)
-    logo_path = os.path.join(settings.BASE_DIR, 'static/images/logo_ipsfa.png')
-    logo = None
-    if os.path.exists(logo_path):
-        logo = logo_path
-
-    membrete_text = (
-        'REPÚBLICA BOLIVARIANA DE VENEZUELA<br/>'
-        'MINISTERIO DEL PODER POPULAR PARA LA DEFENSA<br/>'
-        'VICEMINISTERIO DE SERVICIOS, PERSONAL Y LOGÍSTICA<br/>'
-        'DIRECCIÓN GENERAL DE EMPRESAS Y SERVICIOS<br/>'
-        'INSTITUTO DE PREVISIÓN SOCIAL DE LA FUERZA ARMADA NACIONAL BOLIVARIANA<br/>'
-        'GERENCIA DE FINANZAS<br/>'
-        'UNIDAD DE BIENES PÚBLICOS'
-    )
-    membrete_paragraph = Paragraph(membrete_text, styles['Normal'])
-    elementos.append(membrete_paragraph)
-    elementos.append(Spacer(1, 0.2*inch))
-
-    def draw_logo(canvas, doc):
-        if logo:
-            canvas.drawImage(logo, doc.leftMargin, doc.height + doc.topMargin - 0.8*inch, width=0.8*inch, height=0.8*inch, mask='auto')
-        # Agregar marca de agua
-        draw_watermark(canvas, doc)
-
-    # Título del Reporte
-    titulo = Paragraph(titulo_reporte, styles['h2'])
-    titulo.style.alignment = 1
-    elementos.append(titulo)
-
-    # Información específica de la unidad
-    info_reporte = []
-    info_reporte.append(f"Unidad Administrativa: {unidad_nombre}")
-    if fecha_desde != 'N/A' and fecha_hasta != 'N/A':
-        info_reporte.append(f"Período: Desde {fecha_desde} Hasta {fecha_hasta}")
-    info_reporte.append(f"Fecha de Generación: {timezone.now().strftime('%d/%m/%Y %H:%M')}")
-    
-    for info in info_reporte:
-        info_paragraph = Paragraph(info, styles['Normal'])
-        info_paragraph.style.alignment = 1
-        elementos.append(info_paragraph)
-    
-    elementos.append(Spacer(1, 0.3*inch))
 
-    # Tabla de Datos - Columnas específicas para unidad
-    columnas = ['N°', 'CÓDIGO PATRIMONIAL', 'DESCRIPCIÓN', 'CATEGORÍA', 'MARCA', 'MODELO', 'SERIAL', 'ESTADO', 'VALOR (Bs.)']
-    
-    cell_style = styles['Normal'].clone('cell_style')
-    cell_style.fontSize = 7
-    cell_style.leading = 8
-    cell_style.wordWrap = 'LTR'
-    
-    header_style = styles['Normal'].clone('header_style')
-    header_style.fontSize = 7
-    header_style.leading = 8
-    header_style.wordWrap = 'LTR'
-    header_style.alignment = 1
-    
-    columnas_paragraph = [
-        Paragraph(f'<font color="white"><b>{col}</b></font>', header_style) for col in columnas
-    ]
-    datos_tabla = [columnas_paragraph]
-    
-    for i, bien in enumerate(bienes_queryset):
-        categoria_nombre = bien.categoria.nombre if bien.categoria else 'N/A'
-        datos_tabla.append([
-            Paragraph(str(i + 1), cell_style),
-            Paragraph(str(bien.codigo_patrimonial), cell_style),
-            Paragraph(str(bien.descripcion), cell_style),
-            Paragraph(str(categoria_nombre), cell_style),
-            Paragraph(str(bien.marca or ''), cell_style),
-            Paragraph(str(bien.modelo or ''), cell_style),
-            Paragraph(str(bien.serial or ''), cell_style),
-            Paragraph(str(bien.get_estado_bien_display()), cell_style),
-            Paragraph(f"{bien.valor_unitario_bs:,.2f}", cell_style),
-        ])
-
-    tabla_bienes = Table(
-        datos_tabla,
-        colWidths=[0.4*inch, 1.0*inch, 1.3*inch, 0.8*inch, 0.6*inch, 0.6*inch, 0.8*inch, 0.6*inch, 0.8*inch]
+    estadisticas = resumen_reporte(
+        bienes_queryset,
+        {'estado_bien': '', 'categoria__nombre': 'Sin Categoría'},
+        {'valor': 'valor_unitario_bs'},
     )
-    tabla_bienes.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#8B4513')),  # Marrón para unidades
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 7),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('TOPPADDING', (0, 0), (-1, 0), 8),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 7),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-        ('TOPPADDING', (0, 1), (-1, -1), 4),
-        # Sin ROWBACKGROUNDS para que las filas sean transparentes
-    ]))
-    elementos.append(tabla_bienes)
-    elementos.append(Spacer(1, 0.3*inch))
-
-    # Resumen específico de la unidad
-    if bienes_queryset.count() > 0:
-        total_valor = sum(bien.valor_unitario_bs for bien in bienes_queryset)
-        estados_count = {}
-        categorias_count = {}
-        for bien in bienes_queryset:
-            estado = bien.get_estado_bien_display()
-            estados_count[estado] = estados_count.get(estado, 0) + 1
-            
-            categoria = bien.categoria.nombre if bien.categoria else 'Sin Categoría'
-            categorias_count[categoria] = categorias_count.get(categoria, 0) + 1
-        
-        resumen_text = f"""
+    resumen = None
+    if estadisticas.cantidad > 0:
+        resumen = f"""
         <b>RESUMEN DE LA UNIDAD "{unidad_nombre.upper()}":</b><br/>
-        • Total de Bienes Asignados: {bienes_queryset.count()}<br/>
-        • Valor Total: Bs. {total_valor:,.2f}<br/>
-        • Distribución por Estado: {', '.join([f'{estado}: {count}' for estado, count in estados_count.items()])}<br/>
-        • Distribución por Categoría: {', '.join([f'{categoria}: {count}' for categoria, count in list(categorias_count.items())[:3]])}
+        • Total de Bienes Asignados: {estadisticas.cantidad}<br/>
+        • Valor Total: Bs. {estadisticas.totales['valor']:,.2f}<br/>
+        • Distribución por Estado: {_distribucion_estados(estadisticas.distribuciones['estado_bien'])}<br/>
+        • Distribución por Categoría: {_distribucion(estadisticas.distribuciones['categoria__nombre'], 3)}
         """
-        resumen_paragraph = Paragraph(resumen_text, styles['Normal'])
-        elementos.append(resumen_paragraph)
-        elementos.append(Spacer(1, 0.3*inch))
-
-    # Pie de página (Firma)
-    elementos.append(Spacer(1, 1.5*inch))
-    linea_firma = "____________________________________"
-    nombre_firmante = "MY. ANDELSON JOSE PINTO HERRERA"
-    cargo_firmante = "JEFE DEL DEPARTAMENTO BIENES PÚBLICOS"
 
-    p_linea = Paragraph(linea_firma, styles['Normal'])
-    p_linea.style.alignment = 1
-    p_nombre = Paragraph(nombre_firmante, styles['Normal'])
-    p_nombre.style.alignment = 1
-    p_cargo = Paragraph(cargo_firmante, styles['Normal'])
-    p_cargo.style.alignment = 1
-
-    elementos.append(p_linea)
-    elementos.append(p_nombre)
-    elementos.append(p_cargo)
-
-    doc.build(elementos, onFirstPage=draw_logo)
-    buffer.seek(0)
-    return buffer
\ No newline at end of file
+    info_reporte = [f"Unidad Administrativa: {unidad_nombre}", *_periodo(fecha_desde, fecha_hasta)]
+    return generar_reporte_pdf(
+        titulo_reporte, info_reporte, COLUMNAS_UNIDAD,
+        filas_reporte(bienes_queryset, CAMPOS_BIEN), COLOR_UNIDAD, resumen, en_streaming, rapido
+    )
@@ -0,0 +1,369 @@
+# bienes_app/reportes.py
+"""
+Tipos de reporte PDF y Excel del inventario.
+
+Cada tipo (ver TIPOS_REPORTE) lee y valida sus parámetros, genera el archivo
+y le da nombre. Los parámetros quedan normalizados, con los valores por
+omisión ya puestos, de modo que junto con la versión de los datos identifican
+el contenido del reporte (ver cache_reportes.py).
+"""
+
+from datetime import date
+
+from django.db.models import F, Q
+
+from unidades_administrativas_app.models import UnidadAdministrativa
+
+from .depreciacion import METODOS_DEPRECIACION
+from .excel_generator import (
+    generar_reporte_depreciacion_excel,
+    generar_reporte_desincorporados_excel,
+    generar_reporte_inventario_excel,
+    generar_reporte_traslados_excel,
+)
+from .models import Bien, Categoria, MovimientoBien
+from .pdf_generator import (
+    generar_reporte_depreciacion_pdf,
+    generar_reporte_desincorporados_pdf,
+    generar_reporte_inventario_pdf,
+    generar_reporte_por_categoria_pdf,
+    generar_reporte_por_unidad_pdf,
+    generar_reporte_traslados_pdf,
+)
+
+TIPOS_CONTENIDO = {
+    'pdf': 'application/pdf',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+class TipoReporte:
+    """
+    Un tipo de reporte. `leer_parametros(datos)` toma de los parámetros de la
+    solicitud los que usa el reporte y los valida: lanza ValueError si son
+    inválidos y LookupError si no existe lo pedido. `generar(parametros)`
+    devuelve el archivo generado y `nombre_archivo(parametros)` su nombre.
+    """
+
+    def __init__(self, extension, leer_parametros, generar, nombre_archivo):
+        self.extension = extension
+        self.leer_parametros = leer_parametros
+        self.generar = generar
+        self.nombre_archivo = nombre_archivo
+
+    @property
+    def tipo_contenido(self):
+        return TIPOS_CONTENIDO[self.extension]
+
+
+# --- Parámetros ---
+
+def metodo_de_los_parametros(datos):
+    """
+    `metodo_depreciacion` de los parámetros, o None si no viene. Lanza
+    ValueError si no es un método registrado en el motor.
+    """
+    metodo = datos.get('metodo_depreciacion')
+    if metodo is not None and metodo not in METODOS_DEPRECIACION:
+        raise ValueError(f'Método de depreciación inválido: {metodo}.')
+    return metodo
+
+
+def _periodo_opcional(datos):
+    return {
+        'fecha_desde': datos.get('fecha_desde', 'N/A'),
+        'fecha_hasta': datos.get('fecha_hasta', 'N/A'),
+    }
+
+
+def _periodo_obligatorio(datos, mensaje='Debe proporcionar un rango de fechas.'):
+    fecha_desde = datos.get('fecha_desde')
+    fecha_hasta = datos.get('fecha_hasta')
+    if not fecha_desde or not fecha_hasta:
+        raise ValueError(mensaje)
+    return {'fecha_desde': fecha_desde, 'fecha_hasta': fecha_hasta}
+
+
+def _id_existente(datos, campo, modelo, mensaje_falta, mensaje_no_existe):
+    """Id de `modelo` de los parámetros (en `campo`), validando que venga y que exista."""
+    valor = datos.get(campo)
+    if not valor:
+        raise ValueError(mensaje_falta)
+    try:
+        valor = int(valor)
+    except (ValueError, TypeError):
+        raise LookupError(mensaje_no_existe)
+    if not modelo.objects.filter(pk=valor).exists():
+        raise LookupError(mensaje_no_existe)
+    return valor
+
+
+def parametros_inventario(datos):
+    return _periodo_opcional(datos)
+
+
+def parametros_categoria(datos):
+    categoria_id = _id_existente(
+        datos, 'categoria_id', Categoria,
+        'Debe proporcionar un ID de categoría.', 'La categoría especificada no existe.',
+    )
+    return {'categoria_id': categoria_id, **_periodo_opcional(datos)}
+
+
+def parametros_unidad_pdf(datos):
+    return {**parametros_unidad_excel(datos), **_periodo_opcional(datos)}
+
+
+def parametros_unidad_excel(datos):
+    unidad_id = _id_existente(
+        datos, 'unidad_id', UnidadAdministrativa,
+        'Debe proporcionar un ID de unidad.', 'La unidad especificada no existe.',
+    )
+    return {'unidad_id': unidad_id}
+
+
+def parametros_desincorporados_pdf(datos):
+    return _periodo_obligatorio(datos, 'Debe proporcionar un rango de fechas (fecha_desde y fecha_hasta).')
+
+
+def parametros_desincorporados_excel(datos):
+    return _periodo_obligatorio(datos)
+
+
+def parametros_traslados(datos):
+    parametros = {**_periodo_obligatorio(datos), 'unidad_id': None}
+    # Filtro opcional de unidad
+    if datos.get('unidad_id'):
+        parametros['unidad_id'] = _id_existente(
+            datos, 'unidad_id', UnidadAdministrativa,
+            'Debe proporcionar un ID de unidad.', 'La unidad especificada no existe.',
+        )
+    return parametros
+
+
+def parametros_depreciacion(datos):
+    return {
+        'fecha_hasta': datos.get('fecha_hasta', date.today().strftime('%Y-%m-%d')),
+        'metodo_depreciacion': metodo_de_los_parametros(datos),
+    }
+
+
+def parametros_depreciacion_anual(datos):
+    try:
+        anio = int(datos.get('anio'))
+    except (ValueError, TypeError):
+        raise ValueError('Año inválido.')
+    return {'anio': anio, 'metodo_depreciacion': metodo_de_los_parametros(datos)}
+
+
+# --- Consultas ---
+
+def _del_periodo(bienes, parametros):
+    """Filtra los bienes por fecha de creación si se proporcionan fechas."""
+    if parametros['fecha_desde'] != 'N/A' and parametros['fecha_hasta'] != 'N/A':
+        bienes = bienes.filter(fecha_creacion__date__range=[parametros['fecha_desde'], parametros['fecha_hasta']])
+    return bienes
+
+
+def _movimientos(tipo_movimiento, parametros):
+    movimientos = MovimientoBien.objects.filter(
+        tipo_movimiento=tipo_movimiento,
+        fecha_movimiento__date__range=[parametros['fecha_desde'], parametros['fecha_hasta']]
+    ).select_related('bien', 'unidad_origen', 'unidad_destino').order_by('fecha_movimiento')
+    # Si se proporciona una unidad, filtrar si es origen O destino
+    unidad_id = parametros.get('unidad_id')
+    if unidad_id:
+        movimientos = movimientos.filter(Q(unidad_origen_id=unidad_id) | Q(unidad_destino_id=unidad_id))
+    return movimientos
+
+
+def bienes_con_estado_depreciacion(metodo=None):
+    """
+    Bienes con al menos un cálculo de depreciación (opcionalmente solo los de
+    un método), anotados con su último estado (un solo JOIN contra EstadoDepreciacionBien).
+    """
+    bienes = Bien.objects.filter(estado_depreciacion__isnull=False)
+    if metodo:
+        bienes = bienes.filter(metodo_depreciacion=metodo)
+    return bienes.select_related('categoria').annotate(
+        ultima_depreciacion_acumulada=F('estado_depreciacion__depreciacion_acumulada'),
+        ultimo_valor_neto=F('estado_depreciacion__valor_neto_en_libros')
+    ).order_by('codigo_patrimonial')
+
+
+def bienes_con_depreciacion_anual(anio, metodo=None):
+    """
+    Bienes con resumen de depreciación para el año indicado (opcionalmente
+    solo los de un método), anotados con los montos al cierre de ese año
+    (solo se lee DepreciacionAnual, no los registros mensuales).
+    """
+    bienes = Bien.objects.filter(depreciaciones_anuales__anio=anio)
+    if metodo:
+        bienes = bienes.filter(metodo_depreciacion=metodo)
+    return bienes.select_related('categoria').annotate(
+        depreciacion_del_anio=F('depreciaciones_anuales__depreciacion_anio'),
+        ultima_depreciacion_acumulada=F('depreciaciones_anuales__depreciacion_acumulada'),
+        ultimo_valor_neto=F('depreciaciones_anuales__valor_neto_en_libros')
+    ).order_by('codigo_patrimonial')
+
+
+def titulo_con_metodo(titulo, metodo):
+    """Agrega al título del reporte el nombre del método filtrado, si lo hay."""
+    if not metodo:
+        return titulo
+    return f"{titulo} - {METODOS_DEPRECIACION[metodo].nombre.upper()}"
+
+
+def _nombre_categoria(parametros):
+    return Categoria.objects.values_list('nombre', flat=True).get(pk=parametros['categoria_id'])
+
+
+def _nombre_unidad(parametros):
+    return UnidadAdministrativa.objects.values_list('nombre', flat=True).get(pk=parametros['unidad_id'])
+
+
+# --- Generación ---
+
+def inventario_general_pdf(parametros):
+    bienes = _del_periodo(Bien.objects.all().order_by('codigo_patrimonial'), parametros)
+    return generar_reporte_inventario_pdf(
+        bienes, parametros['fecha_desde'], parametros['fecha_hasta'], en_streaming=True, rapido=True
+    )
+
+
+def inventario_general_excel(parametros):
+    bienes = _del_periodo(Bien.objects.all().order_by('codigo_patrimonial'), parametros)
+    return generar_reporte_inventario_excel(bienes, "INVENTARIO GENERAL DE BIENES PÚBLICOS")
+
+
+def categoria_pdf(parametros):
+    nombre = _nombre_categoria(parametros)
+    bienes = _del_periodo(Bien.objects.filter(categoria_id=parametros['categoria_id']).order_by('codigo_patrimonial'), parametros)
+    titulo = f"INVENTARIO DE BIENES - CATEGORÍA: {nombre.upper()}"
+    return generar_reporte_por_categoria_pdf(
+        bienes, nombre, parametros['fecha_desde'], parametros['fecha_hasta'], titulo, en_streaming=True, rapido=True
+    )
+
+
+def categoria_excel(parametros):
+    nombre = _nombre_categoria(parametros)
+    bienes = _del_periodo(Bien.objects.filter(categoria_id=parametros['categoria_id']).order_by('codigo_patrimonial'), parametros)
+    return generar_reporte_inventario_excel(bienes, f"Inventario de Bienes - Categoría: {nombre}")
+
+
+def unidad_pdf(parametros):
+    nombre = _nombre_unidad(parametros)
+    bienes = _del_periodo(
+        Bien.objects.filter(unidad_administrativa_actual_id=parametros['unidad_id']).order_by('codigo_patrimonial'), parametros
+    )
+    titulo = f"INVENTARIO DE BIENES - UNIDAD ADMINISTRATIVA: {nombre.upper()}"
+    return generar_reporte_por_unidad_pdf(
+        bienes, nombre, parametros['fecha_desde'], parametros['fecha_hasta'], titulo, en_streaming=True, rapido=True
+    )
+
+
+def unidad_excel(parametros):
+    nombre = _nombre_unidad(parametros)
+    bienes = Bien.objects.filter(unidad_administrativa_actual_id=parametros['unidad_id']).order_by('codigo_patrimonial')
+    return generar_reporte_inventario_excel(bienes, f"Inventario de Bienes - Unidad: {nombre}")
+
+
+def desincorporados_pdf(parametros):
+    return generar_reporte_desincorporados_pdf(
+        _movimientos('DESINCORPORACION', parametros), parametros['fecha_desde'], parametros['fecha_hasta'],
+        "RELACIÓN DE BIENES DESINCORPORADOS", en_streaming=True, rapido=True,
+    )
+
+
+def desincorporados_excel(parametros):
+    return generar_reporte_desincorporados_excel(
+        _movimientos('DESINCORPORACION', parametros), "Relación de Bienes Desincorporados"
+    )
+
+
+def traslados_pdf(parametros):
+    return generar_reporte_traslados_pdf(
+        _movimientos('TRASLADO', parametros), parametros['fecha_desde'], parametros['fecha_hasta'],
+        "RELACIÓN DE BIENES TRASLADADOS", en_streaming=True, rapido=True,
+    )
+
+
+def traslados_excel(parametros):
+    return generar_reporte_traslados_excel(
+        _movimientos('TRASLADO', parametros), "Relación de Bienes Trasladados",
+        parametros['fecha_desde'], parametros['fecha_hasta'],
+    )
+
+
+def depreciacion_pdf(parametros):
+    metodo = parametros['metodo_depreciacion']
+    titulo = titulo_con_metodo("REPORTE DE DEPRECIACIÓN ACUMULADA", metodo)
+    return generar_reporte_depreciacion_pdf(
+        bienes_con_estado_depreciacion(metodo), parametros['fecha_hasta'], titulo, en_streaming=True, rapido=True
+    )
+
+
+def depreciacion_excel(parametros):
+    metodo = parametros['metodo_depreciacion']
+    titulo = titulo_con_metodo("REPORTE DE DEPRECIACIÓN ACUMULADA", metodo)
+    return generar_reporte_depreciacion_excel(bienes_con_estado_depreciacion(metodo), titulo)
+
+
+def depreciacion_anual_pdf(parametros):
+    anio, metodo = parametros['anio'], parametros['metodo_depreciacion']
+    titulo = titulo_con_metodo(f"REPORTE DE DEPRECIACIÓN ANUAL {anio}", metodo)
+    return generar_reporte_depreciacion_pdf(
+        bienes_con_depreciacion_anual(anio, metodo), f"31/12/{anio}", titulo, en_streaming=True, rapido=True
+    )
+
+
+def depreciacion_anual_excel(parametros):
+    anio, metodo = parametros['anio'], parametros['metodo_depreciacion']
+    titulo = titulo_con_metodo(f"REPORTE DE DEPRECIACIÓN ANUAL {anio}", metodo)
+    return generar_reporte_depreciacion_excel(bienes_con_depreciacion_anual(anio, metodo), titulo)
+
+
+TIPOS_REPORTE = {
+    'inventario_general_pdf': TipoReporte(
+        'pdf', parametros_inventario, inventario_general_pdf, lambda p: 'reporte_inventario_general.pdf'
+    ),
+    'inventario_general_excel': TipoReporte(
+        'xlsx', parametros_inventario, inventario_general_excel, lambda p: 'reporte_inventario_general.xlsx'
+    ),
+    'bienes_categoria_pdf': TipoReporte(
+        'pdf', parametros_categoria, categoria_pdf, lambda p: f'reporte_bienes_categoria_{_nombre_categoria(p)}.pdf'
+    ),
+    'bienes_categoria_excel': TipoReporte(
+        'xlsx', parametros_categoria, categoria_excel, lambda p: f'reporte_bienes_categoria_{_nombre_categoria(p)}.xlsx'
+    ),
+    'bienes_unidad_pdf': TipoReporte(
+        'pdf', parametros_unidad_pdf, unidad_pdf, lambda p: f'reporte_bienes_unidad_{_nombre_unidad(p)}.pdf'
+    ),
+    'bienes_unidad_excel': TipoReporte(
+        'xlsx', parametros_unidad_excel, unidad_excel, lambda p: f'reporte_bienes_unidad_{_nombre_unidad(p)}.xlsx'
+    ),
+    'desincorporados_pdf': TipoReporte(
+        'pdf', parametros_desincorporados_pdf, desincorporados_pdf, lambda p: 'reporte_desincorporados.pdf'
+    ),
+    'desincorporados_excel': TipoReporte(
+        'xlsx', parametros_desincorporados_excel, desincorporados_excel, lambda p: 'reporte_desincorporados.xlsx'
+    ),
+    'traslados_pdf': TipoReporte(
+        'pdf', parametros_traslados, traslados_pdf, lambda p: 'reporte_traslados.pdf'
+    ),
+    'traslados_excel': TipoReporte(
+        'xlsx', parametros_traslados, traslados_excel, lambda p: 'reporte_traslados.xlsx'
+    ),
+    'depreciacion_pdf': TipoReporte(
+        'pdf', parametros_depreciacion, depreciacion_pdf, lambda p: 'reporte_depreciacion.pdf'
+    ),
+    'depreciacion_excel': TipoReporte(
+        'xlsx', parametros_depreciacion, depreciacion_excel, lambda p: 'reporte_depreciacion.xlsx'
+    ),
+    'depreciacion_anual_pdf': TipoReporte(
+        'pdf', parametros_depreciacion_anual, depreciacion_anual_pdf, lambda p: f'reporte_depreciacion_{p["anio"]}.pdf'
+    ),
+    'depreciacion_anual_excel': TipoReporte(
+        'xlsx', parametros_depreciacion_anual, depreciacion_anual_excel, lambda p: f'reporte_depreciacion_{p["anio"]}.xlsx'
+    ),
+}
@@ -1,6 +1,8 @@
 # ipsfa-inventario-backend/bienes_app/serializers.py
 from rest_framework import serializers
-from .models import Bien, MovimientoBien, Categoria
+from rest_framework.reverse import reverse
+from .models import Bien, MovimientoBien, Categoria, EjecucionDepreciacion, UsoBien, ImportacionBienes, SubidaFragmentada, SolicitudReporte
+from .subida_fragmentada import fragmentos_recibidos, fragmentos_faltantes
 from django.contrib.auth.models import User
 from unidades_administrativas_app.models import UnidadAdministrativa 
 
@@ -30,6 +32,7 @@ class BienSerializer(serializers.ModelSerializer):
             'ubicacion_fisica_especifica', 'responsable_asignado_nombre', 
             'responsable_asignado_cargo',
             'vida_util_estimada_anios',
+            'unidades_produccion_estimadas',
             'valor_residual',
             'metodo_depreciacion',
             'estado_bien', 'observaciones', 
@@ -102,4 +105,97 @@ class MovimientoBienSerializer(serializers.ModelSerializer):
 class CategoriaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Categoria
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+class EjecucionDepreciacionSerializer(serializers.ModelSerializer):
+    estado_display = serializers.CharField(source='get_estado_display', read_only=True)
+    usuario_nombre = serializers.CharField(source='usuario.username', read_only=True, default=None)
+    progreso = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = EjecucionDepreciacion
+        fields = [
+            'id', 'mes', 'anio', 'estado', 'estado_display', 'usuario', 'usuario_nombre',
+            'total_bienes', 'bienes_procesados', 'bienes_omitidos', 'registros_creados',
+            'progreso', 'mensaje_error',
+            'fecha_creacion', 'fecha_inicio', 'fecha_fin', 'fecha_actualizacion',
+        ]
+        read_only_fields = fields
+
+class UsoBienSerializer(serializers.ModelSerializer):
+    bien = serializers.PrimaryKeyRelatedField(queryset=Bien.objects.all())
+    bien_codigo_patrimonial = serializers.CharField(source='bien.codigo_patrimonial', read_only=True)
+
+    class Meta:
+        model = UsoBien
+        fields = ['id', 'bien', 'bien_codigo_patrimonial', 'anio', 'mes', 'unidades', 'fecha_registro']
+        read_only_fields = ('id', 'fecha_registro')
+
+    def validate_mes(self, value):
+        if not 1 <= value <= 12:
+            raise serializers.ValidationError("El mes debe estar entre 1 y 12.")
+        return value
+
+class ImportacionBienesSerializer(serializers.ModelSerializer):
+    estado_display = serializers.CharField(source='get_estado_display', read_only=True)
+    modo_display = serializers.CharField(source='get_modo_display', read_only=True)
+    usuario_nombre = serializers.CharField(source='usuario.username', read_only=True, default=None)
+    progreso = serializers.IntegerField(read_only=True)
+    segundos_restantes = serializers.IntegerField(read_only=True)
+    tiene_hoja_errores = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportacionBienes
+        fields = [
+            'id', 'nombre_archivo', 'estado', 'estado_display', 'modo', 'modo_display', 'crear_proveedores',
+            'permitir_duplicados', 'usuario', 'usuario_nombre', 'total_filas', 'filas_procesadas', 'filas_con_error',
+            'bienes_creados', 'bienes_actualizados', 'bienes_sin_cambios', 'proveedores_creados',
+            'progreso', 'segundos_restantes', 'tiene_hoja_errores', 'mensaje_error',
+            'fecha_creacion', 'fecha_inicio', 'fecha_fin', 'fecha_actualizacion',
+        ]
+        read_only_fields = fields
+
+    def get_tiene_hoja_errores(self, obj):
+        return bool(obj.archivo_errores)
+
+
+class SubidaFragmentadaSerializer(serializers.ModelSerializer):
+    estado_display = serializers.CharField(source='get_estado_display', read_only=True)
+    total_fragmentos = serializers.IntegerField(read_only=True)
+    fragmentos_recibidos = serializers.SerializerMethodField()
+    fragmentos_faltantes = serializers.SerializerMethodField()
+    importacion = ImportacionBienesSerializer(read_only=True)
+
+    class Meta:
+        model = SubidaFragmentada
+        fields = [
+            'id', 'nombre_archivo', 'tamano_total', 'tamano_fragmento', 'total_fragmentos',
+            'fragmentos_recibidos', 'fragmentos_faltantes', 'modo', 'crear_proveedores', 'permitir_duplicados',
+            'estado', 'estado_display', 'importacion', 'fecha_creacion', 'fecha_actualizacion',
+        ]
+        read_only_fields = fields
+
+    def get_fragmentos_recibidos(self, obj):
+        return fragmentos_recibidos(obj) if obj.estado == 'EN_CURSO' else list(range(obj.total_fragmentos))
+
+    def get_fragmentos_faltantes(self, obj):
+        return fragmentos_faltantes(obj) if obj.estado == 'EN_CURSO' else []
+
+
+class SolicitudReporteSerializer(serializers.ModelSerializer):
+    estado_display = serializers.CharField(source='get_estado_display', read_only=True)
+    usuario_nombre = serializers.CharField(source='usuario.username', read_only=True, default=None)
+    url_descarga = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SolicitudReporte
+        fields = [
+            'id', 'tipo', 'parametros', 'estado', 'estado_display', 'usuario', 'usuario_nombre', 'nocturna',
+            'nombre_archivo', 'tamano_archivo', 'url_descarga', 'mensaje_error',
+            'fecha_creacion', 'fecha_inicio', 'fecha_fin', 'fecha_actualizacion',
+        ]
+        read_only_fields = fields
+
+    def get_url_descarga(self, obj):
+        if obj.estado != 'COMPLETADA':
+            return None
+        return reverse('solicitud-reporte-descarga', args=[obj.pk], request=self.context.get('request'))
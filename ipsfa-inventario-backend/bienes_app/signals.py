@@ -0,0 +1,87 @@
+# bienes_app/signals.py
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from unidades_administrativas_app.models import UnidadAdministrativa
+from .models import Bien, UsoBien, MovimientoBien, DepreciacionMensual, DepreciacionAnual, EstadoDepreciacionBien, Categoria
+from .depreciacion import marcar_para_recalculo, periodo_a_indice
+from .cache_reportes import datos_modificados
+
+# Campos de Bien de los que depende el cálculo de depreciación
+CAMPOS_VALORACION = [
+    'valor_unitario_bs',
+    'valor_residual',
+    'vida_util_estimada_anios',
+    'unidades_produccion_estimadas',
+    'metodo_depreciacion',
+    'fecha_adquisicion',
+]
+
+# Modelos de los que salen los reportes: cualquier cambio invalida los guardados en la caché
+MODELOS_REPORTES = (
+    Bien, MovimientoBien, DepreciacionMensual, DepreciacionAnual, EstadoDepreciacionBien,
+    Categoria, UnidadAdministrativa,
+)
+
+@receiver(pre_save, sender=Bien)
+def detectar_cambio_valoracion(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Compara los campos de valoración con los guardados y, si alguno cambió,
+    anota en la instancia el primer período afectado. Cualquiera de estos
+    cambios altera el calendario desde la adquisición (la anterior o la nueva,
+    la que sea primero).
+    """
+    instance._recalcular_desde = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(CAMPOS_VALORACION):
+        return
+
+    anterior = Bien.objects.filter(pk=instance.pk).values(*CAMPOS_VALORACION).first()
+    if anterior is None:
+        return
+    cambio = any(
+        anterior[campo] != Bien._meta.get_field(campo).to_python(getattr(instance, campo))
+        for campo in CAMPOS_VALORACION
+    )
+    if cambio:
+        adquisicion = min(anterior['fecha_adquisicion'], Bien._meta.get_field('fecha_adquisicion').to_python(instance.fecha_adquisicion))
+        instance._recalcular_desde = periodo_a_indice(adquisicion.year, adquisicion.month)
+
+@receiver(post_save, sender=Bien)
+def marcar_bien_desactualizado(sender, instance, created, **kwargs):
+    if not created and getattr(instance, '_recalcular_desde', None) is not None:
+        marcar_para_recalculo(instance.pk, instance._recalcular_desde)
+
+@receiver(pre_save, sender=UsoBien)
+def detectar_cambio_uso(sender, instance, raw=False, **kwargs):
+    """Recuerda el período anterior del registro de uso, por si se movió a otro mes."""
+    instance._periodo_anterior = None
+    if raw or instance.pk is None:
+        return
+    anterior = UsoBien.objects.filter(pk=instance.pk).values_list('anio', 'mes').first()
+    if anterior is not None:
+        instance._periodo_anterior = periodo_a_indice(*anterior)
+
+@receiver(post_save, sender=UsoBien)
+def marcar_uso_modificado(sender, instance, raw=False, **kwargs):
+    """El uso de un mes cambia la cuota de ese mes en adelante (unidades de producción)."""
+    if raw:
+        return
+    desde = periodo_a_indice(instance.anio, instance.mes)
+    if getattr(instance, '_periodo_anterior', None) is not None:
+        desde = min(desde, instance._periodo_anterior)
+    marcar_para_recalculo(instance.bien_id, desde)
+
+@receiver(post_delete, sender=UsoBien)
+def marcar_uso_eliminado(sender, instance, **kwargs):
+    marcar_para_recalculo(instance.bien_id, periodo_a_indice(instance.anio, instance.mes))
+
+def invalidar_reportes(sender, **kwargs):
+    """Aumenta la versión de los datos de los reportes (ver cache_reportes.py)."""
+    datos_modificados()
+
+# Solo para los modelos de los reportes: un receptor sin `sender` haría que el
+# borrado de cualquier otro modelo cargara sus filas una a una
+for modelo in MODELOS_REPORTES:
+    post_save.connect(invalidar_reportes, sender=modelo, dispatch_uid=f'invalidar_reportes_{modelo._meta.label}_save')
+    post_delete.connect(invalidar_reportes, sender=modelo, dispatch_uid=f'invalidar_reportes_{modelo._meta.label}_delete')
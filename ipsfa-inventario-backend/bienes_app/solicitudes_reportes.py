@@ -0,0 +1,148 @@
+# bienes_app/solicitudes_reportes.py
+"""
+Generación de reportes en segundo plano (SolicitudReporte).
+
+La API registra la solicitud con los parámetros ya validados y el comando
+`procesar_reportes` la genera en un pool de procesos, con un límite de
+solicitudes simultáneas, sin ocupar los procesos del servidor web. El reporte
+sale de la caché de reportes (ver cache_reportes.py): si ya estaba generado
+para la versión actual de los datos solo se copia. La copia de cada solicitud
+se guarda aparte, para que se pueda descargar aunque los datos cambien
+después, y se elimina a los DIAS_VIGENCIA_SOLICITUD días.
+
+Opcionalmente el comando encola cada noche los REPORTES_NOCTURNOS, que así
+quedan en la caché para las descargas del día siguiente.
+"""
+
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache_reportes import abrir_reporte, clave_reporte, version_datos
+from .models import SolicitudReporte
+from .reportes import TIPOS_REPORTE
+
+# Días que se conservan las solicitudes terminadas y sus archivos
+DIAS_VIGENCIA_SOLICITUD = 7
+
+# Reportes que se pregeneran cada noche (tipo, parámetros)
+REPORTES_NOCTURNOS = [
+    ('inventario_general_pdf', {}),
+    ('inventario_general_excel', {}),
+    ('depreciacion_pdf', {}),
+    ('depreciacion_excel', {}),
+]
+
+
+def trabajadores_por_defecto():
+    """Solicitudes simultáneas configuradas en settings.REPORTES_TRABAJADORES."""
+    return max(1, getattr(settings, 'REPORTES_TRABAJADORES', 1))
+
+
+def directorio_solicitudes():
+    return os.path.join(settings.REPORTES_CACHE_DIR, 'solicitudes')
+
+
+def ruta_archivo_solicitud(solicitud):
+    return os.path.join(directorio_solicitudes(), f'{solicitud.pk}.{TIPOS_REPORTE[solicitud.tipo].extension}')
+
+
+def solicitudes_visibles(usuario):
+    """Solicitudes que puede consultar el usuario: las suyas y las pregeneradas en la noche."""
+    return SolicitudReporte.objects.filter(Q(usuario=usuario) | Q(nocturna=True)).select_related('usuario')
+
+
+def crear_solicitud(tipo, datos, usuario=None, nocturna=False):
+    """
+    Registra como PENDIENTE la generación del reporte `tipo` con los
+    parámetros `datos`. Lanza ValueError si el tipo o los parámetros son
+    inválidos y LookupError si no existe lo pedido (ver TipoReporte).
+    """
+    if tipo not in TIPOS_REPORTE:
+        raise ValueError(f'Tipo de reporte inválido: {tipo}.')
+    parametros = TIPOS_REPORTE[tipo].leer_parametros(datos)
+    return SolicitudReporte.objects.create(tipo=tipo, parametros=parametros, usuario=usuario, nocturna=nocturna)
+
+
+def programar_reportes_nocturnos():
+    """Encola los REPORTES_NOCTURNOS si no se encolaron ya hoy. Devuelve cuántas solicitudes creó."""
+    if SolicitudReporte.objects.filter(nocturna=True, fecha_creacion__date=timezone.localdate()).exists():
+        return 0
+    for tipo, datos in REPORTES_NOCTURNOS:
+        crear_solicitud(tipo, datos, nocturna=True)
+    return len(REPORTES_NOCTURNOS)
+
+
+def tomar_solicitud(solicitud):
+    """Marca una solicitud PENDIENTE como EN_PROCESO. Devuelve False si otro proceso ya la tomó."""
+    tomada = SolicitudReporte.objects.filter(pk=solicitud.pk, estado='PENDIENTE').update(
+        estado='EN_PROCESO', fecha_inicio=timezone.now()
+    )
+    return bool(tomada)
+
+
+def reiniciar_interrumpidas():
+    """Devuelve a la cola las solicitudes que quedaron EN_PROCESO (p. ej. tras una caída). Devuelve cuántas."""
+    return SolicitudReporte.objects.filter(estado='EN_PROCESO').update(estado='PENDIENTE', fecha_inicio=None)
+
+
+def marcar_fallida(solicitud_id, mensaje):
+    SolicitudReporte.objects.filter(pk=solicitud_id, estado='EN_PROCESO').update(
+        estado='FALLIDA', mensaje_error=mensaje, fecha_fin=timezone.now(), fecha_actualizacion=timezone.now()
+    )
+
+
+def ejecutar_solicitud(solicitud_id):
+    """
+    Genera el reporte de una solicitud ya tomada (EN_PROCESO) y guarda su
+    copia en disco. Corre en los procesos del pool de `procesar_reportes`.
+    Devuelve la solicitud terminada (COMPLETADA o FALLIDA).
+    """
+    solicitud = SolicitudReporte.objects.get(pk=solicitud_id)
+    reporte = TIPOS_REPORTE[solicitud.tipo]
+    try:
+        clave = clave_reporte(solicitud.tipo, solicitud.parametros, version_datos())
+        with abrir_reporte(clave, reporte.extension, lambda: reporte.generar(solicitud.parametros)) as archivo:
+            solicitud.tamano_archivo = _guardar_copia(archivo, ruta_archivo_solicitud(solicitud))
+        solicitud.nombre_archivo = reporte.nombre_archivo(solicitud.parametros)
+    except Exception as e:
+        solicitud.estado = 'FALLIDA'
+        solicitud.mensaje_error = str(e)
+        solicitud.fecha_fin = timezone.now()
+        solicitud.save(update_fields=['estado', 'mensaje_error', 'fecha_fin', 'fecha_actualizacion'])
+        return solicitud
+
+    solicitud.estado = 'COMPLETADA'
+    solicitud.fecha_fin = timezone.now()
+    solicitud.save(update_fields=['estado', 'nombre_archivo', 'tamano_archivo', 'fecha_fin', 'fecha_actualizacion'])
+    return solicitud
+
+
+def _guardar_copia(archivo, ruta):
+    """Copia `archivo` en `ruta` (a través de un temporal). Devuelve el tamaño en bytes."""
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(ruta), suffix='.tmp', delete=False) as temporal:
+        shutil.copyfileobj(archivo, temporal)
+    os.replace(temporal.name, ruta)
+    return os.path.getsize(ruta)
+
+
+def descartar_solicitudes_vencidas(dias=DIAS_VIGENCIA_SOLICITUD):
+    """Elimina las solicitudes terminadas hace más de `dias` días, con sus archivos. Devuelve cuántas."""
+    vencidas = SolicitudReporte.objects.filter(
+        estado__in=['COMPLETADA', 'FALLIDA'], fecha_fin__lt=timezone.now() - timedelta(days=dias)
+    )
+    total = 0
+    for solicitud in vencidas:
+        try:
+            os.remove(ruta_archivo_solicitud(solicitud))
+        except FileNotFoundError:
+            pass
+        solicitud.delete()
+        total += 1
+    return total
@@ -0,0 +1,156 @@
+# bienes_app/subida_fragmentada.py
+"""
+Subida de archivos de carga masiva en fragmentos (SubidaFragmentada).
+
+Protocolo, junto a `bienes/upload/`:
+
+1. POST `bienes/upload/fragmentado/` con el nombre y el tamaño del archivo:
+   crea la subida e indica cuántos fragmentos enviar y de qué tamaño.
+2. PUT `bienes/upload/fragmentado/<id>/<n>/` con el fragmento n (desde 0) en
+   el campo 'fragmento'. Cada fragmento se escribe en disco apenas llega y
+   se puede reenviar; tras un corte, GET `bienes/upload/fragmentado/<id>/`
+   indica cuáles faltan.
+3. POST `bienes/upload/fragmentado/<id>/completar/`: une los fragmentos en
+   el archivo de una ImportacionBienes PENDIENTE, que procesa el comando
+   `procesar_importaciones` igual que una carga normal.
+
+Los fragmentos se guardan en settings.IMPORTACION_FRAGMENTOS_DIR, un
+directorio por subida, y nunca se cargan completos en memoria.
+"""
+
+import os
+import shutil
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import ImportacionBienes, SubidaFragmentada
+
+TAMANO_FRAGMENTO = 8 * 1024 * 1024
+TAMANO_FRAGMENTO_MINIMO = 256 * 1024
+TAMANO_FRAGMENTO_MAXIMO = 64 * 1024 * 1024
+# Días tras los que se descartan las subidas que nunca se completaron
+DIAS_VIGENCIA_SUBIDA = 7
+
+
+def directorio_subida(subida):
+    return os.path.join(settings.IMPORTACION_FRAGMENTOS_DIR, str(subida.pk))
+
+
+def _ruta_fragmento(subida, numero):
+    return os.path.join(directorio_subida(subida), f'{numero}.part')
+
+
+def fragmentos_recibidos(subida):
+    """Números de los fragmentos ya guardados, en orden."""
+    try:
+        nombres = os.listdir(directorio_subida(subida))
+    except FileNotFoundError:
+        return []
+    return sorted(int(nombre[:-len('.part')]) for nombre in nombres if nombre.endswith('.part'))
+
+
+def fragmentos_faltantes(subida):
+    recibidos = set(fragmentos_recibidos(subida))
+    return [numero for numero in range(subida.total_fragmentos) if numero not in recibidos]
+
+
+def guardar_fragmento(subida, numero, archivo):
+    """
+    Escribe en disco el fragmento `numero` (un UploadedFile), por partes.
+    Se escribe en un archivo temporal que solo reemplaza al definitivo si el
+    tamaño es el esperado, de modo que un fragmento cortado a la mitad nunca
+    cuenta como recibido. Lanza ValueError si el número o el tamaño no
+    corresponden a la subida.
+    """
+    if subida.estado != 'EN_CURSO':
+        raise ValueError('La subida ya fue completada.')
+    if not 0 <= numero < subida.total_fragmentos:
+        raise ValueError(f'El fragmento debe estar entre 0 y {subida.total_fragmentos - 1}.')
+
+    os.makedirs(directorio_subida(subida), exist_ok=True)
+    ruta = _ruta_fragmento(subida, numero)
+    temporal = f'{ruta}.{uuid.uuid4().hex}.tmp'
+    esperado = subida.tamano_esperado(numero)
+    escritos = 0
+    try:
+        with open(temporal, 'wb') as destino:
+            for parte in archivo.chunks():
+                escritos += len(parte)
+                if escritos > esperado:
+                    break
+                destino.write(parte)
+        if escritos != esperado:
+            raise ValueError(f'El fragmento {numero} debe tener {esperado} bytes.')
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    # Marca la actividad de la subida (para no descartarla por vencida)
+    SubidaFragmentada.objects.filter(pk=subida.pk).update(fecha_actualizacion=timezone.now())
+
+
+def completar_subida(subida):
+    """
+    Une los fragmentos, en orden y por partes, en el archivo de una nueva
+    ImportacionBienes PENDIENTE con las opciones de la subida, y elimina los
+    fragmentos. Lanza ValueError si falta alguno.
+    """
+    if subida.estado != 'EN_CURSO':
+        raise ValueError('La subida ya fue completada.')
+    faltantes = fragmentos_faltantes(subida)
+    if faltantes:
+        raise ValueError(f'Faltan {len(faltantes)} fragmentos: {faltantes[:20]}.')
+
+    campo = ImportacionBienes._meta.get_field('archivo')
+    # Los fragmentos ya están en disco: se unen directamente en la ruta final del archivo
+    nombre = campo.storage.get_available_name(campo.generate_filename(None, subida.nombre_archivo))
+    ruta = campo.storage.path(nombre)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    try:
+        with open(ruta, 'wb') as destino:
+            for numero in range(subida.total_fragmentos):
+                with open(_ruta_fragmento(subida, numero), 'rb') as fragmento:
+                    shutil.copyfileobj(fragmento, destino, 1024 * 1024)
+        with transaction.atomic():
+            importacion = ImportacionBienes.objects.create(
+                archivo=nombre,
+                nombre_archivo=subida.nombre_archivo,
+                modo=subida.modo,
+                crear_proveedores=subida.crear_proveedores,
+                permitir_duplicados=subida.permitir_duplicados,
+                usuario=subida.usuario,
+                ip_address=subida.ip_address,
+            )
+            # Actualización condicional: si dos pedidos completan la misma subida, solo uno crea la importación
+            completada = SubidaFragmentada.objects.filter(pk=subida.pk, estado='EN_CURSO').update(
+                estado='COMPLETADA', importacion=importacion, fecha_actualizacion=timezone.now(),
+            )
+            if not completada:
+                raise ValueError('La subida ya fue completada.')
+    except Exception:
+        if os.path.exists(ruta):
+            os.remove(ruta)
+        raise
+    shutil.rmtree(directorio_subida(subida), ignore_errors=True)
+    subida.refresh_from_db()
+    return importacion
+
+
+def descartar_subida(subida):
+    shutil.rmtree(directorio_subida(subida), ignore_errors=True)
+    subida.delete()
+
+
+def descartar_subidas_vencidas(dias=DIAS_VIGENCIA_SUBIDA):
+    """Elimina las subidas sin completar que no recibieron fragmentos en `dias` días. Devuelve cuántas."""
+    vencidas = SubidaFragmentada.objects.filter(
+        estado='EN_CURSO', fecha_actualizacion__lt=timezone.now() - timedelta(days=dias)
+    )
+    total = 0
+    for subida in vencidas:
+        descartar_subida(subida)
+        total += 1
+    return total
@@ -1,3 +1,198 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from openpyxl import load_workbook
+from proveedores_app.models import Proveedor
+
+from . import importacion
+from .depreciacion import ESTADOS_DEPRECIABLES, calcular_depreciacion, recalcular_pendientes
+from .models import Bien, DepreciacionMensual, EjecucionDepreciacion, EstadoDepreciacionBien, ImportacionBienes
+
+
+def crear_bien(i, **campos):
+    datos = {
+        'descripcion': f'Bien {i}',
+        'ubicacion_fisica_especifica': 'Piso 1',
+        'fecha_adquisicion': date(2012 + i % 9, i % 12 + 1, 1),
+        'valor_unitario_bs': Decimal(1000 + 137 * i) + Decimal('0.45'),
+        'valor_residual': Decimal(0 if i % 3 else 50 * i),
+        'vida_util_estimada_anios': i % 7 + 1,
+        'metodo_depreciacion': 'LINEA_RECTA' if i % 2 else 'SALDO_DECRECIENTE',
+    }
+    datos.update(campos)
+    return Bien.objects.create(**datos)
+
+
+def historial():
+    return {
+        (bien_id, anio, mes): valores for bien_id, anio, mes, *valores in DepreciacionMensual.objects.values_list(
+            'bien_id', 'anio', 'mes', 'valor_depreciado_mes', 'depreciacion_acumulada', 'valor_neto_en_libros'
+        )
+    }
+
+
+def estados():
+    return {
+        bien_id: valores for bien_id, *valores in EstadoDepreciacionBien.objects.values_list(
+            'bien_id', 'ultimo_anio', 'ultimo_mes', 'depreciacion_acumulada', 'valor_neto_en_libros'
+        )
+    }
+
+
+def depreciar_mes_a_mes(anio, mes):
+    """El cálculo anterior: un registro por bien y mes, leyendo el del mes previo."""
+    fin = date(anio, mes, 1)
+    bienes = Bien.objects.filter(
+        vida_util_estimada_anios__gt=0, metodo_depreciacion__in=['LINEA_RECTA', 'SALDO_DECRECIENTE'],
+        estado_bien__in=ESTADOS_DEPRECIABLES,
+    )
+    for bien in bienes:
+        ultimo = DepreciacionMensual.objects.filter(bien=bien).order_by('-anio', '-mes').first()
+        periodo = date(bien.fecha_adquisicion.year, bien.fecha_adquisicion.month, 1)
+        if ultimo:
+            periodo = date(ultimo.anio, ultimo.mes, 1) + relativedelta(months=1)
+        while periodo <= fin:
+            ultimo = DepreciacionMensual.objects.filter(bien=bien).order_by('-anio', '-mes').first()
+            neto = ultimo.valor_neto_en_libros if ultimo else bien.valor_unitario_bs
+            if neto <= bien.valor_residual:
+                break
+            if bien.metodo_depreciacion == 'LINEA_RECTA':
+                cuota = (bien.valor_unitario_bs - bien.valor_residual) / Decimal(bien.vida_util_estimada_anios * 12)
+            else:
+                cuota = neto * (Decimal(1) / Decimal(bien.vida_util_estimada_anios) * 2) / Decimal(12)
+            if neto - cuota < bien.valor_residual:
+                cuota = neto - bien.valor_residual
+            acumulada = (ultimo.depreciacion_acumulada if ultimo else Decimal('0.00')) + cuota
+            DepreciacionMensual.objects.create(
+                bien=bien, mes=periodo.month, anio=periodo.year, valor_depreciado_mes=cuota,
+                depreciacion_acumulada=acumulada, valor_neto_en_libros=bien.valor_unitario_bs - acumulada,
+            )
+            periodo += relativedelta(months=1)
+
+
+class CalculoDepreciacionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(14):
+            crear_bien(i)
+
+    def test_igual_al_calculo_mes_a_mes(self):
+        # Un cálculo parcial y luego el resto, como las ejecuciones mensuales
+        calcular_depreciacion(2019, 6)
+        calcular_depreciacion(2025, 3)
+        calculado = historial()
+        DepreciacionMensual.objects.all().delete()
+        depreciar_mes_a_mes(2019, 6)
+        depreciar_mes_a_mes(2025, 3)
+        self.assertTrue(calculado)
+        self.assertEqual(calculado, historial())
+
+    def test_recalculo_desde_un_periodo_igual_a_reconstruir(self):
+        calcular_depreciacion(2022, 6)
+        EjecucionDepreciacion.objects.create(anio=2022, mes=6, estado='COMPLETADA')
+        bienes = list(Bien.objects.order_by('id'))
+        bienes[0].valor_unitario_bs *= 2
+        bienes[1].valor_residual = bienes[1].valor_unitario_bs / 3
+        bienes[2].vida_util_estimada_anios += 3
+        bienes[3].metodo_depreciacion = 'LINEA_RECTA' if bienes[3].metodo_depreciacion != 'LINEA_RECTA' else 'SALDO_DECRECIENTE'
+        bienes[4].fecha_adquisicion = date(2019, 5, 1)
+        bienes[5].metodo_depreciacion = None
+        for bien in bienes[:6]:
+            bien.save()
+        self.assertEqual(EstadoDepreciacionBien.objects.filter(recalcular_desde_anio__isnull=False).count(), 6)
+
+        recalcular_pendientes(tamano_lote=4)
+        recalculado, estados_recalculados = historial(), estados()
+        DepreciacionMensual.objects.all().delete()
+        EstadoDepreciacionBien.objects.all().delete()
+        calcular_depreciacion(2022, 6)
+        self.assertEqual(recalculado, historial())
+        self.assertEqual(estados_recalculados, estados())
+
+
+def fila(i, **columnas):
+    datos = {
+        'FECHA DE ADQUISICIÓN': f'2021-03-{i % 28 + 1:02d}', 'DESCRIPCIÓN': f'Bien {i}', 'CANTIDAD': 1,
+        'MARCA': 'HP', 'MODELO': f'M{i}', 'SERIAL': f'S{i:06d}', 'CÓDIGO': f'A{i}',
+        'N° ORDEN DE COMPRA O N° DE FACTURA': 'F1', 'PROVEEDOR': 'ACME C.A.', 'VALOR UNITARIO Bs.': '1500.50',
+        'VALOR UNITARIO $': '', 'RESPONSABLE DEL ÁREA': 'Ana', 'CARGO DEL RESPONSABLE': 'Jefa',
+        'UBICACIÓN FÍSICA': 'Piso 1', 'ESTADO DEL BIEN': 'Bueno', 'OBSERVACIONES': '',
+    }
+    datos.update(columnas)
+    return datos
+
+
+class ImportacionTests(TestCase):
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        configuracion = override_settings(MEDIA_ROOT=directorio, IMPORTACION_FRAGMENTOS_DIR=directorio)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        Proveedor.objects.create(nombre_proveedor='ACME C.A.')
+
+    def importar(self, filas, modo='CREAR', tamano_lote=importacion.TAMANO_LOTE_IMPORTACION):
+        contenido = io.StringIO()
+        pd.DataFrame(filas).to_csv(contenido, sep=';', index=False)
+        carga = ImportacionBienes.objects.create(
+            archivo=ContentFile(contenido.getvalue().encode(), name='carga.csv'), nombre_archivo='carga.csv', modo=modo,
+        )
+        importacion.ejecutar_importacion(carga, tamano_lote=tamano_lote)
+        return carga
+
+    def test_fila_invalida_rechaza_la_carga(self):
+        carga = self.importar([fila(1), fila(2, **{'FECHA DE ADQUISICIÓN': '2024-13-01'}), fila(3)])
+
+        self.assertEqual(carga.estado, 'RECHAZADA')
+        self.assertEqual(carga.filas_con_error, 1)
+        self.assertEqual(Bien.objects.count(), 0)
+        with carga.archivo_errores.open('rb') as archivo:
+            filas = list(load_workbook(archivo).active.iter_rows(values_only=True))
+        self.assertEqual(filas[0][-1], 'ERRORES')
+        self.assertEqual([f[-1] for f in filas[1:]], [
+            None, 'fecha_adquisicion: Fecha con formato erróneo. Use AAAA-MM-DD o DD/MM/AAAA.', None,
+        ])
+
+    def test_carga_valida_crea_los_bienes(self):
+        carga = self.importar([fila(i) for i in range(5)], tamano_lote=2)
+
+        self.assertEqual(carga.estado, 'COMPLETADA')
+        self.assertEqual(carga.bienes_creados, 5)
+        self.assertEqual(
+            sorted(Bien.objects.values_list('serial', flat=True)), [f'S{i:06d}' for i in range(5)]
+        )
+
+    def test_actualizacion_fallida_deja_los_bienes_como_estaban(self):
+        self.importar([fila(i) for i in range(4)])
+        antes = list(Bien.objects.order_by('id').values_list('serial', 'valor_unitario_bs', 'marca', 'bloque_duplicados'))
+
+        guardar_lote = importacion._guardar_lote
+        lotes = []
+
+        def fallar_en_el_tercer_lote(*args, **kwargs):
+            lotes.append(None)
+            if len(lotes) == 3:
+                raise RuntimeError('Fallo simulado')
+            return guardar_lote(*args, **kwargs)
+
+        filas = [fila(i, **{'VALOR UNITARIO Bs.': '999.00', 'MARCA': 'DELL'}) for i in range(4)] + [fila(10), fila(11)]
+        with mock.patch.object(importacion, '_guardar_lote', fallar_en_el_tercer_lote):
+            with self.assertRaises(RuntimeError):
+                self.importar(filas, modo='ACTUALIZAR', tamano_lote=2)
+
+        carga = ImportacionBienes.objects.latest('id')
+        self.assertEqual(carga.estado, 'FALLIDA')
+        self.assertEqual(
+            list(Bien.objects.order_by('id').values_list('serial', 'valor_unitario_bs', 'marca', 'bloque_duplicados')),
+            antes,
+        )
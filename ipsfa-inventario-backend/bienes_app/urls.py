@@ -15,12 +15,31 @@ from .views import (
     ReporteBienesTrasladadosExcel,
     DashboardStatsView,
     BienesUploadView,
+    BienesDuplicadosView,
+    SubidaFragmentadaView,
+    SubidaFragmentadaDetailView,
+    SubidaFragmentoView,
+    CompletarSubidaFragmentadaView,
+    ImportacionBienesListView,
+    ImportacionBienesDetailView,
+    ImportacionBienesErroresView,
     CalcularDepreciacionView,
+    EjecucionDepreciacionListView,
+    EjecucionDepreciacionDetailView,
+    ValorDepreciacionPeriodoView,
+    ProyeccionDepreciacionView,
     CategoriaViewSet,
+    UsoBienViewSet,
     BienQRCodeView,
     ReporteDepreciacionPDF,
     ReporteDepreciacionExcel,
+    ReporteDepreciacionAnualPDF,
+    ReporteDepreciacionAnualExcel,
+    ExportacionParquetView,
     SiguienteCodigoPatrimonialView,
+    SolicitudReporteView,
+    SolicitudReporteDetailView,
+    SolicitudReporteDescargaView,
 )
 from .user_views import UserDetailView
 
@@ -28,12 +47,25 @@ router = DefaultRouter()
 router.register(r'bienes', BienViewSet, basename='bien')
 router.register(r'movimientos-bienes', MovimientoBienViewSet, basename='movimientobien')
 router.register(r'categorias', CategoriaViewSet, basename='categoria')
+router.register(r'usos-bienes', UsoBienViewSet, basename='usobien')
 
 urlpatterns = [
     path('dashboard/stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
     path('bienes/upload/', BienesUploadView.as_view(), name='bienes-upload'),
+    path('bienes/duplicados/', BienesDuplicadosView.as_view(), name='bienes-duplicados'),
+    path('bienes/upload/fragmentado/', SubidaFragmentadaView.as_view(), name='subida-fragmentada'),
+    path('bienes/upload/fragmentado/<int:pk>/', SubidaFragmentadaDetailView.as_view(), name='subida-fragmentada-detalle'),
+    path('bienes/upload/fragmentado/<int:pk>/<int:numero>/', SubidaFragmentoView.as_view(), name='subida-fragmentada-fragmento'),
+    path('bienes/upload/fragmentado/<int:pk>/completar/', CompletarSubidaFragmentadaView.as_view(), name='subida-fragmentada-completar'),
+    path('bienes/importaciones/', ImportacionBienesListView.as_view(), name='importaciones-bienes'),
+    path('bienes/importaciones/<int:pk>/', ImportacionBienesDetailView.as_view(), name='importacion-bienes-detalle'),
+    path('bienes/importaciones/<int:pk>/errores/', ImportacionBienesErroresView.as_view(), name='importacion-bienes-errores'),
     path('bienes/<int:pk>/qr_code/', BienQRCodeView.as_view(), name='bien-qr-code'),
     path('depreciacion/calcular/', CalcularDepreciacionView.as_view(), name='calcular-depreciacion'),
+    path('depreciacion/ejecuciones/', EjecucionDepreciacionListView.as_view(), name='ejecuciones-depreciacion'),
+    path('depreciacion/ejecuciones/<int:pk>/', EjecucionDepreciacionDetailView.as_view(), name='ejecucion-depreciacion-detalle'),
+    path('depreciacion/valor-al-periodo/', ValorDepreciacionPeriodoView.as_view(), name='valor-depreciacion-periodo'),
+    path('depreciacion/proyeccion/', ProyeccionDepreciacionView.as_view(), name='proyeccion-depreciacion'),
     path('reportes/inventario-general/', ReporteInventarioGeneralPDF.as_view(), name='reporte-inventario-general'),
     path('reportes/inventario-general/excel/', ReporteInventarioGeneralExcel.as_view(), name='reporte-inventario-general-excel'),
     path('reportes/bienes-por-categoria/pdf/', ReporteBienesPorCategoriaPDF.as_view(), name='reporte-bienes-categoria-pdf'),
@@ -46,6 +78,12 @@ urlpatterns = [
     path('reportes/bienes-trasladados/excel/', ReporteBienesTrasladadosExcel.as_view(), name='reporte-bienes-trasladados-excel'),
     path('reportes/depreciacion/pdf/', ReporteDepreciacionPDF.as_view(), name='reporte-depreciacion-pdf'),
     path('reportes/depreciacion/excel/', ReporteDepreciacionExcel.as_view(), name='reporte-depreciacion-excel'),
+    path('reportes/depreciacion-anual/pdf/', ReporteDepreciacionAnualPDF.as_view(), name='reporte-depreciacion-anual-pdf'),
+    path('reportes/depreciacion-anual/excel/', ReporteDepreciacionAnualExcel.as_view(), name='reporte-depreciacion-anual-excel'),
+    path('reportes/solicitudes/', SolicitudReporteView.as_view(), name='solicitudes-reporte'),
+    path('reportes/solicitudes/<int:pk>/', SolicitudReporteDetailView.as_view(), name='solicitud-reporte-detalle'),
+    path('reportes/solicitudes/<int:pk>/descargar/', SolicitudReporteDescargaView.as_view(), name='solicitud-reporte-descarga'),
+    path('reportes/parquet/<str:tabla>/', ExportacionParquetView.as_view(), name='exportacion-parquet'),
     path('bienes/siguiente-codigo/<str:codigo_unidad>/', SiguienteCodigoPatrimonialView.as_view(), name='siguiente-codigo-patrimonial'),
     path('', include(router.urls)),
     path('users/me/', UserDetailView.as_view(), name='user-detail'),
@@ -1,29 +1,45 @@
-from rest_framework import viewsets, permissions, status
+from rest_framework import viewsets, permissions, status, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Sum, Count, Max, F, Subquery, OuterRef, Q
-from django.db import transaction
-import pandas as pd
-from .models import Bien, MovimientoBien, DepreciacionMensual, Categoria
-from .serializers import BienSerializer, MovimientoBienSerializer, CategoriaSerializer
+from rest_framework.pagination import PageNumberPagination
+from django.db.models import Sum, Count
+from .models import Bien, MovimientoBien, Categoria, EstadoDepreciacionBien, EjecucionDepreciacion, UsoBien, ImportacionBienes, SubidaFragmentada
+from .serializers import (
+    BienSerializer, MovimientoBienSerializer, CategoriaSerializer, EjecucionDepreciacionSerializer,
+    UsoBienSerializer, ImportacionBienesSerializer, SubidaFragmentadaSerializer, SolicitudReporteSerializer,
+)
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from unidades_administrativas_app.models import UnidadAdministrativa
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse, FileResponse
 from django.shortcuts import get_object_or_404
 import qrcode
 from io import BytesIO
 from decimal import Decimal
-from .pdf_generator import (
-    generar_reporte_inventario_pdf, 
-    generar_reporte_desincorporados_pdf, 
-    generar_reporte_traslados_pdf, 
-    generar_reporte_depreciacion_pdf,
-    generar_reporte_por_categoria_pdf,
-    generar_reporte_por_unidad_pdf
+from .importacion import leer_archivo, simular_importacion, EXTENSIONES_ARCHIVO
+from .parquet import exportar_parquet, TABLAS_PARQUET
+from .duplicados import buscar_grupos_duplicados, UMBRAL_SIMILITUD
+from .subida_fragmentada import (
+    guardar_fragmento, completar_subida, descartar_subida, fragmentos_faltantes,
+    TAMANO_FRAGMENTO, TAMANO_FRAGMENTO_MINIMO, TAMANO_FRAGMENTO_MAXIMO,
+)
+from .reportes import TIPOS_REPORTE, metodo_de_los_parametros
+from .cache_reportes import abrir_reporte, clave_reporte, ruta_reporte, version_datos
+from .solicitudes_reportes import crear_solicitud, ruta_archivo_solicitud, solicitudes_visibles
+from .depreciacion import (
+    valores_al_periodo,
+    bienes_proyectables,
+    proyeccion_mensual,
+    proyeccion_anual,
+    periodo_a_indice,
+    indice_a_periodo,
 )
-from .excel_generator import generar_reporte_inventario_excel, generar_reporte_desincorporados_excel, generar_reporte_traslados_excel, generar_reporte_depreciacion_excel
 from datetime import date
-from dateutil.relativedelta import relativedelta
+import csv
+import itertools
+import os
+import tempfile
 
 # from unidades_administrativas_app.models import UnidadAdministrativa # Si necesitas la instancia, ya está importada en serializers.py y accesible a través del movimiento
 
@@ -102,14 +118,9 @@ class DashboardStatsView(APIView):
             total=Sum('valor_unitario_bs')
         )['total'] or 0
 
-        # 2. Depreciación Acumulada (LÓGICA ACTUALIZADA)
-        subquery = DepreciacionMensual.objects.filter(
-            bien=OuterRef('pk')
-        ).order_by('-anio', '-mes').values('depreciacion_acumulada')[:1]
-        depreciacion_acumulada_total = Bien.objects.annotate(
-            ultima_dep_acumulada=Subquery(subquery)
-        ).aggregate(
-            total_depreciacion=Sum('ultima_dep_acumulada')
+        # 2. Depreciación Acumulada (último estado de cada bien, mantenido por el cálculo de depreciación)
+        depreciacion_acumulada_total = EstadoDepreciacionBien.objects.aggregate(
+            total_depreciacion=Sum('depreciacion_acumulada')
         )['total_depreciacion'] or 0
 
         # 3. Conteo de Bienes Obsoletos (sin cambios)
@@ -141,7 +152,18 @@ class DashboardStatsView(APIView):
 
 class BienesUploadView(APIView):
     """
-    Vista para manejar la carga masiva de bienes desde un archivo CSV o Excel.
+    Vista para manejar la carga masiva de bienes desde un archivo CSV, Excel o Parquet.
+    El archivo no se procesa dentro de la petición: se guarda como una
+    ImportacionBienes PENDIENTE que procesa el comando `procesar_importaciones`
+    (ver importacion.py), y su avance se consulta en ImportacionBienesDetailView.
+    Con modo=ACTUALIZAR las filas de bienes ya registrados los actualizan, y con
+    crear_proveedores=true se crean los proveedores del archivo que no existan.
+    Las filas que parecen duplicar un bien registrado u otra fila (mismo
+    serial escrito distinto, o misma marca y modelo con descripción parecida;
+    ver duplicados.py) son errores, salvo con permitir_duplicados=true.
+
+    Con simular=true el archivo se valida en la misma petición sin guardar nada
+    y se responde con el resumen de lo que haría la carga (ver simular_importacion).
     """
     permission_classes = [permissions.IsAdminUser] # Solo administradores pueden hacer cargas masivas
 
@@ -150,91 +172,211 @@ class BienesUploadView(APIView):
 
         if not archivo:
             return Response({'error': 'No se proporcionó ningún archivo.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not archivo.name.endswith(EXTENSIONES_ARCHIVO):
+            return Response({'error': 'Formato de archivo no soportado.'}, status=status.HTTP_400_BAD_REQUEST)
+        modo = request.data.get('modo') or 'CREAR'
+        if modo not in dict(ImportacionBienes.MODO_CHOICES):
+            return Response({'error': f"Modo de carga '{modo}' no válido."}, status=status.HTTP_400_BAD_REQUEST)
+        crear_proveedores = str(request.data.get('crear_proveedores', '')).lower() in ('true', '1')
+        permitir_duplicados = str(request.data.get('permitir_duplicados', '')).lower() in ('true', '1')
+
+        if str(request.data.get('simular', '')).lower() in ('true', '1'):
+            try:
+                df = leer_archivo(archivo)
+            except Exception as e:
+                return Response({'error': f"Error al leer el archivo: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+            resumen = simular_importacion(df, actualizar=modo == 'ACTUALIZAR', crear_proveedores=crear_proveedores,
+                                          permitir_duplicados=permitir_duplicados)
+            resumen['status'] = f"Validación de '{archivo.name}' completada; no se guardó ningún cambio."
+            return Response(resumen, status=status.HTTP_200_OK)
+
+        importacion = ImportacionBienes.objects.create(
+            archivo=archivo,
+            nombre_archivo=archivo.name,
+            modo=modo,
+            crear_proveedores=crear_proveedores,
+            permitir_duplicados=permitir_duplicados,
+            usuario=request.user,
+            ip_address=request.META.get('REMOTE_ADDR'),
+        )
+        datos = ImportacionBienesSerializer(importacion).data
+        datos['status'] = f"Archivo '{archivo.name}' recibido; la carga se procesará en segundo plano."
+        return Response(datos, status=status.HTTP_202_ACCEPTED)
+
+class BienesDuplicadosView(APIView):
+    """
+    Grupos de posibles bienes duplicados entre los registrados (ver
+    duplicados.py): mismo serial escrito distinto, o misma marca y modelo con
+    descripción parecida. Parámetros: `umbral` de similitud de las
+    descripciones (0.5 a 1) y `limite` de grupos en la respuesta (por
+    defecto 500), además de los filtros `categoria_id` y `unidad_id`.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    LIMITE_GRUPOS = 500
 
-        # Determinar el tipo de archivo y leerlo con pandas
+    def get(self, request, *args, **kwargs):
         try:
-            if archivo.name.endswith('.csv'):
-                df = pd.read_csv(archivo, sep=';', encoding='utf-8')
-            elif archivo.name.endswith(('.xls', '.xlsx')):
-                df = pd.read_excel(archivo)
-            else:
-                return Response({'error': 'Formato de archivo no soportado.'}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            return Response({'error': f"Error al leer el archivo: {e}"}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Mapeo de columnas del archivo Excel/CSV a los campos del modelo Django
-        column_map = {
-            'FECHA DE ADQUISICIÓN': 'fecha_adquisicion',
-            'DESCRIPCIÓN': 'descripcion',
-            'CANTIDAD': 'cantidad',
-            'MARCA': 'marca',
-            'MODELO': 'modelo',
-            'SERIAL': 'serial',
-            'CÓDIGO': 'codigo_anterior',
-            'N° ORDEN DE COMPRA O N° DE FACTURA': 'n_orden_compra_factura',
-            'PROVEEDOR': 'nombre_proveedor',
-            'VALOR UNITARIO Bs.': 'valor_unitario_bs',
-            'VALOR UNITARIO $': 'valor_unitario_usd',
-            'RESPONSABLE DEL ÁREA': 'responsable_asignado_nombre',
-            'CARGO DEL RESPONSABLE': 'responsable_asignado_cargo',
-            'UBICACIÓN FÍSICA': 'ubicacion_fisica_especifica',
-            'ESTADO DEL BIEN': 'estado_bien',
-            'OBSERVACIONES': 'observaciones'
-        }
+            umbral = float(request.query_params.get('umbral') or UMBRAL_SIMILITUD)
+            limite = int(request.query_params.get('limite') or self.LIMITE_GRUPOS)
+        except ValueError:
+            return Response({'error': 'umbral y limite deben ser números.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0.5 <= umbral <= 1:
+            return Response({'error': 'El umbral debe estar entre 0.5 y 1.'}, status=status.HTTP_400_BAD_REQUEST)
+        if limite <= 0:
+            return Response({'error': 'El límite debe ser mayor que 0.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        filtros = {}
+        try:
+            for parametro, campo in (('categoria_id', 'categoria_id'), ('unidad_id', 'unidad_administrativa_actual_id')):
+                if request.query_params.get(parametro):
+                    filtros[campo] = int(request.query_params[parametro])
+        except ValueError:
+            return Response({'error': 'categoria_id y unidad_id deben ser números enteros.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        df.rename(columns=column_map, inplace=True)
-
-        # Convertir la columna de estado a los valores internos del modelo (ej: 'Nuevo' -> 'NUEVO')
-        estado_map = {
-            'Nuevo': 'NUEVO',
-            'Bueno': 'BUENO',
-            'Regular': 'REGULAR',
-            'Malo': 'MALO',
-            'En Reparación': 'EN_REPARACION',
-            'Obsoleto': 'OBSOLETO',
-            'Desincorporado': 'DESINCORPORADO'
-        }
-        if 'estado_bien' in df.columns:
-            df['estado_bien'] = df['estado_bien'].map(estado_map).fillna('NUEVO')
+        grupos = buscar_grupos_duplicados(umbral, Bien.objects.filter(**filtros))
+        return Response({'total_grupos': len(grupos), 'grupos': grupos[:limite]}, status=status.HTTP_200_OK)
 
-        bienes_a_crear = df.to_dict('records')
-        errors = []
-        success_count = 0
+class SubidaFragmentadaView(APIView):
+    """
+    Inicia la subida en fragmentos de un archivo de carga masiva grande (ver
+    subida_fragmentada.py). Recibe nombre_archivo, tamano_total (bytes) y
+    opcionalmente tamano_fragmento, modo, crear_proveedores y permitir_duplicados.
+    """
+    permission_classes = [permissions.IsAdminUser]
 
+    def post(self, request, *args, **kwargs):
+        nombre_archivo = request.data.get('nombre_archivo')
+        if not nombre_archivo:
+            return Response({'error': 'Debe indicar el nombre del archivo.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not nombre_archivo.endswith(EXTENSIONES_ARCHIVO):
+            return Response({'error': 'Formato de archivo no soportado.'}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            with transaction.atomic(): # Usar una transacción atómica
-                for i, record in enumerate(bienes_a_crear):
-                    # Limpiar datos: convertir NaN de pandas a None
-                    cleaned_record = {k: v if pd.notna(v) else None for k, v in record.items()}
-
-                    serializer = BienSerializer(data=cleaned_record)
-                    if serializer.is_valid():
-                        serializer.save()
-                        success_count += 1
-                    else:
-                        errors.append({'fila': i + 2, 'errores': serializer.errors})
-                
-                # Si hay algún error, revertir toda la transacción
-                if errors:
-                    raise Exception("Errores de validación encontrados durante la carga.")
+            tamano_total = int(request.data.get('tamano_total'))
+            tamano_fragmento = int(request.data.get('tamano_fragmento') or TAMANO_FRAGMENTO)
+        except (TypeError, ValueError):
+            return Response({'error': 'tamano_total y tamano_fragmento deben ser números enteros.'}, status=status.HTTP_400_BAD_REQUEST)
+        if tamano_total <= 0:
+            return Response({'error': 'El archivo está vacío.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not TAMANO_FRAGMENTO_MINIMO <= tamano_fragmento <= TAMANO_FRAGMENTO_MAXIMO:
+            return Response(
+                {'error': f'tamano_fragmento debe estar entre {TAMANO_FRAGMENTO_MINIMO} y {TAMANO_FRAGMENTO_MAXIMO} bytes.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        modo = request.data.get('modo') or 'CREAR'
+        if modo not in dict(ImportacionBienes.MODO_CHOICES):
+            return Response({'error': f"Modo de carga '{modo}' no válido."}, status=status.HTTP_400_BAD_REQUEST)
+
+        subida = SubidaFragmentada.objects.create(
+            nombre_archivo=nombre_archivo,
+            tamano_total=tamano_total,
+            tamano_fragmento=tamano_fragmento,
+            modo=modo,
+            crear_proveedores=str(request.data.get('crear_proveedores', '')).lower() in ('true', '1'),
+            permitir_duplicados=str(request.data.get('permitir_duplicados', '')).lower() in ('true', '1'),
+            usuario=request.user,
+            ip_address=request.META.get('REMOTE_ADDR'),
+        )
+        return Response(SubidaFragmentadaSerializer(subida).data, status=status.HTTP_201_CREATED)
 
-        except Exception as e:
-            # Si la excepción fue la que lanzamos, devolvemos los errores de validación
-            if str(e) == "Errores de validación encontrados durante la carga.":
-                 return Response({
-                    'status': 'Error de validación',
-                    'success_count': success_count,
-                    'error_count': len(errors),
-                    'errors': errors
-                }, status=status.HTTP_400_BAD_REQUEST)
-            # Para otros errores inesperados
-            return Response({'error': f'Error inesperado en la transacción: {e}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        return Response({
-            'status': 'Carga masiva completada exitosamente',
-            'total_procesados': len(bienes_a_crear),
-            'bienes_creados': success_count
-        }, status=status.HTTP_201_CREATED)
+class SubidaFragmentadaDetailView(APIView):
+    """Estado de una subida en fragmentos (incluye los fragmentos que faltan, para retomarla) o su cancelación."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, pk, *args, **kwargs):
+        subida = get_object_or_404(SubidaFragmentada, pk=pk, usuario=request.user)
+        return Response(SubidaFragmentadaSerializer(subida).data)
+
+    def delete(self, request, pk, *args, **kwargs):
+        subida = get_object_or_404(SubidaFragmentada, pk=pk, usuario=request.user, estado='EN_CURSO')
+        descartar_subida(subida)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class SubidaFragmentoView(APIView):
+    """Recibe el fragmento número `numero` (desde 0) en el campo 'fragmento'. Se puede reenviar."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def put(self, request, pk, numero, *args, **kwargs):
+        subida = get_object_or_404(SubidaFragmentada, pk=pk, usuario=request.user)
+        fragmento = request.FILES.get('fragmento')
+        if not fragmento:
+            return Response({'error': 'No se proporcionó el fragmento.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            guardar_fragmento(subida, numero, fragmento)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'fragmento': numero, 'fragmentos_faltantes': len(fragmentos_faltantes(subida))})
+
+class CompletarSubidaFragmentadaView(APIView):
+    """Une los fragmentos y encola la importación del archivo, igual que BienesUploadView."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request, pk, *args, **kwargs):
+        subida = get_object_or_404(SubidaFragmentada, pk=pk, usuario=request.user)
+        try:
+            importacion = completar_subida(subida)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        datos = ImportacionBienesSerializer(importacion).data
+        datos['status'] = f"Archivo '{importacion.nombre_archivo}' recibido; la carga se procesará en segundo plano."
+        return Response(datos, status=status.HTTP_202_ACCEPTED)
+
+class ImportacionBienesListView(generics.ListAPIView):
+    """Últimas cargas masivas de bienes (la más reciente primero)."""
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = ImportacionBienesSerializer
+
+    def get_queryset(self):
+        return ImportacionBienes.objects.select_related('usuario')[:20]
+
+class ImportacionBienesDetailView(generics.RetrieveAPIView):
+    """Estado, avance y tiempo restante estimado de una carga masiva, para que la UI lo consulte periódicamente."""
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = ImportacionBienesSerializer
+    queryset = ImportacionBienes.objects.select_related('usuario')
+
+class ImportacionBienesErroresView(APIView):
+    """Descarga la hoja con las filas del archivo y sus errores de una carga rechazada."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, pk, *args, **kwargs):
+        importacion = get_object_or_404(ImportacionBienes, pk=pk)
+        if not importacion.archivo_errores:
+            return Response({'error': 'Esta carga no tiene hoja de errores.'}, status=status.HTTP_404_NOT_FOUND)
+        nombre = importacion.nombre_archivo.rsplit('.', 1)[0]
+        return FileResponse(
+            importacion.archivo_errores.open('rb'),
+            as_attachment=True,
+            filename=f'errores_{nombre}.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+class ExportacionParquetView(APIView):
+    """
+    Descarga una tabla completa del inventario (bienes, movimientos o
+    depreciaciones) como archivo Parquet, para análisis (ver parquet.py).
+    El archivo se arma en un temporal, leyendo la tabla por lotes.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, tabla, *args, **kwargs):
+        if tabla not in TABLAS_PARQUET:
+            return Response(
+                {'error': f"Tabla '{tabla}' no válida. Opciones: {', '.join(TABLAS_PARQUET)}."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        archivo = tempfile.TemporaryFile()
+        try:
+            exportar_parquet(TABLAS_PARQUET[tabla], archivo)
+        except ValueError as e:
+            archivo.close()
+            return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        archivo.seek(0)
+        return FileResponse(
+            archivo,
+            as_attachment=True,
+            filename=f'{tabla}_{date.today():%Y%m%d}.parquet',
+            content_type='application/vnd.apache.parquet',
+        )
 
 class GenerarQRBienView(APIView):
     """
@@ -293,9 +435,38 @@ class CategoriaViewSet(viewsets.ModelViewSet):
     serializer_class = CategoriaSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+class UsoBienViewSet(viewsets.ModelViewSet):
+    """
+    Uso mensual de los bienes que se deprecian por unidades de producción.
+    Filtrable por `bien_id` y `anio`. Cada cambio marca el historial de
+    depreciación del bien para recalcularlo desde ese mes (ver signals.py).
+    """
+    serializer_class = UsoBienSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        usos = UsoBien.objects.select_related('bien')
+        bien_id = self.request.query_params.get('bien_id')
+        if bien_id:
+            usos = usos.filter(bien_id=bien_id)
+        anio = self.request.query_params.get('anio')
+        if anio:
+            usos = usos.filter(anio=anio)
+        return usos
+
+def metodo_de_la_solicitud(request):
+    """
+    `metodo_depreciacion` de los parámetros de la solicitud, o None si no
+    viene. Lanza ValueError si no es un método registrado en el motor.
+    """
+    return metodo_de_los_parametros(request.query_params)
+
 class CalcularDepreciacionView(APIView):
     """
-    Vista para iniciar el proceso de cálculo de depreciación para un período específico (mes/año).
+    Vista para solicitar el cálculo de depreciación para un período específico (mes/año).
+    El cálculo no se hace dentro de la petición: se registra una EjecucionDepreciacion
+    PENDIENTE que procesa el comando `procesar_depreciacion`, y su avance se consulta en
+    EjecucionDepreciacionDetailView.
     """
     permission_classes = [permissions.IsAdminUser] # Solo administradores pueden ejecutar este proceso
 
@@ -303,396 +474,300 @@ class CalcularDepreciacionView(APIView):
         try:
             mes_solicitado = int(request.data.get('mes'))
             anio_solicitado = int(request.data.get('anio'))
-            fecha_fin_solicitada = date(anio_solicitado, mes_solicitado, 1)
+            date(anio_solicitado, mes_solicitado, 1) # Valida que el período exista
         except (ValueError, TypeError):
             return Response({'error': 'Mes o año inválido.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        bienes_a_depreciar = Bien.objects.filter(
-            vida_util_estimada_anios__isnull=False,
-            vida_util_estimada_anios__gt=0,
-            metodo_depreciacion__isnull=False,
-            estado_bien__in=['NUEVO', 'BUENO', 'REGULAR', 'EN_REPARACION']
-        )
-
-        bienes_calculados = 0
-        bienes_omitidos = 0
-        registros_creados = 0
-
-        with transaction.atomic():
-            for bien in bienes_a_depreciar:
-                ultimo_calculo = DepreciacionMensual.objects.filter(bien=bien).order_by('-anio', '-mes').first()
-
-                fecha_inicio_calculo = date(bien.fecha_adquisicion.year, bien.fecha_adquisicion.month, 1)
-                if ultimo_calculo:
-                    fecha_inicio_calculo = date(ultimo_calculo.anio, ultimo_calculo.mes, 1) + relativedelta(months=1)
-
-                # --- LÓGICA DE "CATCH-UP" ---
-                periodo_actual = fecha_inicio_calculo
-                registros_creados_bien = 0
-                while periodo_actual <= fecha_fin_solicitada:
-                    mes_a_calcular = periodo_actual.month
-                    anio_a_calcular = periodo_actual.year
-
-                    ultimo_calculo_loop = DepreciacionMensual.objects.filter(bien=bien).order_by('-anio', '-mes').first()
-                    valor_en_libros_actual = ultimo_calculo_loop.valor_neto_en_libros if ultimo_calculo_loop else bien.valor_unitario_bs
-
-                    if valor_en_libros_actual <= bien.valor_residual:
-                        break
-
-                    depreciacion_del_mes = Decimal('0.00')
-
-                    if bien.metodo_depreciacion == 'LINEA_RECTA':
-                        vida_util_meses = bien.vida_util_estimada_anios * 12
-                        base_depreciable = bien.valor_unitario_bs - bien.valor_residual
-                        if vida_util_meses > 0:
-                            depreciacion_del_mes = base_depreciable / Decimal(vida_util_meses)
-
-                    elif bien.metodo_depreciacion == 'SALDO_DECRECIENTE':
-                        tasa_depreciacion_anual = (Decimal('1') / Decimal(bien.vida_util_estimada_anios)) * 2
-                        depreciacion_del_mes = (valor_en_libros_actual * tasa_depreciacion_anual) / Decimal('12')
-
-                    if (valor_en_libros_actual - depreciacion_del_mes) < bien.valor_residual:
-                        depreciacion_del_mes = valor_en_libros_actual - bien.valor_residual
-
-                    depreciacion_acumulada_anterior = ultimo_calculo_loop.depreciacion_acumulada if ultimo_calculo_loop else Decimal('0.00')
-                    nueva_depreciacion_acumulada = depreciacion_acumulada_anterior + depreciacion_del_mes
-                    nuevo_valor_neto_en_libros = bien.valor_unitario_bs - nueva_depreciacion_acumulada
-
-                    DepreciacionMensual.objects.create(
-                        bien=bien, mes=mes_a_calcular, anio=anio_a_calcular,
-                        valor_depreciado_mes=depreciacion_del_mes,
-                        depreciacion_acumulada=nueva_depreciacion_acumulada,
-                        valor_neto_en_libros=nuevo_valor_neto_en_libros
-                    )
-                    registros_creados += 1
-                    registros_creados_bien += 1
-
-                    periodo_actual += relativedelta(months=1)
-
-                if registros_creados_bien > 0:
-                    bienes_calculados += 1
-                else:
-                    bienes_omitidos += 1
-
-        return Response({
-            'status': f'Cálculo de depreciación hasta {mes_solicitado}/{anio_solicitado} completado.',
-            'bienes_procesados': bienes_calculados,
-            'bienes_omitidos': bienes_omitidos,
-            'total_registros_mensuales_creados': registros_creados,
-        }, status=status.HTTP_200_OK)
-    
-class ReporteInventarioGeneralPDF(APIView):
-    permission_classes = [permissions.IsAuthenticated]
-
-    def get(self, request, *args, **kwargs):
-        fecha_desde = request.query_params.get('fecha_desde', 'N/A')
-        fecha_hasta = request.query_params.get('fecha_hasta', 'N/A')
-
-        # Filtrar bienes por fecha de creación si se proporcionan fechas
-        bienes = Bien.objects.all().order_by('codigo_patrimonial')
-        
-        if fecha_desde != 'N/A' and fecha_hasta != 'N/A':
-            bienes = bienes.filter(
-                fecha_creacion__date__range=[fecha_desde, fecha_hasta]
-            )
-
-        buffer = generar_reporte_inventario_pdf(bienes, fecha_desde, fecha_hasta)
-
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="reporte_inventario_general.pdf"'
-
-        return response
-    
-class ReporteInventarioGeneralExcel(APIView):
-    permission_classes = [permissions.IsAuthenticated]
-
-    def get(self, request, *args, **kwargs):
-        fecha_desde = request.query_params.get('fecha_desde', 'N/A')
-        fecha_hasta = request.query_params.get('fecha_hasta', 'N/A')
-        
-        # Filtrar bienes por fecha de creación si se proporcionan fechas
-        bienes = Bien.objects.all().order_by('codigo_patrimonial')
-        
-        if fecha_desde != 'N/A' and fecha_hasta != 'N/A':
-            bienes = bienes.filter(
-                fecha_creacion__date__range=[fecha_desde, fecha_hasta]
-            )
-
-        titulo = "INVENTARIO GENERAL DE BIENES PÚBLICOS"
-        buffer = generar_reporte_inventario_excel(bienes, titulo)
-
-        # Preparar la respuesta HTTP
-        response = HttpResponse(
-            buffer,
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        activa = EjecucionDepreciacion.objects.filter(estado__in=['PENDIENTE', 'EN_PROCESO']).first()
+        if activa:
+            return Response({
+                'error': f'Ya hay un cálculo de depreciación en curso (hasta {activa.mes}/{activa.anio}). Espere a que finalice.',
+                'ejecucion': EjecucionDepreciacionSerializer(activa).data,
+            }, status=status.HTTP_409_CONFLICT)
+
+        ejecucion = EjecucionDepreciacion.objects.create(
+            mes=mes_solicitado,
+            anio=anio_solicitado,
+            usuario=request.user,
         )
-        response['Content-Disposition'] = 'attachment; filename="reporte_inventario_general.xlsx"'
-
-        return response
+        datos = EjecucionDepreciacionSerializer(ejecucion).data
+        datos['status'] = f'Cálculo de depreciación hasta {mes_solicitado}/{anio_solicitado} en cola.'
+        return Response(datos, status=status.HTTP_202_ACCEPTED)
+
+class EjecucionDepreciacionListView(generics.ListAPIView):
+    """Últimas ejecuciones de depreciación (la más reciente primero)."""
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = EjecucionDepreciacionSerializer
+
+    def get_queryset(self):
+        return EjecucionDepreciacion.objects.select_related('usuario')[:20]
+
+class EjecucionDepreciacionDetailView(generics.RetrieveAPIView):
+    """Estado y avance de una ejecución de depreciación, para que la UI lo consulte periódicamente."""
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = EjecucionDepreciacionSerializer
+    queryset = EjecucionDepreciacion.objects.select_related('usuario')
     
-class ReporteBienesPorCategoriaPDF(APIView):
+class ValorDepreciacionPeriodoView(APIView):
+    """
+    Depreciación acumulada y valor neto en libros de los bienes a cualquier
+    período (mes/año), aunque no exista el historial mensual (ver
+    `valores_al_periodo`). Con `bien_id` devuelve un solo bien; si no, la lista
+    paginada de los bienes filtrados por `categoria_id` y/o `unidad_id`, con los
+    totales del conjunto.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        # Obtener el ID de la categoría desde los parámetros de la URL (ej: ?categoria_id=1)
-        categoria_id = request.query_params.get('categoria_id')
-
-        if not categoria_id:
-            return Response({'error': 'Debe proporcionar un ID de categoría.'}, status=status.HTTP_400_BAD_REQUEST)
-
         try:
-            # Obtener la categoría y los bienes asociados
-            categoria = Categoria.objects.get(pk=categoria_id)
-            bienes = Bien.objects.filter(categoria=categoria).order_by('codigo_patrimonial')
-
-            # Definir título y rango de fechas (puedes hacerlos dinámicos si los pasas como params)
-            titulo = f"INVENTARIO DE BIENES - CATEGORÍA: {categoria.nombre.upper()}"
-            fecha_desde = request.query_params.get('fecha_desde', 'N/A')
-            fecha_hasta = request.query_params.get('fecha_hasta', 'N/A')
-
-            # Filtrar por fechas si se proporcionan
-            if fecha_desde != 'N/A' and fecha_hasta != 'N/A':
-                bienes = bienes.filter(
-                    fecha_creacion__date__range=[fecha_desde, fecha_hasta]
-                )
-
-            # Llamar a la función específica para categorías
-            buffer = generar_reporte_por_categoria_pdf(bienes, categoria.nombre, fecha_desde, fecha_hasta, titulo)
-
-            response = HttpResponse(buffer, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="reporte_bienes_categoria_{categoria.nombre}.pdf"'
-            return response
-
-        except Categoria.DoesNotExist:
-            return Response({'error': 'La categoría especificada no existe.'}, status=status.HTTP_404_NOT_FOUND)
-
-
-class ReporteBienesPorCategoriaExcel(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+            mes = int(request.query_params.get('mes'))
+            anio = int(request.query_params.get('anio'))
+            date(anio, mes, 1) # Valida que el período exista
+        except (ValueError, TypeError):
+            return Response({'error': 'Mes o año inválido.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    def get(self, request, *args, **kwargs):
+        bien_id = request.query_params.get('bien_id')
+        if bien_id:
+            if not bien_id.isdigit():
+                return Response({'error': 'bien_id inválido.'}, status=status.HTTP_400_BAD_REQUEST)
+            bienes = Bien.objects.filter(pk=bien_id)
+            resultados = valores_al_periodo(bienes, anio, mes)
+            if not resultados:
+                return Response({'error': 'Bien no encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(resultados[0])
+
+        bienes = Bien.objects.all()
         categoria_id = request.query_params.get('categoria_id')
-        if not categoria_id:
-            return Response({'error': 'Debe proporcionar un ID de categoría.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        try:
-            categoria = Categoria.objects.get(pk=categoria_id)
-            bienes = Bien.objects.filter(categoria=categoria).order_by('codigo_patrimonial')
-
-            # Filtrar por fechas si se proporcionan
-            fecha_desde = request.query_params.get('fecha_desde', 'N/A')
-            fecha_hasta = request.query_params.get('fecha_hasta', 'N/A')
-            
-            if fecha_desde != 'N/A' and fecha_hasta != 'N/A':
-                bienes = bienes.filter(
-                    fecha_creacion__date__range=[fecha_desde, fecha_hasta]
-                )
-
-            titulo = f"Inventario de Bienes - Categoría: {categoria.nombre}"
-
-            buffer = generar_reporte_inventario_excel(bienes, titulo)
+        if categoria_id:
+            bienes = bienes.filter(categoria_id=categoria_id)
+        unidad_id = request.query_params.get('unidad_id')
+        if unidad_id:
+            bienes = bienes.filter(unidad_administrativa_actual_id=unidad_id)
+
+        resultados = valores_al_periodo(bienes, anio, mes)
+        paginador = PageNumberPagination()
+        pagina = paginador.paginate_queryset(resultados, request, view=self)
+        respuesta = paginador.get_paginated_response(pagina)
+        respuesta.data['totales'] = {
+            'depreciacion_acumulada': sum((r['depreciacion_acumulada'] for r in resultados), Decimal('0.00')),
+            'valor_neto_en_libros': sum((r['valor_neto_en_libros'] for r in resultados), Decimal('0.00')),
+        }
+        return respuesta
 
-            response = HttpResponse(
-                buffer,
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            response['Content-Disposition'] = f'attachment; filename="reporte_bienes_categoria_{categoria.nombre}.xlsx"'
-            return response
+class _Eco:
+    """Pseudo-archivo para csv.writer: devuelve cada línea en lugar de guardarla (para streaming)."""
+    def write(self, valor):
+        return valor
 
-        except Categoria.DoesNotExist:
-            return Response({'error': 'La categoría especificada no existe.'}, status=status.HTTP_404_NOT_FOUND)
+class ProyeccionDepreciacionView(APIView):
+    """
+    Proyección (simulación) de la depreciación futura, sin escribir en DepreciacionMensual.
 
-class ReporteBienesPorUnidadPDF(APIView):
+    Parámetros: `desde` y `hasta` (AAAA-MM; por defecto el mes actual y 10 años),
+    filtros `categoria_id` y `unidad_id`, y opcionalmente otra `vida_util_estimada_anios`
+    u otro `metodo_depreciacion` para todos los bienes. Con `agrupacion=anual`
+    devuelve los totales por año; si no, envía en streaming un CSV con el
+    calendario mes a mes de cada bien.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    MAXIMO_MESES = 50 * 12
 
     def get(self, request, *args, **kwargs):
-        unidad_id = request.query_params.get('unidad_id')
-        if not unidad_id:
-            return Response({'error': 'Debe proporcionar un ID de unidad.'}, status=status.HTTP_400_BAD_REQUEST)
-
+        hoy = timezone.now().date()
         try:
-            unidad = UnidadAdministrativa.objects.get(pk=unidad_id)
-            bienes = Bien.objects.filter(unidad_administrativa_actual=unidad).order_by('codigo_patrimonial')
-
-            # Filtrar por fechas si se proporcionan
-            fecha_desde = request.query_params.get('fecha_desde', 'N/A')
-            fecha_hasta = request.query_params.get('fecha_hasta', 'N/A')
-            
-            if fecha_desde != 'N/A' and fecha_hasta != 'N/A':
-                bienes = bienes.filter(
-                    fecha_creacion__date__range=[fecha_desde, fecha_hasta]
-                )
-
-            titulo = f"INVENTARIO DE BIENES - UNIDAD ADMINISTRATIVA: {unidad.nombre.upper()}"
-            buffer = generar_reporte_por_unidad_pdf(bienes, unidad.nombre, fecha_desde, fecha_hasta, titulo)
+            desde = self.leer_periodo(request.query_params.get('desde'), periodo_a_indice(hoy.year, hoy.month))
+            hasta = self.leer_periodo(request.query_params.get('hasta'), desde + 10 * 12 - 1)
+        except ValueError:
+            return Response({'error': 'Los períodos deben tener el formato AAAA-MM.'}, status=status.HTTP_400_BAD_REQUEST)
+        if hasta < desde or hasta - desde >= self.MAXIMO_MESES:
+            return Response({'error': 'El rango de la proyección debe ser de 1 a 50 años.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        vida_util = request.query_params.get('vida_util_estimada_anios')
+        if vida_util is not None:
+            if not vida_util.isdigit() or not 0 < int(vida_util) <= 100:
+                return Response({'error': 'La vida útil debe ser un número de años entre 1 y 100.'}, status=status.HTTP_400_BAD_REQUEST)
+            vida_util = int(vida_util)
+        try:
+            metodo = metodo_de_la_solicitud(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            response = HttpResponse(buffer, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="reporte_bienes_unidad_{unidad.nombre}.pdf"'
-            return response
+        bienes = bienes_proyectables(vida_util, metodo)
+        categoria_id = request.query_params.get('categoria_id')
+        if categoria_id:
+            bienes = bienes.filter(categoria_id=categoria_id)
+        unidad_id = request.query_params.get('unidad_id')
+        if unidad_id:
+            bienes = bienes.filter(unidad_administrativa_actual_id=unidad_id)
 
-        except UnidadAdministrativa.DoesNotExist:
-            return Response({'error': 'La unidad especificada no existe.'}, status=status.HTTP_404_NOT_FOUND)
+        if request.query_params.get('agrupacion') == 'anual':
+            cantidad, anios = proyeccion_anual(bienes, desde, hasta, vida_util, metodo)
+            return Response({
+                'desde': '%04d-%02d' % indice_a_periodo(desde),
+                'hasta': '%04d-%02d' % indice_a_periodo(hasta),
+                'vida_util_estimada_anios': vida_util,
+                'metodo_depreciacion': metodo,
+                'cantidad_bienes': cantidad,
+                'anios': anios,
+            })
 
-class ReporteBienesPorUnidadExcel(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+        escritor = csv.writer(_Eco())
+        encabezado = ['Bien ID', 'Código Patrimonial', 'Año', 'Mes', 'Depreciación del Mes', 'Depreciación Acumulada', 'Valor Neto en Libros']
+        filas = itertools.chain([encabezado], proyeccion_mensual(bienes, desde, hasta, vida_util, metodo))
+        response = StreamingHttpResponse((escritor.writerow(fila) for fila in filas), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="proyeccion_depreciacion.csv"'
+        return response
 
-    def get(self, request, *args, **kwargs):
-        unidad_id = request.query_params.get('unidad_id')
-        if not unidad_id:
-            return Response({'error': 'Debe proporcionar un ID de unidad.'}, status=status.HTTP_400_BAD_REQUEST)
-        try:
-            unidad = UnidadAdministrativa.objects.get(pk=unidad_id)
-            bienes = Bien.objects.filter(unidad_administrativa_actual=unidad).order_by('codigo_patrimonial')
-            titulo = f"Inventario de Bienes - Unidad: {unidad.nombre}"
-            buffer = generar_reporte_inventario_excel(bienes, titulo)
-            response = HttpResponse(
-                buffer,
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            response['Content-Disposition'] = f'attachment; filename="reporte_bienes_unidad_{unidad.nombre}.xlsx"'
-            return response
-        except UnidadAdministrativa.DoesNotExist:
-            return Response({'error': 'La unidad especificada no existe.'}, status=status.HTTP_404_NOT_FOUND)
+    def leer_periodo(self, valor, por_defecto):
+        if not valor:
+            return por_defecto
+        anio, mes = (int(parte) for parte in valor.split('-'))
+        date(anio, mes, 1) # Valida que el período exista
+        return periodo_a_indice(anio, mes)
 
-class ReporteBienesDesincorporadosPDF(APIView):
+def respuesta_reporte(request, tipo, datos):
+    """
+    Respuesta con el reporte `tipo` (ver reportes.py) para los parámetros
+    `datos`, servido desde la caché de reportes (ver cache_reportes.py) y
+    generado solo si no está. La clave de la caché es el ETag: si el cliente
+    ya tiene el reporte de la versión actual de los datos (If-None-Match o
+    If-Modified-Since), se responde 304 sin leerlo ni generarlo.
+    """
+    reporte = TIPOS_REPORTE[tipo]
+    try:
+        parametros = reporte.leer_parametros(datos)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except LookupError as e:
+        return Response({'error': e.args[0]}, status=status.HTTP_404_NOT_FOUND)
+
+    clave = clave_reporte(tipo, parametros, version_datos())
+    etag = f'"{clave}"'
+    ruta = ruta_reporte(clave, reporte.extension)
+    ultima_modificacion = int(os.path.getmtime(ruta)) if os.path.exists(ruta) else None
+    respuesta = get_conditional_response(request, etag=etag, last_modified=ultima_modificacion)
+    if respuesta is None:
+        archivo = abrir_reporte(clave, reporte.extension, lambda: reporte.generar(parametros))
+        ultima_modificacion = int(os.fstat(archivo.fileno()).st_mtime)
+        respuesta = FileResponse(
+            archivo, as_attachment=True, filename=reporte.nombre_archivo(parametros), content_type=reporte.tipo_contenido
+        )
+    respuesta['ETag'] = etag
+    if ultima_modificacion is not None:
+        respuesta['Last-Modified'] = http_date(ultima_modificacion)
+    # El navegador puede guardarlo, pero debe revalidarlo (304) antes de usarlo
+    patch_cache_control(respuesta, private=True, no_cache=True)
+    return respuesta
+
+class VistaReporte(APIView):
+    """Descarga del reporte `tipo_reporte` con los parámetros de la URL (ver respuesta_reporte)."""
     permission_classes = [permissions.IsAuthenticated]
+    tipo_reporte = None
 
     def get(self, request, *args, **kwargs):
-        fecha_desde = request.query_params.get('fecha_desde')
-        fecha_hasta = request.query_params.get('fecha_hasta')
+        return respuesta_reporte(request, self.tipo_reporte, request.query_params)
 
-        if not fecha_desde or not fecha_hasta:
-            return Response({'error': 'Debe proporcionar un rango de fechas (fecha_desde y fecha_hasta).'}, status=status.HTTP_400_BAD_REQUEST)
+class ReporteInventarioGeneralPDF(VistaReporte):
+    tipo_reporte = 'inventario_general_pdf'
 
-        # Filtrar los movimientos de desincorporación por rango de fechas
-        movimientos = MovimientoBien.objects.filter(
-            tipo_movimiento='DESINCORPORACION',
-            fecha_movimiento__date__range=[fecha_desde, fecha_hasta]
-        ).select_related('bien').order_by('fecha_movimiento')
+class ReporteInventarioGeneralExcel(VistaReporte):
+    tipo_reporte = 'inventario_general_excel'
 
-        titulo = "RELACIÓN DE BIENES DESINCORPORADOS"
-        buffer = generar_reporte_desincorporados_pdf(movimientos, fecha_desde, fecha_hasta, titulo)
+class ReporteBienesPorCategoriaPDF(VistaReporte):
+    # ?categoria_id=1, con fecha_desde y fecha_hasta opcionales
+    tipo_reporte = 'bienes_categoria_pdf'
 
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="reporte_desincorporados.pdf"'
-        return response
-
-class ReporteBienesDesincorporadosExcel(APIView):
-    permission_classes = [permissions.IsAuthenticated]
-
-    def get(self, request, *args, **kwargs):
-        fecha_desde = request.query_params.get('fecha_desde')
-        fecha_hasta = request.query_params.get('fecha_hasta')
-        if not fecha_desde or not fecha_hasta:
-            return Response({'error': 'Debe proporcionar un rango de fechas.'}, status=status.HTTP_400_BAD_REQUEST)
+class ReporteBienesPorCategoriaExcel(VistaReporte):
+    tipo_reporte = 'bienes_categoria_excel'
 
-        movimientos = MovimientoBien.objects.filter(
-            tipo_movimiento='DESINCORPORACION',
-            fecha_movimiento__date__range=[fecha_desde, fecha_hasta]
-        ).select_related('bien').order_by('fecha_movimiento')
+class ReporteBienesPorUnidadPDF(VistaReporte):
+    tipo_reporte = 'bienes_unidad_pdf'
 
-        titulo = "Relación de Bienes Desincorporados"
-        buffer = generar_reporte_desincorporados_excel(movimientos, titulo)
+class ReporteBienesPorUnidadExcel(VistaReporte):
+    tipo_reporte = 'bienes_unidad_excel'
 
-        response = HttpResponse(buffer, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename="reporte_desincorporados.xlsx"'
-        return response
+class ReporteBienesDesincorporadosPDF(VistaReporte):
+    tipo_reporte = 'desincorporados_pdf'
 
-class ReporteBienesTrasladadosPDF(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+class ReporteBienesDesincorporadosExcel(VistaReporte):
+    tipo_reporte = 'desincorporados_excel'
 
-    def get(self, request, *args, **kwargs):
-        fecha_desde = request.query_params.get('fecha_desde')
-        fecha_hasta = request.query_params.get('fecha_hasta')
-        unidad_id = request.query_params.get('unidad_id') # Filtro opcional de unidad
+class ReporteBienesTrasladadosPDF(VistaReporte):
+    # unidad_id es un filtro opcional: la unidad puede ser origen o destino
+    tipo_reporte = 'traslados_pdf'
 
-        if not fecha_desde or not fecha_hasta:
-            return Response({'error': 'Debe proporcionar un rango de fechas.'}, status=status.HTTP_400_BAD_REQUEST)
+class ReporteBienesTrasladadosExcel(VistaReporte):
+    tipo_reporte = 'traslados_excel'
 
-        movimientos = MovimientoBien.objects.filter(
-            tipo_movimiento='TRASLADO',
-            fecha_movimiento__date__range=[fecha_desde, fecha_hasta]
-        ).select_related('bien', 'unidad_origen', 'unidad_destino').order_by('fecha_movimiento')
+class ReporteDepreciacionPDF(VistaReporte):
+    tipo_reporte = 'depreciacion_pdf'
 
-        # Si se proporciona una unidad, filtrar si es origen O destino
-        if unidad_id:
-            movimientos = movimientos.filter(Q(unidad_origen_id=unidad_id) | Q(unidad_destino_id=unidad_id))
+class ReporteDepreciacionExcel(VistaReporte):
+    tipo_reporte = 'depreciacion_excel'
 
-        titulo = "RELACIÓN DE BIENES TRASLADADOS"
-        buffer = generar_reporte_traslados_pdf(movimientos, fecha_desde, fecha_hasta, titulo)
+class ReporteDepreciacionAnualPDF(VistaReporte):
+    tipo_reporte = 'depreciacion_anual_pdf'
 
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="reporte_traslados.pdf"'
-        return response
+class ReporteDepreciacionAnualExcel(VistaReporte):
+    tipo_reporte = 'depreciacion_anual_excel'
 
-class ReporteBienesTrasladadosExcel(APIView):
+class SolicitudReporteView(APIView):
+    """
+    Reportes generados en segundo plano, para los que tardan demasiado en
+    generarse dentro de la petición. GET lista las últimas solicitudes del
+    usuario (y las pregeneradas en la noche); POST registra una con `tipo`
+    (ver TIPOS_REPORTE) y `parametros` (los mismos que recibe la URL del
+    reporte), que genera el comando `procesar_reportes`.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        fecha_desde = request.query_params.get('fecha_desde')
-        fecha_hasta = request.query_params.get('fecha_hasta')
-        unidad_id = request.query_params.get('unidad_id') # Filtro opcional de unidad
-
-        if not fecha_desde or not fecha_hasta:
-            return Response({'error': 'Debe proporcionar un rango de fechas.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        movimientos = MovimientoBien.objects.filter(
-            tipo_movimiento='TRASLADO',
-            fecha_movimiento__date__range=[fecha_desde, fecha_hasta]
-        ).select_related('bien', 'unidad_origen', 'unidad_destino').order_by('fecha_movimiento')
-
-        # Si se proporciona una unidad, filtrar si es origen O destino
-        if unidad_id:
-            movimientos = movimientos.filter(Q(unidad_origen_id=unidad_id) | Q(unidad_destino_id=unidad_id))
-
-        titulo = "Relación de Bienes Trasladados"
-        buffer = generar_reporte_traslados_excel(movimientos, titulo, fecha_desde, fecha_hasta)
+        solicitudes = solicitudes_visibles(request.user)[:20]
+        return Response(SolicitudReporteSerializer(solicitudes, many=True, context={'request': request}).data)
 
-        response = HttpResponse(buffer, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename="reporte_traslados.xlsx"'
-        return response
-
-class ReporteDepreciacionPDF(APIView):
+    def post(self, request, *args, **kwargs):
+        parametros = request.data.get('parametros') or {}
+        if not isinstance(parametros, dict):
+            return Response({'error': 'Los parámetros deben ser un objeto.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            solicitud = crear_solicitud(request.data.get('tipo'), parametros, usuario=request.user)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except LookupError as e:
+            return Response({'error': e.args[0]}, status=status.HTTP_404_NOT_FOUND)
+        datos = SolicitudReporteSerializer(solicitud, context={'request': request}).data
+        datos['status'] = 'Reporte en cola; se generará en segundo plano.'
+        return Response(datos, status=status.HTTP_202_ACCEPTED)
+
+class SolicitudReporteDetailView(generics.RetrieveAPIView):
+    """Estado de una solicitud de reporte, para que la UI lo consulte periódicamente; al completarse trae `url_descarga`."""
     permission_classes = [permissions.IsAuthenticated]
+    serializer_class = SolicitudReporteSerializer
 
-    def get(self, request, *args, **kwargs):
-        fecha_hasta = request.query_params.get('fecha_hasta', date.today().strftime('%Y-%m-%d'))
-        subquery_acumulada = DepreciacionMensual.objects.filter(
-            bien=OuterRef('pk')
-        ).order_by('-anio', '-mes').values('depreciacion_acumulada')[:1]
-        subquery_neto = DepreciacionMensual.objects.filter(
-            bien=OuterRef('pk')
-        ).order_by('-anio', '-mes').values('valor_neto_en_libros')[:1]
-        bienes = Bien.objects.annotate(
-            ultima_depreciacion_acumulada=Subquery(subquery_acumulada),
-            ultimo_valor_neto=Subquery(subquery_neto)
-        ).filter(ultima_depreciacion_acumulada__isnull=False).order_by('codigo_patrimonial')
-        titulo = "REPORTE DE DEPRECIACIÓN ACUMULADA"
-        buffer = generar_reporte_depreciacion_pdf(bienes, fecha_hasta, titulo)
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="reporte_depreciacion.pdf"'
-        return response
+    def get_queryset(self):
+        return solicitudes_visibles(self.request.user)
 
-class ReporteDepreciacionExcel(APIView):
+class SolicitudReporteDescargaView(APIView):
+    """Descarga el archivo de una solicitud de reporte completada."""
     permission_classes = [permissions.IsAuthenticated]
 
-    def get(self, request, *args, **kwargs):
-        fecha_hasta = request.query_params.get('fecha_hasta', date.today().strftime('%Y-%m-%d'))
-        subquery_acumulada = DepreciacionMensual.objects.filter(
-            bien=OuterRef('pk')
-        ).order_by('-anio', '-mes').values('depreciacion_acumulada')[:1]
-        subquery_neto = DepreciacionMensual.objects.filter(
-            bien=OuterRef('pk')
-        ).order_by('-anio', '-mes').values('valor_neto_en_libros')[:1]
-        bienes = Bien.objects.annotate(
-            ultima_depreciacion_acumulada=Subquery(subquery_acumulada),
-            ultimo_valor_neto=Subquery(subquery_neto)
-        ).filter(ultima_depreciacion_acumulada__isnull=False).order_by('codigo_patrimonial')
-        titulo = "REPORTE DE DEPRECIACIÓN ACUMULADA"
-        buffer = generar_reporte_depreciacion_excel(bienes, titulo)
-        response = HttpResponse(buffer, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename="reporte_depreciacion.xlsx"'
-        return response
+    def get(self, request, pk, *args, **kwargs):
+        solicitud = get_object_or_404(solicitudes_visibles(request.user), pk=pk)
+        if solicitud.estado != 'COMPLETADA':
+            return Response(
+                {'error': f'El reporte no está disponible (estado: {solicitud.get_estado_display()}).'},
+                status=status.HTTP_409_CONFLICT
+            )
+        try:
+            archivo = open(ruta_archivo_solicitud(solicitud), 'rb')
+        except FileNotFoundError:
+            return Response({'error': 'El archivo del reporte ya no está disponible.'}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(
+            archivo,
+            as_attachment=True,
+            filename=solicitud.nombre_archivo,
+            content_type=TIPOS_REPORTE[solicitud.tipo].tipo_contenido,
+        )
 
 class SiguienteCodigoPatrimonialView(APIView):
     """
@@ -170,4 +170,15 @@ SIMPLE_JWT = {
 
 # Configuración para archivos subidos por el usuario (Media)
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Procesos de cálculo para la depreciación (1 = sin paralelismo).
+# Los bienes de cada lote se reparten por rangos de id entre los procesos.
+DEPRECIACION_TRABAJADORES = int(os.environ.get('DEPRECIACION_TRABAJADORES', 1))
+# Directorio de los fragmentos de las subidas fragmentadas de carga masiva y de los
+# valores anteriores de los bienes que actualiza una importación en curso
+# (fuera de MEDIA_ROOT para que no se sirvan como archivos públicos).
+IMPORTACION_FRAGMENTOS_DIR = os.environ.get('IMPORTACION_FRAGMENTOS_DIR', os.path.join(BASE_DIR, 'subidas_fragmentadas'))
+# Directorio de la caché de reportes PDF y Excel generados (ver bienes_app/cache_reportes.py).
+REPORTES_CACHE_DIR = os.environ.get('REPORTES_CACHE_DIR', os.path.join(BASE_DIR, 'reportes_cache'))
+# Reportes que el comando procesar_reportes genera a la vez (cada uno en su propio proceso).
+REPORTES_TRABAJADORES = int(os.environ.get('REPORTES_TRABAJADORES', 2))
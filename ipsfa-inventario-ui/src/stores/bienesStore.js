@@ -2,12 +2,25 @@
 import { defineStore } from 'pinia';
 import apiClient from '@/services/api'; // Importamos nuestra instancia de Axios configurada
 
+const INTERVALO_CONSULTA_MS = 2000; // Cada cuánto se consulta el avance de una carga masiva
+const ESTADOS_FINALES_IMPORTACION = ['COMPLETADA', 'RECHAZADA', 'FALLIDA'];
+
+const esperar = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Los archivos más grandes que esto se suben en fragmentos, reanudables tras un corte
+const UMBRAL_SUBIDA_FRAGMENTADA = 20 * 1024 * 1024;
+const REINTENTOS_FRAGMENTO = 3;
+// Identifica en localStorage la subida en curso de un archivo, para retomarla
+const claveSubida = (archivo) => `subida_fragmentada:${archivo.name}:${archivo.size}:${archivo.lastModified}`;
+
 export const useBienesStore = defineStore('bienes', {
   state: () => ({
     bienes: [], // Aquí almacenaremos la lista de bienes del backend
     bienActual: null, // Para almacenar un bien individual (ej: para vista de detalle o edición)
     loading: false, // Para indicar si se está cargando datos
     error: null,    // Para almacenar mensajes de error de la API
+    importacionActual: null, // Carga masiva en segundo plano (estado, progreso, tiempo restante)
+    progresoSubida: null, // Porcentaje enviado de un archivo grande subido en fragmentos
   }),
 
   getters: {
@@ -154,36 +167,181 @@ export const useBienesStore = defineStore('bienes', {
     },
 
     // NUEVA ACCIÓN PARA CARGA MASIVA
-    async subirArchivoBienes(archivo) {
+    async subirArchivoBienes(archivo, modo = 'CREAR', crearProveedores = false, permitirDuplicados = false) { // modo: 'CREAR' o 'ACTUALIZAR' (reimportación)
       this.loading = true;
       this.error = null;
+      this.importacionActual = null;
+      this.progresoSubida = null;
 
       const formData = new FormData();
       formData.append('file', archivo);
+      formData.append('modo', modo);
+      formData.append('crear_proveedores', crearProveedores);
+      formData.append('permitir_duplicados', permitirDuplicados);
 
       try {
-        const response = await apiClient.post('/bienes/upload/', formData, {
-          headers: {
-            'Content-Type': 'multipart/form-data',
-          },
-        });
-        console.log('Respuesta de la carga masiva:', response.data);
-        await this.fetchBienes();
-        return response.data;
+        // El backend solo encola la carga (202) y devuelve la importación creada
+        const response = archivo.size > UMBRAL_SUBIDA_FRAGMENTADA
+          ? await this.subirArchivoFragmentado(archivo, modo, crearProveedores, permitirDuplicados)
+          : await apiClient.post('/bienes/upload/', formData, {
+            headers: {
+              'Content-Type': 'multipart/form-data',
+            },
+          });
+        this.importacionActual = response.data;
+        const importacion = await this.esperarImportacion(response.data.id);
+        if (importacion.estado === 'COMPLETADA') {
+          await this.fetchBienes();
+          return {
+            status: `Archivo '${importacion.nombre_archivo}' procesado exitosamente.`,
+            total_procesados: importacion.total_filas,
+            bienes_creados: importacion.bienes_creados,
+            bienes_actualizados: importacion.bienes_actualizados,
+            bienes_sin_cambios: importacion.bienes_sin_cambios,
+            proveedores_creados: importacion.proveedores_creados,
+          };
+        }
+        this.error = 'Error durante la carga masiva.';
+        throw {
+          status: importacion.estado === 'RECHAZADA'
+            ? 'Se encontraron errores en el archivo. No se ha guardado ningún bien.'
+            : importacion.mensaje_error,
+          success_count: 0,
+          error_count: importacion.filas_con_error,
+          importacion,
+        };
       } catch (err) {
         this.error = 'Error durante la carga masiva.';
-        if (err.response && err.response.data) {
+        if (err.importacion) {
+          throw err;
+        } else if (err.response && err.response.data) {
           console.error('Error en subirArchivoBienes (API):', err.response.data);
           throw err.response.data;
         } else {
           console.error('Error en subirArchivoBienes (General):', err.message);
           throw new Error(this.error);
         }
+      } finally {
+        this.loading = false;
+        this.progresoSubida = null;
+      }
+    },
+
+    async subirArchivoFragmentado(archivo, modo, crearProveedores, permitirDuplicados) {
+      // Sube el archivo en fragmentos; si una subida anterior del mismo archivo quedó cortada, la retoma
+      const clave = claveSubida(archivo);
+      let subida = null;
+      const idGuardado = localStorage.getItem(clave);
+      if (idGuardado) {
+        try {
+          subida = (await apiClient.get(`/bienes/upload/fragmentado/${idGuardado}/`)).data;
+        } catch {
+          subida = null;
+        }
+        if (subida && subida.estado !== 'EN_CURSO') {
+          subida = null;
+        }
+      }
+      if (!subida) {
+        subida = (await apiClient.post('/bienes/upload/fragmentado/', {
+          nombre_archivo: archivo.name,
+          tamano_total: archivo.size,
+          modo,
+          crear_proveedores: crearProveedores,
+          permitir_duplicados: permitirDuplicados,
+        })).data;
+        localStorage.setItem(clave, subida.id);
+      }
+
+      const faltantes = subida.fragmentos_faltantes;
+      let enviados = subida.total_fragmentos - faltantes.length;
+      this.progresoSubida = Math.round((enviados / subida.total_fragmentos) * 100);
+      for (const numero of faltantes) {
+        const inicio = numero * subida.tamano_fragmento;
+        const fragmento = new FormData();
+        fragmento.append('fragmento', archivo.slice(inicio, inicio + subida.tamano_fragmento));
+        for (let intento = 1; ; intento++) {
+          try {
+            await apiClient.put(`/bienes/upload/fragmentado/${subida.id}/${numero}/`, fragmento, {
+              headers: {
+                'Content-Type': 'multipart/form-data',
+              },
+            });
+            break;
+          } catch (err) {
+            // Los errores del servidor (400) no se corrigen reintentando
+            if (intento >= REINTENTOS_FRAGMENTO || err.response?.status === 400) {
+              throw err;
+            }
+            await esperar(INTERVALO_CONSULTA_MS * intento);
+          }
+        }
+        enviados += 1;
+        this.progresoSubida = Math.round((enviados / subida.total_fragmentos) * 100);
+      }
+
+      const response = await apiClient.post(`/bienes/upload/fragmentado/${subida.id}/completar/`);
+      localStorage.removeItem(clave);
+      this.progresoSubida = null;
+      return response;
+    },
+
+    async simularCargaBienes(archivo, modo = 'CREAR', crearProveedores = false, permitirDuplicados = false) {
+      // Valida el archivo completo sin guardar nada y devuelve el resumen de lo que haría la carga
+      this.loading = true;
+      this.error = null;
+      this.importacionActual = null;
+
+      const formData = new FormData();
+      formData.append('file', archivo);
+      formData.append('modo', modo);
+      formData.append('crear_proveedores', crearProveedores);
+      formData.append('permitir_duplicados', permitirDuplicados);
+      formData.append('simular', true);
+
+      try {
+        const response = await apiClient.post('/bienes/upload/', formData, {
+          headers: {
+            'Content-Type': 'multipart/form-data',
+          },
+        });
+        return response.data;
+      } catch (err) {
+        this.error = 'Error al validar el archivo.';
+        console.error('Error en simularCargaBienes:', err.response?.data || err.message);
+        throw err.response?.data || new Error(this.error);
       } finally {
         this.loading = false;
       }
     },
 
+    async esperarImportacion(id) {
+      // Consulta periódicamente el estado hasta que la carga termine
+      let importacion = this.importacionActual;
+      while (!ESTADOS_FINALES_IMPORTACION.includes(importacion.estado)) {
+        await esperar(INTERVALO_CONSULTA_MS);
+        const response = await apiClient.get(`/bienes/importaciones/${id}/`);
+        importacion = response.data;
+        this.importacionActual = importacion;
+      }
+      return importacion;
+    },
+
+    async descargarHojaErrores(importacion) {
+      // Hoja Excel con las filas del archivo y una columna ERRORES por fila
+      const response = await apiClient.get(`/bienes/importaciones/${importacion.id}/errores/`, {
+        responseType: 'blob',
+      });
+      const url = URL.createObjectURL(response.data);
+      const link = document.createElement('a');
+      link.href = url;
+      link.setAttribute('download', `errores_${importacion.nombre_archivo.replace(/\.[^.]+$/, '')}.xlsx`);
+      document.body.appendChild(link);
+      link.click();
+      document.body.removeChild(link);
+      URL.revokeObjectURL(url);
+    },
+
     // Helper para formatear errores de API (si DRF devuelve un objeto de errores por campo)
     formatApiErrors(errors) {
       let formattedError = "Error al procesar la solicitud: ";
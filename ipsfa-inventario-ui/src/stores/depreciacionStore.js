@@ -2,36 +2,78 @@
 import { defineStore } from 'pinia';
 import apiClient from '@/services/api';
 
+const INTERVALO_CONSULTA_MS = 2000; // Cada cuánto se consulta el avance de la ejecución
+const ESTADOS_FINALES = ['COMPLETADA', 'FALLIDA'];
+
+const esperar = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
 export const useDepreciacionStore = defineStore('depreciacion', {
   state: () => ({
     loading: false,
     error: null,
+    ejecucionActual: null, // Ejecución en segundo plano (estado, progreso, contadores)
     ultimoResultado: null, // Para almacenar el resumen del último cálculo
   }),
   getters: {
     isLoading: (state) => state.loading,
     getUltimoResultado: (state) => state.ultimoResultado,
+    getProgreso: (state) => state.ejecucionActual?.progreso ?? 0,
   },
   actions: {
     async ejecutarCalculoDepreciacion(periodo) { // periodo será un objeto { mes, anio }
       this.loading = true;
       this.error = null;
       this.ultimoResultado = null;
+      this.ejecucionActual = null;
 
       try {
-        // Hacemos la petición POST al endpoint del backend
+        // El backend solo encola el cálculo (202) y devuelve la ejecución creada
         const response = await apiClient.post('/depreciacion/calcular/', periodo);
-        this.ultimoResultado = response.data;
-        console.log('Respuesta del cálculo de depreciación:', response.data);
-        return response.data; // Devolvemos el resultado al componente
+        this.ejecucionActual = response.data;
+        const ejecucion = await this.esperarEjecucion(response.data.id);
+        this.ultimoResultado = this.resumirEjecucion(ejecucion);
+        if (ejecucion.estado === 'FALLIDA') {
+          throw new Error(ejecucion.mensaje_error || 'El cálculo de depreciación falló.');
+        }
+        return this.ultimoResultado; // Devolvemos el resultado al componente
       } catch (err) {
-        const errorMessage = err.response?.data?.error || 'Ocurrió un error inesperado durante el cálculo.';
+        // Si ya hay una ejecución en curso (409), se muestra su avance en lugar de fallar sin más
+        if (err.response?.status === 409 && err.response.data?.ejecucion) {
+          this.ejecucionActual = err.response.data.ejecucion;
+        }
+        const errorMessage = err.response?.data?.error || err.message || 'Ocurrió un error inesperado durante el cálculo.';
         this.error = errorMessage;
         console.error('Error en ejecutarCalculoDepreciacion:', err);
         throw new Error(errorMessage);
       } finally {
         this.loading = false;
       }
+    },
+
+    async esperarEjecucion(id) {
+      // Consulta periódicamente el estado hasta que la ejecución termine
+      let ejecucion = this.ejecucionActual;
+      while (!ESTADOS_FINALES.includes(ejecucion.estado)) {
+        await esperar(INTERVALO_CONSULTA_MS);
+        const response = await apiClient.get(`/depreciacion/ejecuciones/${id}/`);
+        ejecucion = response.data;
+        this.ejecucionActual = ejecucion;
+      }
+      return ejecucion;
+    },
+
+    resumirEjecucion(ejecucion) {
+      return {
+        status: ejecucion.estado === 'COMPLETADA'
+          ? `Cálculo de depreciación hasta ${ejecucion.mes}/${ejecucion.anio} completado.`
+          : `Cálculo de depreciación hasta ${ejecucion.mes}/${ejecucion.anio} fallido.`,
+        mes: ejecucion.mes,
+        anio: ejecucion.anio,
+        bienes_calculados: ejecucion.bienes_procesados,
+        bienes_omitidos: ejecucion.bienes_omitidos,
+        total_registros_mensuales_creados: ejecucion.registros_creados,
+        errores: ejecucion.mensaje_error ? [ejecucion.mensaje_error] : [],
+      };
     }
   }
-});
\ No newline at end of file
+});